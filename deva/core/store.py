@@ -4,13 +4,28 @@ from .core import Stream
 from deva.utils.ioloop import get_io_loop
 from .pipe import passed
 from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+import atexit
 import logging
 import os
 import time
 import threading
+import weakref
 
 logger = logging.getLogger(__name__)
 
+# 存活的写后缓冲 DBStream；退出时由单个 atexit 钩子统一 flush，弱引用不阻止回收
+_write_behind_streams = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_write_behind_streams():
+    for stream in list(_write_behind_streams):
+        try:
+            stream.flush()
+        except Exception as e:
+            logger.warning("退出时 flush %s 失败: %s", getattr(stream, 'name', stream), e)
+
 """
 SqliteDict 和 DBStream 的关系说明:
 
@@ -53,12 +68,14 @@ class DBStream(Stream):
     - 容量管理：可设置最大存储容量，自动清理旧数据
     - 时间序列：支持基于时间范围的数据查询和回放
     - 异步支持：支持异步函数返回的数据流式写入
+    - 写后合并提交：可选 write_behind 模式，按间隔/批量大小合并成一个事务
 
     参数：
         name (str): 表名，默认为 'default'
         filename (str): 数据库文件路径，默认在 ~/.deva/nb.sqlite
         maxsize (int): 最大存储记录数，默认无限制
         log (Stream): 日志流对象，默认为 passed
+        write_behind (bool): 是否开启写后合并提交，默认关闭
 
     示例：
         # 创建数据库
@@ -81,11 +98,21 @@ class DBStream(Stream):
 
         # 数据回放
         db.replay(start='2023-01-01 00:00:00', interval=1)  # 每秒回放一条数据
+
+        # 高频写入：合并提交
+        ticks = DBStream('ticks', write_behind=True, flush_interval=0.5, flush_batch_size=2000)
+        ticks.append({'price': 10.0})  # 进入缓冲区
+        ticks.flush()                  # 持久化点
+
+        with db.batch():               # 块内写入合并为一个事务
+            for i in range(1000):
+                db[i] = i
     """
 
     def __init__(self, name='default', filename=None,
                  maxsize=None, log=passed, key_mode='explicit',
-                 time_dict_policy='reject', **kwargs):
+                 time_dict_policy='reject', write_behind=False,
+                 flush_interval=1.0, flush_batch_size=1000, **kwargs):
         """初始化数据库流对象
 
         Args:
@@ -99,6 +126,11 @@ class DBStream(Stream):
             time_dict_policy (str): 当 key_mode='time' 且输入为 dict 时的策略：
                 - reject: 抛出 TypeError（默认，避免误写）
                 - append: 将整个 dict 作为一条事件按时间戳写入
+            write_behind (bool): 写后合并提交模式。写入先进入内存缓冲区，
+                满 flush_batch_size 条或距首条缓冲写入超过 flush_interval 秒时
+                合并为一个事务提交；读操作会先刷出缓冲区
+            flush_interval (float): 缓冲区最长停留时间（秒）
+            flush_batch_size (int): 缓冲区达到该条数时立即提交
             **kwargs: 其他传递给 SqliteDict 的参数
         """
         # 初始化日志流和表名
@@ -119,6 +151,21 @@ class DBStream(Stream):
         self._time_index_ts = []
         self._time_index_dirty = True
         self._time_index_lock = threading.RLock()
+        self._last_time_key = 0.0
+
+        # 增量维护的行数（仅 maxsize 模式使用），None 表示尚未统计
+        self._row_count = None
+
+        # 写后合并提交缓冲区
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._pending = {}
+        self._pending_appended = set()  # 由 append 生成的新键，无需查重
+        self._pending_lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer = None
+        self._batch_depth = 0
 
         if not filename:
             db_path = os.getenv("DEVA_DB_PATH", "~/.deva/nb.sqlite")
@@ -142,18 +189,31 @@ class DBStream(Stream):
             autocommit=False,  # 关闭自动提交以提高性能
             **kwargs)
 
-        # 绑定常用方法
-        self.keys = self.db.keys
-        self.values = self.db.values
-        self.items = self.db.items
-        self.get = self.db.get
         self._check_size_limit()
+        if self.write_behind:
+            _write_behind_streams.add(self)
 
     @property
     def tables(self):
         """获取所有表名"""
         return self.db.tables
 
+    def keys(self):
+        self._flush_if_pending()
+        return self.db.keys()
+
+    def values(self):
+        self._flush_if_pending()
+        return self.db.values()
+
+    def items(self):
+        self._flush_if_pending()
+        return self.db.items()
+
+    def get(self, key, default=None):
+        self._flush_if_pending()
+        return self.db.get(key, default)
+
     def emit(self, x, asynchronous=False):
         """发送数据到流中
 
@@ -172,29 +232,35 @@ class DBStream(Stream):
             self.update(x)
     
     def _check_size_limit(self):
-        """检查并维护最大容量限制"""
+        """检查并维护最大容量限制
+
+        行数与时间索引均为增量维护，只有首次或外部删除后才会全表扫描重建。
+        """
         if not self.maxsize:
             return
-        excess = len(self.db) - self.maxsize
+        if self._row_count is None:
+            self._row_count = len(self.db)
+        excess = self._row_count - self.maxsize
         if excess <= 0:
             return
 
         self._rebuild_time_index()
         with self._time_index_lock:
             evict_keys = [key for _, key in self._time_index[:excess]]
-            evicted = set()
-            for key in evict_keys:
-                if key in self.db:
-                    del self.db[key]
-                    evicted.add(key)
+            del self._time_index[:len(evict_keys)]
+            del self._time_index_ts[:len(evict_keys)]
+            self.db.delete_many(evict_keys)
 
-            remain = excess - len(evicted)
+            remain = excess - len(evict_keys)
             if remain > 0:
-                fallback_keys = [k for k in self.db.keys() if k not in evicted]
+                # 时间索引已耗尽，剩余的都是非时间键
+                fallback_keys = [k for k in self.db.keys() if self._to_float_timestamp(k) is None]
                 fallback_keys.sort(key=lambda x: str(x))
-                for key in fallback_keys[:remain]:
-                    del self.db[key]
-        self._mark_time_index_dirty()
+                fallback_keys = fallback_keys[:remain]
+                self.db.delete_many(fallback_keys)
+                evict_keys.extend(fallback_keys)
+            self.db.commit()
+        self._row_count -= len(evict_keys)
 
     def update(self, x):
         """更新数据库内容
@@ -250,30 +316,141 @@ class DBStream(Stream):
             self._time_index_ts = [ts for ts, _ in data]
             self._time_index_dirty = False
 
+    def _next_time_key(self):
+        """生成严格递增的时间戳键
+
+        SQLite 以 15 位有效数字的文本保存浮点键（当前时间戳约 10 微秒精度），
+        同一精度内的连续写入会互相覆盖，因此对齐到 5 位小数并保证递增。
+        """
+        with self._time_index_lock:
+            key = round(time.time(), 5)
+            if key <= self._last_time_key:
+                key = round(self._last_time_key + 1e-5, 5)
+            self._last_time_key = key
+            return key
+
     def append(self, value, key=None):
         """将一条事件按时间戳键写入。"""
-        store_key = time.time() if key is None else key
-        self.db.update({store_key: value})
-        self.db.commit()  # 手动提交事务
-        self._mark_time_index_dirty()
-        self._check_size_limit()
+        store_key = self._next_time_key() if key is None else key
+        self._write({store_key: value}, new_keys=(store_key,) if key is None else ())
         return store_key
 
     def upsert(self, key, value):
         """按显式键写入/覆盖一条记录。"""
-        self.db.update({key: value})
-        self.db.commit()  # 手动提交事务
-        self._mark_time_index_dirty()
-        self._check_size_limit()
+        self._write({key: value})
         return key
 
     def bulk_update(self, mapping):
         """批量写入映射。"""
+        self._write(dict(mapping))
+        return self
+
+    def _write(self, mapping, new_keys=()):
+        """写入入口：直接提交，或在写后合并模式/批量块中进入缓冲区"""
+        if not (self.write_behind or self._batch_depth):
+            self._commit(mapping, new_keys)
+            return
+
+        with self._pending_lock:
+            self._pending.update(mapping)
+            self._pending_appended.update(new_keys)
+            self._pending_appended.difference_update(k for k in mapping if k not in new_keys)
+            # 批量块内不按条数 / 定时提交，只在块退出时提交
+            if self._batch_depth:
+                return
+            size = len(self._pending)
+            if size < self.flush_batch_size:
+                self._schedule_flush()
+        if size >= self.flush_batch_size:
+            self.flush()
+
+    def _commit(self, mapping, new_keys=()):
+        """一个事务写入 mapping，并增量维护行数与时间索引"""
+        if not mapping:
+            return
+        if not self.maxsize:
+            self.db.update(mapping)
+            self.db.commit()  # 手动提交事务
+            self._mark_time_index_dirty()
+            return
+
+        new_keys = set(new_keys)
+        candidates = [k for k in mapping if k not in new_keys]
+        existing = set(self.db.existing_keys(candidates)) if candidates else set()
+
         self.db.update(mapping)
         self.db.commit()  # 手动提交事务
-        self._mark_time_index_dirty()
+        self._track_new_keys([k for k in mapping if k not in existing])
         self._check_size_limit()
-        return self
+
+    def _track_new_keys(self, keys):
+        """新插入的键：累加行数，并按时间戳插入有序时间索引"""
+        if self._row_count is not None:
+            self._row_count += len(keys)
+        with self._time_index_lock:
+            if self._time_index_dirty:
+                return
+            for key in keys:
+                ts = self._to_float_timestamp(key)
+                if ts is None:
+                    continue
+                if not self._time_index_ts or ts >= self._time_index_ts[-1]:
+                    # 时间键通常单调递增，直接追加
+                    self._time_index.append((ts, key))
+                    self._time_index_ts.append(ts)
+                else:
+                    pos = bisect_right(self._time_index_ts, ts)
+                    self._time_index.insert(pos, (ts, key))
+                    self._time_index_ts.insert(pos, ts)
+
+    def _schedule_flush(self):
+        """缓冲区有数据时启动一次性定时提交"""
+        if self._flush_timer is None and self.flush_interval:
+            self._flush_timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_on_timer(self):
+        """定时提交；批量块进行中时留给块退出时提交"""
+        with self._pending_lock:
+            if self._batch_depth:
+                self._flush_timer = None
+                return
+        self.flush()
+
+    def _flush_if_pending(self):
+        if self._pending:
+            self.flush()
+
+    def flush(self):
+        """将缓冲区中的写入合并为一个事务提交，返回提交条数"""
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                appended, self._pending_appended = self._pending_appended, set()
+                timer, self._flush_timer = self._flush_timer, None
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            self._commit(pending, appended)
+        return len(pending)
+
+    @contextmanager
+    def batch(self):
+        """批量写入块：块内写入进入缓冲区，最外层块退出时一次提交（持久化点）
+
+        块内不按 flush_batch_size / flush_interval 提交；块内的读取（len、get、时间范围等）
+        为读到最新数据仍会先提交缓冲区。
+        """
+        with self._pending_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._pending_lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
 
     def __slice__(self, start=None, stop=None):
         """时间切片操作
@@ -287,6 +464,7 @@ class DBStream(Stream):
         """
         from datetime import datetime
 
+        self._flush_if_pending()
         self._rebuild_time_index()
         with self._time_index_lock:
             if not self._time_index:
@@ -303,6 +481,50 @@ class DBStream(Stream):
                 if start < ts < stop:
                     yield key
 
+    @staticmethod
+    def _range_bound(value):
+        """时间范围边界: None / 时间戳 / datetime / ISO 字符串 → 时间戳"""
+        from datetime import datetime
+
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.timestamp()
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                return datetime.fromisoformat(value).timestamp()
+        return float(value)
+
+    def time_range(self, start=None, stop=None, values=False, chunk_size=1000):
+        """按时间顺序遍历 [start, stop] 内的时间键（含两端）
+
+        在 SQL 侧按数值键的表达式索引做范围查询并分块拉取，
+        不需要先载入全部键，内存占用与表大小无关。
+
+        Args:
+            start: 开始时间（时间戳、datetime 或 ISO 字符串），None 表示最早
+            stop: 结束时间，None 表示最新
+            values: 为 True 时产出 (key, value)
+            chunk_size: 每次查询的行数
+
+        Yields:
+            key 或 (key, value)
+        """
+        self._flush_if_pending()
+        rows = self.db.iter_numeric_range(
+            self._range_bound(start), self._range_bound(stop),
+            chunk_size=chunk_size, with_values=values,
+        )
+        for row in rows:
+            yield (row[1], row[2]) if values else row[1]
+
+    def time_bounds(self, start=None, stop=None):
+        """[start, stop] 内时间键的 (最早时间戳, 最晚时间戳, 数量)"""
+        self._flush_if_pending()
+        return self.db.numeric_range_bounds(self._range_bound(start), self._range_bound(stop))
+
     @gen.coroutine
     def replay(self, start=None, end=None, interval=None):
         """时序数据回放
@@ -321,6 +543,7 @@ class DBStream(Stream):
 
     def __len__(self):
         """获取数据库记录数"""
+        self._flush_if_pending()
         return self.db.__len__()
 
     def __getitem__(self, item):
@@ -331,6 +554,7 @@ class DBStream(Stream):
         """
         if isinstance(item, slice):
             return self.__slice__(item.start, item.stop)
+        self._flush_if_pending()
         return self.db.__getitem__(item)
 
     def __setitem__(self, key, value):
@@ -340,21 +564,30 @@ class DBStream(Stream):
 
     def __delitem__(self, x):
         """删除数据"""
+        self._flush_if_pending()
         result = self.db.__delitem__(x)
         self.db.commit()  # 手动提交事务
+        if self._row_count is not None:
+            self._row_count -= 1
         self._mark_time_index_dirty()
         return result
 
     def __contains__(self, x):
         """检查键是否存在"""
+        self._flush_if_pending()
         return self.db.__contains__(x)
 
     def __iter__(self):
         """迭代器"""
+        self._flush_if_pending()
         return self.db.__iter__()
 
     def clear(self):
         """清空当前表。"""
+        with self._pending_lock:
+            self._pending.clear()
+            self._pending_appended.clear()
         result = self.db.clear()
+        self._row_count = 0 if self.maxsize else None
         self._mark_time_index_dirty()
         return result
@@ -6,6 +6,7 @@ Attention Kernel - 事件级注意力计算核心
 - QueryState：全局查询状态
 - Encoder：Key/Value 编码器
 - AttentionHead：单头注意力
+- EventFeatureMatrix / FeatureScorer：批量打分的事件特征矩阵与可向量化 scorer
 - MultiHeadAttention：多头注意力融合
 - AttentionKernel：核心注意力中枢
 - ManasEngine：末那识引擎（完整决策中枢）
@@ -28,6 +29,7 @@ Attention Kernel - 事件级注意力计算核心
 from .event import AttentionEvent
 from .state import QueryState
 from .event_encoder import Encoder
+from .feature_matrix import EventFeatureMatrix, FeatureScorer, CallableScorer
 from .attention_scorer import AttentionHead
 from .multi_scorer import MultiHeadAttention
 from .kernel import AttentionKernel
@@ -69,6 +71,9 @@ __all__ = [
     "AttentionEvent",
     "QueryState",
     "Encoder",
+    "EventFeatureMatrix",
+    "FeatureScorer",
+    "CallableScorer",
     "AttentionHead",
     "MultiHeadAttention",
     "AttentionKernel",
@@ -2,9 +2,12 @@
 AttentionHead - 单头注意力
 
 实现标准的 attention 计算：score -> softmax -> weighted sum
+
+打分在 EventFeatureMatrix 上批量完成：可向量化 scorer 直接按特征列计算，
+普通 (Q, K) -> score 函数经 CallableScorer 逐 key 调用。
 """
 
-import math
+from .feature_matrix import EventFeatureMatrix, as_vector_scorer, softmax, value_dict
 
 
 class AttentionHead:
@@ -13,7 +16,7 @@ class AttentionHead:
 
     属性:
         name: 头的名称
-        scorer: 相似度计算函数 (Q, K) -> score
+        scorer: 相似度计算函数 (Q, K) -> score，或实现 score_matrix 的可向量化 scorer
     """
 
     def __init__(self, name, scorer):
@@ -22,36 +25,41 @@ class AttentionHead:
 
         Args:
             name: 头的名称
-            scorer: (Q, K) -> score 的函数
+            scorer: (Q, K) -> score 的函数，或可向量化 scorer（如 FeatureScorer）
         """
         self.name = name
         self.scorer = scorer
 
+    def score_matrix(self, Q, matrix):
+        """
+        对一批事件打分
+
+        Args:
+            Q: QueryState 或 query dict
+            matrix: EventFeatureMatrix
+
+        Returns:
+            长度为 N 的 score 数组
+        """
+        return as_vector_scorer(self.scorer).score_matrix(Q, matrix)
+
     def compute(self, Q, events):
         """
         计算单头 attention 输出
 
         Args:
             Q: QueryState 或 query dict
-            events: AttentionEvent 列表
+            events: AttentionEvent 列表或 EventFeatureMatrix
 
         Returns:
             加权聚合后的 dict {alpha, risk, confidence}
         """
-        if not events:
-            return {"alpha": 0, "risk": 0, "confidence": 0}
-
-        scores = []
-        values = []
-        for e in events:
-            k = e.key if e.key is not None else e.features
-            v = e.value if e.value is not None else {}
-            score = self.scorer(Q, k)
-            scores.append(score)
-            values.append(v)
+        matrix = EventFeatureMatrix.of(events)
+        if not len(matrix):
+            return value_dict()
 
-        weights = self._softmax(scores)
-        return self._aggregate(weights, values)
+        weights = softmax(self.score_matrix(Q, matrix))
+        return value_dict(weights @ matrix.values)
 
     def _softmax(self, scores):
         """
@@ -63,30 +71,4 @@ class AttentionHead:
         Returns:
             归一化后的权重列表
         """
-        if not scores:
-            return []
-        exp_scores = [math.exp(s) for s in scores]
-        total = sum(exp_scores)
-        if total == 0:
-            return [0] * len(scores)
-        return [s / total for s in exp_scores]
-
-    def _aggregate(self, weights, values):
-        """
-        加权求和
-
-        Args:
-            weights: 权重列表
-            values: value dict 列表
-
-        Returns:
-            加权聚合后的 dict
-        """
-        result = {"alpha": 0, "risk": 0, "confidence": 0}
-        for w, v in zip(weights, values):
-            if not isinstance(v, dict):
-                continue
-            result["alpha"] += w * v.get("alpha", 0)
-            result["risk"] += w * v.get("risk", 0)
-            result["confidence"] += w * v.get("confidence", 0)
-        return result
\ No newline at end of file
+        return softmax(scores).tolist()
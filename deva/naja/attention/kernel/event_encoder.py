@@ -56,6 +56,22 @@ class Encoder:
             "action": event.features.get("action", None)
         }
 
+    def encode_batch(self, events):
+        """
+        批量编码一批事件的 key 和 value
+
+        Args:
+            events: AttentionEvent 列表
+
+        Returns:
+            编码后的事件列表
+        """
+        encoded = list(events)
+        for e in encoded:
+            e.key = self.encode_key(e)
+            e.value = self.encode_value(e)
+        return encoded
+
     def project_query(self, state):
         """
         投影 Query 状态
@@ -0,0 +1,155 @@
+"""
+EventFeatureMatrix - 批量注意力计算的事件特征矩阵
+
+一批事件只编码一次：
+- keys: 每个事件的 key（供逐事件 scorer 兼容调用）
+- values: N×3 的 value 矩阵（alpha / risk / confidence）
+- column(): 按需抽取的特征列，同一批事件内缓存
+
+scorer 分两类：
+- 可向量化 scorer（实现 score_matrix(Q, matrix) -> 长度 N 的数组），如 FeatureScorer
+- 普通 (Q, K) -> score 函数，由 CallableScorer 适配为逐 key 调用
+
+softmax() 减去最大值后取指数，支持 H×N 矩阵一次归一化所有头。
+"""
+
+import numpy as np
+
+VALUE_FIELDS = ("alpha", "risk", "confidence")
+
+
+def value_dict(row=None):
+    """value 向量 -> {alpha, risk, confidence}"""
+    if row is None:
+        return {field: 0 for field in VALUE_FIELDS}
+    return {field: float(x) for field, x in zip(VALUE_FIELDS, row)}
+
+
+def softmax(scores, temperature=1.0):
+    """
+    数值稳定的 softmax（沿最后一维）
+
+    指数和为 0（全部为 -inf）时返回全零权重，与逐元素 math.exp 实现的约定一致。
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        return scores
+    if temperature != 1.0:
+        scores = scores / temperature
+    peak = scores.max(axis=-1, keepdims=True)
+    peak = np.where(np.isfinite(peak), peak, 0.0)
+    exp_scores = np.exp(scores - peak)
+    total = exp_scores.sum(axis=-1, keepdims=True)
+    return np.divide(exp_scores, total, out=np.zeros_like(exp_scores), where=total > 0)
+
+
+def _feature_dict(key):
+    if isinstance(key, dict):
+        return key
+    return getattr(key, "features", None) or {}
+
+
+class EventFeatureMatrix:
+    """
+    一批 AttentionEvent 的特征矩阵
+
+    key / value 按 AttentionHead 的约定取：key 为空时用 features，
+    value 不是 dict 时该行记为 0。特征列在首次访问时抽取，
+    因此应在事件特征（_value_alignment、_recall_priority 等）写完之后构建。
+    """
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.keys = [e.key if e.key is not None else e.features for e in self.events]
+        self._features = None
+        self._columns = {}
+
+        values = [e.value if isinstance(e.value, dict) else {} for e in self.events]
+        # 按字段逐列抽取（N×3 视图），比逐行写入矩阵快
+        self.values = np.array([[v.get(field, 0) for v in values] for field in VALUE_FIELDS],
+                               dtype=np.float64).reshape(len(VALUE_FIELDS), len(values)).T
+
+    @classmethod
+    def of(cls, events):
+        """已经是 EventFeatureMatrix 时原样返回"""
+        return events if isinstance(events, cls) else cls(events)
+
+    def __len__(self):
+        return len(self.events)
+
+    def column(self, name, default=0.0):
+        """
+        特征列 K[name]
+
+        key 为 dict 时直接取值，否则取 key.features（与 Manas scorer 的约定一致）
+        """
+        cache_key = (name, default)
+        col = self._columns.get(cache_key)
+        if col is None:
+            if self._features is None:
+                self._features = [_feature_dict(k) for k in self.keys]
+            col = np.array([f.get(name, default) for f in self._features], dtype=np.float64)
+            self._columns[cache_key] = col
+        return col
+
+
+class FeatureScorer:
+    """
+    可向量化的特征 scorer
+
+    score = K[feature] × query_weight(Q) × (1 + boost_scale × K[boost_feature])
+
+    属性:
+        feature: 特征名，或 (Q) -> 特征名 的函数（如按市场状态选择特征）
+        query_weight: 可选的 (Q) -> 权重，只依赖 Q，每批计算一次
+        boost_feature: 可选的加权特征（如召回事件的 _recall_priority）
+    """
+
+    def __init__(self, feature, default=0.0, query_weight=None, boost_feature=None, boost_scale=2.0):
+        self.feature = feature
+        self.default = default
+        self.query_weight = query_weight
+        self.boost_feature = boost_feature
+        self.boost_scale = boost_scale
+
+    def feature_name(self, Q):
+        return self.feature(Q) if callable(self.feature) else self.feature
+
+    def __call__(self, Q, K):
+        """逐事件打分，与 score_matrix 的单行结果一致"""
+        features = _feature_dict(K)
+        score = features.get(self.feature_name(Q), self.default)
+        if self.query_weight is not None:
+            score = score * self.query_weight(Q)
+        if self.boost_feature:
+            score = score * (1.0 + self.boost_scale * features.get(self.boost_feature, 0))
+        return score
+
+    def score_matrix(self, Q, matrix):
+        scores = matrix.column(self.feature_name(Q), self.default)
+        if self.query_weight is not None:
+            scores = scores * self.query_weight(Q)
+        if self.boost_feature:
+            scores = scores * (1.0 + self.boost_scale * matrix.column(self.boost_feature, 0))
+        return scores
+
+
+class CallableScorer:
+    """把 (Q, K) -> score 函数适配为 score_matrix 接口（逐 key 调用）"""
+
+    def __init__(self, scorer):
+        self.scorer = scorer
+
+    def __call__(self, Q, K):
+        return self.scorer(Q, K)
+
+    def score_matrix(self, Q, matrix):
+        scorer = self.scorer
+        return np.array([scorer(Q, k) for k in matrix.keys], dtype=np.float64)
+
+
+def as_vector_scorer(scorer):
+    """可向量化 scorer 原样返回，普通函数用 CallableScorer 包装"""
+    if hasattr(scorer, "score_matrix"):
+        return scorer
+    return CallableScorer(scorer)
@@ -1,10 +1,11 @@
 """
 预定义多头配置
 
-提供默认的四个注意力头
+提供默认的四个注意力头，scorer 均为可向量化的 FeatureScorer
 """
 
 from .attention_scorer import AttentionHead
+from .feature_matrix import FeatureScorer
 
 
 def get_default_heads():
@@ -15,22 +16,10 @@ def get_default_heads():
         AttentionHead 列表
     """
     return [
-        AttentionHead(
-            "market",
-            scorer=lambda Q, K: K.get("price_change", 0)
-        ),
-        AttentionHead(
-            "news",
-            scorer=lambda Q, K: K.get("sentiment", 0)
-        ),
-        AttentionHead(
-            "flow",
-            scorer=lambda Q, K: K.get("volume_spike", 0)
-        ),
-        AttentionHead(
-            "meta",
-            scorer=lambda Q, K: K.get("historical_alpha", 0)
-        )
+        AttentionHead("market", scorer=FeatureScorer("price_change")),
+        AttentionHead("news", scorer=FeatureScorer("sentiment")),
+        AttentionHead("flow", scorer=FeatureScorer("volume_spike")),
+        AttentionHead("meta", scorer=FeatureScorer("historical_alpha")),
     ]
 
 
@@ -41,16 +30,16 @@ def get_regime_aware_heads():
     Returns:
         AttentionHead 列表
     """
-    def trend_scorer(Q, K):
+    def trend_feature(Q):
         regime = Q.get("regime", "neutral") if isinstance(Q, dict) else getattr(Q, "market_regime", {}).get("type", "neutral")
         if regime == "trend":
-            return K.get("momentum", 0)
+            return "momentum"
         elif regime == "reversal":
-            return K.get("reversal", 0)
-        return K.get("breakout", 0)
+            return "reversal"
+        return "breakout"
 
     return [
-        AttentionHead("trend", scorer=lambda Q, K: trend_scorer(Q, K)),
-        AttentionHead("reversal", scorer=lambda Q, K: K.get("reversal", 0)),
-        AttentionHead("breakout", scorer=lambda Q, K: K.get("breakout", 0)),
-    ]
\ No newline at end of file
+        AttentionHead("trend", scorer=FeatureScorer(trend_feature)),
+        AttentionHead("reversal", scorer=FeatureScorer("reversal")),
+        AttentionHead("breakout", scorer=FeatureScorer("breakout")),
+    ]
@@ -331,12 +331,8 @@ class AttentionKernel:
             attention 结果 dict
         """
         vs = self._get_value_system()
-        events = []
-        for e in raw_events:
-            e.key = self.encoder.encode_key(e)
-            e.value = self.encoder.encode_value(e)
-            events.append(e)
-
+        events = self.encoder.encode_batch(raw_events)
+        for e in events:
             alignment = vs.calculate_alignment(e.features)
             e.features["_value_alignment"] = alignment
         
@@ -403,12 +399,8 @@ class AttentionKernel:
         )
 
         vs = self._get_value_system()
-        events = []
-        for e in raw_events:
-            e.key = self.encoder.encode_key(e)
-            e.value = self.encoder.encode_value(e)
-            events.append(e)
-
+        events = self.encoder.encode_batch(raw_events)
+        for e in events:
             alignment = vs.calculate_alignment(e.features)
             e.features["_value_alignment"] = alignment
         
@@ -552,6 +544,7 @@ class AttentionKernel:
         - timing_score 调整行动紧迫度
         """
         from .attention_scorer import AttentionHead
+        from .feature_matrix import FeatureScorer
         from .multi_scorer import MultiHeadAttention
 
         focus = unified_output.attention_focus.value
@@ -561,19 +554,17 @@ class AttentionKernel:
         harmony = unified_output.harmony_state.value
         action = unified_output.action_type.value
 
-        # 基础 scorer：根据 attention_focus 调整各维度权重
-        def manas_market_scorer(Q, K):
-            """市场头 scorer - Q·K 联合打分"""
-            base = K.get("price_change", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("price_change", 0)
-            recall_boost = K.get("_recall_priority", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("_recall_priority", 0)
-
-            # 从 Q 获取 Manas 信息
-            q_features = {}
+        def query_features(Q):
+            """从 Q 获取 Manas 信息"""
             if isinstance(Q, dict):
-                q_features = Q
-            elif hasattr(Q, 'features') and Q.features:
-                q_features = Q.features
-
+                return Q
+            return getattr(Q, "features", None) or {}
+
+        # 基础 scorer：K 侧特征 × Q 侧权重 × 召回加权（1 + 2 × _recall_priority），
+        # Q 侧权重每批只算一次，K 侧按特征列批量计算
+        def market_weight(Q):
+            """市场头 - Q·K 联合打分"""
+            q_features = query_features(Q)
             q_regime = q_features.get("regime_score", 0)
             q_focus = q_features.get("attention_focus", "watch")
 
@@ -583,25 +574,12 @@ class AttentionKernel:
                 focus_weight = 1.5  # 止损时更关注市场波动
             elif q_focus == "accumulate":
                 focus_weight = 0.8
-            elif q_focus == "watch":
-                focus_weight = 1.0
-
-            # 召回事件获得额外加权
-            recall_weight = 1.0 + recall_boost * 2.0
-
-            return base * focus_weight * (1.0 + abs(q_regime) * 0.5) * recall_weight
 
-        def manas_news_scorer(Q, K):
-            """新闻/情绪头 scorer"""
-            base = K.get("sentiment", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("sentiment", 0)
-            recall_boost = K.get("_recall_priority", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("_recall_priority", 0)
-
-            q_features = {}
-            if isinstance(Q, dict):
-                q_features = Q
-            elif hasattr(Q, 'features') and Q.features:
-                q_features = Q.features
+            return focus_weight * (1.0 + abs(q_regime) * 0.5)
 
+        def news_weight(Q):
+            """新闻/情绪头"""
+            q_features = query_features(Q)
             q_timing = q_features.get("timing_score", 0.5)
             q_harmony = q_features.get("harmony_state", "neutral")
 
@@ -615,21 +593,11 @@ class AttentionKernel:
             elif q_harmony == "resistance":
                 harmony_weight = 0.6
 
-            recall_weight = 1.0 + recall_boost * 2.0
-
-            return base * timing_weight * harmony_weight * recall_weight
-
-        def manas_flow_scorer(Q, K):
-            """资金流头 scorer"""
-            base = K.get("volume_spike", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("volume_spike", 0)
-            recall_boost = K.get("_recall_priority", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("_recall_priority", 0)
-
-            q_features = {}
-            if isinstance(Q, dict):
-                q_features = Q
-            elif hasattr(Q, 'features') and Q.features:
-                q_features = Q.features
+            return timing_weight * harmony_weight
 
+        def flow_weight(Q):
+            """资金流头"""
+            q_features = query_features(Q)
             q_portfolio_sig = q_features.get("portfolio_signal", "none")
             q_regime = q_features.get("regime_score", 0)
 
@@ -643,21 +611,11 @@ class AttentionKernel:
             # 顺风环境资金流更可信
             regime_weight = 1.0 + max(q_regime, 0) * 0.5
 
-            recall_weight = 1.0 + recall_boost * 2.0
-
-            return base * sig_weight * regime_weight * recall_weight
-
-        def manas_meta_scorer(Q, K):
-            """Meta/Alpha 头 scorer - 由 Manas 历史表现驱动"""
-            base = K.get("historical_alpha", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("historical_alpha", 0)
-            recall_boost = K.get("_recall_priority", 0) if isinstance(K, dict) else getattr(K, "features", {}).get("_recall_priority", 0)
-
-            q_features = {}
-            if isinstance(Q, dict):
-                q_features = Q
-            elif hasattr(Q, 'features') and Q.features:
-                q_features = Q.features
+            return sig_weight * regime_weight
 
+        def meta_weight(Q):
+            """Meta/Alpha 头 - 由 Manas 历史表现驱动"""
+            q_features = query_features(Q)
             q_confidence = q_features.get("confidence_score", 0.5)
             q_action = q_features.get("action_type", "hold")
 
@@ -671,16 +629,18 @@ class AttentionKernel:
             elif q_action == "hold":
                 action_weight = 0.7
 
-            recall_weight = 1.0 + recall_boost * 2.0
-
-            return base * confidence_weight * action_weight * recall_weight
+            return confidence_weight * action_weight
 
         # 根据 attention_focus 动态调整 head 权重（通过 output_mode="merge" 的简单加法实现）
         heads = [
-            AttentionHead("market", scorer=manas_market_scorer),
-            AttentionHead("news", scorer=manas_news_scorer),
-            AttentionHead("flow", scorer=manas_flow_scorer),
-            AttentionHead("meta", scorer=manas_meta_scorer),
+            AttentionHead("market", scorer=FeatureScorer(
+                "price_change", query_weight=market_weight, boost_feature="_recall_priority")),
+            AttentionHead("news", scorer=FeatureScorer(
+                "sentiment", query_weight=news_weight, boost_feature="_recall_priority")),
+            AttentionHead("flow", scorer=FeatureScorer(
+                "volume_spike", query_weight=flow_weight, boost_feature="_recall_priority")),
+            AttentionHead("meta", scorer=FeatureScorer(
+                "historical_alpha", query_weight=meta_weight, boost_feature="_recall_priority")),
         ]
 
         return MultiHeadAttention(heads, output_mode="merge")
@@ -753,10 +713,7 @@ class AttentionKernel:
         passed_events = []
         rescue_state = {"state": "normal", "action": "watch"}
 
-        for e in raw_events:
-            e.key = self.encoder.encode_key(e)
-            e.value = self.encoder.encode_value(e)
-
+        for e in self.encoder.encode_batch(raw_events):
             filter_result = rescue_filter.filter(e)
 
             if not filter_result.passed:
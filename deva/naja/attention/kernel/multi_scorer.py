@@ -1,9 +1,15 @@
 """
 MultiHeadAttention - 多头注意力融合
 
-并行计算多个 AttentionHead 并融合结果
+并行计算多个 AttentionHead 并融合结果：事件只构建一次特征矩阵，
+所有 AttentionHead 的打分堆成 H×N 矩阵，一次 softmax、一次矩阵乘完成聚合。
 """
 
+import numpy as np
+
+from .attention_scorer import AttentionHead
+from .feature_matrix import EventFeatureMatrix, softmax, value_dict
+
 
 class MultiHeadAttention:
     """
@@ -29,17 +35,28 @@ class MultiHeadAttention:
         """
         计算多头 attention 输出
 
+        AttentionHead 走批量路径；其他头（如 TemperatureAwareHead）仍调用各自的 compute。
+
         Args:
             Q: QueryState 或 query dict
-            events: AttentionEvent 列表
+            events: AttentionEvent 列表或 EventFeatureMatrix
 
         Returns:
             融合后的 dict
         """
-        outputs = []
-        for head in self.heads:
-            out = head.compute(Q, events)
-            outputs.append(out)
+        matrix = EventFeatureMatrix.of(events)
+        outputs = [None] * len(self.heads)
+
+        batched = [i for i, head in enumerate(self.heads) if isinstance(head, AttentionHead)]
+        if batched and len(matrix):
+            scores = np.vstack([self.heads[i].score_matrix(Q, matrix) for i in batched])
+            pooled = softmax(scores) @ matrix.values
+            for i, row in zip(batched, pooled):
+                outputs[i] = value_dict(row)
+
+        for i, head in enumerate(self.heads):
+            if outputs[i] is None:
+                outputs[i] = head.compute(Q, matrix if isinstance(head, AttentionHead) else matrix.events)
 
         if self.output_mode == "concat":
             return self._concat(outputs)
@@ -72,4 +89,4 @@ class MultiHeadAttention:
         Returns:
             {"head_outputs": [...]} 包含所有头的输出
         """
-        return {"head_outputs": outputs}
\ No newline at end of file
+        return {"head_outputs": outputs}
@@ -5,7 +5,7 @@ Event Self-Attention - 事件自注意力层
 """
 
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Any, Optional
 from .embedding import EventEmbedding
 
 
@@ -41,64 +41,82 @@ class EventSelfAttention:
     事件自注意力层 - 让事件之间能够"互相看"
     
     借鉴 Transformer 的自注意力机制，但针对金融事件序列
+
+    注意力分数与输出均以批量矩阵乘一次算出（batch × head 维度广播），
+    可选 float32 计算以及 top-k 稀疏注意力（每个事件只关注分数最高的 k 个事件）。
     """
     
-    def __init__(self, d_model: int = 128, num_heads: int = 4):
+    def __init__(self, d_model: int = 128, num_heads: int = 4,
+                 dtype: Any = np.float64, top_k: Optional[int] = None):
         self.d_model = d_model
         self.num_heads = num_heads
         self.d_k = d_model // num_heads
+        self.dtype = np.dtype(dtype)
+        self.top_k = top_k
         
         # 投影矩阵
-        self.W_q = np.random.randn(d_model, d_model) * 0.01
-        self.W_k = np.random.randn(d_model, d_model) * 0.01
-        self.W_v = np.random.randn(d_model, d_model) * 0.01
-        self.W_o = np.random.randn(d_model, d_model) * 0.01
+        self.W_q = (np.random.randn(d_model, d_model) * 0.01).astype(self.dtype)
+        self.W_k = (np.random.randn(d_model, d_model) * 0.01).astype(self.dtype)
+        self.W_v = (np.random.randn(d_model, d_model) * 0.01).astype(self.dtype)
+        self.W_o = (np.random.randn(d_model, d_model) * 0.01).astype(self.dtype)
     
     def _split_heads(self, x: np.ndarray) -> np.ndarray:
         """将向量分割成多头"""
         batch_size, seq_len, d_model = x.shape
         return x.reshape(batch_size, seq_len, self.num_heads, self.d_k).transpose(0, 2, 1, 3)
     
-    def _scaled_dot_product_attention(self, Q: np.ndarray, K: np.ndarray, V: np.ndarray) -> tuple:
+    def _scaled_dot_product_attention(self, Q: np.ndarray, K: np.ndarray, V: np.ndarray,
+                                      mask: Optional[np.ndarray] = None) -> tuple:
         """
         缩放点积注意力 - Transformer 的核心
         
         这样可以让一个事件"关注"其他相关事件
         例如："AI 板块上涨"事件会增加"英伟达上涨"事件的权重
+
+        Args:
+            Q, K, V: (batch, heads, seq_len, d_k)
+            mask: 可选布尔掩码，可广播到 (batch, heads, seq_len, seq_len)，
+                  False 的位置不参与注意力
+
+        Returns:
+            (输出 (batch, heads, seq_len, d_k), 注意力权重 (batch, heads, seq_len, seq_len))
         """
-        # 简单实现：直接计算注意力分数
-        batch_size, num_heads, seq_len, d_k = Q.shape
+        seq_len, d_k = Q.shape[-2], Q.shape[-1]
+        
+        # 计算注意力分数: Q @ K^T / sqrt(d_k)
+        scores = np.matmul(Q, np.swapaxes(K, -1, -2)) / Q.dtype.type(np.sqrt(d_k))
         
-        # 计算注意力分数
-        scores = np.zeros((batch_size, num_heads, seq_len, seq_len))
-        for b in range(batch_size):
-            for h in range(num_heads):
-                for i in range(seq_len):
-                    for j in range(seq_len):
-                        scores[b, h, i, j] = np.dot(Q[b, h, i], K[b, h, j]) / np.sqrt(d_k)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        
+        if self.top_k is not None and 0 < self.top_k < seq_len:
+            # 稀疏注意力：每行只保留前 k 个分数
+            kth = np.partition(scores, seq_len - self.top_k, axis=-1)[..., seq_len - self.top_k, np.newaxis]
+            scores = np.where(scores >= kth, scores, -np.inf)
         
         attention_weights = self._softmax(scores)
         
         # 计算输出
-        output = np.zeros_like(Q)
-        for b in range(batch_size):
-            for h in range(num_heads):
-                for i in range(seq_len):
-                    output[b, h, i] = np.sum(attention_weights[b, h, i, j] * V[b, h, j] for j in range(seq_len))
+        output = np.matmul(attention_weights, V)
         
         return output, attention_weights
     
     def _softmax(self, x: np.ndarray) -> np.ndarray:
-        """数值稳定的 softmax"""
-        exp_x = np.exp(x - np.max(x, axis=-1, keepdims=True))
-        return exp_x / np.sum(exp_x, axis=-1, keepdims=True)
+        """数值稳定的 softmax（整行被掩码时输出全 0）"""
+        x_max = np.max(x, axis=-1, keepdims=True)
+        x_max = np.where(np.isfinite(x_max), x_max, x.dtype.type(0))
+        exp_x = np.exp(x - x_max)
+        denom = np.sum(exp_x, axis=-1, keepdims=True)
+        return np.divide(exp_x, denom, out=np.zeros_like(exp_x), where=denom > 0)
     
-    def forward(self, event_embeddings: List[EventEmbedding]) -> tuple:
+    def forward(self, event_embeddings: List[EventEmbedding],
+                mask: Optional[np.ndarray] = None) -> tuple:
         """
         前向传播
         
         Args:
             event_embeddings: 事件嵌入列表
+            mask: 可选布尔掩码 (seq_len, seq_len)，False 表示不关注
             
         Returns:
             (更新后的事件嵌入, 注意力权重矩阵)
@@ -108,7 +126,7 @@ class EventSelfAttention:
         if seq_len == 0:
             return [], np.array([])
         
-        X = np.array([e.vector for e in event_embeddings])[np.newaxis, :, :]  # (1, seq_len, d_model)
+        X = np.asarray([e.vector for e in event_embeddings], dtype=self.dtype)[np.newaxis, :, :]  # (1, seq_len, d_model)
         
         # 投影
         Q = np.matmul(X, self.W_q)
@@ -121,7 +139,7 @@ class EventSelfAttention:
         V = self._split_heads(V)
         
         # 自注意力计算
-        attn_output, attn_weights = self._scaled_dot_product_attention(Q, K, V)
+        attn_output, attn_weights = self._scaled_dot_product_attention(Q, K, V, mask=mask)
         
         # 合并头
         attn_output = attn_output.transpose(0, 2, 1, 3).reshape(1, seq_len, self.d_model)
@@ -157,12 +157,8 @@ class OSAttentionKernel:
 
         vs = self._get_value_system()
 
-        encoded_events = []
-        for e in events:
-            e.key = self.encoder.encode_key(e)
-            e.value = self.encoder.encode_value(e)
-            encoded_events.append(e)
-
+        encoded_events = self.encoder.encode_batch(events)
+        for e in encoded_events:
             alignment = vs.calculate_alignment(e.features)
             e.features["_value_alignment"] = alignment
 
@@ -11,6 +11,12 @@
 
     attr = get_attribution()
     report = attr.get_full_attribution_report()
+
+每个策略维护一份增量聚合（StrategyAggregate），record_trade 时更新并持久化到
+naja_bandit_attribution_stats；记录键 → 策略的索引按记录逐行写入
+naja_bandit_attribution_index，单笔写入与历史记录数无关。
+按策略的统计查询不再扫描全表；聚合记录数与归因表不一致（如归因表被外部清空）时
+启动时自动全量重算，rebuild_aggregates() 用于显式全量重算，clear() 清空全部归因数据。
 """
 
 from __future__ import annotations
@@ -28,6 +34,8 @@ from deva import NB
 log = logging.getLogger(__name__)
 
 ATTRIBUTION_TABLE = "naja_bandit_attribution"
+ATTRIBUTION_STATS_TABLE = "naja_bandit_attribution_stats"
+ATTRIBUTION_INDEX_TABLE = "naja_bandit_attribution_index"
 POSITION_REWARD_TABLE = "naja_bandit_position_rewards"
 
 
@@ -93,6 +101,8 @@ class StrategyContribution:
     total_loss: float
     profit_loss_ratio: float
     rank: int = 0
+    return_volatility: float = 0.0
+    max_drawdown: float = 0.0
 
 
 @dataclass
@@ -124,6 +134,162 @@ class MarketConditionAttribution:
     volatility_low_count: int
 
 
+def _confidence_bucket(confidence: float) -> Optional[str]:
+    if confidence > 0.7:
+        return "high"
+    if confidence >= 0.4:
+        return "mid"
+    if confidence < 0.4:
+        return "low"
+    return None
+
+
+def _liquidity_bucket(liquidity: float) -> Optional[str]:
+    if liquidity > 0.7:
+        return "high"
+    if liquidity >= 0.3:
+        return "mid"
+    if liquidity < 0.3:
+        return "low"
+    return None
+
+
+def _volatility_bucket(volatility: float) -> Optional[str]:
+    if volatility > 0.7:
+        return "high"
+    if volatility < 0.3:
+        return "low"
+    return None
+
+
+@dataclass
+class StrategyAggregate:
+    """单个策略的增量聚合
+
+    每记录一笔交易 O(1) 更新：计数、收益和/平方和（波动率）、盈亏、
+    最优/最差、归因分解之和、信心度与收益的交叉和（相关系数）、
+    信心度/流动性/波动率分档，以及按平仓顺序累计收益的最大回撤状态。
+    record_keys 为该策略在归因表中的记录键（按记录顺序），只保存在内存中，
+    持久化在索引表里逐行存放。
+    """
+    strategy_id: str
+    count: int = 0
+    return_sum: float = 0.0
+    return_sq_sum: float = 0.0
+    win_count: int = 0
+    loss_count: int = 0
+    profit_sum: float = 0.0
+    loss_sum: float = 0.0
+    best_return: float = 0.0
+    worst_return: float = 0.0
+    holding_sum: float = 0.0
+
+    selection_sum: float = 0.0
+    timing_sum: float = 0.0
+    position_sum: float = 0.0
+
+    confidence_sum: float = 0.0
+    confidence_sq_sum: float = 0.0
+    confidence_return_sum: float = 0.0
+
+    cum_return: float = 0.0
+    peak_return: float = 0.0
+    max_drawdown: float = 0.0
+
+    # 分档: {档位: [次数, 收益和]}
+    confidence_buckets: Dict[str, List[float]] = field(default_factory=dict)
+    liquidity_buckets: Dict[str, List[float]] = field(default_factory=dict)
+    volatility_buckets: Dict[str, List[float]] = field(default_factory=dict)
+
+    record_keys: List[str] = field(default_factory=list)
+
+    def add(self, key: str, record: dict):
+        """累加一条归因记录"""
+        r = record["total_return_pct"]
+        confidence = record.get("signal_confidence", 0)
+
+        if self.count == 0:
+            self.best_return = self.worst_return = r
+        else:
+            self.best_return = max(self.best_return, r)
+            self.worst_return = min(self.worst_return, r)
+        self.count += 1
+        self.return_sum += r
+        self.return_sq_sum += r * r
+        if r > 0:
+            self.win_count += 1
+            self.profit_sum += r
+        elif r < 0:
+            self.loss_count += 1
+            self.loss_sum += -r
+        self.holding_sum += record.get("holding_seconds", 0.0)
+
+        self.selection_sum += record.get("selection_return_pct", 0.0)
+        self.timing_sum += record.get("timing_return_pct", 0.0)
+        self.position_sum += record.get("position_return_pct", 0.0)
+
+        self.confidence_sum += confidence
+        self.confidence_sq_sum += confidence * confidence
+        self.confidence_return_sum += confidence * r
+
+        self.cum_return += r
+        self.peak_return = max(self.peak_return, self.cum_return)
+        self.max_drawdown = max(self.max_drawdown, self.peak_return - self.cum_return)
+
+        self._bump(self.confidence_buckets, _confidence_bucket(confidence), r)
+        self._bump(self.liquidity_buckets, _liquidity_bucket(record.get("market_liquidity", 0.5)), r)
+        self._bump(self.volatility_buckets, _volatility_bucket(record.get("market_volatility", 0.5)), r)
+
+        self.record_keys.append(key)
+
+    @staticmethod
+    def _bump(buckets: Dict[str, List[float]], bucket: Optional[str], r: float):
+        if bucket is None:
+            return
+        slot = buckets.setdefault(bucket, [0, 0.0])
+        slot[0] += 1
+        slot[1] += r
+
+    def bucket(self, buckets: Dict[str, List[float]], name: str) -> tuple:
+        """(次数, 平均收益)"""
+        count, total = buckets.get(name, (0, 0.0))
+        return int(count), (total / count if count else 0.0)
+
+    @property
+    def return_volatility(self) -> float:
+        if self.count == 0:
+            return 0.0
+        mean = self.return_sum / self.count
+        return max(self.return_sq_sum / self.count - mean * mean, 0.0) ** 0.5
+
+    @property
+    def confidence_return_correlation(self) -> float:
+        """信心度与收益的皮尔逊相关系数（少于 3 笔返回 0）"""
+        n = self.count
+        if n < 3:
+            return 0.0
+        mean_c = self.confidence_sum / n
+        mean_r = self.return_sum / n
+        var_c = self.confidence_sq_sum / n - mean_c * mean_c
+        var_r = self.return_sq_sum / n - mean_r * mean_r
+        if var_c <= 1e-12 or var_r <= 1e-12:
+            return 0.0
+        cov = self.confidence_return_sum / n - mean_c * mean_r
+        return cov / (var_c * var_r) ** 0.5
+
+    def to_dict(self) -> dict:
+        """聚合状态（不含 record_keys，记录键由索引表逐行持久化）"""
+        data = dict(vars(self))
+        data.pop("record_keys", None)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StrategyAggregate":
+        from dataclasses import fields as dc_fields
+        valid = {f.name for f in dc_fields(cls)} - {"record_keys"}
+        return cls(**{k: v for k, v in data.items() if k in valid})
+
+
 class StrategyAttribution:
     """策略归因分析器
 
@@ -151,13 +317,93 @@ class StrategyAttribution:
 
         self._db = NB(ATTRIBUTION_TABLE)
         self._reward_db = NB(POSITION_REWARD_TABLE)
+        self._stats_db = NB(ATTRIBUTION_STATS_TABLE)
+        self._index_db = NB(ATTRIBUTION_INDEX_TABLE)
         self._cache: Dict[str, Any] = {}
         self._cache_time: float = 0
         self._cache_ttl = 60
 
+        self._agg_lock = threading.RLock()
+        self._aggregates: Dict[str, StrategyAggregate] = {}
+        self._known_keys: set = set()
+        self._load_aggregates()
+
         self._initialized = True
         log.info("[Attribution] 策略归因分析器初始化完成")
 
+    def _load_aggregates(self):
+        """加载持久化的聚合与记录键索引
+
+        聚合的记录数、索引行数与归因表记录数任一不一致时（旧数据、归因表被外部清空或
+        部分删除）全量重建一次。
+        """
+        try:
+            for strategy_id, data in self._stats_db.items():
+                if isinstance(data, dict):
+                    self._aggregates[strategy_id] = StrategyAggregate.from_dict(data)
+
+            indexed = []
+            for key, entry in self._index_db.items():
+                if isinstance(entry, dict):
+                    indexed.append((entry.get("seq", 0), entry.get("strategy_id", ""), key))
+            indexed.sort()
+            for _, strategy_id, key in indexed:
+                agg = self._aggregates.get(strategy_id)
+                if agg is not None:
+                    agg.record_keys.append(key)
+                self._known_keys.add(key)
+
+            total = sum(agg.count for agg in self._aggregates.values())
+            if total != len(self._db) or len(indexed) != total:
+                self.rebuild_aggregates()
+        except Exception as e:
+            log.error(f"加载归因聚合失败: {e}")
+
+    def rebuild_aggregates(self) -> int:
+        """从归因表全量重算所有策略的聚合（显式维护工具），返回记录数"""
+        records = []
+        for key, data in self._db.items():
+            if isinstance(data, dict) and "total_return_pct" in data:
+                records.append((key, data))
+        records.sort(key=lambda item: item[1].get("exit_time", 0))
+
+        aggregates: Dict[str, StrategyAggregate] = {}
+        for key, data in records:
+            strategy_id = data.get("strategy_id", "")
+            aggregates.setdefault(strategy_id, StrategyAggregate(strategy_id)).add(key, data)
+
+        with self._agg_lock:
+            self._aggregates = aggregates
+            self._known_keys = {key for key, _ in records}
+            self._stats_db.clear()
+            with self._stats_db.batch():
+                for strategy_id, agg in aggregates.items():
+                    self._stats_db[strategy_id] = agg.to_dict()
+            self._index_db.clear()
+            with self._index_db.batch():
+                for agg in aggregates.values():
+                    for seq, key in enumerate(agg.record_keys, 1):
+                        self._index_db[key] = {"strategy_id": agg.strategy_id, "seq": seq}
+        self._invalidate_cache()
+        log.info(f"[Attribution] 重建归因聚合: {len(aggregates)} 个策略, {len(records)} 条记录")
+        return len(records)
+
+    def clear(self) -> int:
+        """清空归因记录、聚合与记录键索引，返回清除的归因记录数"""
+        with self._agg_lock:
+            count = len(self._db)
+            self._db.clear()
+            self._stats_db.clear()
+            self._index_db.clear()
+            self._aggregates = {}
+            self._known_keys = set()
+        self._invalidate_cache()
+        return count
+
+    def get_strategy_aggregate(self, strategy_id: str) -> StrategyAggregate:
+        """获取策略的增量聚合（不存在时返回空聚合）"""
+        return self._aggregates.get(strategy_id) or StrategyAggregate(strategy_id)
+
     def _get_cached(self, key: str) -> Optional[Any]:
         now = time.time()
         if now - self._cache_time < self._cache_ttl and key in self._cache:
@@ -260,9 +506,27 @@ class StrategyAttribution:
         """保存归因记录"""
         try:
             key = f"{attr.position_id}_{int(attr.exit_time * 1000)}"
-            self._db[key] = attr.to_dict()
+            record = attr.to_dict()
+            self._db[key] = record
         except Exception as e:
             log.error(f"保存归因记录失败: {e}")
+            return
+
+        try:
+            with self._agg_lock:
+                if key in self._known_keys:
+                    # 同一记录重复写入：覆盖了原记录，聚合需按新值重算
+                    self.rebuild_aggregates()
+                    return
+                agg = self._aggregates.get(attr.strategy_id)
+                if agg is None:
+                    agg = self._aggregates[attr.strategy_id] = StrategyAggregate(attr.strategy_id)
+                agg.add(key, record)
+                self._known_keys.add(key)
+                self._stats_db[attr.strategy_id] = agg.to_dict()
+                self._index_db[key] = {"strategy_id": attr.strategy_id, "seq": agg.count}
+        except Exception as e:
+            log.error(f"更新归因聚合失败: {e}")
 
     def _invalidate_cache(self):
         """使缓存失效"""
@@ -279,43 +543,24 @@ class StrategyAttribution:
         if cached:
             return cached
 
-        records = self._get_strategy_records(strategy_id)
-
-        if not records:
-            return StrategyContribution(
-                strategy_id=strategy_id,
-                total_return=0.0,
-                total_trades=0,
-                win_trades=0,
-                win_rate=0.0,
-                avg_return=0.0,
-                best_return=0.0,
-                worst_return=0.0,
-                avg_holding_seconds=0.0,
-                total_profit=0.0,
-                total_loss=0.0,
-                profit_loss_ratio=0.0,
-            )
-
-        total_return = sum(r["total_return_pct"] for r in records)
-        returns = [r["total_return_pct"] for r in records]
-        wins = sum(1 for r in returns if r > 0)
-        profits = sum(r for r in returns if r > 0)
-        losses = abs(sum(r for r in returns if r < 0))
+        agg = self.get_strategy_aggregate(strategy_id)
+        n = agg.count
 
         contribution = StrategyContribution(
             strategy_id=strategy_id,
-            total_return=total_return,
-            total_trades=len(records),
-            win_trades=wins,
-            win_rate=wins / len(records) * 100 if records else 0,
-            avg_return=sum(returns) / len(returns) if returns else 0,
-            best_return=max(returns) if returns else 0,
-            worst_return=min(returns) if returns else 0,
-            avg_holding_seconds=sum(r["holding_seconds"] for r in records) / len(records),
-            total_profit=profits,
-            total_loss=losses,
-            profit_loss_ratio=profits / losses if losses > 0 else float("inf"),
+            total_return=agg.return_sum,
+            total_trades=n,
+            win_trades=agg.win_count,
+            win_rate=agg.win_count / n * 100 if n else 0.0,
+            avg_return=agg.return_sum / n if n else 0.0,
+            best_return=agg.best_return,
+            worst_return=agg.worst_return,
+            avg_holding_seconds=agg.holding_sum / n if n else 0.0,
+            total_profit=agg.profit_sum,
+            total_loss=agg.loss_sum,
+            profit_loss_ratio=(agg.profit_sum / agg.loss_sum if agg.loss_sum > 0 else float("inf")) if n else 0.0,
+            return_volatility=agg.return_volatility,
+            max_drawdown=agg.max_drawdown,
         )
 
         self._set_cached(f"contribution_{strategy_id}", contribution)
@@ -327,15 +572,7 @@ class StrategyAttribution:
         Returns:
             List[StrategyContribution]: 策略贡献度列表
         """
-        strategy_ids = set()
-        for key in self._db.keys():
-            try:
-                data = self._db[key]
-                if isinstance(data, dict):
-                    strategy_ids.add(data.get("strategy_id", ""))
-            except Exception:
-                pass
-
+        strategy_ids = list(self._aggregates)
         contributions = [self.get_strategy_contribution(sid) for sid in strategy_ids]
         contributions.sort(key=lambda x: x.total_return, reverse=True)
 
@@ -356,54 +593,25 @@ class StrategyAttribution:
         if cached:
             return cached
 
-        records = self._get_strategy_records(strategy_id)
-
-        high_conf = [r for r in records if r.get("signal_confidence", 0) > 0.7]
-        mid_conf = [r for r in records if 0.4 <= r.get("signal_confidence", 0) <= 0.7]
-        low_conf = [r for r in records if r.get("signal_confidence", 0) < 0.4]
-
-        def avg_return(recs):
-            if not recs:
-                return 0.0
-            return sum(r["total_return_pct"] for r in recs) / len(recs)
-
-        correlation = self._calculate_correlation(records)
+        agg = self.get_strategy_aggregate(strategy_id)
+        high_n, high_avg = agg.bucket(agg.confidence_buckets, "high")
+        mid_n, mid_avg = agg.bucket(agg.confidence_buckets, "mid")
+        low_n, low_avg = agg.bucket(agg.confidence_buckets, "low")
 
         analysis = SignalQualityAnalysis(
             strategy_id=strategy_id,
-            high_confidence_trades=len(high_conf),
-            high_confidence_avg_return=avg_return(high_conf),
-            medium_confidence_trades=len(mid_conf),
-            medium_confidence_avg_return=avg_return(mid_conf),
-            low_confidence_trades=len(low_conf),
-            low_confidence_avg_return=avg_return(low_conf),
-            confidence_return_correlation=correlation,
+            high_confidence_trades=high_n,
+            high_confidence_avg_return=high_avg,
+            medium_confidence_trades=mid_n,
+            medium_confidence_avg_return=mid_avg,
+            low_confidence_trades=low_n,
+            low_confidence_avg_return=low_avg,
+            confidence_return_correlation=agg.confidence_return_correlation,
         )
 
         self._set_cached(f"signal_quality_{strategy_id}", analysis)
         return analysis
 
-    def _calculate_correlation(self, records: List[dict]) -> float:
-        """计算信心度与收益的相关性"""
-        if len(records) < 3:
-            return 0.0
-
-        confidences = [r.get("signal_confidence", 0) for r in records]
-        returns = [r["total_return_pct"] for r in records]
-
-        n = len(records)
-        mean_c = sum(confidences) / n
-        mean_r = sum(returns) / n
-
-        cov = sum((c - mean_c) * (r - mean_r) for c, r in zip(confidences, returns)) / n
-        std_c = (sum((c - mean_c) ** 2 for c in confidences) / n) ** 0.5
-        std_r = (sum((r - mean_r) ** 2 for r in returns) / n) ** 0.5
-
-        if std_c == 0 or std_r == 0:
-            return 0.0
-
-        return cov / (std_c * std_r)
-
     def get_market_condition_attribution(self, strategy_id: str) -> MarketConditionAttribution:
         """获取市场条件归因
 
@@ -416,32 +624,25 @@ class StrategyAttribution:
         if cached:
             return cached
 
-        records = self._get_strategy_records(strategy_id)
-
-        liq_high = [r for r in records if r.get("market_liquidity", 0.5) > 0.7]
-        liq_mid = [r for r in records if 0.3 <= r.get("market_liquidity", 0.5) <= 0.7]
-        liq_low = [r for r in records if r.get("market_liquidity", 0.5) < 0.3]
-
-        vol_high = [r for r in records if r.get("market_volatility", 0.5) > 0.7]
-        vol_low = [r for r in records if r.get("market_volatility", 0.5) < 0.3]
-
-        def avg_return(recs):
-            if not recs:
-                return 0.0
-            return sum(r["total_return_pct"] for r in recs) / len(recs)
+        agg = self.get_strategy_aggregate(strategy_id)
+        liq_high_n, liq_high_avg = agg.bucket(agg.liquidity_buckets, "high")
+        liq_mid_n, liq_mid_avg = agg.bucket(agg.liquidity_buckets, "mid")
+        liq_low_n, liq_low_avg = agg.bucket(agg.liquidity_buckets, "low")
+        vol_high_n, vol_high_avg = agg.bucket(agg.volatility_buckets, "high")
+        vol_low_n, vol_low_avg = agg.bucket(agg.volatility_buckets, "low")
 
         attribution = MarketConditionAttribution(
             strategy_id=strategy_id,
-            liquidity_high_avg=avg_return(liq_high),
-            liquidity_high_count=len(liq_high),
-            liquidity_mid_avg=avg_return(liq_mid),
-            liquidity_mid_count=len(liq_mid),
-            liquidity_low_avg=avg_return(liq_low),
-            liquidity_low_count=len(liq_low),
-            volatility_high_avg=avg_return(vol_high),
-            volatility_high_count=len(vol_high),
-            volatility_low_avg=avg_return(vol_low),
-            volatility_low_count=len(vol_low),
+            liquidity_high_avg=liq_high_avg,
+            liquidity_high_count=liq_high_n,
+            liquidity_mid_avg=liq_mid_avg,
+            liquidity_mid_count=liq_mid_n,
+            liquidity_low_avg=liq_low_avg,
+            liquidity_low_count=liq_low_n,
+            volatility_high_avg=vol_high_avg,
+            volatility_high_count=vol_high_n,
+            volatility_low_avg=vol_low_avg,
+            volatility_low_count=vol_low_n,
         )
 
         self._set_cached(f"market_condition_{strategy_id}", attribution)
@@ -458,21 +659,12 @@ class StrategyAttribution:
                 "total_return": 总收益,
             }
         """
-        records = self._get_strategy_records(strategy_id)
-
-        if not records:
-            return {
-                "selection_return": 0.0,
-                "timing_return": 0.0,
-                "position_return": 0.0,
-                "total_return": 0.0,
-            }
-
+        agg = self.get_strategy_aggregate(strategy_id)
         return {
-            "selection_return": sum(r["selection_return_pct"] for r in records),
-            "timing_return": sum(r["timing_return_pct"] for r in records),
-            "position_return": sum(r["position_return_pct"] for r in records),
-            "total_return": sum(r["total_return_pct"] for r in records),
+            "selection_return": agg.selection_sum,
+            "timing_return": agg.timing_sum,
+            "position_return": agg.position_sum,
+            "total_return": agg.return_sum,
         }
 
     def get_full_attribution_report(self, strategy_id: Optional[str] = None) -> dict:
@@ -537,12 +729,12 @@ class StrategyAttribution:
         }
 
     def _get_strategy_records(self, strategy_id: str) -> List[dict]:
-        """获取策略的所有归因记录"""
+        """获取策略的所有归因记录（按记录键索引读取）"""
         records = []
-        for key in self._db.keys():
+        for key in list(self.get_strategy_aggregate(strategy_id).record_keys):
             try:
-                data = self._db[key]
-                if isinstance(data, dict) and data.get("strategy_id") == strategy_id:
+                data = self._db.get(key)
+                if isinstance(data, dict):
                     records.append(data)
             except Exception:
                 pass
@@ -562,6 +754,8 @@ class StrategyAttribution:
             "total_profit": c.total_profit,
             "total_loss": c.total_loss,
             "profit_loss_ratio": c.profit_loss_ratio,
+            "return_volatility": c.return_volatility,
+            "max_drawdown": c.max_drawdown,
         }
 
     def _signal_to_dict(self, s: SignalQualityAnalysis) -> dict:
@@ -607,15 +801,10 @@ class StrategyAttribution:
         Returns:
             List[dict]: 交易历史
         """
-        records = []
-        for key in self._db.keys():
-            try:
-                data = self._db[key]
-                if isinstance(data, dict):
-                    if strategy_id is None or data.get("strategy_id") == strategy_id:
-                        records.append(data)
-            except Exception:
-                pass
+        if strategy_id is not None:
+            records = self._get_strategy_records(strategy_id)
+        else:
+            records = [data for data in self._db.values() if isinstance(data, dict)]
 
         reverse = sort_by in ("exit_time", "total_return")
         if sort_by == "exit_time":
@@ -676,6 +865,7 @@ __all__ = [
     "StrategyAttribution",
     "TradeAttribution",
     "StrategyContribution",
+    "StrategyAggregate",
     "SignalQualityAnalysis",
     "MarketConditionAttribution",
     "get_attribution",
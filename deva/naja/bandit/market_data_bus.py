@@ -28,6 +28,10 @@
     # 主动获取（触发回源）
     prices = bus.fetch(["nvda", "aapl"])
 
+    # 批量写入整张行情表（一次加锁、一次事务、每个订阅者一次通知）
+    bus.write_quotes_frame(df)
+    bus.subscribe_batch(lambda prices: print(len(prices)))
+
     # 注册高优先级（持仓股，TTL=5s）
     bus.register_priority_codes(["nvda", "aapl"], "HIGH")
 """
@@ -51,6 +55,19 @@ MARKET_DATA_BUS_TABLE = "naja_market_data_bus"
 MARKET_DATA_HUB_STREAM = "market_data_hub"
 MARKET_QUOTE_VERSION = 1
 
+# MarketQuote 字段 -> 可接受的列名（依次尝试），兼容实时行情 DataFrame 的列命名
+_QUOTE_COLUMN_ALIASES = {
+    "current": ("current", "now"),
+    "prev_close": ("prev_close", "close"),
+    "change": ("change", "price_change"),
+    "change_pct": ("change_pct", "p_change"),
+    "volume": ("volume",),
+    "high": ("high",),
+    "low": ("low",),
+    "open_price": ("open_price", "open"),
+    "amount": ("amount",),
+}
+
 
 def _normalize_code(code: str) -> str:
     """去掉 sh/sz/gb_ 前缀，用于内部存储和 API 查询
@@ -249,6 +266,7 @@ class MarketDataBus:
         self._lock_pending = threading.Lock()
 
         self._subscribers: List[Callable[[str, float], None]] = []
+        self._batch_subscribers: List[Callable[[Dict[str, float]], None]] = []
         self._lock_subscribers = threading.Lock()
 
         self._stream = NS(
@@ -331,10 +349,17 @@ class MarketDataBus:
         filtered_stream.sink(lambda q: callback(q.get("code"), q.get("current", 0)))
         log.debug(f"[MarketDataBus] 订阅行情: {codes}")
 
+    def subscribe_batch(self, callback: Callable[[Dict[str, float]], None]):
+        """订阅批量行情：每次写入只回调一次，参数为 {code: current}"""
+        with self._lock_subscribers:
+            self._batch_subscribers.append(callback)
+
     def unsubscribe(self, callback: Callable):
         with self._lock_subscribers:
             if callback in self._subscribers:
                 self._subscribers.remove(callback)
+            if callback in self._batch_subscribers:
+                self._batch_subscribers.remove(callback)
 
     def fetch(self, codes: List[str], force: bool = False) -> Dict[str, float]:
         if not codes:
@@ -399,6 +424,79 @@ class MarketDataBus:
         self._update_cache_from_quotes(quotes)
         self._emit_to_subscribers_from_quotes(quotes)
 
+    def write_quotes_frame(self, frame: Any, default_market: str = "US") -> int:
+        """列式批量写入行情
+
+        Args:
+            frame: DataFrame 或 {列名: 数组} 的列式快照。code 取 code 列（无则取索引），
+                价格列兼容 now/close/p_change/price_change/open 等实时行情列名
+            default_market: 非 sh/sz 代码且没有 market 列时使用的市场
+
+        Returns:
+            写入的行情条数（current <= 0 的行被跳过）
+        """
+        quotes = self._quotes_from_columns(frame, default_market)
+        if quotes:
+            self.write_quotes(quotes)
+        return len(quotes)
+
+    def _quotes_from_columns(self, frame: Any, default_market: str) -> Dict[str, MarketQuote]:
+        import numpy as np
+        import pandas as pd
+
+        df = frame if isinstance(frame, pd.DataFrame) else pd.DataFrame(frame)
+        if df.empty:
+            return {}
+
+        n = len(df)
+        codes = (df["code"] if "code" in df.columns else df.index.to_series()).astype(str).to_numpy()
+
+        def numeric(field_name: str) -> np.ndarray:
+            for column in _QUOTE_COLUMN_ALIASES[field_name]:
+                if column in df.columns:
+                    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=0.0)
+                    return np.nan_to_num(values, nan=0.0)
+            return np.zeros(n)
+
+        cols = {name: numeric(name) for name in _QUOTE_COLUMN_ALIASES}
+        volume = cols["volume"].astype(np.int64)
+
+        now = time.time()
+        names = df["name"].astype(str).to_numpy() if "name" in df.columns else codes
+        if "timestamp" in df.columns:
+            timestamps = df["timestamp"].to_numpy()
+        else:
+            timestamps = np.full(n, now)
+
+        is_sh = np.char.startswith(codes.astype(str), "sh")
+        is_sz = np.char.startswith(codes.astype(str), "sz")
+        other = df["market"].astype(str).to_numpy() if "market" in df.columns else np.full(n, default_market, dtype=object)
+        markets = np.where(is_sh, "SH", np.where(is_sz, "SZ", other))
+
+        keep = np.flatnonzero((cols["current"] > 0) & (codes != ""))
+
+        quotes: Dict[str, MarketQuote] = {}
+        for i in keep:
+            code = codes[i]
+            quotes[code] = MarketQuote(
+                code=code,
+                name=names[i],
+                current=float(cols["current"][i]),
+                prev_close=float(cols["prev_close"][i]),
+                change=float(cols["change"][i]),
+                change_pct=float(cols["change_pct"][i]),
+                volume=int(volume[i]),
+                high=float(cols["high"][i]),
+                low=float(cols["low"][i]),
+                open_price=float(cols["open_price"][i]),
+                amount=float(cols["amount"][i]),
+                market=str(markets[i]),
+                timestamp=timestamps[i],
+                fetch_time=now,
+                is_stale=False,
+            )
+        return quotes
+
     def _get_cached_quote(self, normalized_code: str) -> Optional[MarketQuote]:
         with self._lock_cache:
             return self._cache.get(normalized_code)
@@ -414,10 +512,14 @@ class MarketDataBus:
         self._persist_quotes_to_db(quotes)
 
     def _persist_quotes_to_db(self, quotes: Dict[str, MarketQuote]):
+        if not quotes:
+            return
         try:
-            for code, quote in quotes.items():
-                normalized = _normalize_code(code)
-                self._db.upsert(normalized, quote.to_dict())
+            # 一次 bulk_update = 一个事务
+            self._db.bulk_update({
+                _normalize_code(code): quote.to_dict()
+                for code, quote in quotes.items()
+            })
         except Exception as e:
             log.debug(f"[MarketDataBus] 持久化行情失败: {e}")
 
@@ -585,12 +687,23 @@ class MarketDataBus:
         if not quotes:
             return
         with self._lock_subscribers:
-            for callback in self._subscribers:
+            subscribers = list(self._subscribers)
+            batch_subscribers = list(self._batch_subscribers)
+
+        for callback in subscribers:
+            try:
+                for code, quote in quotes.items():
+                    callback(quote.code, quote.current)
+            except Exception as e:
+                log.debug(f"[MarketDataBus] 推送失败: {e}")
+
+        if batch_subscribers:
+            prices = {quote.code: quote.current for quote in quotes.values()}
+            for callback in batch_subscribers:
                 try:
-                    for code, quote in quotes.items():
-                        callback(quote.code, quote.current)
+                    callback(prices)
                 except Exception as e:
-                    log.debug(f"[MarketDataBus] 推送失败: {e}")
+                    log.debug(f"[MarketDataBus] 批量推送失败: {e}")
 
         for code, quote in quotes.items():
             self._stream.emit(quote.to_dict())
@@ -612,6 +725,7 @@ class MarketDataBus:
             "pending_requests": pending_count,
             "fetching_codes": fetching_count,
             "subscribers": len(self._subscribers),
+            "batch_subscribers": len(self._batch_subscribers),
             "priority_high": len(self._priority_codes[self.PRIORITY_HIGH]),
             "priority_medium": len(self._priority_codes[self.PRIORITY_MEDIUM]),
             "priority_low": len(self._priority_codes[self.PRIORITY_LOW]),
@@ -302,12 +302,9 @@ class BanditTuner:
             log.warning(f"[BanditTuner] Portfolio 未初始化")
             return
 
-        with portfolio._lock:
-            matching_positions = [(pos_id, pos) for pos_id, pos in portfolio._positions.items()
-                                  if pos.stock_code == stock_code and pos.status == "OPEN"]
-
-            if matching_positions:
-                log.info(f"[BanditTuner] 📈 价格更新: {stock_code} {matching_positions[0][1].current_price} -> {current_price}, 止损={matching_positions[0][1].stop_loss:.2f}, 止盈={matching_positions[0][1].take_profit:.2f}")
+        matching_positions = portfolio.get_positions_by_stock(stock_code)
+        if matching_positions:
+            log.info(f"[BanditTuner] 📈 价格更新: {stock_code} {matching_positions[0].current_price} -> {current_price}, 止损={matching_positions[0].stop_loss:.2f}, 止盈={matching_positions[0].take_profit:.2f}")
 
         closed_positions = portfolio.update_price(stock_code, current_price)
 
@@ -3,6 +3,11 @@
 别名/关键词: 虚拟持仓、持仓同步、virtual portfolio
 
 管理虚拟股票的买入、卖出和持仓。
+
+行情路径：
+- 按股票代码索引未平仓持仓，update_price / update_prices 只触达相关持仓
+- 每个持仓一行存储（naja_bandit_virtual_positions），价格更新只标记脏持仓，
+  由写后缓冲按间隔合并提交；开平仓立即提交
 """
 
 from __future__ import annotations
@@ -11,7 +16,9 @@ import logging
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 from deva import NB
 from deva.naja.register import SR
@@ -20,6 +27,7 @@ log = logging.getLogger(__name__)
 
 VIRTUAL_PORTFOLIO_TABLE = "naja_bandit_virtual_portfolio"
 UNIFIED_POSITIONS_TABLE = "naja_bandit_positions"
+VIRTUAL_POSITIONS_TABLE = "naja_bandit_virtual_positions"
 
 
 @dataclass
@@ -72,15 +80,29 @@ class VirtualPortfolio:
     2. 更新持仓价格
     3. 检查止盈止损
     4. 平仓处理
-    - 使用统一持仓表 naja_bandit_positions
+    - 账户信息保存在统一持仓表 naja_bandit_positions
+    - 持仓逐行保存在 naja_bandit_virtual_positions（键: 账户名/持仓ID）
     """
 
-    def __init__(self, account_name: str = "虚拟测试"):
+    def __init__(self, account_name: str = "虚拟测试", persist_interval: float = 1.0):
+        """
+        Args:
+            account_name: 账户名
+            persist_interval: 价格更新产生的脏持仓合并提交间隔（秒）
+        """
         self.account_name = account_name
         self._positions: Dict[str, VirtualPosition] = {}
+        # 股票代码 → {持仓ID: 持仓}，仅包含未平仓持仓
+        self._by_symbol: Dict[str, Dict[str, VirtualPosition]] = {}
         self._lock = threading.RLock()
 
         self._db = NB(UNIFIED_POSITIONS_TABLE)
+        self._position_db = NB(
+            VIRTUAL_POSITIONS_TABLE,
+            write_behind=True,
+            flush_interval=persist_interval,
+            flush_batch_size=1000,
+        )
 
         self._total_capital = 1000000.0
         self._used_capital = 0.0
@@ -100,12 +122,23 @@ class VirtualPortfolio:
 
             accounts_data = self._db.get("accounts", {})
             account_data = accounts_data.get(self.account_name, {})
-            positions_data = account_data.get("positions", {})
+
+            prefix = self._position_key("")
+            positions_data = {
+                key[len(prefix):]: value for key, value in self._position_db.items()
+                if isinstance(key, str) and key.startswith(prefix)
+            }
+            # 旧格式：持仓整体存放在账户字典中，首次加载时迁移为逐行存储
+            legacy = not positions_data and bool(account_data.get("positions"))
+            if legacy:
+                positions_data = account_data.get("positions", {})
 
             for pos_id, pos_data in positions_data.items():
                 if isinstance(pos_data, dict):
                     filtered_data = {k: v for k, v in pos_data.items() if k in valid_fields}
-                    self._positions[pos_id] = VirtualPosition(**filtered_data)
+                    position = VirtualPosition(**filtered_data)
+                    self._positions[pos_id] = position
+                    self._index(position)
 
             self._used_capital = sum(
                 pos.entry_price * pos.quantity
@@ -113,24 +146,58 @@ class VirtualPortfolio:
                 if pos.status == "OPEN"
             )
             self._total_capital = account_data.get("total_capital", 1000000.0)
+            if legacy:
+                for position in self._positions.values():
+                    self._mark_dirty(position)
+                self.flush()
+                self._save_account()
             log.info(f"已加载 {len(self._positions)} 个虚拟持仓，已用资金: {self._used_capital:.2f}")
         except Exception as e:
             log.error(f"加载持仓失败: {e}")
 
-    def _save_positions(self):
-        """保存持仓到统一数据库"""
+    def _position_key(self, position_id: str) -> str:
+        return f"{self.account_name}/{position_id}"
+
+    def _index(self, position: VirtualPosition):
+        if position.status == "OPEN":
+            self._by_symbol.setdefault(position.stock_code, {})[position.position_id] = position
+
+    def _unindex(self, position: VirtualPosition):
+        bucket = self._by_symbol.get(position.stock_code)
+        if bucket is not None:
+            bucket.pop(position.position_id, None)
+            if not bucket:
+                del self._by_symbol[position.stock_code]
+
+    def _mark_dirty(self, position: VirtualPosition):
+        """持仓进入写后缓冲；同一持仓在一个提交间隔内的多次更新合并为一次写入"""
+        try:
+            self._position_db.upsert(self._position_key(position.position_id), dict(vars(position)))
+        except Exception as e:
+            log.error(f"保存持仓失败: {e}")
+
+    def flush(self) -> int:
+        """立即提交所有脏持仓，返回提交条数"""
+        try:
+            return self._position_db.flush()
+        except Exception as e:
+            log.error(f"保存持仓失败: {e}")
+            return 0
+
+    def _save_account(self):
+        """保存账户信息（资金）到统一数据库；持仓不再写入账户字典"""
         try:
             accounts_data = self._db.get("accounts", {})
             if self.account_name not in accounts_data:
                 accounts_data[self.account_name] = {"account_type": "virtual"}
 
-            positions_data = {pos_id: vars(pos) for pos_id, pos in self._positions.items()}
-            accounts_data[self.account_name]["positions"] = positions_data
-            accounts_data[self.account_name]["total_capital"] = self._total_capital
-            accounts_data[self.account_name]["used_capital"] = self._used_capital
+            account = accounts_data[self.account_name]
+            account.pop("positions", None)
+            account["total_capital"] = self._total_capital
+            account["used_capital"] = self._used_capital
             self._db["accounts"] = accounts_data
         except Exception as e:
-            log.error(f"保存持仓失败: {e}")
+            log.error(f"保存账户失败: {e}")
     
     def register_position_callback(self, callback: Callable[[str, VirtualPosition], None]):
         """注册持仓更新回调"""
@@ -146,7 +213,7 @@ class VirtualPortfolio:
             open_positions = [p for p in self._positions.values() if p.status == "OPEN"]
             count = 0
             for pos in open_positions:
-                self.close_position(pos.position_id, reason="手动清空")
+                self.close_position(pos.position_id, pos.current_price, reason="手动清空")
                 count += 1
             log.info(f"已手动清空 {count} 个持仓")
             return count
@@ -155,9 +222,17 @@ class VirtualPortfolio:
         """清空历史持仓记录"""
         with self._lock:
             count = len(self._positions)
+            position_ids = list(self._positions)
             self._positions.clear()
+            self._by_symbol.clear()
             self._used_capital = 0.0
-            self._save_positions()
+            self.flush()
+            for pos_id in position_ids:
+                try:
+                    del self._position_db[self._position_key(pos_id)]
+                except KeyError:
+                    pass
+            self._save_account()
             log.info(f"已清空 {count} 个历史持仓记录")
             return count
     
@@ -239,9 +314,12 @@ class VirtualPortfolio:
             )
             
             self._positions[position_id] = position
+            self._index(position)
             self._used_capital += position_value
             
-            self._save_positions()
+            self._mark_dirty(position)
+            self.flush()
+            self._save_account()
             
             log.info(f"虚拟开仓: {stock_name}({stock_code}) 数量={quantity:.2f} 价格={price:.2f}")
             
@@ -258,40 +336,73 @@ class VirtualPortfolio:
             List[dict]: 触发止盈止损的平仓列表
         """
         log.debug(f"[VirtualPortfolio] 📈 update_price 被调用: {stock_code} @ {current_price}")
+        return self.update_prices({stock_code: current_price})
+
+    def update_prices(self, prices) -> List[VirtualPosition]:
+        """批量更新持仓价格
 
+        只处理有未平仓持仓的股票，单次行情推送的开销与持仓簿大小无关。
+        价格不是正数（停牌、缺失）的行情会被跳过。
+
+        Args:
+            prices: {股票代码: 价格} 映射（dict / pandas.Series），
+                或 (股票代码数组, 价格数组) 二元组
+
+        Returns:
+            List[VirtualPosition]: 触发止盈止损的平仓列表
+        """
         with self._lock:
             closed = []
-            matching_positions = [(pos_id, pos) for pos_id, pos in self._positions.items()
-                                  if pos.stock_code == stock_code and pos.status == "OPEN"]
-
-            log.debug(f"[VirtualPortfolio] 🔍 找到 {len(matching_positions)} 个匹配的持仓")
-
-            for pos_id, position in matching_positions:
-                old_price = position.current_price
-                position.current_price = current_price
-                position.last_update_time = SR('market_time_service').get_market_time()
-
-                log.debug(f"[VirtualPortfolio] 💰 更新持仓 {pos_id}: {stock_code} {old_price} -> {current_price}")
-                
-                for callback in self._position_callbacks:
-                    try:
-                        callback(pos_id, position)
-                    except Exception as e:
-                        log.error(f"持仓更新回调失败: {e}")
-                
-                close_reason = None
-                if position.stop_loss > 0 and current_price <= position.stop_loss:
-                    close_reason = "STOP_LOSS"
-                elif position.take_profit > 0 and current_price >= position.take_profit:
-                    close_reason = "TAKE_PROFIT"
-                
-                if close_reason:
-                    closed_pos = self.close_position(pos_id, current_price, close_reason)
-                    if closed_pos:
-                        closed.append(closed_pos)
-            
-            self._save_positions()
+            updates = list(self._held_quotes(prices))
+            if not updates:
+                return closed
+
+            market_time = SR('market_time_service').get_market_time()
+            for stock_code, current_price in updates:
+                for pos_id, position in list(self._by_symbol.get(stock_code, {}).items()):
+                    position.current_price = current_price
+                    position.last_update_time = market_time
+
+                    for callback in self._position_callbacks:
+                        try:
+                            callback(pos_id, position)
+                        except Exception as e:
+                            log.error(f"持仓更新回调失败: {e}")
+
+                    close_reason = None
+                    if position.stop_loss > 0 and current_price <= position.stop_loss:
+                        close_reason = "STOP_LOSS"
+                    elif position.take_profit > 0 and current_price >= position.take_profit:
+                        close_reason = "TAKE_PROFIT"
+
+                    if close_reason:
+                        closed_pos = self.close_position(pos_id, current_price, close_reason)
+                        if closed_pos:
+                            closed.append(closed_pos)
+                    else:
+                        self._mark_dirty(position)
+
             return closed
+
+    def _held_quotes(self, prices) -> Iterable[Tuple[str, float]]:
+        """从行情中取出有持仓的 (股票代码, 价格)"""
+        by_symbol = self._by_symbol
+        if not by_symbol:
+            return ()
+
+        if hasattr(prices, "items"):
+            if len(prices) > len(by_symbol):
+                pairs = ((code, prices[code]) for code in list(by_symbol) if code in prices)
+            else:
+                pairs = ((code, price) for code, price in prices.items() if code in by_symbol)
+        else:
+            codes, values = prices
+            codes = np.asarray(codes)
+            values = np.asarray(values, dtype=float)
+            mask = np.isin(codes, list(by_symbol))
+            pairs = zip(codes[mask].tolist(), values[mask].tolist())
+
+        return [(code, float(price)) for code, price in pairs if price is not None and price > 0]
     
     def close_position(
         self,
@@ -325,6 +436,7 @@ class VirtualPortfolio:
             position.exit_time = exit_time
 
             position.close_reason = reason
+            self._unindex(position)
 
             actual_pnl = (exit_price - position.entry_price) * position.quantity
 
@@ -339,7 +451,9 @@ class VirtualPortfolio:
             log.info(f"虚拟平仓: {position.stock_name}({position.stock_code}) "
                     f"收益率={position.return_pct:.2f}% 原因={reason}")
 
-            self._save_positions()
+            self._mark_dirty(position)
+            self.flush()
+            self._save_account()
             return position
     
     def close_all(self, reason: str = "FORCE") -> int:
@@ -359,8 +473,7 @@ class VirtualPortfolio:
     
     def get_positions_by_stock(self, stock_code: str) -> List[VirtualPosition]:
         """获取股票的持仓"""
-        return [p for p in self._positions.values() 
-                if p.stock_code == stock_code and p.status == "OPEN"]
+        return list(self._by_symbol.get(stock_code, {}).values())
     
     def get_positions_by_strategy(self, strategy_id: str) -> List[VirtualPosition]:
         """获取策略的持仓"""
@@ -32,6 +32,7 @@ from .semantic import (
     STOCK_RELEVANT_SOURCES,
     _get_market_activity,
     _is_stock_relevant_topic,
+    TopicCenterIndex,
 )
 from .memory_manager import MemoryManager
 
@@ -113,6 +114,8 @@ class NewsMindStrategy:
 
         self.topics: Dict[int, Topic] = {}
         self.topic_counter = 0
+        # 主题中心矩阵（float32 归一化行），最近主题查找先矩阵粗筛再精确复核
+        self._topic_index = TopicCenterIndex()
 
         # 记忆配置快捷访问
         self.short_term_half_life = self.memory.short_term_half_life
@@ -391,13 +394,15 @@ class NewsMindStrategy:
             candidates.sort(key=lambda e: e.attention_score, reverse=True)
             candidates = candidates[: self.max_batch_keep]
 
+        # 语义编码
         for event in candidates:
-            # 语义编码
             event.vector = self._simple_embedding(event.content, event.source, event.event_type)
-            
-            # 注意力评分（批量模式下使用相同的scorer）
-            event.attention_score = self.attention_scorer.score(event)
-            
+
+        # 注意力评分（批量评分，新颖度一次矩阵乘法算完，结果与逐条 score 相同）
+        for event, score in zip(candidates, self.attention_scorer.score_batch(candidates)):
+            event.attention_score = score
+
+        for event in candidates:
             # 主题聚类
             topic_id = self._assign_topic(event)
             event.topic_id = topic_id
@@ -498,10 +503,12 @@ class NewsMindStrategy:
         if event.vector is None:
             return False
         
-        for topic in self.topics.values():
+        threshold = self.topic_threshold * 0.8
+        for topic_id in self._topic_candidates(event.vector, threshold):
+            topic = self.topics[topic_id]
             if topic.event_count <= 2:
                 sim = self._cosine_similarity(event.vector, topic.center)
-                if sim > self.topic_threshold * 0.8:
+                if sim > threshold:
                     return False
         
         return True
@@ -811,13 +818,28 @@ class NewsMindStrategy:
         best_topic = None
         best_similarity = -1
         
-        for topic_id, topic in self.topics.items():
-            sim = self._cosine_similarity(vector, topic.center)
+        for topic_id in self._topic_candidates(vector, self.topic_threshold, nearest=True):
+            sim = self._cosine_similarity(vector, self.topics[topic_id].center)
             if sim > best_similarity and sim > self.topic_threshold:
                 best_similarity = sim
                 best_topic = topic_id
         
         return best_topic
+
+    def _topic_candidates(self, vector: List[float], threshold: float, nearest: bool = False) -> List[int]:
+        """主题中心矩阵粗筛，返回需要精确比较的主题（保持 self.topics 的顺序）
+
+        粗筛按容差放宽阈值，最终结果仍由逐个 _cosine_similarity 决定，
+        与逐个比较全部主题的结果一致。
+        """
+        self._topic_index.sync(self.topics)
+        shortlist = self._topic_index.shortlist(vector, threshold, nearest=nearest)
+        if shortlist is None:
+            return list(self.topics)
+        if len(shortlist) <= 1:
+            return shortlist
+        wanted = set(shortlist)
+        return [topic_id for topic_id in self.topics if topic_id in wanted]
     
     def _analyze_window(self) -> List[Dict]:
         """分析窗口数据，生成高级信号"""
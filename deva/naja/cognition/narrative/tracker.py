@@ -45,6 +45,7 @@
     - TimingNarrative（天）：关注「时间」—— 现在是不是时机
 
 关键词已迁移到 keyword_registry.py，本文件从那里导入以保持向后兼容。
+各检测器共享一个编译好的关键词自动机（keyword_automaton.py），每段事件文本只扫描一遍。
 """
 
 from __future__ import annotations
@@ -65,6 +66,13 @@ from deva.naja.cognition.semantic.keyword_registry import (
     SENTIMENT_KEYWORDS,
     SUPPLY_DEMAND_KEYWORDS,
 )
+from deva.naja.cognition.semantic.keyword_automaton import (
+    DYNAMICS_GROUP,
+    NARRATIVE_GROUP,
+    SENTIMENT_GROUP,
+    SUPPLY_DEMAND_GROUP,
+    update_keyword_group,
+)
 
 from deva.naja.events import NarrativeStateEvent, publish_event
 
@@ -264,6 +272,7 @@ class NarrativeTracker:
         # 🚀 从 ManasEngine 获取关注的主题，而非预设关键词
         self._focus_themes = self._get_initial_focus_themes()
         self._keywords = self._themes_to_keywords(self._focus_themes)
+        self._automaton = update_keyword_group(NARRATIVE_GROUP, self._keywords)
 
         self._recent_window = float(cfg.get("narrative_recent_window_seconds", 6 * 3600))
         self._prev_window = float(cfg.get("narrative_prev_window_seconds", 6 * 3600))
@@ -363,6 +372,7 @@ class NarrativeTracker:
                 )
                 self._focus_themes = new_themes
                 self._keywords = self._themes_to_keywords(self._focus_themes)
+                self._automaton = update_keyword_group(NARRATIVE_GROUP, self._keywords)
         except Exception as e:
             import logging
             logging.getLogger(__name__).warning(f"[NarrativeTracker] 处理 MANAS_STATE_CHANGED 失败: {e}")
@@ -546,18 +556,7 @@ class NarrativeTracker:
             return {}
 
         combined = " ".join(t for t in texts if t)
-        combined_lower = combined.lower()
-        matches: Dict[str, List[str]] = {}
-
-        for narrative, keywords in self._keywords.items():
-            hit_keywords: List[str] = []
-            for keyword in keywords:
-                if self._keyword_in_text(keyword, combined, combined_lower):
-                    hit_keywords.append(keyword)
-            if hit_keywords:
-                matches[narrative] = hit_keywords
-
-        return matches
+        return self._automaton.match(combined, NARRATIVE_GROUP)
 
     def ingest_event(self, event: Any) -> List[Dict[str, Any]]:
         """
@@ -720,16 +719,9 @@ class NarrativeTracker:
             return []
 
         combined = " ".join(t for t in texts if t)
-        combined_lower = combined.lower()
-
         results: List[Dict[str, Any]] = []
 
-        for signal_type, keywords in DYNAMICS_KEYWORDS.items():
-            hit_keywords: List[str] = []
-            for keyword in keywords:
-                if self._keyword_in_text(keyword, combined, combined_lower):
-                    hit_keywords.append(keyword)
-
+        for signal_type, hit_keywords in self._automaton.match(combined, DYNAMICS_GROUP).items():
             if hit_keywords:
                 severity = self._assess_signal_severity(hit_keywords)
                 source_event = combined[:200] if len(combined) > 200 else combined
@@ -773,37 +765,6 @@ class NarrativeTracker:
             return "中等"
         return "轻微"
 
-    def detect_value_signals(self, event: Any) -> Dict[str, List[str]]:
-        """检测价值信号（Dynamics）- 真正的供需失衡/效率提升信号
-
-        【Dynamics-供需动态】我们自己的价值判断体系
-        - 基于 DYNAMICS_KEYWORDS 命中情况
-        - 代表我们认定的重要变化（供需失衡、技术突破等）
-
-        Returns:
-            Dict[str, List[str]] - 按价值类别分类的命中关键词
-        """
-        if not self.enabled:
-            return {}
-
-        texts = self._collect_texts(event)
-        if not texts:
-            return {}
-
-        combined = " ".join(t for t in texts if t)
-        combined_lower = combined.lower()
-        matches: Dict[str, List[str]] = {}
-
-        for signal_type, keywords in DYNAMICS_KEYWORDS.items():
-            hit_keywords: List[str] = []
-            for keyword in keywords:
-                if self._keyword_in_text(keyword, combined, combined_lower):
-                    hit_keywords.append(keyword)
-            if hit_keywords:
-                matches[signal_type] = hit_keywords
-
-        return matches
-
     def get_summary(self, limit: int = 10) -> List[Dict[str, Any]]:
         if not self._states:
             return []
@@ -1027,18 +988,7 @@ class NarrativeTracker:
             return {}
 
         combined = " ".join(t for t in texts if t)
-        combined_lower = combined.lower()
-        matches: Dict[str, List[str]] = {}
-
-        for signal_type, keywords in DYNAMICS_KEYWORDS.items():
-            hit_keywords: List[str] = []
-            for keyword in keywords:
-                if self._keyword_in_text(keyword, combined, combined_lower):
-                    hit_keywords.append(keyword)
-            if hit_keywords:
-                matches[signal_type] = hit_keywords
-
-        return matches
+        return self._automaton.match(combined, DYNAMICS_GROUP)
 
     def detect_market_narrative_signals(self, event: Any) -> Dict[str, List[str]]:
         """检测市场叙事信号（Sentiment）- 市场情绪/舆论信号（仅作参考）
@@ -1059,18 +1009,7 @@ class NarrativeTracker:
             return {}
 
         combined = " ".join(t for t in texts if t)
-        combined_lower = combined.lower()
-        matches: Dict[str, List[str]] = {}
-
-        for signal_type, keywords in SENTIMENT_KEYWORDS.items():
-            hit_keywords: List[str] = []
-            for keyword in keywords:
-                if self._keyword_in_text(keyword, combined, combined_lower):
-                    hit_keywords.append(keyword)
-            if hit_keywords:
-                matches[signal_type] = hit_keywords
-
-        return matches
+        return self._automaton.match(combined, SENTIMENT_GROUP)
 
     def detect_problem_opportunity(self, event: Any) -> Optional[Dict[str, Any]]:
         """
@@ -1094,16 +1033,10 @@ class NarrativeTracker:
             return None
 
         combined = " ".join(t for t in texts if t)
-        combined_lower = combined.lower()
-
         detected_problems: List[Dict[str, Any]] = []
         opportunity_types_found: Set[str] = set()
 
-        for category, keywords in SUPPLY_DEMAND_KEYWORDS.items():
-            hit_keywords: List[str] = []
-            for keyword in keywords:
-                if self._keyword_in_text(keyword, combined, combined_lower):
-                    hit_keywords.append(keyword)
+        for category, hit_keywords in self._automaton.match(combined, SUPPLY_DEMAND_GROUP).items():
             if hit_keywords:
                 severity = self._assess_problem_severity(category, hit_keywords)
                 detected_problems.append({
@@ -1683,14 +1616,18 @@ class NarrativeTracker:
         """获取A股数据 - 使用历史快照数据库（已过滤噪音股票）"""
         try:
             from deva import NB
+            from deva.naja.market_hotspot.data.snapshot_store import get_snapshot_store
 
-            snapshot_db = NB('quant_snapshot_5min_window', key_mode='time')
-            keys = list(snapshot_db.keys())
-            if not keys:
-                return {}
-
-            latest_key = keys[-1]
-            data_list = snapshot_db.get(latest_key)
+            store = get_snapshot_store()
+            latest_ts = store.latest_timestamp()
+            if latest_ts is not None:
+                data_list = store.read_records(latest_ts)
+            else:
+                snapshot_db = NB('quant_snapshot_5min_window', key_mode='time')
+                keys = list(snapshot_db.keys())
+                if not keys:
+                    return {}
+                data_list = snapshot_db.get(keys[-1])
 
             if not data_list or not isinstance(data_list, list):
                 return {}
@@ -2172,13 +2109,6 @@ class NarrativeTracker:
 
         return texts
 
-    def _keyword_in_text(self, keyword: str, text: str, text_lower: str) -> bool:
-        if not keyword:
-            return False
-        if keyword.isascii():
-            return keyword.lower() in text_lower
-        return keyword in text
-
     def _get_timestamp(self, event: Any) -> float:
         ts = getattr(event, "timestamp", None)
         if ts is None:
@@ -6,6 +6,8 @@
 - Topic/TopicManager: 主题管理
 - SemanticColdStart: 语义图谱冷启动
 - KeywordRegistry: 统一关键词注册表
+- KeywordAutomaton: 多模式关键词自动机
+- EmbeddingRing/TopicCenterIndex: 语义向量矩阵索引
 """
 
 from .news_event import (
@@ -31,6 +33,13 @@ from .keyword_registry import (
     MARKET_NARRATIVE_KEYWORDS,
     NEWS_TOPIC_KEYWORDS,
 )
+from .embedding_index import EmbeddingRing, TopicCenterIndex
+from .keyword_automaton import (
+    KeywordAutomaton,
+    KeywordHit,
+    get_keyword_automaton,
+    update_keyword_group,
+)
 
 __all__ = [
     # 新闻事件
@@ -55,4 +64,12 @@ __all__ = [
     "SUPPLY_DEMAND_KEYWORDS",
     "MARKET_NARRATIVE_KEYWORDS",
     "NEWS_TOPIC_KEYWORDS",
+    # 语义向量索引
+    "EmbeddingRing",
+    "TopicCenterIndex",
+    # 关键词自动机
+    "KeywordAutomaton",
+    "KeywordHit",
+    "get_keyword_automaton",
+    "update_keyword_group",
 ]
@@ -15,74 +15,84 @@ from datetime import datetime, timedelta
 from collections import deque
 from typing import Dict, List
 
+from .embedding_index import EmbeddingRing, normalize_vector
+from .keyword_automaton import ATTENTION_GROUP, ATTENTION_SENTIMENT_GROUP, get_keyword_automaton
+from .keyword_registry import ATTENTION_KEYWORDS
 from .news_event import NewsEvent
 
 
 class AttentionScorer:
     """注意力评分器"""
 
-    KEYWORDS = {
-        "high": ["突破", "暴涨", "暴跌", "涨停", "跌停", "重大", "紧急", "突发",
-                "AI", "人工智能", "算力", "芯片", "GPU", "英伟达", "OpenAI",
-                "政策", "监管", "改革", "创新", "革命"],
-        "medium": ["上涨", "下跌", "增长", "下降", "利好", "利空",
-                   "技术", "产品", "发布", "合作", "收购", "并购"],
+    KEYWORDS = ATTENTION_KEYWORDS
+
+    WEIGHTS = {
+        "novelty": 0.20,
+        "sentiment": 0.12,
+        "market": 0.20,
+        "keywords": 0.15,
+        "velocity": 0.13,
+        "importance": 0.20,  # 数据源标记的重要性权重
     }
 
     def __init__(self, history_size: int = 1000):
         self.history = deque(maxlen=history_size)
         self.recent_events = deque(maxlen=100)
+        # 与 history 逐条对应的归一化向量环形缓冲，新颖度评分用一次矩阵乘法完成
+        self._history_vectors = EmbeddingRing(history_size)
 
     def score(self, event: NewsEvent) -> float:
         """计算注意力评分"""
+        total = self._combine(event, self._novelty_score(event))
+        self._record(event)
+        return total
+
+    def peek_score(self, event: NewsEvent) -> float:
+        """计算注意力评分（不写入历史，用于预筛选）"""
+        return self._combine(event, self._novelty_score(event))
+
+    def score_batch(self, events: List[NewsEvent]) -> List[float]:
+        """批量评分，结果与依次调用 score() 相同
+
+        新颖度一次算出：每条事件对应的历史窗口 = 历史 + 本批中排在它前面的事件
+        """
+        totals = []
+        for event, novelty in zip(events, self._novelty_scores_batch(events)):
+            totals.append(self._combine(event, novelty))
+            self._record(event)
+        return totals
+
+    def _combine(self, event: NewsEvent, novelty: float) -> float:
         scores = {
-            "novelty": self._novelty_score(event),
+            "novelty": novelty,
             "sentiment": self._sentiment_score(event),
             "market": self._market_score(event),
             "keywords": self._keyword_score(event),
             "velocity": self._velocity_score(event),
             "importance": self._importance_score(event),  # 新增：数据源标记的重要性
         }
+        total = sum(scores[k] * self.WEIGHTS[k] for k in scores)
+        return min(1.0, max(0.0, total))
 
-        weights = {
-            "novelty": 0.20,
-            "sentiment": 0.12,
-            "market": 0.20,
-            "keywords": 0.15,
-            "velocity": 0.13,
-            "importance": 0.20,  # 数据源标记的重要性权重
-        }
-
-        total = sum(scores[k] * weights[k] for k in scores)
-
+    def _record(self, event: NewsEvent):
+        ring = self._sync_history_vectors()
         self.history.append(event)
+        ring.append(event.vector)
         self.recent_events.append({
             "time": event.timestamp,
             "type": event.event_type,
         })
 
-        return min(1.0, max(0.0, total))
-
-    def peek_score(self, event: NewsEvent) -> float:
-        """计算注意力评分（不写入历史，用于预筛选）"""
-        scores = {
-            "novelty": self._novelty_score(event),
-            "sentiment": self._sentiment_score(event),
-            "market": self._market_score(event),
-            "keywords": self._keyword_score(event),
-            "velocity": self._velocity_score(event),
-            "importance": self._importance_score(event),
-        }
-        weights = {
-            "novelty": 0.20,
-            "sentiment": 0.12,
-            "market": 0.20,
-            "keywords": 0.15,
-            "velocity": 0.13,
-            "importance": 0.20,
-        }
-        total = sum(scores[k] * weights[k] for k in scores)
-        return min(1.0, max(0.0, total))
+    def _sync_history_vectors(self) -> EmbeddingRing:
+        """history 被外部替换或清空时按其内容重建向量缓冲"""
+        ring = self._history_vectors
+        capacity = self.history.maxlen or ring.capacity
+        if len(ring) != len(self.history) or ring.capacity != capacity:
+            ring = EmbeddingRing(capacity)
+            for hist in self.history:
+                ring.append(hist.vector)
+            self._history_vectors = ring
+        return ring
 
     def _importance_score(self, event: NewsEvent) -> float:
         """数据源标记的重要性评分
@@ -108,30 +118,59 @@ class AttentionScorer:
         return 0.0
 
     def _novelty_score(self, event: NewsEvent) -> float:
-        """新颖度评分"""
+        """新颖度评分：1 - 与历史事件的平均余弦相似度"""
         if not self.history or event.vector is None:
             return 0.5
 
-        similarities = []
-        for hist in self.history:
-            if hist.vector is not None:
-                sim = self._cosine_similarity(event.vector, hist.vector)
-                similarities.append(sim)
-
-        if not similarities:
+        similarities = self._sync_history_vectors().similarities(event.vector)
+        if similarities.size == 0:
             return 0.5
 
-        return 1.0 - np.mean(similarities)
+        return 1.0 - float(similarities.mean(dtype=np.float64))
+
+    def _novelty_scores_batch(self, events: List[NewsEvent]) -> List[float]:
+        """批量新颖度：本批向量与 [历史, 本批] 做一次矩阵乘法，按前缀和取各自的历史窗口"""
+        ring = self._sync_history_vectors()
+        hist_rows, hist_valid = ring.ordered()
+        n_hist, capacity = len(hist_valid), ring.capacity
+
+        dim = ring.dim
+        if dim is None:
+            dim = next((np.size(e.vector) for e in events if e.vector is not None and np.size(e.vector)), None)
+        if dim is None:
+            return [0.5] * len(events)
+
+        queries = np.zeros((len(events), dim), dtype=np.float32)
+        query_valid = np.zeros(len(events), dtype=bool)
+        for i, event in enumerate(events):
+            row = normalize_vector(event.vector, dim)
+            if row is not None:
+                queries[i] = row
+                query_valid[i] = True
+        if hist_rows.shape[1] != dim:
+            hist_rows = np.zeros((n_hist, dim), dtype=np.float32)
+
+        valid = np.concatenate([hist_valid, query_valid])
+        sims = (queries @ np.vstack([hist_rows, queries]).T).astype(np.float64) * valid
+        sim_prefix = np.concatenate([np.zeros((len(events), 1)), np.cumsum(sims, axis=1)], axis=1)
+        count_prefix = np.concatenate([[0], np.cumsum(valid)])
+
+        novelties = []
+        for k, event in enumerate(events):
+            end = n_hist + k
+            start = max(0, end - capacity)
+            count = count_prefix[end] - count_prefix[start]
+            if end == start or event.vector is None or not query_valid[k] or count == 0:
+                novelties.append(0.5)
+                continue
+            novelties.append(1.0 - (sim_prefix[k, end] - sim_prefix[k, start]) / count)
+        return novelties
 
     def _sentiment_score(self, event: NewsEvent) -> float:
         """情绪强度评分"""
-        text = event.content.lower()
-        score = 0.0
-
-        strong_words = ["暴涨", "涨停", "突破", "重大利好", "暴跌", "跌停", "崩盘", "危机"]
-        for word in strong_words:
-            if word in text:
-                score += 0.3
+        text = event.content
+        hits = get_keyword_automaton().count(text, ATTENTION_SENTIMENT_GROUP)
+        score = 0.3 * hits.get("strong", 0)
 
         score += min(0.2, text.count("!") * 0.05)
         return min(1.0, score)
@@ -156,17 +195,8 @@ class AttentionScorer:
 
     def _keyword_score(self, event: NewsEvent) -> float:
         """关键词评分"""
-        text = event.content.lower()
-        score = 0.0
-
-        for keyword in self.KEYWORDS["high"]:
-            if keyword.lower() in text:
-                score += 0.25
-
-        for keyword in self.KEYWORDS["medium"]:
-            if keyword.lower() in text:
-                score += 0.1
-
+        hits = get_keyword_automaton().count(event.content, ATTENTION_GROUP)
+        score = 0.25 * hits.get("high", 0) + 0.1 * hits.get("medium", 0)
         return min(1.0, score)
 
     def _velocity_score(self, event: NewsEvent) -> float:
@@ -0,0 +1,204 @@
+"""
+EmbeddingIndex - 语义向量矩阵索引
+
+新闻认知里的两类相似度计算都改为一次矩阵-向量乘：
+- EmbeddingRing: 最近事件向量的环形缓冲（新颖度评分，替代逐条余弦循环）
+- TopicCenterIndex: 主题中心矩阵（最近主题查找）
+
+两者都预分配 float32 矩阵，按行存放 L2 归一化后的向量，
+余弦相似度 = 矩阵 @ 归一化查询向量。零向量归一化后为全零行，相似度为 0，
+与 `_cosine_similarity` 对零范数返回 0.0 的约定一致。
+"""
+
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# float32 粗筛的容差：相似度落在阈值/最优值 margin 以内的候选交给 float64 精确复核
+SIMILARITY_MARGIN = 1e-4
+
+
+def normalize_vector(vector: Optional[Sequence[float]], dim: Optional[int] = None) -> Optional[np.ndarray]:
+    """L2 归一化为 float32；向量为空或维度不符时返回 None"""
+    if vector is None:
+        return None
+    arr = np.asarray(vector, dtype=np.float64).ravel()
+    if arr.size == 0 or (dim is not None and arr.size != dim):
+        return None
+    norm = np.linalg.norm(arr)
+    if norm > 0:
+        arr = arr / norm
+    return arr.astype(np.float32)
+
+
+class EmbeddingRing:
+    """
+    事件向量环形缓冲
+
+    与 AttentionScorer.history（deque(maxlen)）逐条对应：
+    每次追加占用一个槽位，无向量（或维度不符）的事件占位但标记为无效。
+    维度由第一条有效向量确定。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(self.capacity, dtype=bool)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def valid_count(self) -> int:
+        return int(self._valid.sum())
+
+    def clear(self):
+        self._valid[:] = False
+        self._head = 0
+        self._size = 0
+
+    def append(self, vector: Optional[Sequence[float]]):
+        row = normalize_vector(vector, self.dim)
+        if row is not None and self._matrix is None:
+            self.dim = row.size
+            self._matrix = np.zeros((self.capacity, self.dim), dtype=np.float32)
+        slot = self._head
+        if row is not None:
+            self._matrix[slot] = row
+        self._valid[slot] = row is not None
+        self._head = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def similarities(self, vector: Optional[Sequence[float]]) -> np.ndarray:
+        """查询向量与全部有效行的余弦相似度（一次矩阵-向量乘）"""
+        query = normalize_vector(vector, self.dim)
+        if query is None or self._matrix is None:
+            return np.empty(0, dtype=np.float32)
+        rows = self._matrix[self._valid]
+        return rows @ query
+
+    def ordered(self):
+        """按从旧到新返回 (矩阵行, 有效标记)，供批量评分按时间窗口计算"""
+        order = (self._head - self._size + np.arange(self._size)) % self.capacity
+        if self._matrix is None:
+            return np.zeros((self._size, 0), dtype=np.float32), self._valid[order]
+        return self._matrix[order], self._valid[order]
+
+
+class TopicCenterIndex:
+    """
+    主题中心矩阵
+
+    每个主题占一行（topic_id → 行号），删除的行回收复用，容量按倍数扩展。
+    sync() 按中心向量对象的身份检测变化：主题中心以整体替换的方式更新
+    （_assign_topic 每次生成新列表），原地修改列表不会被发现。
+
+    shortlist() 只做 float32 粗筛，返回需要用原实现精确复核的主题，
+    保证最终选出的主题与逐个余弦比较完全一致。
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._capacity = max(1, int(capacity))
+        self._used = np.zeros(self._capacity, dtype=bool)
+        self._slots: Dict[Hashable, int] = {}
+        self._ids: List[Optional[Hashable]] = [None] * self._capacity
+        self._centers: Dict[Hashable, object] = {}
+        self._free: List[int] = []
+        self._high = 0
+        self._irregular: Dict[Hashable, object] = {}  # 维度与索引不符的中心，始终交给精确复核
+
+    def __len__(self) -> int:
+        return len(self._centers)
+
+    def _grow(self):
+        capacity = self._capacity * 2
+        used = np.zeros(capacity, dtype=bool)
+        used[:self._capacity] = self._used
+        self._used = used
+        self._ids.extend([None] * (capacity - self._capacity))
+        if self._matrix is not None:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[:self._capacity] = self._matrix
+            self._matrix = matrix
+        self._capacity = capacity
+
+    def set(self, topic_id: Hashable, center: Sequence[float]):
+        """写入或更新一个主题中心"""
+        self._centers[topic_id] = center
+        row = normalize_vector(center, self.dim)
+        if row is None:
+            self._release(topic_id)
+            self._irregular[topic_id] = center
+            return
+        self._irregular.pop(topic_id, None)
+        if self._matrix is None:
+            self.dim = row.size
+            self._matrix = np.zeros((self._capacity, self.dim), dtype=np.float32)
+
+        slot = self._slots.get(topic_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._high >= self._capacity:
+                    self._grow()
+                slot = self._high
+                self._high += 1
+            self._slots[topic_id] = slot
+            self._ids[slot] = topic_id
+            self._used[slot] = True
+        self._matrix[slot] = row
+
+    def _release(self, topic_id: Hashable):
+        slot = self._slots.pop(topic_id, None)
+        if slot is not None:
+            self._used[slot] = False
+            self._ids[slot] = None
+            self._free.append(slot)
+
+    def remove(self, topic_id: Hashable):
+        self._release(topic_id)
+        self._irregular.pop(topic_id, None)
+        self._centers.pop(topic_id, None)
+
+    def sync(self, topics: Mapping[Hashable, object]):
+        """与 {topic_id: Topic} 对齐：移除已删除的主题，刷新中心被替换的主题"""
+        for topic_id in [tid for tid in self._centers if tid not in topics]:
+            self.remove(topic_id)
+        centers = self._centers
+        for topic_id, topic in topics.items():
+            center = topic.center
+            if centers.get(topic_id) is not center:
+                self.set(topic_id, center)
+
+    def shortlist(self, vector: Sequence[float], threshold: float,
+                  nearest: bool = False) -> Optional[List[Hashable]]:
+        """
+        粗筛相似度可能超过 threshold 的主题
+
+        Args:
+            nearest: True 时只保留与最高相似度相差不超过容差的主题（最近主题查找）
+
+        Returns:
+            候选 topic_id 列表（未排序）；无法使用索引（查询维度不符）时返回 None
+        """
+        if not self._centers:
+            return []
+        if self._matrix is None:
+            return list(self._irregular)
+        query = normalize_vector(vector, self.dim)
+        if query is None:
+            return None
+        high = self._high
+        sims = self._matrix[:high] @ query
+        mask = self._used[:high] & (sims > threshold - SIMILARITY_MARGIN)
+        if nearest and mask.any():
+            mask &= sims >= sims[mask].max() - SIMILARITY_MARGIN
+        candidates = [self._ids[s] for s in np.flatnonzero(mask)]
+        candidates.extend(self._irregular)
+        return candidates
@@ -0,0 +1,276 @@
+"""
+KeywordAutomaton - 多模式关键词自动机（Aho-Corasick）
+
+把所有关键词词典编译成一个自动机，对每段文本只扫描一遍，
+返回全部 (分组, 类别, 关键词, 位置) 命中，取代逐个关键词的子串判断。
+
+匹配语义与各检测器原有的逐词子串判断一致：
+- 纯 ASCII 关键词大小写不敏感（"ai" 命中 "AI"）
+- 含非 ASCII 字符的关键词大小写敏感（"AI芯片" 不命中 "ai芯片"）
+
+文本只做 ASCII 小写化（不改变长度），命中位置即原文下标；
+含非 ASCII 字符且带 ASCII 字母的关键词命中后再与原文逐字核对。
+
+共享自动机：
+- 默认词典：叙事 / 供需动态 / 市场情绪 / 供需问题 / 注意力评分
+- NarrativeTracker 的关注主题变化时通过 update_keyword_group() 替换 narrative 分组并重建
+- 自动机本身不可变，重建后整体替换引用，持有旧引用的调用方不受影响
+
+使用方式：
+    from deva.naja.cognition.semantic.keyword_automaton import get_keyword_automaton
+
+    automaton = get_keyword_automaton()
+    automaton.match(text, "dynamics")   # {"Token短缺": ["token短缺", ...], ...}
+    automaton.find_all(text)            # [KeywordHit(group, label, keyword, position), ...]
+"""
+
+import string
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from .keyword_registry import (
+    ATTENTION_KEYWORDS,
+    ATTENTION_SENTIMENT_WORDS,
+    DEFAULT_NARRATIVE_KEYWORDS,
+    DYNAMICS_KEYWORDS,
+    SENTIMENT_KEYWORDS,
+    SUPPLY_DEMAND_KEYWORDS,
+)
+
+NARRATIVE_GROUP = "narrative"
+DYNAMICS_GROUP = "dynamics"
+SENTIMENT_GROUP = "sentiment"
+SUPPLY_DEMAND_GROUP = "supply_demand"
+ATTENTION_GROUP = "attention"
+ATTENTION_SENTIMENT_GROUP = "attention_sentiment"
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+
+KeywordDictionaries = Mapping[str, Mapping[str, Iterable[str]]]
+
+
+class KeywordHit(NamedTuple):
+    """一次关键词命中"""
+    group: str
+    label: str
+    keyword: str
+    position: int
+
+
+class KeywordAutomaton:
+    """
+    关键词自动机
+
+    dictionaries: {分组: {类别: [关键词, ...]}}，例如
+        {"narrative": {"AI": ["AI", "大模型"]}, "dynamics": {...}}
+
+    scan() 的结果按文本做 LRU 缓存：同一事件文本被多个检测器依次检测时只扫描一次。
+    """
+
+    def __init__(self, dictionaries: KeywordDictionaries, cache_size: int = 256):
+        self._groups: Dict[str, Dict[str, List[str]]] = {
+            group: {label: list(keywords) for label, keywords in mapping.items()}
+            for group, mapping in dictionaries.items()
+        }
+        # 条目：(group, label, keyword)，按词典顺序编号，排序即还原词典顺序
+        self._entries: List[Tuple[str, str, str]] = []
+        # 模式：(关键词原文, 长度, 是否需要与原文核对, 条目编号)
+        self._patterns: List[Tuple[str, int, bool, List[int]]] = []
+        pattern_ids: Dict[str, int] = {}
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for group, mapping in self._groups.items():
+            for label, keywords in mapping.items():
+                for keyword in keywords:
+                    if not keyword:
+                        continue
+                    entry_id = len(self._entries)
+                    self._entries.append((group, label, keyword))
+                    pid = pattern_ids.get(keyword)
+                    if pid is None:
+                        pid = pattern_ids[keyword] = len(self._patterns)
+                        key = keyword.translate(_ASCII_LOWER)
+                        exact = not keyword.isascii() and any(c in _ASCII_LETTERS for c in keyword)
+                        self._patterns.append((keyword, len(keyword), exact, []))
+                        self._insert(key, pid)
+                    self._patterns[pid][3].append(entry_id)
+
+        self._alphabet = frozenset(ch for node in self._goto for ch in node)
+        self._build_failure_links()
+
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Dict[str, List[str]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ============== 构建 ==============
+
+    def _insert(self, key: str, pid: int):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] += (pid,)
+
+    def _build_failure_links(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())  # 根的子节点失败指针为根
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                # 合并后缀节点的输出，扫描时无需沿失败链回溯
+                out[child] += out[fail[child]]
+
+    # ============== 查询 ==============
+
+    @property
+    def groups(self) -> List[str]:
+        return list(self._groups)
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self._patterns)
+
+    def dictionary(self, group: str) -> Dict[str, List[str]]:
+        """编译时使用的词典（副本）"""
+        return {label: list(keywords) for label, keywords in self._groups.get(group, {}).items()}
+
+    def _iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """单遍扫描，产出 (起始位置, 模式编号)"""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        patterns = self._patterns
+        node = 0
+        for i, ch in enumerate(text.translate(_ASCII_LOWER)):
+            if ch not in alphabet:
+                node = 0
+                continue
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                keyword, length, exact, _ = patterns[pid]
+                start = i - length + 1
+                if exact and text[start:i + 1] != keyword:
+                    continue
+                yield start, pid
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """返回全部命中（含重复出现），按命中结束位置排序"""
+        if not text:
+            return []
+        entries, patterns = self._entries, self._patterns
+        hits = []
+        for start, pid in self._iter_matches(text):
+            for entry_id in patterns[pid][3]:
+                group, label, keyword = entries[entry_id]
+                hits.append(KeywordHit(group, label, keyword, start))
+        return hits
+
+    def scan(self, text: str) -> Dict[str, Dict[str, List[str]]]:
+        """
+        按分组/类别汇总命中关键词（每个关键词只记一次，保持词典顺序）
+
+        Returns:
+            {group: {label: [keyword, ...]}}，结果被缓存，调用方不要修改
+        """
+        if not text:
+            return {}
+        with self._cache_lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+
+        patterns = self._patterns
+        seen_patterns = set()
+        entry_ids: List[int] = []
+        for _, pid in self._iter_matches(text):
+            if pid not in seen_patterns:
+                seen_patterns.add(pid)
+                entry_ids.extend(patterns[pid][3])
+
+        result: Dict[str, Dict[str, List[str]]] = {}
+        for entry_id in sorted(entry_ids):
+            group, label, keyword = self._entries[entry_id]
+            result.setdefault(group, {}).setdefault(label, []).append(keyword)
+
+        if self._cache_size > 0:
+            with self._cache_lock:
+                self._cache[text] = result
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def match(self, text: str, group: str) -> Dict[str, List[str]]:
+        """单个分组的命中：{类别: [关键词, ...]}，与逐词子串判断的结果一致"""
+        return {label: list(keywords) for label, keywords in self.scan(text).get(group, {}).items()}
+
+    def count(self, text: str, group: str) -> Dict[str, int]:
+        """单个分组内每个类别命中的关键词数"""
+        return {label: len(keywords) for label, keywords in self.scan(text).get(group, {}).items()}
+
+
+# ============== 共享自动机 ==============
+
+_shared_lock = threading.Lock()
+_shared_groups: Dict[str, Dict[str, List[str]]] = {}
+_shared_automaton: Optional[KeywordAutomaton] = None
+
+
+def default_keyword_dictionaries() -> Dict[str, Mapping[str, Iterable[str]]]:
+    """共享自动机的默认词典"""
+    return {
+        NARRATIVE_GROUP: DEFAULT_NARRATIVE_KEYWORDS,
+        DYNAMICS_GROUP: DYNAMICS_KEYWORDS,
+        SENTIMENT_GROUP: SENTIMENT_KEYWORDS,
+        SUPPLY_DEMAND_GROUP: SUPPLY_DEMAND_KEYWORDS,
+        ATTENTION_GROUP: ATTENTION_KEYWORDS,
+        ATTENTION_SENTIMENT_GROUP: ATTENTION_SENTIMENT_WORDS,
+    }
+
+
+def get_keyword_automaton() -> KeywordAutomaton:
+    """获取共享自动机（首次调用时用默认词典编译）"""
+    global _shared_automaton
+    automaton = _shared_automaton
+    if automaton is not None:
+        return automaton
+    with _shared_lock:
+        if _shared_automaton is None:
+            for group, mapping in default_keyword_dictionaries().items():
+                _shared_groups.setdefault(group, {k: list(v) for k, v in mapping.items()})
+            _shared_automaton = KeywordAutomaton(_shared_groups)
+        return _shared_automaton
+
+
+def update_keyword_group(group: str, mapping: Mapping[str, Iterable[str]]) -> KeywordAutomaton:
+    """
+    替换共享自动机中的一个分组，词典有变化时重建
+
+    Returns:
+        替换后的共享自动机；词典未变化时返回现有实例
+    """
+    global _shared_automaton
+    normalized = {label: list(keywords) for label, keywords in mapping.items()}
+    get_keyword_automaton()
+    with _shared_lock:
+        if _shared_groups.get(group) == normalized and _shared_automaton is not None:
+            return _shared_automaton
+        _shared_groups[group] = normalized
+        _shared_automaton = KeywordAutomaton(_shared_groups)
+        return _shared_automaton
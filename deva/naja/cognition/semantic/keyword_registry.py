@@ -468,6 +468,21 @@ NEWS_TOPIC_KEYWORDS: Dict[str, tuple] = {
 }
 
 
+# 注意力评分关键词（AttentionScorer）
+ATTENTION_KEYWORDS = {
+    "high": ["突破", "暴涨", "暴跌", "涨停", "跌停", "重大", "紧急", "突发",
+             "AI", "人工智能", "算力", "芯片", "GPU", "英伟达", "OpenAI",
+             "政策", "监管", "改革", "创新", "革命"],
+    "medium": ["上涨", "下跌", "增长", "下降", "利好", "利空",
+               "技术", "产品", "发布", "合作", "收购", "并购"],
+}
+
+# 情绪强度词（AttentionScorer 情绪评分）
+ATTENTION_SENTIMENT_WORDS = {
+    "strong": ["暴涨", "涨停", "突破", "重大利好", "暴跌", "跌停", "崩盘", "危机"],
+}
+
+
 def get_all_keywords() -> List[str]:
     """获取所有叙事关键词（扁平化）"""
     keywords = []
@@ -310,14 +310,13 @@ class DataSourceEntry(RecoverableUnit):
             try:
                 self._log("INFO", f"开始回放表 {table_name}")
 
-                db_stream = NB(table_name, key_mode='time')
+                from ..market_hotspot.data.snapshot_store import SnapshotRange
 
-                if start_time is None and end_time is None:
-                    keys = list(db_stream.keys())
-                else:
-                    keys = list(db_stream[start_time:end_time])
+                # 按回放区间选择 NB 表或列式快照；列式快照与 NB 表一致，按旧格式（list[dict]）下发
+                snapshots = SnapshotRange(table_name, start_time, end_time)
+                keys, total, read = iter(snapshots), snapshots.total, snapshots.read
 
-                self._log("INFO", f"找到 {len(keys)} 条数据")
+                self._log("INFO", f"找到 {total} 条数据")
 
                 for key in keys:
                     if self._stop_event.is_set():
@@ -325,7 +324,7 @@ class DataSourceEntry(RecoverableUnit):
                         break
 
                     try:
-                        data = db_stream.get(key)
+                        data = read(key)
                         if data is not None:
                             self._emit_data(data)
                             self._state.last_data_ts = time.time()
@@ -44,6 +44,7 @@ class DictionaryEntry(RecoverableUnit):
         )
 
         self._payload_db = NB(DICT_PAYLOAD_TABLE)
+        self._payload_seq = 0
 
     def _get_func_name(self) -> str:
         return "fetch_data"
@@ -179,6 +180,7 @@ class DictionaryEntry(RecoverableUnit):
                 "entry_id": self.id,
                 "entry_name": self.name,
             }
+            self._payload_seq += 1
 
             try:
                 self._state.data_size_bytes = len(str(data).encode("utf-8"))
@@ -188,6 +190,11 @@ class DictionaryEntry(RecoverableUnit):
         except Exception as e:
             self._log("ERROR", "Save payload failed", error=str(e))
 
+    @property
+    def payload_version(self) -> tuple:
+        """payload 版本（保存/清除后改变），供下游缓存判断是否需要重新读取"""
+        return (self._state.payload_key, self._state.last_update_ts, self._payload_seq)
+
     def get_payload(self) -> Any:
         """获取数据"""
         payload = self._payload_db.get(self._state.payload_key)
@@ -200,6 +207,7 @@ class DictionaryEntry(RecoverableUnit):
         try:
             if self._state.payload_key and self._state.payload_key in self._payload_db:
                 del self._payload_db[self._state.payload_key]
+            self._payload_seq += 1
 
             self._state.last_status = "cleared"
             self._state.last_update_ts = 0
@@ -0,0 +1,369 @@
+"""
+交易事件持久化存储 - 带索引列的 SQLite 事件表
+
+TradingEventBus 持久化的事件同时写入本表：
+- event_type / symbol / direction / confidence / timestamp 为独立列并建索引
+- 完整事件以 JSON 存入 payload 列
+
+EventQuery 的过滤、分页、聚合统计、导出都下推到 SQL 执行，
+数月历史也只扫描命中索引的行，不再把整段历史拉回 Python 过滤排序。
+
+写入为后写（write-behind）：append 只在内存排队，后台线程按 flush_interval
+批量提交；查询前先提交排队的事件，保证读到自己的写入。
+旧 NB 流（trading.<event_type>）中的历史由 import_legacy 一次性导入。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser('~'), '.deva', 'naja_events.sqlite')
+
+_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS trading_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_type TEXT NOT NULL,
+        symbol TEXT,
+        direction TEXT,
+        confidence REAL,
+        timestamp REAL NOT NULL,
+        strategy_name TEXT,
+        payload TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_te_type_ts ON trading_events(event_type, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_te_symbol_ts ON trading_events(symbol, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_te_type_dir_ts ON trading_events(event_type, direction, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_te_type_conf ON trading_events(event_type, confidence)',
+    'CREATE INDEX IF NOT EXISTS idx_te_ts ON trading_events(timestamp)',
+    '''
+    CREATE TABLE IF NOT EXISTS trading_event_migrations (
+        event_type TEXT PRIMARY KEY,
+        migrated_at REAL NOT NULL,
+        count INTEGER NOT NULL
+    )
+    ''',
+]
+
+_INSERT = ('INSERT INTO trading_events '
+           '(event_type, symbol, direction, confidence, timestamp, strategy_name, payload) '
+           'VALUES (?, ?, ?, ?, ?, ?, ?)')
+
+
+def _plain(value):
+    """Enum 等取原始值，便于索引列比较"""
+    return getattr(value, 'value', value)
+
+
+def _json_default(value):
+    """Enum 序列化为原始值，其他对象转字符串"""
+    plain = _plain(value)
+    return plain if plain is not value else str(value)
+
+
+def event_to_record(event) -> Dict[str, Any]:
+    """事件对象 → 可 JSON 序列化的字典（优先使用事件自带的 to_dict）"""
+    if isinstance(event, dict):
+        return dict(event)
+    to_dict = getattr(event, 'to_dict', None)
+    if callable(to_dict):
+        return to_dict()
+    if hasattr(event, '__dataclass_fields__'):
+        return asdict(event)
+    return dict(vars(event))
+
+
+def extract_columns(record: Dict[str, Any]) -> Tuple[Any, Any, Any, Any]:
+    """
+    提取索引列 (symbol, direction, confidence, strategy_name)
+
+    交易决策事件没有顶层 symbol/direction/confidence，
+    依次回退到 approved_* / approval_score / 原始信号。
+    """
+    signal = record.get('signal_event') if isinstance(record.get('signal_event'), dict) else {}
+    symbol = record.get('symbol') or record.get('approved_symbol') or signal.get('symbol')
+    direction = record.get('direction') or record.get('approved_direction') or signal.get('direction')
+    confidence = record.get('confidence')
+    if confidence is None:
+        confidence = record.get('approval_score')
+    strategy_name = record.get('strategy_name') or signal.get('strategy_name')
+    direction = _plain(direction)
+    return (
+        symbol,
+        str(direction).lower() if direction is not None else None,
+        float(confidence) if confidence is not None else None,
+        strategy_name,
+    )
+
+
+class TradingEventStore:
+    """
+    交易事件存储
+
+    单连接 + 锁，WAL 模式；db_path=':memory:' 时为进程内存储（测试用）。
+    flush_interval > 0 时 append 走后写队列（排队超过 max_pending 时立即提交），
+    flush_interval = 0 时每次 append 同步提交。
+
+    使用方式：
+        store = TradingEventStore()
+        store.append('StrategySignalEvent', event)
+        rows = store.query(event_type='StrategySignalEvent', symbol='000001', limit=50)
+        stats = store.aggregate('StrategySignalEvent', start_time=t0)
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, flush_interval: float = 0.5,
+                 max_pending: int = 1000):
+        self.db_path = db_path
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+        self._conn.commit()
+
+        # 后写队列：已序列化的行 + 待执行的清理截止时间
+        self._pending: List[Tuple] = []
+        self._pending_lock = threading.Lock()
+        self._prune_before: Optional[float] = None
+        self._max_pending = max_pending
+        self._closed = threading.Event()
+        self._writer = None
+        if flush_interval > 0:
+            self._flush_interval = flush_interval
+            self._writer = threading.Thread(target=self._write_loop, daemon=True,
+                                            name='trading-event-store')
+            self._writer.start()
+
+    # ============== 写入 ==============
+
+    @staticmethod
+    def _row(event_type: str, event) -> Tuple:
+        record = event_to_record(event)
+        symbol, direction, confidence, strategy_name = extract_columns(record)
+        timestamp = record.get('timestamp')
+        if timestamp is None:
+            timestamp = time.time()
+        return (event_type, symbol, direction, confidence, float(timestamp),
+                strategy_name, json.dumps(record, ensure_ascii=False, default=_json_default))
+
+    def append(self, event_type: str, event) -> None:
+        """写入单个事件（后写模式下只入队，序列化在调用方线程完成）"""
+        row = self._row(event_type, event)
+        if self._writer is None:
+            with self._lock:
+                self._conn.execute(_INSERT, row)
+                self._conn.commit()
+            return
+        with self._pending_lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self._max_pending
+        if full:
+            self.flush()
+
+    def append_many(self, items: List[Tuple[str, Any]]) -> int:
+        """批量写入 [(event_type, event), ...]，单事务同步提交（先提交排队的事件）"""
+        rows = [self._row(event_type, event) for event_type, event in items]
+        self.flush()
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(_INSERT, rows)
+            self._conn.commit()
+        return len(rows)
+
+    def flush(self) -> int:
+        """提交排队的事件与待执行的清理，返回提交的事件数"""
+        with self._lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+                prune_before, self._prune_before = self._prune_before, None
+            if not rows and prune_before is None:
+                return 0
+            if rows:
+                self._conn.executemany(_INSERT, rows)
+            if prune_before is not None:
+                self._conn.execute('DELETE FROM trading_events WHERE timestamp < ?', (prune_before,))
+            self._conn.commit()
+        return len(rows)
+
+    def _write_loop(self):
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                log.warning(f"事件存储批量提交失败: {e}")
+
+    def prune(self, before: float) -> int:
+        """删除早于 before 的事件，返回删除行数"""
+        self.flush()
+        with self._lock:
+            cur = self._conn.execute('DELETE FROM trading_events WHERE timestamp < ?', (before,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def request_prune(self, before: float):
+        """登记保留期清理，由下一次批量提交执行（不阻塞发布路径）"""
+        if self._writer is None:
+            self.prune(before)
+            return
+        with self._pending_lock:
+            self._prune_before = max(before, self._prune_before or before)
+
+    def is_migrated(self, event_type: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM trading_event_migrations WHERE event_type = ?', (event_type,)).fetchone()
+        return row is not None
+
+    def import_legacy(self, event_type: str, records: List[Dict[str, Any]]) -> int:
+        """导入旧 NB 流中的事件并登记迁移（同一事务，每种类型只导入一次）"""
+        rows = [self._row(event_type, record) for record in records]
+        self.flush()
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM trading_event_migrations WHERE event_type = ?',
+                                  (event_type,)).fetchone():
+                return 0
+            self._conn.executemany(_INSERT, rows)
+            self._conn.execute('INSERT INTO trading_event_migrations VALUES (?, ?, ?)',
+                               (event_type, time.time(), len(rows)))
+            self._conn.commit()
+        return len(rows)
+
+    # ============== 查询 ==============
+
+    @staticmethod
+    def _where(event_type=None, symbol=None, direction=None, min_confidence=None,
+               max_confidence=None, start_time=None, end_time=None,
+               strategy_name=None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if event_type:
+            clauses.append('event_type = ?')
+            params.append(event_type)
+        if symbol:
+            clauses.append('symbol = ?')
+            params.append(symbol)
+        if direction:
+            clauses.append('direction = ?')
+            params.append(str(_plain(direction)).lower())
+        # 与旧实现一致：无置信度的事件不受置信度条件约束
+        if min_confidence is not None:
+            clauses.append('(confidence IS NULL OR confidence >= ?)')
+            params.append(min_confidence)
+        if max_confidence is not None:
+            clauses.append('(confidence IS NULL OR confidence <= ?)')
+            params.append(max_confidence)
+        if start_time:
+            clauses.append('timestamp >= ?')
+            params.append(start_time)
+        if end_time:
+            clauses.append('timestamp <= ?')
+            params.append(end_time)
+        if strategy_name:
+            clauses.append('strategy_name = ?')
+            params.append(strategy_name)
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        return where, params
+
+    def query(self, limit: int = 100, offset: int = 0, **filters) -> List[Dict[str, Any]]:
+        """
+        条件查询（按时间倒序，分页在 SQL 中完成）
+
+        Args:
+            limit: 返回数量；<= 0 表示不限
+            offset: 跳过条数
+            **filters: event_type / symbol / direction / min_confidence /
+                       max_confidence / start_time / end_time / strategy_name
+        """
+        self.flush()
+        where, params = self._where(**filters)
+        sql = f'SELECT payload FROM trading_events{where} ORDER BY timestamp DESC, id DESC'
+        if limit and limit > 0:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        elif offset:
+            sql += ' LIMIT -1 OFFSET ?'
+            params.append(offset)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_events(self, batch_size: int = 1000, **filters) -> Iterator[Dict[str, Any]]:
+        """按时间倒序分批迭代（导出用，不一次性载入全部结果）"""
+        self.flush()
+        where, params = self._where(**filters)
+        sql = (f'SELECT id, timestamp, payload FROM trading_events{where} '
+               f'{"AND" if where else "WHERE"} (timestamp < ? OR (timestamp = ? AND id < ?)) '
+               'ORDER BY timestamp DESC, id DESC LIMIT ?')
+        # 键集游标 (timestamp, id)，每批走索引定位，不用 OFFSET 重扫
+        last_ts, last_id = float('inf'), float('inf')
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, params + [last_ts, last_ts, last_id, batch_size]).fetchall()
+            if not rows:
+                return
+            for _id, _ts, payload in rows:
+                yield json.loads(payload)
+            last_id, last_ts, _ = rows[-1]
+            if len(rows) < batch_size:
+                return
+
+    def count(self, **filters) -> int:
+        """满足条件的事件数"""
+        self.flush()
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM trading_events{where}', params).fetchone()[0]
+
+    def aggregate(self, event_type: Optional[str] = None, **filters) -> Dict[str, Any]:
+        """
+        聚合统计：总数、买/卖数、置信度 avg/max/min、按天时间线
+
+        Returns:
+            {'total', 'buy', 'sell', 'avg_confidence', 'max_confidence',
+             'min_confidence', 'timeline': {'YYYY-MM-DD': n}}
+        """
+        self.flush()
+        where, params = self._where(event_type=event_type, **filters)
+        with self._lock:
+            total, buy, sell, avg_c, max_c, min_c = self._conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(direction = 'buy'), 0), COALESCE(SUM(direction = 'sell'), 0), "
+                "AVG(confidence), MAX(confidence), MIN(confidence) "
+                f"FROM trading_events{where}",
+                params,
+            ).fetchone()
+            timeline = self._conn.execute(
+                "SELECT strftime('%Y-%m-%d', timestamp, 'unixepoch', 'localtime') AS day, COUNT(*) "
+                f"FROM trading_events{where} GROUP BY day ORDER BY day",
+                params,
+            ).fetchall()
+        return {
+            'total': total,
+            'buy': buy,
+            'sell': sell,
+            'avg_confidence': avg_c or 0.0,
+            'max_confidence': max_c or 0.0,
+            'min_confidence': min_c or 0.0,
+            'timeline': {day: n for day, n in timeline if day},
+        }
+
+    def close(self):
+        """停止后台提交线程，提交剩余事件后关闭连接"""
+        self._closed.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._conn.close()
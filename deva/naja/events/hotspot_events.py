@@ -6,7 +6,7 @@ Hotspot Events - 市场热点相关事件
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 import time
 
 
@@ -24,7 +24,8 @@ class HotspotComputedEvent:
     global_hotspot: float
     activity: float
     block_hotspot: Dict[str, float] = field(default_factory=dict)
-    symbol_weights: Dict[str, float] = field(default_factory=dict)
+    # MarketHotspotSystem 发布的是 WeightsView（按 symbol 取值时才生成字典）
+    symbol_weights: Mapping[str, float] = field(default_factory=dict)
     symbols: List[str] = field(default_factory=list)
 
     # 真实市场数据（用于下游系统如 QueryState 更新）
@@ -44,7 +45,7 @@ class HotspotComputedEvent:
             'global_hotspot': self.global_hotspot,
             'activity': self.activity,
             'block_hotspot': self.block_hotspot,
-            'symbol_weights': self.symbol_weights,
+            'symbol_weights': dict(self.symbol_weights),
             'symbol_count': len(self.symbols),
         }
 
@@ -9,6 +9,9 @@
 - 按置信度（confidence）查询
 - 分页查询
 - 聚合统计
+
+总线配置了 TradingEventStore 时，过滤、分页、聚合与导出均下推到
+带索引的事件表执行；否则回退到读取历史后在 Python 中过滤。
 """
 
 import logging
@@ -34,6 +37,18 @@ class QueryCondition:
     limit: int = 100
     offset: int = 0
     
+    def filters(self) -> Dict[str, Any]:
+        """事件存储可用的过滤参数"""
+        return dict(
+            event_type=self.event_type,
+            symbol=self.symbol,
+            direction=self.direction,
+            min_confidence=self.min_confidence,
+            max_confidence=self.max_confidence,
+            start_time=self.start_time,
+            end_time=self.end_time,
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         result = {}
@@ -78,9 +93,9 @@ class EventQuery:
     
     使用方式：
         from deva.naja.events.query_interface import EventQuery
-        from deva.naja.events import get_event_bus
+        from deva.naja.events import get_trading_bus
         
-        bus = get_event_bus()
+        bus = get_trading_bus()
         query = EventQuery(bus)
         
         # 查询策略信号
@@ -94,8 +109,9 @@ class EventQuery:
         stats = query.get_stats('StrategySignalEvent', days=30)
     """
     
-    def __init__(self, event_bus):
+    def __init__(self, event_bus, store=None):
         self.bus = event_bus
+        self.store = store if store is not None else getattr(event_bus, 'event_store', None)
     
     def query_events(self, condition: QueryCondition) -> List[Dict[str, Any]]:
         """
@@ -109,6 +125,12 @@ class EventQuery:
         """
         log.info(f"查询事件: {condition}")
         
+        if self.store is not None:
+            result = self.store.query(limit=condition.limit, offset=condition.offset,
+                                      **condition.filters())
+            log.info(f"查询结果: 返回 {len(result)}")
+            return result
+        
         # 获取原始历史数据
         if condition.event_type:
             raw_history = self.bus.get_persistent_history(condition.event_type, limit=1000)
@@ -233,6 +255,16 @@ class EventQuery:
             limit=limit
         )
         
+        if decision and self.store is not None:
+            # decision 不是索引列：按时间倒序流式过滤，凑满 limit 即停
+            results = []
+            for event in self.store.iter_events(**condition.filters()):
+                if event.get('decision') == decision:
+                    results.append(event)
+                    if len(results) >= limit:
+                        break
+            return results
+        
         results = self.query_events(condition)
         
         # 如果指定了 decision，进一步过滤
@@ -262,6 +294,18 @@ class EventQuery:
             limit=1000
         )
         
+        if self.store is not None:
+            agg = self.store.aggregate(**condition.filters())
+            return EventStats(
+                total_events=agg['total'],
+                buy_signals=agg['buy'],
+                sell_signals=agg['sell'],
+                avg_confidence=agg['avg_confidence'],
+                max_confidence=agg['max_confidence'],
+                min_confidence=agg['min_confidence'],
+                timeline=agg['timeline'],
+            )
+        
         events = self.query_events(condition)
         
         stats = EventStats()
@@ -314,12 +358,18 @@ class EventQuery:
         """
         import csv
         
+        end_time = time.time()
         condition = QueryCondition(
             event_type=event_type,
-            days=days,
+            start_time=end_time - days * 86400,
+            end_time=end_time,
             limit=5000
         )
         
+        if self.store is not None:
+            self._export_store_to_csv(condition, output_path)
+            return
+        
         events = self.query_events(condition)
         
         if not events:
@@ -341,6 +391,29 @@ class EventQuery:
         
         log.info(f"✅ 导出完成: {len(events)} 条事件 → {output_path}")
     
+    def _export_store_to_csv(self, condition: QueryCondition, output_path: str):
+        """从事件存储分批导出：先扫一遍收集列，再流式写出，不受 5000 条上限约束"""
+        import csv
+        
+        filters = condition.filters()
+        all_keys = set()
+        for event in self.store.iter_events(**filters):
+            all_keys.update(event.keys())
+        
+        if not all_keys:
+            log.warning(f"没有找到 {condition.event_type} 事件，跳过导出")
+            return
+        
+        count = 0
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
+            writer.writeheader()
+            for event in self.store.iter_events(**filters):
+                writer.writerow(event)
+                count += 1
+        
+        log.info(f"✅ 导出完成: {count} 条事件 → {output_path}")
+    
     def get_recent_signals_by_strategy(self, 
                                       strategy_name: Optional[str] = None,
                                       days: int = 7) -> Dict[str, List[Dict[str, Any]]]:
@@ -354,6 +427,14 @@ class EventQuery:
         Returns:
             按策略分组的信号字典
         """
+        if strategy_name and self.store is not None:
+            end_time = time.time()
+            signals = self.store.query(event_type='StrategySignalEvent',
+                                       strategy_name=strategy_name,
+                                       start_time=end_time - days * 86400,
+                                       end_time=end_time, limit=500)
+            return {strategy_name: signals} if signals else {}
+        
         signals = self.query_strategy_signals(days=days, limit=500)
         
         grouped = {}
@@ -378,8 +459,8 @@ def get_event_query() -> EventQuery:
     """获取全局事件查询接口单例"""
     global _global_query
     if _global_query is None:
-        from . import get_event_bus
-        bus = get_event_bus()
+        from . import get_trading_bus
+        bus = get_trading_bus()
         _global_query = EventQuery(bus)
         log.info("✅ 事件查询接口初始化完成")
     return _global_query
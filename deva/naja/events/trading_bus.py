@@ -5,11 +5,16 @@
 核心特性：
 1. 基于 Stream 异步分发（可选）
 2. NB 持久化支持
-3. 去重窗口
+3. 去重窗口（指纹字典 + 按时间排序的过期队列，O(1) 判重）
 4. 重要性阈值
 5. 市场过滤
+6. 锁外分发：订阅列表写时复制，回调不在总线锁内执行
+7. 可选的订阅者异步队列（有界深度，溢出丢弃并计数）
+8. 可选的索引事件存储（TradingEventStore），历史查询下推到 SQL；
+   旧 NB 流中的历史在配置持久化时导入，按保留期定期清理
 """
 
+import queue
 import time
 import threading
 import logging
@@ -28,6 +33,72 @@ except ImportError:
     log.warning("Stream/NB 不可用，回退到简化实现")
 
 
+class _AsyncDelivery:
+    """订阅者异步队列：有界深度，单独线程按顺序调用回调"""
+
+    DROP_NEW = 'drop_new'
+    DROP_OLDEST = 'drop_oldest'
+    _STOP = object()
+
+    def __init__(self, subscription: 'TradingEventSubscription', maxsize: int, overflow: str = DROP_NEW):
+        self.subscription = subscription
+        self.overflow = overflow
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.max_depth = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"trading-bus-{subscription.subscription_id}", daemon=True
+        )
+        self._thread.start()
+
+    def offer(self, event) -> bool:
+        """入队；队列满时按 overflow 策略丢弃，返回本事件是否入队"""
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self.overflow != self.DROP_OLDEST:
+                return False
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                return False
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            try:
+                if event is self._STOP:
+                    return
+                self.subscription.invoke(event)
+            finally:
+                self.queue.task_done()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """等待队列清空（测试/关闭用）"""
+        deadline = None if timeout is None else time.time() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def stop(self):
+        try:
+            self.queue.put(self._STOP, timeout=1.0)
+        except queue.Full:
+            pass
+
+
 @dataclass
 class TradingEventSubscription:
     """交易事件订阅配置"""
@@ -37,6 +108,27 @@ class TradingEventSubscription:
     priority: int = 0
     min_importance: float = 0.0
     created_at: float = field(default_factory=time.time)
+    module_name: str = 'unknown'
+    delivered: int = 0
+    errors: int = 0
+    delivery: Optional[_AsyncDelivery] = None
+
+    def accepts(self, importance: float, market: Optional[str]) -> bool:
+        if importance < self.min_importance:
+            return False
+        if self.markets and market and market not in self.markets:
+            return False
+        return True
+
+    def invoke(self, event) -> bool:
+        try:
+            self.callback(event)
+        except Exception as e:
+            self.errors += 1
+            log.error(f"交易事件回调失败: {e}")
+            return False
+        self.delivered += 1
+        return True
 
 
 @dataclass
@@ -60,20 +152,32 @@ class TradingEventBus:
     - PortfolioUpdateEvent（持仓更新）
     """
     
-    def __init__(self, use_stream: bool = True, dedup_window: float = 30.0):
+    # 事件存储保留期清理的检查间隔（秒）
+    PRUNE_INTERVAL = 3600.0
+
+    def __init__(self, use_stream: bool = True, dedup_window: float = 30.0,
+                 event_store=None, retention_days: Optional[float] = 90.0):
         """
         Args:
             use_stream: 是否使用 Stream/NS 实现（如果可用）
             dedup_window: 重复事件检测窗口（秒）
+            event_store: 可选的 TradingEventStore，持久化事件同时写入带索引的事件表
+            retention_days: 事件存储保留天数，None 表示不清理
         """
         self._use_stream = use_stream and STREAM_AVAILABLE
         self._dedup_window = dedup_window
         self._lock = threading.RLock()
-        self._recent_events = deque(maxlen=1000)  # (指纹, 时间戳)
+        # 去重：指纹 → 首次出现时间；过期队列按时间排序 (时间戳, 指纹)
+        self._max_recent = 1000
+        self._recent_fingerprints: Dict[str, float] = {}
+        self._recent_events: deque = deque()
         
         # 持久化配置
         self._persistent_types: Set[str] = set()
         self._nb_streams: Dict[str, Any] = {}
+        self.event_store = event_store
+        self._retention_seconds = retention_days * 86400 if retention_days else None
+        self._next_prune = 0.0
         
         # 订阅管理
         if self._use_stream:
@@ -103,11 +207,34 @@ class TradingEventBus:
                            time_dict_policy='append')
                     self._nb_streams[event_type] = nb
                     log.info(f"📦 配置交易事件持久化: {event_type}")
+                    self._migrate_nb_history(event_type, nb)
                 except Exception as e:
                     log.warning(f"创建 NB 流失败: {e}")
         else:
             self._persistent_types.discard(event_type)
     
+    def _migrate_nb_history(self, event_type: str, nb):
+        """把 NB 流中已有的事件导入事件存储（每种类型只导入一次）"""
+        if self.event_store is None or self.event_store.is_migrated(event_type):
+            return
+        try:
+            records = []
+            for key, data in nb.items():
+                if not isinstance(data, dict):
+                    continue
+                record = dict(data)
+                if record.get('timestamp') is None:
+                    try:
+                        record['timestamp'] = float(key)
+                    except (TypeError, ValueError):
+                        continue
+                records.append(record)
+            count = self.event_store.import_legacy(event_type, records)
+            if count:
+                log.info(f"📦 导入 NB 历史事件: {event_type} {count} 条")
+        except Exception as e:
+            log.warning(f"导入 NB 历史事件失败: {e}")
+
     def enable_stream(self, enabled: bool = True):
         """启用/禁用 Stream 实现"""
         if enabled and not STREAM_AVAILABLE:
@@ -133,43 +260,51 @@ class TradingEventBus:
         if event is None:
             return 0
         
+        event_type = type(event).__name__
+        fingerprint = self._get_event_fingerprint(event)
+
         with self._lock:
             self._stats.total_published += 1
-            
-            event_type = type(event).__name__
             self._stats.by_event_type[event_type] = \
                 self._stats.by_event_type.get(event_type, 0) + 1
             
             # 去重检查
-            fingerprint = self._get_event_fingerprint(event)
-            if self._is_duplicate(fingerprint):
+            now = time.time()
+            self._cleanup_old_events(now)
+            if self._is_duplicate(fingerprint, now):
                 log.debug(f"  交易事件去重: {fingerprint}")
                 self._stats.total_dropped += 1
                 return 0
             
             # 记录去重
-            self._recent_events.append((fingerprint, time.time()))
-            self._cleanup_old_events()
+            self._remember(fingerprint, now)
             
-            # 分发
-            delivered = self._deliver_event(event, event_type)
+            # 订阅列表写时复制，拿到引用后即可在锁外遍历
+            subscribers = self._subscriptions.get(event_type, [])
+        
+        # 分发（锁外，慢订阅者不阻塞其他发布者）
+        delivered = self._deliver_event(event, event_type, subscribers)
+        
+        with self._lock:
             self._stats.total_delivered += delivered
-            
-            # 持久化
-            if event_type in self._persistent_types:
-                self._persist_event(event_type, event)
-            
-            # 高重要性事件无人接收告警
-            if delivered == 0 and self._get_event_importance(event) >= 0.7:
-                log.warning(f"⚠️ 高重要性交易事件无人接收: {event}")
-            
-            return delivered
+        
+        # 持久化
+        if event_type in self._persistent_types:
+            self._persist_event(event_type, event)
+        
+        # 高重要性事件无人接收告警
+        if delivered == 0 and self._get_event_importance(event) >= 0.7:
+            log.warning(f"⚠️ 高重要性交易事件无人接收: {event}")
+        
+        return delivered
     
     def subscribe(self, event_type: str, callback: Callable, 
                   subscription_id: Optional[str] = None,
                   markets: Optional[Set[str]] = None,
                   priority: int = 0,
-                  min_importance: float = 0.0) -> str:
+                  min_importance: float = 0.0,
+                  queue_size: int = 0,
+                  overflow: str = _AsyncDelivery.DROP_NEW) -> str:
         """
         订阅交易事件
         
@@ -180,6 +315,8 @@ class TradingEventBus:
             markets: 市场过滤（如 {'CN', 'US'}）
             priority: 优先级（数值越大优先级越高）
             min_importance: 重要性阈值
+            queue_size: >0 时回调经独立线程的有界队列异步执行，发布方不等待回调
+            overflow: 队列满时的处理（'drop_new' 丢弃新事件 / 'drop_oldest' 丢弃最旧事件）
             
         Returns:
             订阅ID
@@ -192,10 +329,13 @@ class TradingEventBus:
             markets=markets,
             priority=priority,
             min_importance=min_importance,
+            module_name=sub_id.split('_')[0] if '_' in sub_id else 'unknown',
         )
+        if queue_size > 0:
+            subscription.delivery = _AsyncDelivery(subscription, queue_size, overflow)
         
         with self._lock:
-            subs = self._subscriptions.get(event_type, [])
+            subs = list(self._subscriptions.get(event_type, []))
             # 按优先级插入
             for i, sub in enumerate(subs):
                 if sub.priority < subscription.priority:
@@ -216,6 +356,9 @@ class TradingEventBus:
                 new_subs = [sub for sub in subs if sub.subscription_id != subscription_id]
                 if len(new_subs) != len(subs):
                     self._subscriptions[event_type] = new_subs
+                    for sub in subs:
+                        if sub.subscription_id == subscription_id and sub.delivery is not None:
+                            sub.delivery.stop()
                     log.debug(f"  取消订阅: {subscription_id}")
                     return True
         return False
@@ -233,6 +376,35 @@ class TradingEventBus:
                 by_module=dict(self._stats.by_module),
             )
     
+    def get_subscriber_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各订阅者的投递统计（异步订阅含队列深度与丢弃数）"""
+        with self._lock:
+            subscriptions = [(t, sub) for t, subs in self._subscriptions.items() for sub in subs]
+        stats = {}
+        for event_type, sub in subscriptions:
+            item = {
+                'event_type': event_type,
+                'delivered': sub.delivered,
+                'errors': sub.errors,
+                'async': sub.delivery is not None,
+            }
+            if sub.delivery is not None:
+                item.update(
+                    queue_depth=sub.delivery.queue.qsize(),
+                    max_depth=sub.delivery.max_depth,
+                    queue_size=sub.delivery.queue.maxsize,
+                    dropped=sub.delivery.dropped,
+                )
+            stats[sub.subscription_id] = item
+        return stats
+    
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """等待所有异步订阅队列处理完"""
+        with self._lock:
+            deliveries = [sub.delivery for subs in self._subscriptions.values()
+                          for sub in subs if sub.delivery is not None]
+        return all(d.join(timeout) for d in deliveries)
+    
     def get_history(self, event_type: str, limit: int = 100) -> List[Dict]:
         """
         查询事件历史（如果配置了持久化）
@@ -244,6 +416,10 @@ class TradingEventBus:
         Returns:
             事件列表（按时间倒序）
         """
+        if self.event_store is not None:
+            return [{'timestamp': e.get('timestamp'), 'data': e}
+                    for e in self.get_persistent_history(event_type, limit)]
+        
         if not self._use_stream or event_type not in self._nb_streams:
             return []
         
@@ -261,6 +437,16 @@ class TradingEventBus:
             log.error(f"查询事件历史失败: {e}")
             return []
     
+    def get_persistent_history(self, event_type: str, limit: int = 100) -> List[Dict]:
+        """从事件存储按时间倒序读取事件字典（未配置存储时返回空列表）"""
+        if self.event_store is None:
+            return []
+        try:
+            return self.event_store.query(event_type=event_type, limit=limit)
+        except Exception as e:
+            log.error(f"查询事件历史失败: {e}")
+            return []
+    
     # ============== 内部方法 ==============
     
     def _get_event_fingerprint(self, event) -> str:
@@ -282,62 +468,76 @@ class TradingEventBus:
         minute = int(time.time() / 60)
         return f"{event_type}:{id(event)}:{minute}"
     
-    def _is_duplicate(self, fingerprint: str) -> bool:
+    def _is_duplicate(self, fingerprint: str, now: Optional[float] = None) -> bool:
         """检查事件是否重复"""
-        now = time.time()
-        for fp, ts in self._recent_events:
-            if fp == fingerprint and now - ts < self._dedup_window:
-                return True
-        return False
+        ts = self._recent_fingerprints.get(fingerprint)
+        if ts is None:
+            return False
+        now = time.time() if now is None else now
+        return now - ts < self._dedup_window
     
-    def _cleanup_old_events(self):
-        """清理超过去重窗口的事件"""
-        now = time.time()
-        cutoff = now - self._dedup_window
-        self._recent_events = deque(
-            [(fp, ts) for fp, ts in self._recent_events if ts > cutoff],
-            maxlen=self._recent_events.maxlen
-        )
+    def _remember(self, fingerprint: str, now: float):
+        """记录指纹；超过容量时淘汰最早的记录"""
+        self._recent_fingerprints[fingerprint] = now
+        self._recent_events.append((now, fingerprint))
+        while len(self._recent_events) > self._max_recent:
+            self._forget(*self._recent_events.popleft())
+    
+    def _forget(self, ts: float, fingerprint: str):
+        if self._recent_fingerprints.get(fingerprint) == ts:
+            del self._recent_fingerprints[fingerprint]
+    
+    def _cleanup_old_events(self, now: Optional[float] = None):
+        """清理超过去重窗口的事件（只弹出队首过期项）"""
+        cutoff = (time.time() if now is None else now) - self._dedup_window
+        recent = self._recent_events
+        while recent and recent[0][0] <= cutoff:
+            self._forget(*recent.popleft())
     
     def _get_event_importance(self, event) -> float:
         """获取事件重要性"""
         return getattr(event, 'importance', 0.5)
     
-    def _deliver_event(self, event, event_type: str) -> int:
-        """分发事件到订阅者"""
-        subscribers = self._subscriptions.get(event_type, [])
+    def _deliver_event(self, event, event_type: str,
+                       subscribers: Optional[List[TradingEventSubscription]] = None) -> int:
+        """分发事件到订阅者（同步订阅直接回调，异步订阅入队）"""
+        if subscribers is None:
+            subscribers = self._subscriptions.get(event_type, [])
         if not subscribers:
             return 0
         
         importance = self._get_event_importance(event)
         market = getattr(event, 'market', None)
         
-        delivered = 0
+        delivered_modules = []
         for sub in subscribers:
-            try:
-                # 重要性检查
-                if importance < sub.min_importance:
-                    continue
-                
-                # 市场过滤
-                if sub.markets and market and market not in sub.markets:
+            if not sub.accepts(importance, market):
+                continue
+            if sub.delivery is not None:
+                if not sub.delivery.offer(event):
                     continue
-                
-                sub.callback(event)
-                delivered += 1
-                
-                # 记录模块统计
-                module_name = sub.subscription_id.split('_')[0] if '_' in sub.subscription_id else 'unknown'
-                self._stats.by_module[module_name] = \
-                    self._stats.by_module.get(module_name, 0) + 1
-                    
-            except Exception as e:
-                log.error(f"交易事件回调失败: {e}")
+            elif not sub.invoke(event):
+                continue
+            delivered_modules.append(sub.module_name)
         
-        return delivered
+        if delivered_modules:
+            # 记录模块统计
+            with self._lock:
+                by_module = self._stats.by_module
+                for module_name in delivered_modules:
+                    by_module[module_name] = by_module.get(module_name, 0) + 1
+        
+        return len(delivered_modules)
     
     def _persist_event(self, event_type: str, event):
         """持久化事件"""
+        if self.event_store is not None:
+            try:
+                self.event_store.append(event_type, event)
+                self._schedule_prune()
+            except Exception as e:
+                log.warning(f"事件存储写入失败: {e}")
+        
         if not self._use_stream:
             return
         
@@ -351,6 +551,16 @@ class TradingEventBus:
         except Exception as e:
             log.warning(f"事件持久化失败: {e}")
     
+    def _schedule_prune(self):
+        """每 PRUNE_INTERVAL 秒登记一次保留期清理（由事件存储的后台提交执行）"""
+        if self._retention_seconds is None:
+            return
+        now = time.time()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.PRUNE_INTERVAL
+        self.event_store.request_prune(now - self._retention_seconds)
+    
     # ============== 快捷方法 ==============
     
     def publish_strategy_signal(self, symbol: str, direction: str, confidence: float = 0.5,
@@ -407,7 +617,15 @@ def get_trading_bus() -> TradingEventBus:
     
     with _trading_bus_lock:
         if _trading_bus_instance is None:
-            _trading_bus_instance = TradingEventBus()
+            event_store = None
+            try:
+                import atexit
+                from .event_store import TradingEventStore
+                event_store = TradingEventStore()
+                atexit.register(event_store.close)
+            except Exception as e:
+                log.warning(f"[TradingEventBus] 事件存储不可用: {e}")
+            _trading_bus_instance = TradingEventBus(event_store=event_store)
             _trading_bus_instance.configure_persistence('StrategySignalEvent', persistent=True)
             _trading_bus_instance.configure_persistence('TradeDecisionEvent', persistent=True)
             log.info("[TradingEventBus] 📦 交易事件持久化已启用")
@@ -6,6 +6,8 @@ from .global_hotspot_engine import GlobalHotspotEngine, MarketSnapshot
 from .block_engine import BlockHotspotEngine, BlockConfig
 from .weight_pool import WeightPool, WeightPoolView, SymbolWeightConfig
 from .market_context import MarketContext
+from .symbol_universe import SymbolUniverse
+from .snapshot_result import SnapshotResult, WeightsView
 
 __all__ = [
     "GlobalHotspotEngine",
@@ -16,4 +18,7 @@ __all__ = [
     "WeightPoolView",
     "SymbolWeightConfig",
     "MarketContext",
+    "SymbolUniverse",
+    "SnapshotResult",
+    "WeightsView",
 ]
@@ -15,6 +15,7 @@ Block Hotspot Module - 题材热点计算
 """
 
 import numpy as np
+import pandas as pd
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
@@ -388,34 +389,26 @@ class BlockHotspotEngine:
             volumes: 成交量数组
             block_ids: 题材ID数组（可选，如果提供将优先使用）
         """
+        use_external_blocks = block_ids is not None and len(block_ids) == len(symbols)
+        noise_detector = _get_noise_detector()
+
+        if use_external_blocks:
+            return self._aggregate_by_block_ids(block_ids, returns, volumes, noise_detector)
+
         block_data = defaultdict(lambda: {
             'returns': [],
             'volumes': []
         })
-
-        use_external_blocks = block_ids is not None and len(block_ids) == len(symbols)
-        noise_detector = _get_noise_detector()
         filtered_noise = 0
 
         for i, symbol in enumerate(symbols):
-            symbol_str = str(symbol)
-
-            if use_external_blocks:
-                block_id = str(block_ids[i])
-                if block_id and block_id != '0':
-                    if noise_detector and noise_detector.is_noise(block_id, self._blocks.get(block_id).name if block_id in self._blocks else block_id):
-                        filtered_noise += 1
-                        continue
-                    block_data[block_id]['returns'].append(returns[i])
-                    block_data[block_id]['volumes'].append(volumes[i])
-            else:
-                block_id_list = self._symbol_to_blocks.get(symbol_str, [])
-                for block_id in block_id_list:
-                    if noise_detector and noise_detector.is_noise(block_id, self._blocks.get(block_id).name if block_id in self._blocks else block_id):
-                        filtered_noise += 1
-                        continue
-                    block_data[block_id]['returns'].append(returns[i])
-                    block_data[block_id]['volumes'].append(volumes[i])
+            block_id_list = self._symbol_to_blocks.get(str(symbol), [])
+            for block_id in block_id_list:
+                if noise_detector and noise_detector.is_noise(block_id, self._blocks.get(block_id).name if block_id in self._blocks else block_id):
+                    filtered_noise += 1
+                    continue
+                block_data[block_id]['returns'].append(returns[i])
+                block_data[block_id]['volumes'].append(volumes[i])
 
         if filtered_noise > 0 and os.environ.get("NAJA_LAB_DEBUG") == "true":
             log.info(f"[BlockHotspot] 噪音题材聚合已过滤: {filtered_noise} 条")
@@ -429,6 +422,42 @@ class BlockHotspotEngine:
 
         return result
     
+    def _aggregate_by_block_ids(
+        self,
+        block_ids: np.ndarray,
+        returns: np.ndarray,
+        volumes: np.ndarray,
+        noise_detector
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        按外部题材ID数组分组（每行一个题材）
+
+        题材按首次出现顺序排列，组内保持行顺序；噪音判断每个题材只做一次。
+        """
+        keys = np.asarray(block_ids).astype(str)
+        codes, uniques = pd.factorize(keys)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        result = {}
+        filtered_noise = 0
+        for k, block_id in enumerate(uniques):
+            if not block_id or block_id == '0':
+                continue
+            rows = order[bounds[k]:bounds[k + 1]]
+            if noise_detector and noise_detector.is_noise(block_id, self._blocks.get(block_id).name if block_id in self._blocks else block_id):
+                filtered_noise += len(rows)
+                continue
+            result[block_id] = {
+                'returns': returns[rows],
+                'volumes': volumes[rows]
+            }
+
+        if filtered_noise > 0 and os.environ.get("NAJA_LAB_DEBUG") == "true":
+            log.info(f"[BlockHotspot] 噪音题材聚合已过滤: {filtered_noise} 条")
+
+        return result
+
     def _calc_block_hotspot(
         self,
         returns: np.ndarray,
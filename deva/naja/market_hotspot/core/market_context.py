@@ -33,6 +33,7 @@ from deva.naja.market_hotspot.core.block_engine import (
     BlockConfig
 )
 from deva.naja.market_hotspot.core.global_hotspot_engine import GlobalHotspotEngine
+from deva.naja.market_hotspot.core.symbol_universe import SymbolUniverse
 from deva.naja.market_hotspot.engine.dual_engine import DualEngineCoordinator
 
 
@@ -46,6 +47,7 @@ class MarketContext:
         frequency_scheduler: 频率调度器
         weight_pool: 权重池
         block_engine: 题材热点引擎
+        universe: 个股编号表，各阶段槽位通过它对齐
         last_update_time: 最后更新时间
         is_active: 是否活跃
     """
@@ -61,6 +63,7 @@ class MarketContext:
     global_hotspot: GlobalHotspotEngine = field(init=False)
     strategy_allocator: StrategyAllocator = field(init=False)
     dual_engine: DualEngineCoordinator = field(init=False)
+    universe: SymbolUniverse = field(init=False)
     last_update_time: float = 0.0
     is_active: bool = False
 
@@ -72,6 +75,7 @@ class MarketContext:
         self.global_hotspot = GlobalHotspotEngine(history_window=self.global_history_window)
         self.strategy_allocator = StrategyAllocator()
         self.dual_engine = DualEngineCoordinator()
+        self.universe = SymbolUniverse(self.market)
 
     def activate(self):
         """激活市场"""
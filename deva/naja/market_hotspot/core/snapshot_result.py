@@ -0,0 +1,126 @@
+"""
+SnapshotResult - process_snapshot 的数组化结果
+
+流水线各阶段读写数组（权重、档位按各自槽位存放），symbol → 值的字典
+只在 UI / API 通过 result['symbol_weights'] 等键访问时才生成，并缓存在结果对象上。
+
+对调用方而言它是一个 MutableMapping，键与旧的结果字典一致；
+智能增强层等下游写入的附加键直接存放在字段字典中，惰性键被赋值后不再按数组展开。
+"""
+
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from deva.naja.market_hotspot.scheduling.frequency_scheduler import FrequencyLevel
+
+
+class WeightsView(Mapping):
+    """
+    symbol → 权重的只读视图（按权重池槽位顺序）
+
+    len() / 迭代 / items() 直接读数组；按 symbol 取值时才生成（并缓存）结果对象上的字典。
+    """
+
+    def __init__(self, result: 'SnapshotResult'):
+        self._result = result
+
+    def __getitem__(self, symbol: str) -> float:
+        return self._result['symbol_weights'][symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.weight_symbols.tolist())
+
+    def __len__(self) -> int:
+        return len(self._result.weight_symbols)
+
+    def items(self):
+        return zip(self._result.weight_symbols.tolist(), self._result.weights.tolist())
+
+    def values(self):
+        return self._result.weights.tolist()
+
+
+class SnapshotResult(MutableMapping):
+    """
+    一次快照调度的结果
+
+    数组字段:
+        weight_symbols / weights   权重池全部已注册个股及其权重（权重池槽位顺序）
+        level_symbols / levels     本次参与调度的个股及其频率档位（调度器槽位顺序）
+
+    惰性字典键:
+        'symbol_weights'    {symbol: weight}
+        'frequency_levels'  {symbol: FrequencyLevel}
+    """
+
+    _LAZY_KEYS = ('symbol_weights', 'frequency_levels')
+
+    def __init__(
+        self,
+        fields: Dict[str, Any],
+        weight_symbols: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        level_symbols: Optional[np.ndarray] = None,
+        levels: Optional[np.ndarray] = None,
+    ):
+        self._fields = dict(fields)
+        self.weight_symbols = weight_symbols if weight_symbols is not None else np.empty(0, dtype=object)
+        self.weights = weights if weights is not None else np.empty(0)
+        self.level_symbols = level_symbols if level_symbols is not None else np.empty(0, dtype=object)
+        self.levels = levels if levels is not None else np.empty(0, dtype=np.int8)
+        for key in self._LAZY_KEYS:
+            self._fields.setdefault(key, None)
+
+    # ---- MutableMapping ----
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._fields[key]
+        if value is None and key in self._LAZY_KEYS:
+            value = self._materialize(key)
+            self._fields[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._fields[key] = value
+
+    def __delitem__(self, key: str):
+        del self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        scalars = {k: v for k, v in self._fields.items() if isinstance(v, (int, float, str, bool))}
+        return f"SnapshotResult({scalars}, symbols={len(self.weight_symbols)})"
+
+    def _materialize(self, key: str) -> Dict:
+        if key == 'symbol_weights':
+            return dict(zip(self.weight_symbols.tolist(), self.weights.tolist()))
+        levels = [FrequencyLevel(v) for v in self.levels.tolist()]
+        return dict(zip(self.level_symbols.tolist(), levels))
+
+    # ---- 数组视图 ----
+
+    def top_weights(self, n: int) -> Dict[str, float]:
+        """权重最高的 n 个个股（同权重保持槽位顺序，与 sorted(..., reverse=True) 一致）"""
+        order = np.argsort(-self.weights, kind='stable')[:n]
+        return dict(zip(self.weight_symbols[order].tolist(), self.weights[order].tolist()))
+
+    def symbols_at_level(self, level: FrequencyLevel) -> List[str]:
+        return self.level_symbols[self.levels == level.value].tolist()
+
+    def weight_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.weight_symbols, self.weights
+
+    def weights_view(self) -> WeightsView:
+        """不展开字典的 symbol → 权重视图（事件 / 订阅方用）"""
+        return WeightsView(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """完整展开为普通字典（序列化 / 持久化用）"""
+        return {key: self[key] for key in self._fields}
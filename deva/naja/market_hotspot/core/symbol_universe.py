@@ -0,0 +1,161 @@
+"""
+Symbol Universe - 市场内共享的个股编号表
+
+功能:
+- symbol 驻留（intern）后获得固定编号，只追加不回收
+- 快照 symbols 数组 → 编号数组（同一批 symbols 重复出现时直接复用）
+- 编号 ↔ 各阶段（WeightPool / FrequencyScheduler / RiverEngine）槽位的对齐数组
+
+各阶段仍保留自己的 _symbol_to_idx；Universe 只负责把它们对齐成整数数组，
+process_snapshot 每个 tick 只做一次字符串查找，之后全部是数组 gather/scatter。
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SymbolUniverse:
+    """
+    单个市场的个股编号表
+
+    用法:
+        ids = universe.ids(symbols)                          # 快照行 → 编号
+        pos = universe.positions(symbols, pool._symbol_to_idx)   # 快照行 → 阶段槽位（-1 未注册）
+        src, dst = universe.translate(pool._symbol_to_idx, scheduler._symbol_to_idx)
+    """
+
+    def __init__(self, market: str = 'CN'):
+        self.market = market
+        self._symbol_to_id: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._lock = threading.RLock()
+
+        self._index: Optional[pd.Index] = None
+        # 最近一批快照 symbols 及其编号
+        self._last_batch: Optional[np.ndarray] = None
+        self._last_ids: Optional[np.ndarray] = None
+        # 阶段映射缓存: id(mapping) -> ((len(mapping), len(universe)), uid → 槽位数组)
+        self._stage_slots: Dict[int, Tuple[Tuple[int, int], np.ndarray]] = {}
+        self._translations: Dict[Tuple[int, int], Tuple[Tuple[int, int, int], Tuple[np.ndarray, np.ndarray]]] = {}
+        self._stage_symbols: Dict[Tuple[int, str], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._symbol_to_id
+
+    @property
+    def symbols(self) -> np.ndarray:
+        """编号 → symbol 的 object 数组"""
+        return np.asarray(self._symbols, dtype=object)
+
+    def intern(self, symbol: str) -> int:
+        """驻留单个 symbol，返回编号"""
+        sid = self._symbol_to_id.get(symbol)
+        if sid is None:
+            with self._lock:
+                sid = self._symbol_to_id.get(symbol)
+                if sid is None:
+                    sid = len(self._symbols)
+                    self._symbol_to_id[symbol] = sid
+                    self._symbols.append(symbol)
+                    self._index = None
+        return sid
+
+    def intern_many(self, symbols: Iterable[str]) -> np.ndarray:
+        return np.array([self.intern(s) for s in symbols], dtype=np.int64)
+
+    def ids(self, symbols: np.ndarray) -> np.ndarray:
+        """快照 symbols 数组 → 编号数组（新 symbol 自动驻留）"""
+        symbols = np.asarray(symbols)
+        last = self._last_batch
+        if last is not None and (symbols is last or (
+                len(symbols) == len(last) and bool(np.all(symbols == last)))):
+            return self._last_ids
+
+        if symbols.dtype != object or (len(symbols) and type(symbols[0]) is not str):
+            symbols = symbols.astype(str).astype(object)
+
+        with self._lock:
+            if self._index is None:
+                self._index = pd.Index(self._symbols, dtype=object)
+            ids = self._index.get_indexer(symbols) if len(self._index) else np.full(len(symbols), -1)
+            missing = np.flatnonzero(ids < 0)
+            if len(missing):
+                ids[missing] = [self.intern(s) for s in symbols[missing]]
+
+        ids = ids.astype(np.int64, copy=False)
+        self._last_batch = symbols.copy()
+        self._last_ids = ids
+        return ids
+
+    def stage_slots(self, mapping: Dict[str, int]) -> np.ndarray:
+        """编号 → 阶段槽位数组（长度为 len(universe)，未注册为 -1）
+
+        以 (mapping 对象, 长度, universe 长度) 为缓存键；阶段整体重建映射（reset/load_state）
+        后应调用 invalidate()。
+        """
+        key = (len(mapping), len(self._symbols))
+        cached = self._stage_slots.get(id(mapping))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with self._lock:
+            for symbol in mapping:
+                self.intern(symbol)
+            slots = np.full(len(self._symbols), -1, dtype=np.int64)
+            if mapping:
+                ids = np.fromiter((self._symbol_to_id[s] for s in mapping), dtype=np.int64, count=len(mapping))
+                slots[ids] = np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))
+            self._stage_slots[id(mapping)] = ((len(mapping), len(self._symbols)), slots)
+        return slots
+
+    def stage_symbols(self, mapping: Dict[str, int]) -> np.ndarray:
+        """阶段槽位 → symbol 的 object 数组"""
+        slots = self.stage_slots(mapping)
+        key = (id(mapping), 'symbols')
+        cached = self._stage_symbols.get(key)
+        if cached is not None and cached[0] is slots:
+            return cached[1]
+        known = np.flatnonzero(slots >= 0)
+        symbols = np.empty(len(mapping), dtype=object)
+        symbols[slots[known]] = np.asarray(self._symbols, dtype=object)[known]
+        self._stage_symbols[key] = (slots, symbols)
+        return symbols
+
+    def positions(self, symbols: np.ndarray, mapping: Dict[str, int]) -> np.ndarray:
+        """快照行 → 阶段槽位（-1 表示该阶段未注册）"""
+        ids = self.ids(symbols)
+        return self.stage_slots(mapping)[ids]
+
+    def translate(self, src: Dict[str, int], dst: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """两个阶段共有 symbol 的槽位对 (src_slots, dst_slots)，按 dst 槽位升序"""
+        key = (len(src), len(dst), len(self._symbols))
+        cache_key = (id(src), id(dst))
+        cached = self._translations.get(cache_key)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with self._lock:
+            for symbol in dst:
+                self.intern(symbol)
+            src_slots = self.stage_slots(src)
+            dst_slots = self.stage_slots(dst)
+        both = np.flatnonzero((src_slots >= 0) & (dst_slots >= 0))
+        order = np.argsort(dst_slots[both], kind='stable')
+        pair = (src_slots[both][order], dst_slots[both][order])
+        self._translations[cache_key] = ((len(src), len(dst), len(self._symbols)), pair)
+        return pair
+
+    def invalidate(self):
+        """丢弃阶段映射缓存（阶段 reset / load_state 后调用）"""
+        with self._lock:
+            self._stage_slots.clear()
+            self._translations.clear()
+            self._stage_symbols.clear()
+            self._last_batch = None
+            self._last_ids = None
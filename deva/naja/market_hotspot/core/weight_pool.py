@@ -45,8 +45,20 @@ class WeightPool:
 
     修复内容:
     - 添加历史字典key清理机制，防止内存泄漏
+
+    局部活动历史存放在预分配的 (max_symbols × window) float32 环形缓冲中，
+    按 _symbol_to_idx 寻址，所有个股的波动率/量能异常/趋势一次向量化算出；
+    不活跃个股通过 last-seen 向量批量淘汰。
     """
 
+    _PRICE_LIMITS = {
+        'MAIN': 0.10,  # 主板 ±10%
+        'KCB': 0.20,  # 科创板 ±20%
+        'CYC': 0.20,  # 创业板 ±20%
+        'BJ': 0.30,   # 北交所 ±30%
+        'US': 1.0,    # 美股无限制
+    }
+
     def __init__(
         self,
         max_symbols: int = 5000,
@@ -71,15 +83,21 @@ class WeightPool:
         self._block_hotspot: Dict[str, float] = {}
 
         # 局部活动历史 (用于计算 local_activity)
-        # 修复：使用带时间戳的字典，支持自动清理
-        self._price_history: Dict[str, List[float]] = {}
-        self._volume_history: Dict[str, List[float]] = {}
-        self._symbol_last_seen: Dict[str, float] = {}  # 跟踪symbol最后活跃时间
-        self._symbol_markets: Dict[str, str] = {}  # 跟踪symbol所属市场
+        # 环形缓冲: 第 idx 行为该 symbol 最近 _history_window 个样本
         self._history_window = 10
+        self._price_ring = np.zeros((max_symbols, self._history_window), dtype=np.float32)
+        self._volume_ring = np.zeros((max_symbols, self._history_window), dtype=np.float32)
+        self._ring_pos = np.zeros(max_symbols, dtype=np.int32)    # 下一个写入位置
+        self._ring_count = np.zeros(max_symbols, dtype=np.int32)  # 有效样本数
+        self._last_seen = np.zeros(max_symbols, dtype=np.float64)  # 最后活跃时间, 0 表示无历史
+        self._price_limits = np.full(max_symbols, 0.10)
+        self._symbol_markets: Dict[str, str] = {}  # 跟踪symbol所属市场
         self._cleanup_counter = 0
         self._cleanup_interval = 100  # 每100次update清理一次
 
+        # symbol → 题材 的 CSR 索引: (题材名数组, 每个槽位的起始偏移, 题材列号)
+        self._membership: Optional[Tuple[List[str], np.ndarray, np.ndarray]] = None
+
         self._last_update_time = 0.0
     
     def register_symbol(self, symbol: str, blocks: List[str], base_weight: float = 1.0) -> bool:
@@ -96,7 +114,9 @@ class WeightPool:
         
         if symbol in self._symbol_to_idx:
             # 已存在，更新题材映射
-            self._symbol_blocks[symbol] = blocks
+            if self._symbol_blocks.get(symbol) != blocks:
+                self._symbol_blocks[symbol] = blocks
+                self._membership = None
             idx = self._symbol_to_idx[symbol]
             self._base_weights[idx] = base_weight
             return True
@@ -105,8 +125,10 @@ class WeightPool:
         self._symbol_to_idx[symbol] = idx
         self._idx_to_symbol[idx] = symbol
         self._symbol_blocks[symbol] = blocks
+        self._membership = None
         self._base_weights[idx] = base_weight
         self._symbol_markets[symbol] = self._infer_market(symbol)
+        self._price_limits[idx] = self._get_price_limit(symbol)
         
         return True
     
@@ -143,14 +165,7 @@ class WeightPool:
         - 美股: 1.0 (无限制，用1.0作为归一化基准)
         """
         market = self._symbol_markets.get(symbol, self._infer_market(symbol))
-        limits = {
-            'MAIN': 0.10,  # 主板 ±10%
-            'KCB': 0.20,  # 科创板 ±20%
-            'CYC': 0.20,  # 创业板 ±20%
-            'BJ': 0.30,   # 北交所 ±30%
-            'US': 1.0,    # 美股无限制
-        }
-        return limits.get(market, 0.10)
+        return self._PRICE_LIMITS.get(market, 0.10)
     
     def update(
         self,
@@ -173,7 +188,36 @@ class WeightPool:
         Returns:
             symbol_weights: 个股权重字典
         """
+        lookup = self._symbol_to_idx.get
+        positions = np.fromiter(
+            (lookup(str(symbol), -1) for symbol in symbols), dtype=np.int64, count=len(symbols)
+        )
+        weights = self.update_array(positions, returns, volumes, block_hotspot, timestamp)
+        return dict(zip(self.slot_symbols().tolist(), weights.tolist()))
+
+    def update_array(
+        self,
+        positions: np.ndarray,
+        returns: np.ndarray,
+        volumes: np.ndarray,
+        block_hotspot: Dict[str, float],
+        timestamp: float
+    ) -> np.ndarray:
+        """
+        数组版更新
+
+        Args:
+            positions: 快照每行对应的槽位（-1 表示未注册）
+            returns: 涨跌幅数组
+            volumes: 成交量数组
+            block_hotspot: 题材热点字典
+            timestamp: 当前时间戳
+
+        Returns:
+            全部已注册个股的权重（按槽位，已裁剪；返回的是 _weights 的视图）
+        """
         self._block_hotspot = block_hotspot
+        n = len(self._symbol_to_idx)
 
         # 清理异常值
         returns = np.nan_to_num(returns, nan=0.0, posinf=50.0, neginf=-50.0)
@@ -183,58 +227,89 @@ class WeightPool:
 
         try:
             # 更新局部活动
-            self._update_local_activity(symbols, returns, volumes)
+            self._update_local_activity(positions, returns, volumes)
 
             # 计算每个 symbol 的权重
-            registered_count = 0
-            for symbol, idx in self._symbol_to_idx.items():
-                weight = self._calc_symbol_weight(symbol, idx)
-                self._weights[idx] = weight
-                registered_count += 1
-            log.debug(f"[WeightPool] update: symbols参数={len(symbols)}, 已注册={registered_count}, _symbol_to_idx={len(self._symbol_to_idx)}")
+            self._weights[:n] = self._calc_weights(n)
+            log.debug(f"[WeightPool] update: symbols参数={len(positions)}, 已注册={n}")
         except Exception as e:
             import traceback
             log.error(f"WeightPool 计算失败: {e}")
             log.error(traceback.format_exc())
 
         self._last_update_time = timestamp
+        return self._weights[:n]
 
-        # 构建返回字典
-        return {
-            symbol: float(self._weights[idx])
-            for symbol, idx in self._symbol_to_idx.items()
-        }
+    def slot_symbols(self) -> np.ndarray:
+        """槽位 → symbol 的 object 数组"""
+        symbols = np.empty(len(self._symbol_to_idx), dtype=object)
+        for symbol, idx in self._symbol_to_idx.items():
+            symbols[idx] = symbol
+        return symbols
+
+    def _block_membership(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """symbol → 题材 的 CSR 索引，注册变化后重建"""
+        if self._membership is None:
+            n = len(self._symbol_to_idx)
+            block_col: Dict[str, int] = {}
+            counts = np.zeros(n, dtype=np.int64)
+            rows = [[] for _ in range(n)]
+            for symbol, idx in self._symbol_to_idx.items():
+                blocks = self._symbol_blocks.get(symbol, [])
+                rows[idx] = [block_col.setdefault(b, len(block_col)) for b in blocks]
+                counts[idx] = len(blocks)
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            cols = np.fromiter((c for row in rows for c in row), dtype=np.int64, count=int(offsets[-1]))
+            self._membership = (list(block_col), offsets, cols)
+        return self._membership
+
+    def _calc_weights(self, n: int) -> np.ndarray:
+        """
+        批量计算个股权重
+
+        公式:
+        weight = base_weight * (1 + block_influence) * (1 + local_activity)
+
+        其中 block_influence 是所属题材热点的最大值（无题材为 0）
+        """
+        block_names, offsets, cols = self._block_membership()
+        block_influence = np.zeros(n)
+        if len(cols):
+            get = self._block_hotspot.get
+            scores = np.fromiter((get(b, 0.0) for b in block_names), dtype=np.float64, count=len(block_names))
+            has_blocks = offsets[1:] > offsets[:-1]
+            starts = offsets[:-1][has_blocks]
+            block_influence[has_blocks] = np.maximum.reduceat(scores[cols], starts)
+
+        weight = self._base_weights[:n] * (1 + block_influence) * (
+            1 + self._local_activity[:n] * self.config.local_activity_sensitivity)
+        return np.clip(weight, self.config.min_weight, self.config.max_weight)
     
     def _update_local_activity(
         self,
-        symbols: np.ndarray,
+        positions: np.ndarray,
         returns: np.ndarray,
         volumes: np.ndarray
     ):
         """更新个股局部活动度（带自动清理）"""
         current_time = time.time()
 
-        for i, symbol in enumerate(symbols):
-            symbol_str = str(symbol)
-            if symbol_str not in self._symbol_to_idx:
-                continue
-
-            idx = self._symbol_to_idx[symbol_str]
+        known = positions >= 0
+        if known.any():
+            idx = positions[known]
+            # 同一 tick 内重复出现的 symbol 只保留最后一次
+            idx, last = np.unique(idx[::-1], return_index=True)
+            src = np.flatnonzero(known)[::-1][last]
 
-            if symbol_str not in self._price_history:
-                self._price_history[symbol_str] = []
-                self._volume_history[symbol_str] = []
+            pos = self._ring_pos[idx]
+            self._price_ring[idx, pos] = returns[src]
+            self._volume_ring[idx, pos] = volumes[src]
+            self._ring_pos[idx] = (pos + 1) % self._history_window
+            self._ring_count[idx] = np.minimum(self._ring_count[idx] + 1, self._history_window)
+            self._last_seen[idx] = current_time
 
-            self._price_history[symbol_str].append(float(returns[i]))
-            self._volume_history[symbol_str].append(float(volumes[i]))
-            self._symbol_last_seen[symbol_str] = current_time
-
-            if len(self._price_history[symbol_str]) > self._history_window:
-                self._price_history[symbol_str] = self._price_history[symbol_str][-self._history_window:]
-                self._volume_history[symbol_str] = self._volume_history[symbol_str][-self._history_window:]
-
-            activity = self._calc_local_activity(symbol_str)
-            self._local_activity[idx] = activity
+            self._local_activity[idx] = self._calc_local_activity(idx)
 
         self._cleanup_counter += 1
         if self._cleanup_counter >= self._cleanup_interval:
@@ -242,27 +317,20 @@ class WeightPool:
 
     def _cleanup_stale_history(self, current_time: float):
         """清理长期不活跃symbol的历史数据，防止内存泄漏"""
-        stale_symbols = [
-            symbol for symbol, last_seen in self._symbol_last_seen.items()
-            if current_time - last_seen > self.max_history_stale_seconds
-        ]
-
-        for symbol in stale_symbols:
-            if symbol in self._price_history:
-                del self._price_history[symbol]
-            if symbol in self._volume_history:
-                del self._volume_history[symbol]
-            if symbol in self._symbol_last_seen:
-                del self._symbol_last_seen[symbol]
+        stale = (self._last_seen > 0) & (current_time - self._last_seen > self.max_history_stale_seconds)
+        stale_count = int(stale.sum())
 
-        if stale_symbols:
-            log.info(f"[WeightPool] 清理了 {len(stale_symbols)} 个不活跃symbol的历史数据")
+        if stale_count:
+            self._ring_pos[stale] = 0
+            self._ring_count[stale] = 0
+            self._last_seen[stale] = 0.0
+            log.info(f"[WeightPool] 清理了 {stale_count} 个不活跃symbol的历史数据")
 
         self._cleanup_counter = 0
     
-    def _calc_local_activity(self, symbol: str) -> float:
+    def _calc_local_activity(self, idx: np.ndarray) -> np.ndarray:
         """
-        计算个股局部活动度（标准化后的结果，跨市场可比）
+        批量计算个股局部活动度（标准化后的结果，跨市场可比）
 
         维度:
         1. 价格波动率（相对于涨跌停限制）
@@ -271,80 +339,87 @@ class WeightPool:
 
         标准化处理：所有市场的涨跌幅都除以各自的涨跌停限制，
         使得 10% 涨幅在主板(10%限)和北交所(30%限)得到相同的"热度"评分
+
+        Args:
+            idx: symbol 索引数组
+
+        Returns:
+            与 idx 对齐的活动度数组，样本不足 3 个的为 0
         """
-        prices = self._price_history.get(symbol, [])
-        volumes = self._volume_history.get(symbol, [])
+        window = self._history_window
+        count = self._ring_count[idx]
+        activity = np.zeros(len(idx))
 
-        if len(prices) < 3:
-            return 0.0
+        ready = count >= 3
+        if not ready.any():
+            return activity
 
-        price_limit = self._get_price_limit(symbol)
+        idx = idx[ready]
+        n = count[ready].astype(np.float64)
+        pos = self._ring_pos[idx]
+        price_limit = self._price_limits[idx]
 
-        prices_arr = np.array(prices)
-        volumes_arr = np.array(volumes)
+        prices = self._price_ring[idx].astype(np.float64)
+        volumes = self._volume_ring[idx].astype(np.float64)
+        # 未写满时有效样本位于 [0, count)，写满后整行有效
+        valid = np.arange(window) < n[:, None]
 
         # 1. 价格波动率（标准化：除以涨跌停限制）
         # 如果 limit 是 0.30（北交所），10% 涨幅标准化后为 10/30 = 0.33
         # 如果 limit 是 0.10（主板），10% 涨幅标准化后为 10/10 = 1.0
-        if price_limit > 0:
-            normalized_prices = prices_arr / price_limit
-        else:
-            normalized_prices = prices_arr
-
-        price_volatility = np.std(normalized_prices) / (np.mean(np.abs(normalized_prices)) + 1e-6)
+        safe_limit = np.where(price_limit > 0, price_limit, 1.0)
+        normalized = np.where(valid, prices / safe_limit[:, None], 0.0)
+        mean = normalized.sum(axis=1) / n
+        std = np.sqrt((np.where(valid, normalized - mean[:, None], 0.0) ** 2).sum(axis=1) / n)
+        price_volatility = std / (np.abs(normalized).sum(axis=1) / n + 1e-6)
 
         # 2. 成交量异常
-        if len(volumes_arr) >= 2:
-            volume_ratio = volumes_arr[-1] / (np.mean(volumes_arr[:-1]) + 1e-6)
-            volume_anomaly = min(abs(volume_ratio - 1.0), 3.0) / 3.0
-        else:
-            volume_anomaly = 0.0
+        rows = np.arange(len(idx))
+        last_slot = (pos - 1) % window
+        last_volume = volumes[rows, last_slot]
+        prev_mean = (np.where(valid, volumes, 0.0).sum(axis=1) - last_volume) / (n - 1)
+        volume_ratio = last_volume / (prev_mean + 1e-6)
+        volume_anomaly = np.minimum(np.abs(volume_ratio - 1.0), 3.0) / 3.0
 
         # 3. 近期趋势强度（标准化：除以涨跌停限制）
         # 原来: abs(mean(returns[-3:])) / 5.0
         # 标准化后: abs(mean(returns[-3:])) / limit (cap at 1.0)
-        recent_trend = abs(np.mean(prices_arr[-3:]))
-        trend_strength = min(recent_trend / price_limit, 1.0) if price_limit > 0 else 0.0
+        recent_slots = (pos[:, None] - np.arange(1, 4)) % window
+        recent_trend = np.abs(prices[rows[:, None], recent_slots].mean(axis=1))
+        trend_strength = np.where(
+            price_limit > 0, np.minimum(recent_trend / safe_limit, 1.0), 0.0
+        )
 
         # 综合活动度
-        activity = (
-            min(price_volatility, 1.0) * 0.4 +
+        combined = (
+            np.minimum(price_volatility, 1.0) * 0.4 +
             volume_anomaly * 0.3 +
             trend_strength * 0.3
         )
+        activity[ready] = np.minimum(combined, 1.0)
+
+        return activity
+
+    def _get_history(self, idx: int) -> Tuple[List[float], List[float]]:
+        """按时间顺序取出单个 symbol 的历史（旧 → 新）"""
+        count = int(self._ring_count[idx])
+        if count == 0:
+            return [], []
+        order = (int(self._ring_pos[idx]) - count + np.arange(count)) % self._history_window
+        return (
+            self._price_ring[idx, order].astype(float).tolist(),
+            self._volume_ring[idx, order].astype(float).tolist(),
+        )
 
-        return min(activity, 1.0)
-    
-    def _calc_symbol_weight(self, symbol: str, idx: int) -> float:
-        """
-        计算个股权重
-        
-        公式:
-        weight = base_weight * (1 + block_influence) * (1 + local_activity)
-        
-        其中 block_influence 是所属题材热点的加权平均
-        """
-        base_weight = self._base_weights[idx]
-        local_activity = self._local_activity[idx]
-        
-        # 计算题材影响
-        blocks = self._symbol_blocks.get(symbol, [])
-        if not blocks:
-            block_influence = 0.0
-        else:
-            block_scores = [
-                self._block_hotspot.get(s, 0.0)
-                for s in blocks
-            ]
-            block_influence = max(block_scores) if block_scores else 0.0
-        
-        # 计算最终权重
-        weight = base_weight * (1 + block_influence) * (1 + local_activity * self.config.local_activity_sensitivity)
-        
-        # 裁剪到有效范围
-        weight = max(self.config.min_weight, min(weight, self.config.max_weight))
-        
-        return weight
+    def _set_history(self, idx: int, prices: List[float], volumes: List[float]):
+        """写入单个 symbol 的历史（旧 → 新）"""
+        prices = list(prices)[-self._history_window:]
+        volumes = list(volumes)[-self._history_window:]
+        count = min(len(prices), len(volumes))
+        self._price_ring[idx, :count] = prices[-count:] if count else []
+        self._volume_ring[idx, :count] = volumes[-count:] if count else []
+        self._ring_count[idx] = count
+        self._ring_pos[idx] = count % self._history_window
     
     def get_symbol_weight(self, symbol: str) -> float:
         """获取指定个股的权重"""
@@ -415,6 +490,16 @@ class WeightPool:
 
     def save_state(self) -> Dict:
         """保存权重池状态用于持久化"""
+        price_history = {}
+        volume_history = {}
+        symbol_last_seen = {}
+        for idx in np.flatnonzero(self._ring_count > 0):
+            symbol = self._idx_to_symbol.get(int(idx))
+            if symbol is None:
+                continue
+            price_history[symbol], volume_history[symbol] = self._get_history(int(idx))
+            symbol_last_seen[symbol] = float(self._last_seen[idx])
+
         return {
             'symbol_to_idx': self._symbol_to_idx,
             'idx_to_symbol': {int(k): v for k, v in self._idx_to_symbol.items()},
@@ -422,9 +507,9 @@ class WeightPool:
             'weights': self._weights[:len(self._symbol_to_idx)].tolist(),
             'base_weights': self._base_weights[:len(self._symbol_to_idx)].tolist(),
             'local_activity': self._local_activity[:len(self._symbol_to_idx)].tolist(),
-            'price_history': self._price_history,
-            'volume_history': self._volume_history,
-            'symbol_last_seen': self._symbol_last_seen,
+            'price_history': price_history,
+            'volume_history': volume_history,
+            'symbol_last_seen': symbol_last_seen,
             'block_hotspot': self._block_hotspot,
             'last_update_time': self._last_update_time,
         }
@@ -441,6 +526,7 @@ class WeightPool:
             self._symbol_blocks.clear()
             for symbol, blocks in state.get('symbol_blocks', {}).items():
                 self._symbol_blocks[symbol] = blocks
+            self._membership = None
 
             weights = state.get('weights', [])
             for i, w in enumerate(weights):
@@ -457,9 +543,23 @@ class WeightPool:
                 if i < len(self._local_activity):
                     self._local_activity[i] = a
 
-            self._price_history = state.get('price_history', {})
-            self._volume_history = state.get('volume_history', {})
-            self._symbol_last_seen = state.get('symbol_last_seen', {})
+            for idx, symbol in self._idx_to_symbol.items():
+                if idx < self.max_symbols:
+                    self._symbol_markets[symbol] = self._infer_market(symbol)
+                    self._price_limits[idx] = self._get_price_limit(symbol)
+
+            self._ring_pos.fill(0)
+            self._ring_count.fill(0)
+            self._last_seen.fill(0.0)
+            price_history = state.get('price_history', {})
+            volume_history = state.get('volume_history', {})
+            symbol_last_seen = state.get('symbol_last_seen', {})
+            for symbol, prices in price_history.items():
+                idx = self._symbol_to_idx.get(symbol)
+                if idx is None or idx >= self.max_symbols:
+                    continue
+                self._set_history(idx, prices, volume_history.get(symbol, []))
+                self._last_seen[idx] = symbol_last_seen.get(symbol, 0.0)
             self._block_hotspot = state.get('block_hotspot', {})
             self._last_update_time = state.get('last_update_time', 0.0)
 
@@ -473,9 +573,9 @@ class WeightPool:
         self._weights.fill(0.0)
         self._local_activity.fill(0.0)
         self._block_hotspot.clear()
-        self._price_history.clear()
-        self._volume_history.clear()
-        self._symbol_last_seen.clear()
+        self._ring_pos.fill(0)
+        self._ring_count.fill(0)
+        self._last_seen.fill(0.0)
         self._cleanup_counter = 0
 
 
@@ -7,6 +7,7 @@ Hotspot Data - 热点系统数据模块
 - 实盘数据获取器 (RealtimeDataFetcher)
 - 异步数据获取器 (AsyncRealtimeDataFetcher)
 - 获取配置 (FetchConfig)
+- 列式快照存储 (ColumnarSnapshotStore)
 """
 
 from deva.naja.market_hotspot.data.global_market_futures import (
@@ -18,6 +19,7 @@ from deva.naja.market_hotspot.data.global_market_futures import (
 )
 
 from .fetch_config import FetchConfig, SNAPSHOT_CONFIG_KEY
+from .snapshot_store import ColumnarSnapshotStore, SnapshotRange, get_snapshot_store
 from .realtime_fetcher import RealtimeDataFetcher
 from .async_fetcher import AsyncRealtimeDataFetcher, get_data_fetcher
 
@@ -34,4 +36,8 @@ __all__ = [
     "FetchConfig",
     "SNAPSHOT_CONFIG_KEY",
     "get_data_fetcher",
+    # 快照存储
+    "ColumnarSnapshotStore",
+    "SnapshotRange",
+    "get_snapshot_store",
 ]
@@ -17,6 +17,9 @@ class FetchConfig:
     force_trading_mode: bool = False
     playback_mode: bool = False
     playback_speed: float = 10.0
+    # 快照存储: "columnar"(列式文件) / "nb"(旧 NB 表) / "both"
+    # 回测 / 清理脚本等仍直接读取 NB 表，迁移完成前默认双写
+    snapshot_storage: str = "both"
 
 
 SNAPSHOT_CONFIG_KEY = "realtime_data_fetcher_snapshot"
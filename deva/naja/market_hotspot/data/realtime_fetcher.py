@@ -47,8 +47,10 @@ from .sina_parser import (
     _fetch_all_stocks_async,
     _fetch_sina_sync,
     _fetch_sina_by_symbols_sync,
+    close_sina_fetcher,
 )
 from .fetch_config import FetchConfig, SNAPSHOT_CONFIG_KEY
+from ..scheduling.frequency_scheduler import FrequencyLevel
 
 log = logging.getLogger(__name__)
 
@@ -490,6 +492,7 @@ class RealtimeDataFetcher:
             self._fetch_thread.join(timeout=5.0)
 
         _close_sina_session()
+        close_sina_fetcher()
 
         log.info("[RealtimeDataFetcher] 已停止")
 
@@ -583,14 +586,10 @@ class RealtimeDataFetcher:
         low_symbols = []
 
         if fs:
-            for symbol, idx in fs._symbol_to_idx.items():
-                level = fs.get_symbol_level(symbol)
-                if level.value == 2:  # HIGH
-                    high_symbols.append(symbol)
-                elif level.value == 1:  # MEDIUM
-                    medium_symbols.append(symbol)
-                else:  # LOW
-                    low_symbols.append(symbol)
+            by_level = fs.symbols_by_level()
+            high_symbols = by_level[FrequencyLevel.HIGH]
+            medium_symbols = by_level[FrequencyLevel.MEDIUM]
+            low_symbols = by_level[FrequencyLevel.LOW]
 
         log.debug(f"[RealtimeDataFetcher] [{market}] 档位: high={len(high_symbols)}, medium={len(medium_symbols)}, low={len(low_symbols)}")
 
@@ -1082,6 +1081,7 @@ class RealtimeDataFetcher:
             from deva.naja.bandit.market_data_bus import get_market_data_bus, MarketQuote
             bus = get_market_data_bus()
             now = time.time()
+            quotes = {}
             for code, info in us_data.items():
                 quote = MarketQuote(
                     code=code,
@@ -1099,7 +1099,9 @@ class RealtimeDataFetcher:
                     is_stale=False,
                 )
                 if quote.current > 0:
-                    bus.write_quotes({code: quote})
+                    quotes[code] = quote
+            if quotes:
+                bus.write_quotes(quotes)
         except Exception as e:
             log.debug(f"[RealtimeDataFetcher] 同步美股到 MarketDataBus 失败: {e}")
 
@@ -1170,41 +1172,9 @@ class RealtimeDataFetcher:
         if df is None or df.empty:
             return
         try:
-            from deva.naja.bandit.market_data_bus import get_market_data_bus, MarketQuote
+            from deva.naja.bandit.market_data_bus import get_market_data_bus
             bus = get_market_data_bus()
-            now = time.time()
-            for _, row in df.iterrows():
-                try:
-                    code = str(row.get('code', ''))
-                    if not code:
-                        continue
-                    if code.startswith('sh'):
-                        market = 'SH'
-                    elif code.startswith('sz'):
-                        market = 'SZ'
-                    else:
-                        market = str(row.get('market', 'US'))
-                    quote = MarketQuote(
-                        code=code,
-                        name=str(row.get('name', code)),
-                        current=float(row.get('now', 0)),
-                        prev_close=float(row.get('close', row.get('prev_close', 0))),
-                        change=float(row.get('price_change', 0)),
-                        change_pct=float(row.get('p_change', 0)),
-                        volume=int(row.get('volume', 0)),
-                        high=float(row.get('high', 0)),
-                        low=float(row.get('low', 0)),
-                        open_price=float(row.get('open', 0)),
-                        amount=float(row.get('amount', 0)),
-                        market=market,
-                        timestamp=row.get('timestamp', now),
-                        fetch_time=now,
-                        is_stale=False,
-                    )
-                    if quote.current > 0:
-                        bus.write_quotes({code: quote})
-                except Exception:
-                    continue
+            bus.write_quotes_frame(df)
         except Exception as e:
             log.debug(f"[RealtimeDataFetcher] 写入 MarketDataBus 失败: {e}")
 
@@ -1271,45 +1241,41 @@ class RealtimeDataFetcher:
             log.debug(f"[RealtimeDataFetcher] 处理美股热点失败: {e}")
 
     def _save_market_snapshot(self, data: pd.DataFrame):
-        """保存市场快照到历史行情表（quant_snapshot_5min_window）"""
-        try:
-            from deva import NB
+        """保存市场快照到历史行情表（quant_snapshot_5min_window）
 
+        snapshot_storage 为 "columnar"/"both" 时写入列式快照存储（snapshot_store），
+        为 "nb"/"both"（默认）时按旧格式（list[dict]）写入 NB 表。
+        """
+        try:
             if data is None or data.empty:
                 return
 
-            snapshot_db = NB("quant_snapshot_5min_window", key_mode="time")
-
-            records = []
             timestamp = time.time()
-
-            for idx, row in data.iterrows():
-                code = idx
-                # 计算涨跌幅（如果 DataFrame 中没有的话）
-                p_change = row.get("p_change", 0)
-                if p_change == 0 and row.get("close", 0) > 0 and row.get("now", 0) > 0:
-                    p_change = (row.get("now", 0) - row.get("close", 0)) / row.get("close", 0)
-                
-                record = {
-                    "timestamp": timestamp,
-                    "code": code,
-                    "name": row.get("name", ""),
-                    "open": row.get("open", 0),
-                    "close": row.get("close", 0),
-                    "now": row.get("now", 0),
-                    "high": row.get("high", 0),
-                    "low": row.get("low", 0),
-                    "volume": row.get("volume", 0),
-                    "amount": row.get("amount", 0),
-                    "p_change": p_change,
-                }
-                records.append(record)
-
-            if records:
-                snapshot_db.append(records)
+            storage = getattr(self.config, "snapshot_storage", "both")
+            saved = 0
+
+            if storage in ("columnar", "both"):
+                from .snapshot_store import get_snapshot_store
+                saved = get_snapshot_store().append(data, timestamp)
+
+            if storage in ("nb", "both"):
+                from deva import NB
+                from .snapshot_store import snapshot_frame_columns
+
+                codes, names, columns = snapshot_frame_columns(data)
+                records = pd.DataFrame(columns)
+                records.insert(0, "name", names)
+                records.insert(0, "code", codes)
+                records.insert(0, "timestamp", timestamp)
+                records = records.to_dict("records")
+                if records:
+                    NB("quant_snapshot_5min_window", key_mode="time").append(records)
+                    saved = len(records)
+
+            if saved:
                 self._last_snapshot_save_time = timestamp
                 self._snapshot_save_count += 1
-                log.debug(f"[RealtimeDataFetcher] 保存快照 {len(records)} 条到 quant_snapshot_5min_window")
+                log.debug(f"[RealtimeDataFetcher] 保存快照 {saved} 条到 quant_snapshot_5min_window ({storage})")
 
         except Exception as e:
             log.debug(f"[RealtimeDataFetcher] 保存快照失败: {e}")
@@ -3,21 +3,40 @@ Sina 行情数据解析与获取
 
 提供新浪行情源的底层 HTTP 能力：
 - Session 管理（aiohttp 连接池）
-- 响应解析（新浪特有文本格式 → dict）
-- 异步批量获取
+- 响应解析（新浪特有文本格式 → dict，或类型化列 → DataFrame）
+- 异步批量获取（有界并发、单批超时、部分结果容忍）
 - A股全量获取（从 BlockDictionary 拿代码列表）
+- 常驻获取器 SinaFetcher（长生命周期事件循环 + ClientSession）
 - 同步包装器（供子线程调用）
 """
 
 import asyncio
 import os
 import logging
-from typing import Dict, List, Optional
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 log = logging.getLogger(__name__)
 
+SINA_HQ_URL = "https://hq.sinajs.cn/list="
+SINA_HEADERS = {
+    "Referer": "https://finance.sina.com.cn",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+
+# 全量获取默认参数：~5000 只 A 股 / 800 = 7 批，并发 8 即一个 RTT 完成
+DEFAULT_BATCH_SIZE = 800
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_BATCH_TIMEOUT = 5.0
+
 # ---------------------------------------------------------------------------
 # Session 管理
 # ---------------------------------------------------------------------------
@@ -87,6 +106,76 @@ def _parse_sina_response(text: str) -> Dict:
     return result
 
 
+# 类型化解析的价格列: (列名, 字段位置)
+_PRICE_FIELDS = (("open", 1), ("close", 2), ("now", 3), ("high", 4), ("low", 5))
+
+
+def _parse_sina_response_columns(text: str) -> Dict[str, np.ndarray]:
+    """解析新浪返回的数据到预分配的类型化列（struct-of-arrays）
+
+    与 _parse_sina_response 字段相同，但直接写入 float64/int64 数组，
+    避免 dict-of-dicts → DataFrame.T 产生 object 列。
+
+    Returns:
+        {'code', 'name': object 数组, 'open'...'low', 'amount': float64, 'volume': int64}
+    """
+    lines = text.strip().split("\n")
+    capacity = len(lines)
+    codes = np.empty(capacity, dtype=object)
+    names = np.empty(capacity, dtype=object)
+    prices = np.empty((len(_PRICE_FIELDS), capacity), dtype=np.float64)
+    volume = np.empty(capacity, dtype=np.int64)
+    amount = np.empty(capacity, dtype=np.float64)
+
+    n = 0
+    for line in lines:
+        if not line or '="' not in line:
+            continue
+        try:
+            prefix, data = line.split('="')
+            data = data.rstrip('";')
+            if not data:
+                continue
+            fields = data.split(",")
+            if len(fields) < 33:
+                continue
+            for row, (_, pos) in enumerate(_PRICE_FIELDS):
+                prices[row, n] = float(fields[pos])
+            volume[n] = int(fields[8])
+            amount[n] = float(fields[9]) if fields[9] else 0.0
+        except Exception:
+            continue
+        codes[n] = prefix.split("_")[-1]
+        names[n] = fields[0]
+        n += 1
+
+    columns = {"code": codes[:n], "name": names[:n]}
+    for row, (column, _) in enumerate(_PRICE_FIELDS):
+        columns[column] = prices[row, :n]
+    columns["volume"] = volume[:n]
+    columns["amount"] = amount[:n]
+    return columns
+
+
+def _sina_columns_to_frame(parts: List[Dict[str, np.ndarray]]) -> Optional[pd.DataFrame]:
+    """合并多批类型化列为 DataFrame（index=code，name 为 category）"""
+    parts = [p for p in parts if len(p["code"])]
+    if not parts:
+        return None
+    merged = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    codes = merged.pop("code")
+    merged["name"] = pd.Categorical(merged["name"])
+    df = pd.DataFrame(merged, index=pd.Index(codes))
+    if df.index.has_duplicates:
+        df = df[~df.index.duplicated(keep="last")]
+    return df
+
+
+def _result_size(result: Dict) -> int:
+    code = result.get("code")
+    return len(code) if isinstance(code, np.ndarray) else len(result)
+
+
 # ---------------------------------------------------------------------------
 # 异步批量获取
 # ---------------------------------------------------------------------------
@@ -107,33 +196,80 @@ async def _fetch_sina_batch_async(codes: List[str], session=None) -> Dict:
     else:
         return await _fetch_sina_batch_with_session(codes, session)
 
-async def _fetch_sina_batch_with_session(codes: List[str], session) -> Dict:
+async def _fetch_sina_batch_with_session(
+    codes: List[str],
+    session,
+    base_url: str = SINA_HQ_URL,
+    parser: Callable[[str], Dict] = _parse_sina_response,
+) -> Dict:
     """使用指定 session 获取一批股票数据"""
     codes_str = ",".join(codes)
-    url = f"https://hq.sinajs.cn/list={codes_str}"
-    headers = {
-        "Referer": "https://finance.sina.com.cn",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-        "Accept-Language": "zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1"
-    }
+    url = f"{base_url}{codes_str}"
     try:
         log.debug(f"[_fetch_sina_batch_async] 请求 Sina API: codes数量={len(codes)}")
-        async with session.get(url, headers=headers) as resp:
+        async with session.get(url, headers=SINA_HEADERS) as resp:
             log.debug(f"[_fetch_sina_batch_async] 响应状态: status={resp.status}")
             if resp.status != 200:
                 return {}
             text = await resp.text()
             log.debug(f"[_fetch_sina_batch_async] 响应长度: {len(text)}")
-            return _parse_sina_response(text)
+            return parser(text)
     except Exception as e:
         log.error(f"[_fetch_sina_batch_async] 请求失败: {e}")
         return {}
 
 
+async def _fetch_batches_concurrently(
+    codes: List[str],
+    session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    batch_timeout: float = DEFAULT_BATCH_TIMEOUT,
+    base_url: str = SINA_HQ_URL,
+    parser: Callable[[str], Dict] = _parse_sina_response,
+) -> Tuple[List[Dict], Dict]:
+    """分批并发获取，最多 max_concurrency 个批次同时在途
+
+    单批超时或失败不影响其他批次，返回已成功部分。
+
+    Returns:
+        (各成功批次的 parser 结果列表, 统计 {'batches', 'failed', 'codes', 'received'})
+    """
+    batches = [codes[i:i + batch_size] for i in range(0, len(codes), batch_size)]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_batch(batch):
+        async with semaphore:
+            return await asyncio.wait_for(
+                _fetch_sina_batch_with_session(batch, session, base_url, parser), batch_timeout
+            )
+
+    results = await asyncio.gather(*(run_batch(b) for b in batches), return_exceptions=True)
+
+    parts = []
+    failed = 0
+    received = 0
+    for n, result in enumerate(results, 1):
+        if isinstance(result, BaseException):
+            failed += 1
+            log.warning(f"[_fetch_batches_concurrently] 批次 {n}/{len(batches)} 失败: {type(result).__name__} {result}")
+            continue
+        size = _result_size(result)
+        if not size:
+            failed += 1
+            continue
+        received += size
+        parts.append(result)
+
+    stats = {
+        'batches': len(batches),
+        'failed': failed,
+        'codes': len(codes),
+        'received': received,
+    }
+    return parts, stats
+
+
 # ---------------------------------------------------------------------------
 # A股代码获取 + 全量异步获取
 # ---------------------------------------------------------------------------
@@ -153,49 +289,189 @@ def _get_cn_codes_from_registry():
 
 
 async def _fetch_all_stocks_async() -> Optional[pd.DataFrame]:
-    """异步获取全量股票数据"""
+    """异步获取全量股票数据（在调用方的事件循环中，使用临时 session）"""
     import aiohttp
 
     log.debug(f"[ASYNC] _fetch_all_stocks_async 开始, PID={os.getpid()}")
-    log.debug(f"[_fetch_all_stocks_async] 开始获取...")
 
     codes = _get_cn_codes_from_registry()
     if not codes:
         log.error("[_fetch_all_stocks_async] StockRegistry 为空，无法获取股票代码列表")
         return None
 
-    log.debug(f"[ASYNC] 股票代码总数: {len(codes)}")
     log.debug(f"[_fetch_all_stocks_async] 股票代码总数: {len(codes)}")
 
-    batch_size = 800
-    all_data = {}
-
-    log.debug(f"[ASYNC] 创建 ClientSession...")
     async with aiohttp.ClientSession(
         connector=aiohttp.TCPConnector(limit=50, limit_per_host=20),
         timeout=aiohttp.ClientTimeout(total=30),
     ) as session:
-        log.debug(f"[ASYNC] ClientSession 创建成功，开始获取批次...")
-        for i in range(0, len(codes), batch_size):
-            batch = codes[i:i + batch_size]
-            log.debug(f"[ASYNC] 获取批次 {i//batch_size + 1}, 代码数: {len(batch)}")
-            batch_data = await _fetch_sina_batch_async(batch, session)
-            log.debug(f"[ASYNC] 批次 {i//batch_size + 1} 返回: {len(batch_data)} 条")
-            log.debug(f"[_fetch_all_stocks_async] 批次 {i//batch_size + 1} 返回: {len(batch_data)} 条")
-            all_data.update(batch_data)
-            await asyncio.sleep(0.05)
-
-    log.debug(f"[ASYNC] 所有批次获取完成，总共: {len(all_data)} 条")
-    log.debug(f"[_fetch_all_stocks_async] 总共获取: {len(all_data)} 条数据")
-
-    if not all_data:
-        log.debug("[_fetch_all_stocks_async] 无数据返回")
-        return None
+        parts, stats = await _fetch_batches_concurrently(
+            codes, session, parser=_parse_sina_response_columns
+        )
 
-    df = pd.DataFrame(all_data).T
+    log.debug(f"[_fetch_all_stocks_async] 总共获取: {stats['received']} 条数据, stats={stats}")
+
+    df = _sina_columns_to_frame(parts)
+    if df is None:
+        log.debug("[_fetch_all_stocks_async] 无数据返回")
     return df
 
 
+# ---------------------------------------------------------------------------
+# 常驻获取器
+# ---------------------------------------------------------------------------
+
+class SinaFetcher:
+    """
+    常驻 Sina 行情获取器
+
+    在后台线程中维持一个长生命周期事件循环和 ClientSession（连接复用），
+    同步调用方通过 run_coroutine_threadsafe 提交请求，不再每次创建/销毁事件循环。
+    全量获取按批有界并发，单批超时后返回其余批次的部分结果。
+    """
+
+    def __init__(
+        self,
+        base_url: str = SINA_HQ_URL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        batch_timeout: float = DEFAULT_BATCH_TIMEOUT,
+        total_timeout: float = 15.0,
+    ):
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.batch_timeout = batch_timeout
+        self.total_timeout = total_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._lock = threading.Lock()
+        self.last_stats: Dict = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._run_loop, args=(loop,), name="SinaFetcher", daemon=True)
+                thread.start()
+                self._loop, self._thread, self._session = loop, thread, None
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, limit_per_host=20),
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        return self._session
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """在常驻事件循环中执行协程并等待结果"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout or self.total_timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    async def _fetch_parts(self, codes: List[str], parser) -> List[Dict]:
+        session = await self._get_session()
+        parts, stats = await _fetch_batches_concurrently(
+            codes, session,
+            batch_size=self.batch_size,
+            max_concurrency=self.max_concurrency,
+            batch_timeout=self.batch_timeout,
+            base_url=self.base_url,
+            parser=parser,
+        )
+        self.last_stats = stats
+        if stats['failed']:
+            log.warning(f"[SinaFetcher] 部分批次失败: {stats}")
+        return parts
+
+    async def fetch_async(self, codes: List[str]) -> Dict:
+        """在常驻事件循环中分批并发获取，返回 {code: 行情字典}"""
+        if not codes:
+            return {}
+        data = {}
+        for part in await self._fetch_parts(codes, _parse_sina_response):
+            data.update(part)
+        return data
+
+    async def fetch_frame_async(self, codes: List[str]) -> Optional[pd.DataFrame]:
+        """在常驻事件循环中分批并发获取，返回类型化 DataFrame"""
+        if not codes:
+            return None
+        return _sina_columns_to_frame(await self._fetch_parts(codes, _parse_sina_response_columns))
+
+    def fetch(self, codes: List[str]) -> Dict:
+        """同步获取指定代码，返回 {code: 行情字典}"""
+        return self.run(self.fetch_async(list(codes)))
+
+    def fetch_frame(self, codes: List[str]) -> Optional[pd.DataFrame]:
+        """同步获取指定代码，返回 index=code 的类型化 DataFrame
+
+        价格/成交额为 float64，成交量为 int64，名称为 category。
+        """
+        return self.run(self.fetch_frame_async(list(codes)))
+
+    def fetch_all(self) -> Optional[pd.DataFrame]:
+        """同步获取全量 A 股快照（类型化 DataFrame）"""
+        codes = _get_cn_codes_from_registry()
+        if not codes:
+            log.error("[SinaFetcher] StockRegistry 为空，无法获取股票代码列表")
+            return None
+        return self.fetch_frame(codes)
+
+    def close(self):
+        """关闭 session 并停止后台事件循环"""
+        with self._lock:
+            loop, thread, session = self._loop, self._thread, self._session
+            self._loop, self._thread, self._session = None, None, None
+        if loop is None:
+            return
+        try:
+            if session is not None and not session.closed and loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+        except Exception as e:
+            log.warning(f"[SinaFetcher] 关闭 session 失败: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        if not loop.is_running():
+            loop.close()
+
+
+_fetcher: Optional[SinaFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_sina_fetcher() -> SinaFetcher:
+    """获取全局常驻 SinaFetcher"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = SinaFetcher()
+        return _fetcher
+
+
+def close_sina_fetcher():
+    """关闭全局常驻 SinaFetcher"""
+    global _fetcher
+    with _fetcher_lock:
+        fetcher, _fetcher = _fetcher, None
+    if fetcher is not None:
+        fetcher.close()
+
+
 # ---------------------------------------------------------------------------
 # 同步包装器
 # ---------------------------------------------------------------------------
@@ -204,23 +480,10 @@ def _fetch_sina_sync(force_trading: bool = False) -> Optional[pd.DataFrame]:
     """同步获取 Sina 全量数据（在子线程中调用）"""
     log.debug(f"[SINA_SYNC] 开始 PID={os.getpid()}")
     try:
-        log.debug("[_fetch_sina_sync] 开始获取 Sina 数据")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        log.debug("[SINA_SYNC] 创建事件循环完成")
-        try:
-            result = loop.run_until_complete(_fetch_all_stocks_async())
-            log.debug(f"[SINA_SYNC] run_until_complete 完成, result={len(result) if result is not None else None}")
-            if result is not None:
-                log.debug(f"[_fetch_sina_sync] 获取完成: result={type(result)}, len={len(result)}")
-            else:
-                log.debug("[_fetch_sina_sync] 获取完成: result is None")
-            return result
-        finally:
-            loop.close()
-            log.debug("[SINA_SYNC] 事件循环已关闭")
+        result = get_sina_fetcher().fetch_all()
+        log.debug(f"[_fetch_sina_sync] 获取完成: len={len(result) if result is not None else None}")
+        return result
     except Exception as e:
-        log.error(f"[SINA_SYNC] 异常: {e}")
         log.error(f"[_fetch_sina_sync] 异常: {e}")
         import traceback
         log.error(traceback.format_exc())
@@ -233,20 +496,10 @@ def _fetch_sina_by_symbols_sync(symbols: List[str]) -> Optional[pd.DataFrame]:
         return None
     log.debug(f"[SINA_SYNC_SYMBOLS] 开始 PID={os.getpid()}, symbols数量={len(symbols)}")
     try:
-        log.debug(f"[_fetch_sina_by_symbols_sync] 开始获取 {len(symbols)} 只股票")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(_fetch_sina_batch_async(symbols))
-            log.debug(f"[SINA_SYNC_SYMBOLS] 完成, result={len(result) if result else 0} 条")
-            if result:
-                df = pd.DataFrame(result).T
-                return df
-            return None
-        finally:
-            loop.close()
+        result = get_sina_fetcher().fetch_frame(symbols)
+        log.debug(f"[SINA_SYNC_SYMBOLS] 完成, result={len(result) if result is not None else 0} 条")
+        return result
     except Exception as e:
-        log.error(f"[SINA_SYNC_SYMBOLS] 异常: {e}")
         log.error(f"[_fetch_sina_by_symbols_sync] 异常: {e}")
         import traceback
         log.error(traceback.format_exc())
@@ -0,0 +1,464 @@
+"""
+列式快照存储 - quant_snapshot_5min_window 的按日列文件格式
+
+目录结构（root 默认 ~/.deva/snapshots，可用 DEVA_SNAPSHOT_PATH 覆盖）::
+
+    <root>/<table>/<YYYYMMDD>/
+        index.bin      每个快照一行: (ts float64, offset int64, count int64)
+        code.bin       int32 股票编号（指向 symbols.json）
+        open.bin ...   各数值列，原始小端数组，可直接 np.memmap
+        symbols.json   {"codes": [...], "names": [...]}
+
+写入按列追加，最后写索引；读取只打开需要的列并返回 memmap 切片（零拷贝）。
+索引之外的尾部数据视为未完成写入，重新打开写入时截断。
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_TABLE = "quant_snapshot_5min_window"
+
+# 数值列及其存储类型
+SNAPSHOT_COLUMNS: Dict[str, np.dtype] = {
+    "open": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "now": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "volume": np.dtype("<i8"),
+    "amount": np.dtype("<f8"),
+    "p_change": np.dtype("<f8"),
+}
+
+_INDEX_DTYPE = np.dtype([("ts", "<f8"), ("offset", "<i8"), ("count", "<i8")])
+_CODE_DTYPE = np.dtype("<i4")
+_TS_TOLERANCE = 1e-6
+
+
+def _to_timestamp(value) -> Optional[float]:
+    """float / datetime / ISO 字符串 → Unix 时间戳"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def _day_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y%m%d")
+
+
+def _numeric(frame: pd.DataFrame, column: str, dtype: np.dtype) -> np.ndarray:
+    if column not in frame.columns:
+        return np.zeros(len(frame), dtype=dtype)
+    values = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=np.float64, na_value=0.0)
+    values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+    return values.astype(dtype)
+
+
+def snapshot_frame_columns(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """把行情 DataFrame / 记录表整理为 (codes, names, 数值列)
+
+    code 取 'code' 列，没有则取 index；p_change 缺失或为 0 时由 now/close 补算，
+    与原 _save_market_snapshot 逐行逻辑一致。
+    """
+    if "code" in frame.columns:
+        codes = frame["code"].astype(str).to_numpy(dtype=object)
+    else:
+        codes = frame.index.astype(str).to_numpy(dtype=object)
+    if "name" in frame.columns:
+        names = frame["name"].astype(object)
+        names = names.where(names.notna(), "").astype(str).to_numpy(dtype=object)
+    else:
+        names = np.full(len(frame), "", dtype=object)
+
+    columns = {col: _numeric(frame, col, dtype) for col, dtype in SNAPSHOT_COLUMNS.items()}
+    close, now = columns["close"], columns["now"]
+    fill = (columns["p_change"] == 0) & (close > 0) & (now > 0)
+    if fill.any():
+        columns["p_change"][fill] = (now[fill] - close[fill]) / close[fill]
+    return codes, names, columns
+
+
+class _DayPartition:
+    """单日分区：列文件 + 索引 + 股票字典"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self._code_ids: Dict[str, int] = {}
+        self._symbols_mtime = None
+        self._index = np.empty(0, dtype=_INDEX_DTYPE)
+        self._index_size = -1
+        self._order: Optional[np.ndarray] = None
+        self._maps: Dict[str, np.memmap] = {}
+        self.rows = 0
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    # ---- 读取 ----
+
+    def refresh(self):
+        """索引或股票字典文件变化时重新加载"""
+        index_path = self._file("index.bin")
+        size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        if size != self._index_size:
+            self._index = np.fromfile(index_path, dtype=_INDEX_DTYPE) if size else np.empty(0, dtype=_INDEX_DTYPE)
+            self._index_size = size
+            self._order = None
+            if len(self._index):
+                last = self._index[-1]
+                self.rows = int(last["offset"] + last["count"])
+            else:
+                self.rows = 0
+
+        symbols_path = self._file("symbols.json")
+        if os.path.exists(symbols_path):
+            mtime = os.stat(symbols_path).st_mtime_ns
+            if mtime != self._symbols_mtime:
+                with open(symbols_path, "r", encoding="utf-8") as f:
+                    symbols = json.load(f)
+                self.codes = list(symbols.get("codes", []))
+                self.names = list(symbols.get("names", []))
+                self._code_ids = {code: i for i, code in enumerate(self.codes)}
+                self._symbols_mtime = mtime
+
+    def sorted_index(self) -> np.ndarray:
+        if self._order is None:
+            self._order = np.argsort(self._index["ts"], kind="stable")
+        return self._index[self._order]
+
+    def locate(self, ts: float) -> Optional[Tuple[int, int]]:
+        index = self.sorted_index()
+        pos = int(np.searchsorted(index["ts"], ts - _TS_TOLERANCE))
+        if pos < len(index) and abs(index["ts"][pos] - ts) <= _TS_TOLERANCE:
+            return int(index["offset"][pos]), int(index["count"][pos])
+        return None
+
+    def column(self, name: str, dtype: np.dtype, end: int) -> np.ndarray:
+        """返回覆盖 [0, end) 行的 memmap，文件增长后自动重新映射"""
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) < end:
+            if end == 0:
+                return np.empty(0, dtype=dtype)
+            mapped = np.memmap(self._file(f"{name}.bin"), dtype=dtype, mode="r")
+            self._maps[name] = mapped
+        return mapped
+
+    # ---- 写入 ----
+
+    def open_for_write(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.refresh()
+        # 截断索引之外的未完成写入
+        for name, dtype in [("code", _CODE_DTYPE)] + list(SNAPSHOT_COLUMNS.items()):
+            path = self._file(f"{name}.bin")
+            expected = self.rows * dtype.itemsize
+            if os.path.exists(path) and os.path.getsize(path) > expected:
+                with open(path, "r+b") as f:
+                    f.truncate(expected)
+
+    def symbol_ids(self, codes: np.ndarray, names: np.ndarray) -> np.ndarray:
+        ids = np.empty(len(codes), dtype=_CODE_DTYPE)
+        dirty = False
+        for i, (code, name) in enumerate(zip(codes, names)):
+            sid = self._code_ids.get(code)
+            if sid is None:
+                sid = len(self.codes)
+                self._code_ids[code] = sid
+                self.codes.append(code)
+                self.names.append(name)
+                dirty = True
+            elif name and self.names[sid] != name:
+                self.names[sid] = name
+                dirty = True
+            ids[i] = sid
+        if dirty:
+            self._write_symbols()
+        return ids
+
+    def _write_symbols(self):
+        path = self._file("symbols.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"codes": self.codes, "names": self.names}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._symbols_mtime = os.stat(path).st_mtime_ns
+
+    def append(self, ts: float, ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        offset = self.rows
+        with open(self._file("code.bin"), "ab") as f:
+            ids.tofile(f)
+        for name, dtype in SNAPSHOT_COLUMNS.items():
+            with open(self._file(f"{name}.bin"), "ab") as f:
+                columns[name].astype(dtype, copy=False).tofile(f)
+
+        entry = np.array([(ts, offset, len(ids))], dtype=_INDEX_DTYPE)
+        with open(self._file("index.bin"), "ab") as f:
+            entry.tofile(f)
+        self._index = np.concatenate([self._index, entry])
+        self._index_size = os.path.getsize(self._file("index.bin"))
+        self._order = None
+        self.rows = offset + len(ids)
+
+
+class ColumnarSnapshotStore:
+    """
+    列式快照存储
+
+    写入:
+        store.append(df, timestamp)          # df 为 index=code 的行情表或含 code 列的记录表
+
+    读取:
+        store.timestamps(start, end)          # 排序后的快照时间戳
+        store.read_columns(ts, ['now'])       # {'code', 'now'}，数值列为 memmap 零拷贝切片
+        store.get(ts, columns=[...])          # DataFrame(timestamp, code, name, ...)
+        store.iter_snapshots(start, end)      # (ts, DataFrame) 按时间顺序
+
+    与 NB 表兼容的 keys()/get() 让回放路径可以直接替换数据源；
+    按区间在 NB 表与列式存储之间选择数据源见 SnapshotRange。
+    """
+
+    def __init__(self, name: str = SNAPSHOT_TABLE, root: Optional[str] = None):
+        if root is None:
+            root = os.getenv("DEVA_SNAPSHOT_PATH", "~/.deva/snapshots")
+        self.name = name
+        self.path = os.path.join(os.path.expanduser(root), name)
+        self._partitions: Dict[str, _DayPartition] = {}
+        self._lock = threading.RLock()
+
+    # ---- 分区 ----
+
+    def days(self) -> List[str]:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(d for d in os.listdir(self.path)
+                      if len(d) == 8 and d.isdigit() and os.path.isdir(os.path.join(self.path, d)))
+
+    def _partition(self, day: str) -> _DayPartition:
+        part = self._partitions.get(day)
+        if part is None:
+            part = _DayPartition(os.path.join(self.path, day))
+            self._partitions[day] = part
+        part.refresh()
+        return part
+
+    # ---- 写入 ----
+
+    def append(self, frame: pd.DataFrame, timestamp: Optional[float] = None) -> int:
+        """追加一个快照，返回写入行数"""
+        if frame is None or len(frame) == 0:
+            return 0
+        ts = float(timestamp) if timestamp is not None else datetime.now().timestamp()
+        codes, names, columns = snapshot_frame_columns(frame)
+
+        with self._lock:
+            part = self._partition(_day_of(ts))
+            if part.locate(ts) is not None:
+                return 0
+            part.open_for_write()
+            ids = part.symbol_ids(codes, names)
+            part.append(ts, ids, columns)
+        return len(codes)
+
+    def append_records(self, records: Sequence[Dict], timestamp: Optional[float] = None) -> int:
+        """追加 NB 旧格式的记录列表（list[dict]）"""
+        if not records:
+            return 0
+        return self.append(pd.DataFrame.from_records(records), timestamp)
+
+    # ---- 读取 ----
+
+    def timestamps(self, start=None, end=None) -> np.ndarray:
+        """[start, end] 内的快照时间戳（升序）"""
+        start_ts, end_ts = _to_timestamp(start), _to_timestamp(end)
+        first_day = _day_of(start_ts) if start_ts is not None else None
+        last_day = _day_of(end_ts) if end_ts is not None else None
+
+        parts = []
+        with self._lock:
+            for day in self.days():
+                if (first_day and day < first_day) or (last_day and day > last_day):
+                    continue
+                parts.append(self._partition(day).sorted_index()["ts"])
+        if not parts:
+            return np.empty(0, dtype=np.float64)
+
+        ts = np.concatenate(parts)
+        mask = np.ones(len(ts), dtype=bool)
+        if start_ts is not None:
+            mask &= ts >= start_ts
+        if end_ts is not None:
+            mask &= ts <= end_ts
+        return ts[mask]
+
+    def latest_timestamp(self) -> Optional[float]:
+        for day in reversed(self.days()):
+            ts = self._partition(day).sorted_index()["ts"]
+            if len(ts):
+                return float(ts[-1])
+        return None
+
+    def read_columns(self, timestamp, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, np.ndarray]]:
+        """读取一个快照的指定列
+
+        数值列是 memmap 的切片，不复制；'code'/'name' 由股票字典还原为 object 数组。
+        """
+        ts = _to_timestamp(timestamp)
+        with self._lock:
+            part = self._partition(_day_of(ts))
+            loc = part.locate(ts)
+            if loc is None:
+                return None
+            offset, count = loc
+            end = offset + count
+
+            wanted = list(SNAPSHOT_COLUMNS) if columns is None else list(columns)
+            ids = part.column("code", _CODE_DTYPE, end)[offset:end]
+            result: Dict[str, np.ndarray] = {"code": np.asarray(part.codes, dtype=object)[ids]}
+            if "name" in wanted:
+                result["name"] = np.asarray(part.names, dtype=object)[ids]
+            for col in wanted:
+                dtype = SNAPSHOT_COLUMNS.get(col)
+                if dtype is not None:
+                    result[col] = part.column(col, dtype, end)[offset:end]
+        return result
+
+    def get(self, timestamp, default=None, columns: Optional[Sequence[str]] = None, copy: bool = True):
+        """读取一个快照为 DataFrame（列与旧记录格式一致）
+
+        默认复制数值列，返回可修改的 DataFrame；copy=False 时数值列是只读 memmap 视图。
+        """
+        if columns is None:
+            columns = ["name"] + list(SNAPSHOT_COLUMNS)
+        data = self.read_columns(timestamp, columns)
+        if data is None:
+            return default
+        frame = pd.DataFrame(data, copy=copy)
+        frame.insert(0, "timestamp", _to_timestamp(timestamp))
+        return frame
+
+    def read_records(self, timestamp) -> List[Dict]:
+        """读取一个快照为旧格式记录列表（list[dict]）"""
+        frame = self.get(timestamp, copy=False)
+        return [] if frame is None else frame.to_dict("records")
+
+    def iter_snapshots(self, start=None, end=None,
+                       columns: Optional[Sequence[str]] = None) -> Iterator[Tuple[float, pd.DataFrame]]:
+        for ts in self.timestamps(start, end):
+            frame = self.get(ts, columns=columns)
+            if frame is not None:
+                yield float(ts), frame
+
+    def keys(self) -> List[float]:
+        return self.timestamps().tolist()
+
+    def __len__(self) -> int:
+        return len(self.timestamps())
+
+    def __contains__(self, timestamp) -> bool:
+        ts = _to_timestamp(timestamp)
+        return self._partition(_day_of(ts)).locate(ts) is not None
+
+    def nbytes(self) -> int:
+        """存储占用字节数"""
+        total = 0
+        for day in self.days():
+            day_path = os.path.join(self.path, day)
+            total += sum(os.path.getsize(os.path.join(day_path, f)) for f in os.listdir(day_path))
+        return total
+
+
+_stores: Dict[str, ColumnarSnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_snapshot_store(name: str = SNAPSHOT_TABLE) -> ColumnarSnapshotStore:
+    """获取（缓存的）列式快照存储"""
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            store = ColumnarSnapshotStore(name)
+            _stores[name] = store
+        return store
+
+
+class SnapshotRange:
+    """
+    [start, end] 内按时间顺序的快照，数据源按请求区间选择
+
+    列式存储在部署之后才开始写入，更早的快照只在 NB 表里：
+    区间内最早的列式快照之前的部分走 NB 表的时间游标，之后的部分读列式存储。
+    区间内没有列式快照时整段走 NB 表。
+
+    用法:
+        snapshots = SnapshotRange(SNAPSHOT_TABLE, start, end)
+        for key in snapshots:
+            records = snapshots.read(key)
+    """
+
+    def __init__(self, name: str = SNAPSHOT_TABLE, start=None, end=None,
+                 nb=None, store: Optional[ColumnarSnapshotStore] = None):
+        self.store = store if store is not None else get_snapshot_store(name)
+        self._columnar = self.store.timestamps(start, end)
+        # 不小于 split 的时间键读列式存储
+        self.split = float(self._columnar[0]) if len(self._columnar) else None
+        self.total = len(self._columnar)
+        self.first_ts = self.split
+        self.last_ts = float(self._columnar[-1]) if len(self._columnar) else None
+
+        self.nb = None
+        self._nb_range = None
+        start_ts = _to_timestamp(start)
+        if self.split is None or start_ts is None or start_ts < self.split:
+            if nb is None:
+                from deva import NB
+                nb = NB(name, key_mode='time')
+            stop = end if self.split is None else self.split - _TS_TOLERANCE
+            nb_first, nb_last, nb_count = nb.time_bounds(start, stop)
+            self.nb = nb
+            if nb_count:
+                self._nb_range = (start, stop)
+                self.total += nb_count
+                self.first_ts = nb_first
+                if self.last_ts is None:
+                    self.last_ts = nb_last
+
+    def __iter__(self):
+        if self._nb_range is not None:
+            yield from self.nb.time_range(*self._nb_range)
+        yield from self._columnar.tolist()
+
+    def __len__(self) -> int:
+        return self.total
+
+    def is_columnar(self, key) -> bool:
+        return self.split is not None and float(key) > self.split - _TS_TOLERANCE
+
+    def read(self, key, columns: Optional[Sequence[str]] = None):
+        """读取一个快照
+
+        NB 部分原样返回；列式部分默认按 NB 旧格式返回 list[dict]，
+        指定 columns 时只取这些列，返回（可修改的）DataFrame。
+        """
+        if not self.is_columnar(key):
+            return self.nb.get(key) if self.nb is not None else None
+        if columns is None:
+            return self.store.read_records(key) or None
+        return self.store.get(key, columns=[c for c in columns if c != "code"])
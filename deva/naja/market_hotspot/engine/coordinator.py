@@ -98,27 +98,84 @@ class DualEngineCoordinator:
         # 返回缓存的结果 (如果有)
         return self.pytorch.get_pattern(symbol)
     
+    def process_batch(
+        self,
+        symbols: np.ndarray,
+        positions: np.ndarray,
+        prices: np.ndarray,
+        volumes: np.ndarray,
+        global_hotspot: float,
+        block_hotspot: Dict[str, float],
+        symbol_weights: np.ndarray,
+        timestamp: float
+    ) -> List[PatternSignal]:
+        """
+        批量处理一个快照（与逐行调用 process_tick 结果一致）
+
+        Args:
+            symbols: 股票代码数组
+            positions: 每行在 River 引擎中的槽位（-1 表示未注册，会先注册）
+            prices / volumes: 价格、成交量数组
+            symbol_weights: 每行的个股权重（缺失为 1.0）
+        """
+        missing = np.flatnonzero(positions < 0)
+        if len(missing):
+            positions = positions.copy()
+            for row in missing:
+                symbol = str(symbols[row])
+                if self.river.register_symbol(symbol):
+                    positions[row] = self.river._symbol_to_idx[symbol]
+
+        anomalies = self.river.process_batch(positions, prices, volumes, timestamp)
+        if not anomalies:
+            return []
+
+        avg_block_hotspot = self._avg_block_hotspot(block_hotspot)
+        patterns = []
+        for row, anomaly_signal in anomalies:
+            trigger_score = self._calc_trigger_score(
+                anomaly_signal,
+                global_hotspot,
+                block_hotspot,
+                float(symbol_weights[row]),
+                avg_block_hotspot=avg_block_hotspot
+            )
+            if not self._should_trigger_pytorch(anomaly_signal.symbol, trigger_score, timestamp):
+                continue
+            self.pytorch.submit(anomaly_signal)
+            pattern = self.pytorch.get_pattern(anomaly_signal.symbol)
+            if pattern:
+                patterns.append(pattern)
+        return patterns
+
+    @staticmethod
+    def _avg_block_hotspot(block_hotspot: Dict[str, float]) -> float:
+        """题材热点取平均（过滤非数值和 nan/inf）"""
+        if not block_hotspot:
+            return 0.0
+        values = list(block_hotspot.values())
+        valid_values = [v for v in values if isinstance(v, (int, float)) and not np.isnan(v) and not np.isinf(v)]
+        return np.mean(valid_values) if valid_values else 0.0
+
     def _calc_trigger_score(
         self,
         anomaly_signal: AnomalySignal,
         global_hotspot: float,
         block_hotspot: Dict[str, float],
-        symbol_weight: float
+        symbol_weight: float,
+        avg_block_hotspot: Optional[float] = None
     ) -> float:
         """
         计算触发分数
 
         trigger_score = f(anomaly_score, symbol_weight, block_hotspot, global_hotspot)
+
+        avg_block_hotspot 可由批量调用方预先算好，避免每个异常重复求平均
         """
         try:
             # 题材热点取平均 - 添加数值检查
-            if block_hotspot:
-                values = list(block_hotspot.values())
-                # 过滤掉异常值
-                valid_values = [v for v in values if isinstance(v, (int, float)) and not np.isnan(v) and not np.isinf(v)]
-                avg_block_hotspot = np.mean(valid_values) if valid_values else 0.0
-            else:
-                avg_block_hotspot = 0.0
+            if avg_block_hotspot is None:
+                avg_block_hotspot = self._avg_block_hotspot(block_hotspot)
 
             # 确保 global_hotspot 是有效数值
             if not isinstance(global_hotspot, (int, float)) or np.isnan(global_hotspot) or np.isinf(global_hotspot):
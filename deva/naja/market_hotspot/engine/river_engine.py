@@ -1,111 +1,21 @@
 """
 River 引擎 - 基础层/常态层
 
-基于 River 库的在线学习引擎，提供：
-- 实时统计量计算（均值、方差、EMA）
-- 在线异常检测（Half-Space Trees）
+在线学习引擎，提供：
+- 实时统计量计算（均值、方差）
+- 残差异常检测
 - O(1)/tick 性能保证
+
+均值/方差按槽位存放在预分配数组中（与 river stats.Mean/Var 相同的 Welford 更新），
+process_batch 一次向量化处理整个快照，只为异常个股构造特征和信号。
 """
 
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
-from collections import deque, defaultdict
-import time
-
-try:
-    from river import stats
-    from river import anomaly
-    RIVER_AVAILABLE = True
-except ImportError:
-    RIVER_AVAILABLE = False
-    print("[NewsMind] Warning: river not installed, using fallback implementations")
 
 from .models import AnomalyLevel, AnomalySignal
 
 
-class _FallbackStats:
-    """备用统计量实现"""
-    
-    class Mean:
-        def __init__(self):
-            self._count = 0
-            self._mean = 0.0
-        
-        def update(self, x):
-            self._count += 1
-            self._mean += (x - self._mean) / self._count
-        
-        def get(self):
-            return self._mean if self._count > 0 else None
-    
-    class Var:
-        def __init__(self):
-            self._count = 0
-            self._mean = 0.0
-            self._m2 = 0.0
-        
-        def update(self, x):
-            self._count += 1
-            delta = x - self._mean
-            self._mean += delta / self._count
-            delta2 = x - self._mean
-            self._m2 += delta * delta2
-        
-        def get(self):
-            if self._count < 2:
-                return None
-            return self._m2 / (self._count - 1)
-    
-    class RollingMean:
-        def __init__(self, window_size=20):
-            self._window = deque(maxlen=window_size)
-        
-        def update(self, x):
-            self._window.append(x)
-        
-        def get(self):
-            if len(self._window) == 0:
-                return None
-            return np.mean(self._window)
-    
-    class RollingVar:
-        def __init__(self, window_size=20):
-            self._window = deque(maxlen=window_size)
-        
-        def update(self, x):
-            self._window.append(x)
-        
-        def get(self):
-            if len(self._window) < 2:
-                return None
-            return np.var(self._window, ddof=1)
-
-
-class _FallbackAnomaly:
-    """备用异常检测实现"""
-    
-    class GaussianScorer:
-        def __init__(self):
-            self._mean = 0.0
-            self._var = 0.0
-            self._count = 0
-        
-        def update(self, x):
-            self._count += 1
-            delta = x - self._mean
-            self._mean += delta / self._count
-            delta2 = x - self._mean
-            self._var += delta * delta2
-        
-        def score_one(self, x):
-            if self._count < 2:
-                return 0.0
-            std = np.sqrt(self._var / (self._count - 1))
-            if std == 0:
-                return 0.0
-            return abs(x - self._mean) / std
-
-
 class RiverEngine:
     """
     River 引擎 - 基础层/常态层
@@ -131,25 +41,18 @@ class RiverEngine:
         
         # Symbol 映射
         self._symbol_to_idx: Dict[str, int] = {}
+        self._idx_to_symbol: List[str] = []
         
-        # 选择使用的统计量类
-        if RIVER_AVAILABLE:
-            self._MeanClass = stats.Mean
-            self._VarClass = stats.Var
-            self._GaussianScorerClass = anomaly.GaussianScorer
-        else:
-            self._MeanClass = _FallbackStats.Mean
-            self._VarClass = _FallbackStats.Var
-            self._GaussianScorerClass = _FallbackAnomaly.GaussianScorer
-        
-        # 统计量 (每个symbol独立)
-        self._mean_estimators: Dict = {}
-        self._var_estimators: Dict = {}
-        self._anomaly_detectors: Dict = {}
+        # 流式统计量 (Welford): 样本数 / 均值 / 二阶中心矩
+        self._count = np.zeros(max_symbols, dtype=np.int64)
+        self._mean = np.zeros(max_symbols)
+        self._m2 = np.zeros(max_symbols)
         
-        # 历史数据缓存
-        self._price_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=history_window))
-        self._volume_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=history_window))
+        # 历史数据环形缓冲: 第 idx 行为该 symbol 最近 history_window 个样本
+        self._price_ring = np.zeros((max_symbols, history_window))
+        self._volume_ring = np.zeros((max_symbols, history_window))
+        self._ring_pos = np.zeros(max_symbols, dtype=np.int64)
+        self._ring_count = np.zeros(max_symbols, dtype=np.int64)
         
         # 异常分数缓存
         self._anomaly_scores = np.zeros(max_symbols)
@@ -169,11 +72,7 @@ class RiverEngine:
         
         idx = len(self._symbol_to_idx)
         self._symbol_to_idx[symbol] = idx
-        
-        # 初始化统计量
-        self._mean_estimators[symbol] = self._MeanClass()
-        self._var_estimators[symbol] = self._VarClass()
-        self._anomaly_detectors[symbol] = self._GaussianScorerClass()
+        self._idx_to_symbol.append(symbol)
         
         return True
     
@@ -190,62 +89,120 @@ class RiverEngine:
         返回:
             AnomalySignal 如果检测到异常，否则 None
         """
-        if symbol not in self._symbol_to_idx:
+        idx = self._symbol_to_idx.get(symbol)
+        if idx is None:
             return None
         
-        idx = self._symbol_to_idx[symbol]
-        
-        # 更新历史
-        self._price_history[symbol].append(price)
-        self._volume_history[symbol].append(volume)
+        signals = self._process_slots(
+            np.array([idx]), np.array([0]), np.array([price], dtype=np.float64),
+            np.array([volume], dtype=np.float64), timestamp
+        )
+        return signals[0][1] if signals else None
+    
+    def process_batch(
+        self,
+        positions: np.ndarray,
+        prices: np.ndarray,
+        volumes: np.ndarray,
+        timestamp: float
+    ) -> List[Tuple[int, AnomalySignal]]:
+        """
+        批量处理一个快照
         
-        # 提取特征
-        features = self._extract_features(symbol, price, volume)
+        Args:
+            positions: 每行对应的槽位（-1 表示未注册，跳过）
+            prices: 价格数组
+            volumes: 成交量数组
+            timestamp: 时间戳
         
-        # 更新 River 统计量
-        mean_est = self._mean_estimators[symbol]
-        var_est = self._var_estimators[symbol]
-        anomaly_det = self._anomaly_detectors[symbol]
+        返回:
+            [(行号, AnomalySignal)]，按行号升序；结果与逐行调用 process_tick 相同
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        rows = np.flatnonzero(positions >= 0)
+        signals: List[Tuple[int, AnomalySignal]] = []
+        
+        # 同一 symbol 在快照中重复出现时分多轮处理，保证逐 tick 的先后顺序
+        while len(rows):
+            _, first = np.unique(positions[rows], return_index=True)
+            if len(first) == len(rows):
+                batch, rows = rows, rows[:0]
+            else:
+                first.sort()
+                batch = rows[first]
+                rows = np.delete(rows, first)
+            signals.extend(self._process_slots(
+                positions[batch], batch, prices[batch], volumes[batch], timestamp
+            ))
+        
+        signals.sort(key=lambda item: item[0])
+        return signals
+    
+    def _process_slots(
+        self,
+        idx: np.ndarray,
+        rows: np.ndarray,
+        prices: np.ndarray,
+        volumes: np.ndarray,
+        timestamp: float
+    ) -> List[Tuple[int, AnomalySignal]]:
+        """处理一组互不重复的槽位"""
+        # 更新历史
+        pos = self._ring_pos[idx]
+        self._price_ring[idx, pos] = prices
+        self._volume_ring[idx, pos] = volumes
+        self._ring_pos[idx] = (pos + 1) % self.history_window
+        self._ring_count[idx] = np.minimum(self._ring_count[idx] + 1, self.history_window)
         
         # 计算预测值 (使用均值作为简单预测)
-        predicted = mean_est.get() if mean_est.get() is not None else price
+        count = self._count[idx]
+        predicted = np.where(count > 0, self._mean[idx], prices)
         
         # 更新统计量
-        mean_est.update(price)
-        var_est.update(price)
+        count = count + 1
+        delta = prices - self._mean[idx]
+        mean = self._mean[idx] + delta / count
+        m2 = self._m2[idx] + delta * (prices - mean)
+        self._count[idx] = count
+        self._mean[idx] = mean
+        self._m2[idx] = m2
         
         # 计算残差
-        residual = abs(price - predicted)
+        residual = np.abs(prices - predicted)
         
         # 异常检测 - 使用基于标准差的方法
-        std = np.sqrt(var_est.get()) if var_est.get() is not None else 0
-        if std > 0:
-            anomaly_score = residual / std
-        else:
-            anomaly_score = 0.0
+        var = np.divide(m2, count - 1, out=np.zeros(len(idx)), where=count >= 2)
+        std = np.sqrt(var)
+        anomaly_score = np.divide(residual, std, out=np.zeros(len(idx)), where=std > 0)
         
         self._anomaly_scores[idx] = anomaly_score
         self._last_update[idx] = timestamp
-        self._processed_count += 1
+        self._processed_count += len(idx)
         
         # 判断异常等级
-        anomaly_level = self._classify_anomaly(anomaly_score)
-        
-        if anomaly_level != AnomalyLevel.NORMAL:
+        signals = []
+        for k in np.flatnonzero(anomaly_score >= self.anomaly_threshold_weak):
+            score = float(anomaly_score[k])
             self._anomaly_count += 1
-            return AnomalySignal(
-                symbol=symbol,
-                anomaly_score=anomaly_score,
-                anomaly_level=anomaly_level,
-                features=features,
+            signals.append((int(rows[k]), AnomalySignal(
+                symbol=self._idx_to_symbol[idx[k]],
+                anomaly_score=score,
+                anomaly_level=self._classify_anomaly(score),
+                features=self._extract_features(int(idx[k]), float(prices[k]), float(volumes[k])),
                 timestamp=timestamp
-            )
-        
-        return None
+            )))
+        return signals
+    
+    def _history(self, idx: int) -> Tuple[List[float], List[float]]:
+        """按时间顺序取出单个 symbol 的历史（旧 → 新）"""
+        count = int(self._ring_count[idx])
+        order = (int(self._ring_pos[idx]) - count + np.arange(count)) % self.history_window
+        return self._price_ring[idx, order].tolist(), self._volume_ring[idx, order].tolist()
     
     def _extract_features(
         self,
-        symbol: str,
+        idx: int,
         price: float,
         volume: float
     ) -> Dict[str, float]:
@@ -258,8 +215,7 @@ class RiverEngine:
             'volatility': 0.0
         }
 
-        prices = list(self._price_history[symbol])
-        volumes = list(self._volume_history[symbol])
+        prices, volumes = self._history(idx)
 
         if len(prices) >= 2:
             prev_price = prices[-2]
@@ -322,14 +278,13 @@ class RiverEngine:
     def reset(self):
         """重置引擎"""
         self._symbol_to_idx.clear()
-        self._mean_estimators.clear()
-        self._var_estimators.clear()
-        self._anomaly_detectors.clear()
-        self._price_history.clear()
-        self._volume_history.clear()
+        self._idx_to_symbol.clear()
+        self._count.fill(0)
+        self._mean.fill(0.0)
+        self._m2.fill(0.0)
+        self._ring_pos.fill(0)
+        self._ring_count.fill(0)
         self._anomaly_scores.fill(0.0)
         self._last_update.fill(0.0)
         self._processed_count = 0
         self._anomaly_count = 0
-
-
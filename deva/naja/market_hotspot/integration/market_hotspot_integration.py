@@ -245,23 +245,31 @@ class MarketHotspotIntegration:
             log.info(f"共注册 {len(self._blocks)} 个题材名称到tracker")
 
             try:
-                db = NB("quant_snapshot_5min_window")
-                if db.keys():
-                    latest_key = sorted(db.keys())[-1]
-                    df = db[latest_key]
-                    if isinstance(df, pd.DataFrame):
-                        if 'code' in df.columns and 'name' in df.columns:
-                            for _, row in df.iterrows():
-                                symbol = str(row['code'])
-                                name = row.get('name', symbol)
-                                if symbol and name and name != symbol:
-                                    tracker.register_symbol_name(symbol, name)
-                        elif 'code' in df.columns and 'stock_name' in df.columns:
-                            for _, row in df.iterrows():
-                                symbol = str(row['code'])
-                                name = row.get('stock_name', symbol)
-                                if symbol and name and name != symbol:
-                                    tracker.register_symbol_name(symbol, name)
+                from deva.naja.market_hotspot.data.snapshot_store import get_snapshot_store
+
+                df = None
+                store = get_snapshot_store()
+                latest_ts = store.latest_timestamp()
+                if latest_ts is not None:
+                    df = store.get(latest_ts, columns=["name"])
+                else:
+                    db = NB("quant_snapshot_5min_window")
+                    if db.keys():
+                        latest_key = sorted(db.keys())[-1]
+                        df = db[latest_key]
+                if isinstance(df, pd.DataFrame):
+                    if 'code' in df.columns and 'name' in df.columns:
+                        for _, row in df.iterrows():
+                            symbol = str(row['code'])
+                            name = row.get('name', symbol)
+                            if symbol and name and name != symbol:
+                                tracker.register_symbol_name(symbol, name)
+                    elif 'code' in df.columns and 'stock_name' in df.columns:
+                        for _, row in df.iterrows():
+                            symbol = str(row['code'])
+                            name = row.get('stock_name', symbol)
+                            if symbol and name and name != symbol:
+                                tracker.register_symbol_name(symbol, name)
             except Exception as e:
                 log.debug(f"从行情数据注册个股名称失败: {e}")
 
@@ -15,9 +15,10 @@ from ..data.fetch_config import FetchConfig
 from ..engine import DualEngineCoordinator
 from ..scheduling import FrequencyScheduler, FrequencyLevel, AdaptiveFrequencyController, StrategyAllocator, StrategyRegistry
 from ..core import GlobalHotspotEngine, MarketSnapshot, BlockHotspotEngine, BlockConfig, WeightPool, WeightPoolView, MarketContext
+from ..core.snapshot_result import SnapshotResult
 from .system_config import MarketHotspotSystemConfig, StepResult, FallbackConfig
 import numpy as np
-from typing import Dict, List, Optional, Any, Tuple, Callable
+from typing import Dict, List, Mapping, Optional, Any, Tuple, Callable
 import time
 import asyncio
 import logging
@@ -88,7 +89,8 @@ class MarketHotspotSystem:
         self._last_global_hotspot = 0.0
         self._last_activity = 0.0
         self._last_block_hotspot: Dict[str, float] = {}
-        self._last_symbol_weights: Dict[str, float] = {}
+        # 最近一次的个股权重: 字典或 SnapshotResult（读取时按需展开）
+        self._symbol_weight_sources: Dict[str, Any] = {'CN': {}, 'US': {}}
 
         # 股票名称缓存
         self._symbol_name_cache: Dict[str, str] = {}
@@ -97,7 +99,6 @@ class MarketHotspotSystem:
         self._us_last_global_hotspot: float = 0.0
         self._us_last_activity: float = 0.0
         self._us_last_block_hotspot: Dict[str, float] = {}
-        self._us_last_symbol_weights: Dict[str, float] = {}
         self._us_last_symbol_snapshot: Dict[str, Dict[str, Any]] = {}
         self._us_last_snapshot_time: float = 0.0
 
@@ -134,6 +135,28 @@ class MarketHotspotSystem:
         # 注册指数符号到频率调度器（指数始终为高频）
         self._register_index_symbols()
 
+    @property
+    def _last_symbol_weights(self) -> Dict[str, float]:
+        return self._symbol_weights_of('CN')
+
+    @_last_symbol_weights.setter
+    def _last_symbol_weights(self, value):
+        self._symbol_weight_sources['CN'] = value
+
+    @property
+    def _us_last_symbol_weights(self) -> Dict[str, float]:
+        return self._symbol_weights_of('US')
+
+    @_us_last_symbol_weights.setter
+    def _us_last_symbol_weights(self, value):
+        self._symbol_weight_sources['US'] = value
+
+    def _symbol_weights_of(self, market: str) -> Dict[str, float]:
+        source = self._symbol_weight_sources.get(market) or {}
+        if isinstance(source, SnapshotResult):
+            return source['symbol_weights']
+        return source
+
     INDEX_SYMBOLS = ['CN_SH', 'CN_HS300', 'CN_CHINEXT', 'US_NQ', 'US_ES', 'US_YM']
 
     # === 动态路由属性（根据当前市场返回对应上下文） ===
@@ -240,6 +263,7 @@ class MarketHotspotSystem:
         log.debug(f"[MarketHotspotSystem] 题材列表(前10个): {[c.name for c in list(self.block_hotspot._blocks.values())[:10]]}")
 
         # 注册个股
+        self._get_context(self._current_market).universe.intern_many(symbol_block_map)
         for symbol, block_ids in symbol_block_map.items():
             self.weight_pool.register_symbol(symbol, block_ids)
             self.frequency_scheduler.register_symbol(symbol)
@@ -411,13 +435,15 @@ class MarketHotspotSystem:
                 timestamp=time.time(),
                 market=market
             )
-            log.debug(f"[MarketHotspotSystem] process_snapshot 完成: global_hotspot={result.get('global_hotspot', 'N/A'):.3f}, block_count={len(result.get('block_hotspot', {}))}, symbol_weights_count={len(result.get('symbol_weights', {}))}")
+            log.debug("[MarketHotspotSystem] process_snapshot 完成: global_hotspot=%.3f, block_count=%d, symbol_weights_count=%d",
+                      result.get('global_hotspot', 0.0), len(result.get('block_hotspot', {})), len(result.weight_symbols))
 
             try:
                 from deva.naja.market_hotspot.tracking.history_tracker import get_history_tracker
                 tracker = get_history_tracker()
                 if tracker:
-                    symbol_weights = result.get('symbol_weights', {})
+                    # 按权重数组记录，不展开 symbol → 权重字典
+                    symbol_weights = result.weight_arrays()
                     block_hotspot = result.get('block_hotspot', {})
                     global_attn = result.get('global_hotspot', 0.5)
                     activity = result.get('activity', 0.5)
@@ -645,10 +671,13 @@ class MarketHotspotSystem:
         block_ids: np.ndarray,
         timestamp: float,
         market: str = 'CN'
-    ) -> Dict[str, Any]:
+    ) -> SnapshotResult:
         """
         处理市场快照（带优雅降级和线程安全，支持双市场）
 
+        各阶段通过 ctx.universe 对齐槽位、以数组传递权重和档位，
+        不再在阶段之间来回构造 symbol 字典。
+
         Args:
             symbols: 股票代码数组
             returns: 涨跌幅数组 (%)
@@ -659,7 +688,8 @@ class MarketHotspotSystem:
             market: 市场标识 ('CN' 或 'US')
 
         Returns:
-            调度决策结果
+            调度决策结果（SnapshotResult，按旧结果字典的键读写；
+            symbol_weights / frequency_levels 字典在首次访问时生成）
         """
         if not self._initialized:
             raise RuntimeError("MarketHotspotSystem not initialized. Call initialize() first.")
@@ -763,15 +793,23 @@ class MarketHotspotSystem:
             else:
                 self._last_block_hotspot = block_hotspot
 
+        # 权重 / 档位在各阶段间以数组传递，字典视图由 SnapshotResult 按需生成
+        universe = ctx.universe
+        weight_symbols = weights = None
+        level_symbols = levels = None
+
         should_execute, fallback = self._get_step_result('symbol_weights', {})
         if should_execute:
             try:
-                symbol_weights = weight_pool.update(
-                    symbols, returns, volumes, block_hotspot, timestamp)
+                pool_positions = universe.positions(symbols, weight_pool._symbol_to_idx)
+                weights = weight_pool.update_array(
+                    pool_positions, returns, volumes, block_hotspot, timestamp).copy()
+                weight_symbols = universe.stage_symbols(weight_pool._symbol_to_idx)
                 self._record_step_success('symbol_weights')
             except Exception as e:
                 log.error(f"[Step 3 WeightPool] 失败: {e}")
                 self._record_step_failure('symbol_weights')
+                weights = None
                 symbol_weights = fallback if fallback else {}
                 result['degraded'] = True
                 result['degraded_steps'].append('symbol_weights')
@@ -781,22 +819,24 @@ class MarketHotspotSystem:
             result['degraded'] = True
             result['degraded_steps'].append('symbol_weights')
 
-        with self._cache_lock:
-            if market == 'US':
-                self._us_last_symbol_weights = symbol_weights
-            else:
-                self._last_symbol_weights = symbol_weights
-
         should_execute, fallback = self._get_step_result('frequency_scheduler', {})
         if should_execute:
             try:
                 freq_config = frequency_controller.adapt(global_hotspot, timestamp)
                 frequency_scheduler.config = freq_config
-                frequency_levels = frequency_scheduler.schedule(symbol_weights, timestamp)
+                if weights is not None:
+                    src, dst = universe.translate(weight_pool._symbol_to_idx, frequency_scheduler._symbol_to_idx)
+                    scheduler_weights = np.full(len(frequency_scheduler._symbol_to_idx), np.nan)
+                    scheduler_weights[dst] = weights[src]
+                    levels = frequency_scheduler.schedule_array(scheduler_weights, timestamp)[dst]
+                    level_symbols = universe.stage_symbols(frequency_scheduler._symbol_to_idx)[dst]
+                else:
+                    frequency_levels = frequency_scheduler.schedule(symbol_weights, timestamp)
                 self._record_step_success('frequency_scheduler')
             except Exception as e:
                 log.error(f"[Step 4 FrequencyScheduler] 失败: {e}")
                 self._record_step_failure('frequency_scheduler')
+                levels = None
                 frequency_levels = fallback if fallback else {}
                 result['degraded'] = True
                 result['degraded_steps'].append('frequency_scheduler')
@@ -806,11 +846,33 @@ class MarketHotspotSystem:
             result['degraded'] = True
             result['degraded_steps'].append('frequency_scheduler')
 
+        snapshot_result = SnapshotResult(
+            {
+                'timestamp': timestamp,
+                'market': market,
+                'latency_ms': 0.0,
+                'global_hotspot': global_hotspot,
+                'block_hotspot': block_hotspot,
+                'symbol_weights': None if weights is not None else symbol_weights,
+                'frequency_levels': None if levels is not None else frequency_levels,
+            },
+            weight_symbols=weight_symbols, weights=weights,
+            level_symbols=level_symbols, levels=levels,
+        )
+
+        with self._cache_lock:
+            if market == 'US':
+                self._us_last_symbol_weights = snapshot_result
+            else:
+                self._last_symbol_weights = snapshot_result
+
         should_execute, fallback = self._get_step_result('strategy_allocation', {})
         if should_execute:
             try:
+                # 分配器只看权重前 50 的个股
+                top_weights = snapshot_result.top_weights(50) if weights is not None else symbol_weights
                 strategy_allocation = strategy_allocator.allocate(
-                    global_hotspot, block_hotspot, symbol_weights, timestamp
+                    global_hotspot, block_hotspot, top_weights, timestamp
                 )
                 self._record_step_success('strategy_allocation')
             except Exception as e:
@@ -829,20 +891,23 @@ class MarketHotspotSystem:
         should_execute, fallback = self._get_step_result('dual_engine', [])
         if should_execute:
             try:
-                for i, symbol in enumerate(symbols):
-                    symbol_str = str(symbol)
-                    weight = symbol_weights.get(symbol_str, 1.0)
-                    pattern = dual_engine.process_tick(
-                        symbol=symbol_str,
-                        price=float(prices[i]),
-                        volume=float(volumes[i]),
-                        global_hotspot=global_hotspot,
-                        block_hotspot=block_hotspot,
-                        symbol_weight=weight,
-                        timestamp=timestamp
-                    )
-                    if pattern:
-                        pattern_signals.append(pattern)
+                if weights is not None:
+                    row_weights = np.ones(len(symbols))
+                    known = pool_positions >= 0
+                    row_weights[known] = weights[pool_positions[known]]
+                else:
+                    row_weights = np.fromiter(
+                        (symbol_weights.get(str(s), 1.0) for s in symbols), dtype=np.float64, count=len(symbols))
+                pattern_signals = dual_engine.process_batch(
+                    symbols=symbols,
+                    positions=universe.positions(symbols, dual_engine.river._symbol_to_idx),
+                    prices=prices,
+                    volumes=volumes,
+                    global_hotspot=global_hotspot,
+                    block_hotspot=block_hotspot,
+                    symbol_weights=row_weights,
+                    timestamp=timestamp
+                )
                 self._record_step_success('dual_engine')
             except Exception as e:
                 log.error(f"[Step 6 DualEngine] 失败: {e}")
@@ -876,21 +941,16 @@ class MarketHotspotSystem:
             result['degraded'] = False
             result['degraded_steps'] = []
 
-        final_result = {
-            'timestamp': timestamp,
-            'market': market,
+        snapshot_result._fields.update({
             'latency_ms': latency,
-            'global_hotspot': global_hotspot,
-            'block_hotspot': block_hotspot,
-            'symbol_weights': symbol_weights,
-            'frequency_levels': frequency_levels,
             'strategy_allocation': strategy_allocation,
             'pattern_signals': pattern_signals,
             'market_state': market_state,
             'dual_engine_summary': dual_engine_summary,
             'degraded': result['degraded'],
             'degraded_steps': result['degraded_steps'],
-        }
+        })
+        final_result = snapshot_result
 
         if market == 'US':
             try:
@@ -924,7 +984,7 @@ class MarketHotspotSystem:
             )
 
         self._publish_hotspot_event(market, global_hotspot, activity,
-                                    block_hotspot, symbol_weights, symbols,
+                                    block_hotspot, final_result.weights_view(), symbols,
                                     returns, volumes, prices)
 
         return final_result
@@ -1277,12 +1337,15 @@ class MarketHotspotSystem:
         self._us_context.strategy_allocator.reset()
         self._us_context.dual_engine.reset()
 
+        self._cn_context.universe.invalidate()
+        self._us_context.universe.invalidate()
+
         with self._cache_lock:
             self._processing_count = 0
             self._total_latency = 0.0
             self._last_global_hotspot = 0.0
             self._last_block_hotspot.clear()
-            self._last_symbol_weights.clear()
+            self._last_symbol_weights = {}
             self._last_valid_result = None
 
         self._step_failures.clear()
@@ -1294,13 +1357,16 @@ class MarketHotspotSystem:
         global_hotspot: float,
         activity: float,
         block_hotspot: Dict[str, float],
-        symbol_weights: Dict[str, float],
+        symbol_weights: Mapping[str, float],
         symbols: np.ndarray,
         returns: np.ndarray = None,
         volumes: np.ndarray = None,
         prices: np.ndarray = None,
     ):
-        """发布热点计算完成事件到事件总线（携带真实市场数据）"""
+        """发布热点计算完成事件到事件总线（携带真实市场数据）
+
+        symbol_weights 为 WeightsView，订阅方按 symbol 取值时才生成字典。
+        """
         try:
             from deva.naja.events import get_event_bus, HotspotComputedEvent
             event_bus = get_event_bus()
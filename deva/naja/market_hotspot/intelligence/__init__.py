@@ -30,7 +30,8 @@ from .propagation import (
     HotspotPropagation,
     PropagationEngine,
     RelationMatrix,
-    BlockRelation
+    BlockRelation,
+    LaggedCorrelationEngine
 )
 from .strategy_learner import (
     StrategyLearning,
@@ -74,6 +75,7 @@ __all__ = [
     "PropagationEngine",
     "RelationMatrix",
     "BlockRelation",
+    "LaggedCorrelationEngine",
     "StrategyLearning",
     "MarketStateDetector",
     "BanditStrategySelector",
@@ -33,6 +33,171 @@ class BlockRelation:
     strength: float
 
 
+def lagged_cross_correlation(sources: np.ndarray, targets: np.ndarray, max_delay: int) -> np.ndarray:
+    """批量滞后相关系数
+
+    Args:
+        sources: (ns, L) 源题材历史（按时间升序、右对齐）
+        targets: (nt, L) 目标题材历史
+        max_delay: 最大滞后
+
+    Returns:
+        (max_delay, ns, nt)，第 d-1 层为 corr(source[:-d], target[d:])；
+        任一窗口方差为 0 时为 NaN（与 np.corrcoef 一致）
+    """
+    length = sources.shape[1]
+    out = np.full((max_delay, len(sources), len(targets)), np.nan)
+
+    def _normalize(x):
+        centered = x - x.mean(axis=1, keepdims=True)
+        norm = np.sqrt((centered * centered).sum(axis=1, keepdims=True))
+        return centered / norm
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for delay in range(1, max_delay + 1):
+            if length - delay < 2:
+                break
+            za = _normalize(sources[:, :length - delay])
+            zb = _normalize(targets[:, delay:])
+            out[delay - 1] = np.clip(za @ zb.T, -1.0, 1.0)
+    return out
+
+
+class LaggedCorrelationEngine:
+    """
+    题材滞后相关引擎
+
+    - 历史存放在 (blocks × window) 环形矩阵中，record() 为 O(1)
+    - 对所有题材对一次性计算 1..max_delay 的滞后相关（每个滞后一次矩阵乘法）
+    - 增量模式：只重算自上次计算以来有新样本的题材所在的行和列
+
+    结果与 RelationMatrix._compute_lagged_correlation / _estimate_delay 的逐对计算一致：
+    两段历史按最新样本右对齐、截到较短的长度；长度不足 max_delay + 5 的题材相关为 0、延迟为 1。
+    """
+
+    def __init__(self, window: int = 50, max_delay: int = 10, capacity: int = 64):
+        self.window = window
+        self.max_delay = max_delay
+
+        self._ids: Dict[str, int] = {}
+        self._capacity = 0
+        self._buf = np.zeros((0, window))
+        self._pos = np.zeros(0, dtype=np.int64)
+        self._len = np.zeros(0, dtype=np.int64)
+        self._corr = np.zeros((0, 0))
+        self._delay = np.ones((0, 0), dtype=np.int16)
+        self._dirty: set = set()
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        n = len(self._ids)
+        buf = np.zeros((capacity, self.window))
+        pos = np.zeros(capacity, dtype=np.int64)
+        lengths = np.zeros(capacity, dtype=np.int64)
+        corr = np.zeros((capacity, capacity))
+        delay = np.ones((capacity, capacity), dtype=np.int16)
+        buf[:n] = self._buf[:n]
+        pos[:n] = self._pos[:n]
+        lengths[:n] = self._len[:n]
+        corr[:n, :n] = self._corr[:n, :n]
+        delay[:n, :n] = self._delay[:n, :n]
+        self._buf, self._pos, self._len = buf, pos, lengths
+        self._corr, self._delay = corr, delay
+        self._capacity = capacity
+
+    def _index(self, block_id: str) -> int:
+        idx = self._ids.get(block_id)
+        if idx is None:
+            idx = len(self._ids)
+            if idx >= self._capacity:
+                self._grow(max(2 * self._capacity, 1))
+            self._ids[block_id] = idx
+        return idx
+
+    def record(self, block_id: str, value: float):
+        """追加一个样本"""
+        idx = self._index(block_id)
+        self._buf[idx, self._pos[idx]] = value
+        self._pos[idx] = (self._pos[idx] + 1) % self.window
+        self._len[idx] = min(self._len[idx] + 1, self.window)
+        self._dirty.add(idx)
+
+    def history(self, block_id: str) -> np.ndarray:
+        idx = self._ids.get(block_id)
+        if idx is None:
+            return np.empty(0)
+        return self._aligned(np.array([idx]), int(self._len[idx]))[0]
+
+    def _aligned(self, rows: np.ndarray, length: int) -> np.ndarray:
+        """rows 的最近 length 个样本（按时间升序）"""
+        cols = (self._pos[rows, None] - length + np.arange(length)) % self.window
+        return self._buf[rows[:, None], cols]
+
+    def _compute(self, src: np.ndarray, tgt: np.ndarray):
+        """重算 src × tgt 的最佳相关与延迟，写入缓存"""
+        min_len = self.max_delay + 5
+        src = src[self._len[src] >= min_len]
+        tgt = tgt[self._len[tgt] >= min_len]
+        if not len(src) or not len(tgt):
+            return
+
+        len_s, len_t = self._len[src], self._len[tgt]
+        for length in np.unique(np.minimum.outer(len_s, len_t)):
+            s_sel, t_sel = len_s >= length, len_t >= length
+            s_rows, t_rows = src[s_sel], tgt[t_sel]
+            lagged = lagged_cross_correlation(
+                self._aligned(s_rows, length), self._aligned(t_rows, length), self.max_delay
+            )
+            strength = np.nan_to_num(np.abs(lagged))
+            best = np.argmax(strength, axis=0)
+            corr = np.take_along_axis(np.nan_to_num(lagged), best[None], axis=0)[0]
+
+            # _estimate_delay 只看 1..min(max_delay, n//3)-1 的滞后（n 为源题材历史长度）
+            delay_lags = np.minimum(self.max_delay, len_s[s_sel] // 3) - 1
+            allowed = np.arange(self.max_delay)[:, None, None] < delay_lags[None, :, None]
+            delay = np.argmax(np.where(allowed, strength, -1.0), axis=0) + 1
+
+            pairs = (len_s[s_sel][:, None] == length) | (len_t[t_sel][None, :] == length)
+            grid = np.ix_(s_rows, t_rows)
+            self._corr[grid] = np.where(pairs, corr, self._corr[grid])
+            self._delay[grid] = np.where(pairs, delay, self._delay[grid])
+
+    def update(self) -> int:
+        """增量重算有新样本的题材，返回重算的题材数"""
+        if not self._dirty:
+            return 0
+        dirty = np.fromiter(sorted(self._dirty), dtype=np.int64)
+        self._dirty.clear()
+        everyone = np.arange(len(self._ids))
+        clean = np.setdiff1d(everyone, dirty, assume_unique=True)
+
+        self._corr[dirty, :] = 0.0
+        self._corr[:, dirty] = 0.0
+        self._delay[dirty, :] = 1
+        self._delay[:, dirty] = 1
+        self._compute(dirty, everyone)
+        self._compute(clean, dirty)
+        return len(dirty)
+
+    def best_lags(self, block_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """block_ids 两两之间的 (最佳相关 [source, target], 延迟 [source, target])"""
+        self.update()
+        rows = np.array([self._ids.get(b, -1) for b in block_ids], dtype=np.int64)
+        corr = np.zeros((len(rows), len(rows)))
+        delay = np.ones((len(rows), len(rows)), dtype=np.int16)
+        known = np.flatnonzero(rows >= 0)
+        if len(known):
+            grid = np.ix_(rows[known], rows[known])
+            corr[np.ix_(known, known)] = self._corr[grid]
+            delay[np.ix_(known, known)] = self._delay[grid]
+        return corr, delay
+
+    def reset(self):
+        self._ids.clear()
+        self._dirty.clear()
+        self._grow(self._capacity)
+
+
 class RelationMatrix:
     """
     题材关系矩阵
@@ -64,6 +229,7 @@ class RelationMatrix:
 
         self._block_history: Dict[str, List[float]] = {}
         self._history_window = 50
+        self._lag_engine = LaggedCorrelationEngine(window=self._history_window)
 
         self._relation_quality_scores: Dict[str, float] = {}
         self._auto_blacklist_enabled: bool = True
@@ -184,6 +350,8 @@ class RelationMatrix:
         if len(self._block_history[block_id]) > self._history_window:
             self._block_history[block_id] = self._block_history[block_id][-self._history_window:]
 
+        self._lag_engine.record(block_id, hotspot)
+
     def _should_blacklist(self, block_name: str) -> bool:
         """检查题材是否应该加入黑名单（兼容旧接口）"""
         return self._is_noise_by_pattern(block_name, block_name)
@@ -272,25 +440,29 @@ class RelationMatrix:
         return set()
 
     def learn_relations(self, min_correlation: float = 0.3):
-        """从历史数据学习题材关系"""
+        """从历史数据学习题材关系
+
+        所有题材对的滞后相关与延迟由 LaggedCorrelationEngine 一次批量（增量）算出。
+        """
         self._auto_update_blacklist()
         detector = self._get_noise_detector()
         blocks = [s for s in self._block_history.keys()]
         if detector:
             blocks = detector.get_valid_blocks(blocks)
-        
-        for i, source in enumerate(blocks):
-            for j, target in enumerate(blocks):
-                if i >= j:
-                    continue
-                
-                correlation = self._compute_lagged_correlation(source, target)
-                
-                if abs(correlation) > min_correlation:
-                    delay = self._estimate_delay(source, target)
-                    self.set_relation(source, target, abs(correlation), delay, 1.0)
-                    self.set_relation(target, source, abs(correlation), delay, 1.0)
-    
+        if len(blocks) < 2:
+            return
+
+        corr, delay = self._lag_engine.best_lags(blocks)
+        rows, cols = np.triu_indices(len(blocks), k=1)
+        selected = np.abs(corr[rows, cols]) > min_correlation
+
+        for i, j in zip(rows[selected], cols[selected]):
+            source, target = blocks[i], blocks[j]
+            correlation = abs(float(corr[i, j]))
+            pair_delay = int(delay[i, j])
+            self.set_relation(source, target, correlation, pair_delay, 1.0)
+            self.set_relation(target, source, correlation, pair_delay, 1.0)
+
     def _compute_lagged_correlation(
         self,
         source: str,
@@ -387,6 +559,7 @@ class RelationMatrix:
         self._relation_matrix.clear()
         self._delay_matrix.clear()
         self._block_history.clear()
+        self._lag_engine.reset()
 
 
 class PropagationEngine:
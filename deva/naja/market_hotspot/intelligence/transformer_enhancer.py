@@ -208,21 +208,26 @@ class TransformerEnhancer:
         # 计算平均注意力权重
         avg_attn = np.mean(attn_weights, axis=(0, 1))  # 平均所有头
         
-        for i, block_i in enumerate(blocks):
-            for j, block_j in enumerate(blocks):
-                if i != j:
-                    attention = float(avg_attn[i, j])
-                    if attention > 0.1:  # 只保留注意力大于阈值的关系
-                        relationships.append({
-                            'source_block': block_i.get('block_id'),
-                            'source_name': block_i.get('name'),
-                            'target_block': block_j.get('block_id'),
-                            'target_name': block_j.get('name'),
-                            'attention': attention
-                        })
+        n = len(blocks)
+        avg_attn = avg_attn[:n, :n]
         
-        # 按注意力权重排序
-        relationships.sort(key=lambda x: x['attention'], reverse=True)
+        # 只保留注意力大于阈值的关系（不含自身）
+        mask = avg_attn > 0.1
+        np.fill_diagonal(mask, False)
+        src, dst = np.nonzero(mask)
+        attention = avg_attn[src, dst]
+        
+        # 按注意力权重排序（同值保持 (i, j) 顺序）
+        order = np.argsort(-attention, kind='stable')
+        for i, j, value in zip(src[order].tolist(), dst[order].tolist(), attention[order].tolist()):
+            block_i, block_j = blocks[i], blocks[j]
+            relationships.append({
+                'source_block': block_i.get('block_id'),
+                'source_name': block_i.get('name'),
+                'target_block': block_j.get('block_id'),
+                'target_name': block_j.get('name'),
+                'attention': value
+            })
         
         return relationships
     
@@ -14,10 +14,10 @@ Frequency Scheduler Module - 频率调度器
 """
 
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Callable
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
-from collections import defaultdict
 import time
 
 
@@ -90,6 +90,12 @@ class FrequencyScheduler:
 
         # 受保护的符号集合（指数等，始终保持HIGH档位）
         self._protected_symbols: set = set()
+
+        # symbol 映射版本号，注册 / 恢复状态时递增
+        self._symbol_version = 0
+
+        # 批量查询用的 symbol 索引缓存: (映射版本号, pd.Index, 槽位数组, 槽位 symbol 数组)
+        self._symbol_index_cache: Optional[Tuple[int, pd.Index, np.ndarray, np.ndarray]] = None
     
     def register_symbol(self, symbol: str) -> bool:
         """注册个股"""
@@ -102,6 +108,7 @@ class FrequencyScheduler:
         idx = len(self._symbol_to_idx)
         self._symbol_to_idx[symbol] = idx
         self._idx_to_symbol[idx] = symbol
+        self._symbol_version += 1
         
         return True
 
@@ -127,33 +134,65 @@ class FrequencyScheduler:
             timestamp: 当前时间戳
             
         Returns:
-            symbol -> FrequencyLevel 映射
+            symbol -> FrequencyLevel 映射（仅包含已注册且出现在 symbol_weights 中的个股）
         """
-        # 计算目标频率
-        target_levels = self._calc_target_levels(symbol_weights)
-        
-        # 应用滞后和冷静期
-        final_levels = self._apply_constraints(
-            target_levels, symbol_weights, timestamp
-        )
-        
-        # 更新状态
-        changes = 0
-        for symbol, level in final_levels.items():
-            idx = self._symbol_to_idx.get(symbol)
-            if idx is not None:
-                old_level = self._current_levels[idx]
-                if old_level != level.value:
-                    self._current_levels[idx] = level.value
-                    self._last_switch_time[idx] = timestamp
-                    changes += 1
-                
-                self._last_weights[idx] = symbol_weights.get(symbol, 0.0)
-        
-        self._switch_count += changes
+        weights = self.weights_from_dict(symbol_weights)
+        levels = self.schedule_array(weights, timestamp)
+
+        present = np.flatnonzero(~np.isnan(weights))
+        symbols = self._slot_symbols()
+        return {symbols[idx]: FrequencyLevel(int(levels[idx])) for idx in present}
+
+    def weights_from_dict(self, symbol_weights: Dict[str, float]) -> np.ndarray:
+        """把权重字典对齐到 _symbol_to_idx 槽位，缺失的为 NaN"""
+        weights = np.full(len(self._symbol_to_idx), np.nan)
+        if symbol_weights:
+            index, slots = self._symbol_index()
+            pos = index.get_indexer(pd.Index(list(symbol_weights.keys())))
+            known = pos >= 0
+            values = np.fromiter(symbol_weights.values(), dtype=np.float64, count=len(symbol_weights))
+            weights[slots[pos[known]]] = values[known]
+        return weights
+
+    def schedule_array(self, weights: np.ndarray, timestamp: float) -> np.ndarray:
+        """
+        数组版频率调度
+
+        Args:
+            weights: 与 _symbol_to_idx 槽位对齐的权重数组，NaN 表示本次不参与调度
+            timestamp: 当前时间戳
+
+        Returns:
+            调度后全部已注册个股的档位数组（int8，按槽位）
+        """
+        n = len(self._symbol_to_idx)
+        weights = np.asarray(weights, dtype=np.float64)[:n]
+        if len(weights) < n:
+            weights = np.concatenate([weights, np.full(n - len(weights), np.nan)])
+
+        present = ~np.isnan(weights)
+        current = self._current_levels[:n]
+        target = self._target_levels(weights)
+
+        candidates = present & (target != current)
+        candidates &= (timestamp - self._last_switch_time[:n]) >= self.config.cooldown
+        candidates &= self._hysteresis_allows(current, target, weights)
+
+        # 最小变更原则: 按权重变化幅度从大到小，最多 max_changes 个
+        changed = np.flatnonzero(candidates)
+        if len(changed):
+            max_changes = max(1, int(n * self.config.min_change_ratio))
+            if len(changed) > max_changes:
+                delta = np.abs(weights[changed] - self._last_weights[changed])
+                changed = changed[np.argsort(-delta, kind='stable')[:max_changes]]
+            self._current_levels[changed] = target[changed]
+            self._last_switch_time[changed] = timestamp
+
+        self._last_weights[:n][present] = weights[present]
+        self._switch_count += len(changed)
         self._last_schedule_time = timestamp
-        
-        return final_levels
+
+        return self._current_levels[:n].copy()
 
     def recalculate_levels_from_weights(self):
         """从存储的权重重新计算所有符号的档位（用于状态恢复后）"""
@@ -182,137 +221,36 @@ class FrequencyScheduler:
 
         self._last_schedule_time = timestamp
 
-    def _calc_target_levels(
-        self,
-        symbol_weights: Dict[str, float]
-    ) -> Dict[str, FrequencyLevel]:
-        """计算目标频率档位"""
-        targets = {}
-
-        for symbol, weight in symbol_weights.items():
-            if symbol in self._protected_symbols:
-                targets[symbol] = FrequencyLevel.HIGH
-                continue
-
-            if weight < self.config.low_threshold:
-                level = FrequencyLevel.LOW
-            elif weight < self.config.high_threshold:
-                level = FrequencyLevel.MEDIUM
-            else:
-                level = FrequencyLevel.HIGH
+    def _target_levels(self, weights: np.ndarray) -> np.ndarray:
+        """按阈值计算目标档位，受保护符号固定为 HIGH"""
+        target = np.where(
+            weights < self.config.low_threshold, FrequencyLevel.LOW.value,
+            np.where(weights < self.config.high_threshold, FrequencyLevel.MEDIUM.value, FrequencyLevel.HIGH.value)
+        ).astype(np.int8)
+        if self._protected_symbols:
+            protected = [self._symbol_to_idx[s] for s in self._protected_symbols if s in self._symbol_to_idx]
+            target[protected] = FrequencyLevel.HIGH.value
+        return target
+
+    def _hysteresis_allows(self, current: np.ndarray, target: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """滞后机制: 跨越阈值时需超出 hysteresis（跨两档需超出 2 倍）"""
+        low, high, h = self.config.low_threshold, self.config.high_threshold, self.config.hysteresis
+        LOW, MEDIUM, HIGH = FrequencyLevel.LOW.value, FrequencyLevel.MEDIUM.value, FrequencyLevel.HIGH.value
+
+        allowed = np.ones(len(weights), dtype=bool)
+        rules = (
+            (LOW, MEDIUM, weights >= low + h),
+            (MEDIUM, LOW, weights <= low - h),
+            (MEDIUM, HIGH, weights >= high + h),
+            (HIGH, MEDIUM, weights <= high - h),
+            (LOW, HIGH, weights >= high + 2 * h),
+            (HIGH, LOW, weights <= low - 2 * h),
+        )
+        for cur, tgt, ok in rules:
+            transition = (current == cur) & (target == tgt)
+            allowed[transition] = ok[transition]
+        return allowed
 
-            targets[symbol] = level
-        
-        return targets
-    
-    def _apply_constraints(
-        self,
-        target_levels: Dict[str, FrequencyLevel],
-        symbol_weights: Dict[str, float],
-        timestamp: float
-    ) -> Dict[str, FrequencyLevel]:
-        """
-        应用约束:
-        1. 滞后机制
-        2. 冷静期
-        3. 最小变更原则
-        """
-        final_levels = {}
-        potential_changes = []
-        
-        # 第一遍: 识别可能的变更
-        for symbol, target in target_levels.items():
-            idx = self._symbol_to_idx.get(symbol)
-            if idx is None:
-                continue
-            
-            current = FrequencyLevel(self._current_levels[idx])
-            
-            if current == target:
-                final_levels[symbol] = target
-                continue
-            
-            # 检查冷静期
-            time_since_switch = timestamp - self._last_switch_time[idx]
-            if time_since_switch < self.config.cooldown:
-                final_levels[symbol] = current
-                continue
-            
-            # 检查滞后
-            weight = symbol_weights.get(symbol, 0.0)
-            last_weight = self._last_weights[idx]
-            
-            if self._should_switch_with_hysteresis(
-                current, target, weight, last_weight
-            ):
-                potential_changes.append((symbol, target, weight))
-            else:
-                final_levels[symbol] = current
-        
-        # 应用最小变更原则
-        if len(potential_changes) > 0:
-            # 按权重变化幅度排序，优先处理变化大的
-            potential_changes.sort(key=lambda x: abs(x[2] - self._last_weights[self._symbol_to_idx[x[0]]]), reverse=True)
-            
-            # 计算允许的最大变更数
-            total_symbols = len(self._symbol_to_idx)
-            max_changes = max(1, int(total_symbols * self.config.min_change_ratio))
-            
-            # 应用变更
-            for i, (symbol, target, _) in enumerate(potential_changes):
-                if i < max_changes:
-                    final_levels[symbol] = target
-                else:
-                    idx = self._symbol_to_idx[symbol]
-                    final_levels[symbol] = FrequencyLevel(self._current_levels[idx])
-        
-        return final_levels
-    
-    def _should_switch_with_hysteresis(
-        self,
-        current: FrequencyLevel,
-        target: FrequencyLevel,
-        weight: float,
-        last_weight: float
-    ) -> bool:
-        """判断是否应该在滞后机制下切换"""
-        if current == target:
-            return True
-        
-        # 计算权重变化方向
-        weight_change = weight - last_weight
-        
-        # 根据当前档位和目标档位确定阈值
-        if current == FrequencyLevel.LOW and target == FrequencyLevel.MEDIUM:
-            # 从低频升到中频: 需要超过 low_threshold + hysteresis
-            threshold = self.config.low_threshold + self.config.hysteresis
-            return weight >= threshold
-        
-        elif current == FrequencyLevel.MEDIUM and target == FrequencyLevel.LOW:
-            # 从中频降到低频: 需要低于 low_threshold - hysteresis
-            threshold = self.config.low_threshold - self.config.hysteresis
-            return weight <= threshold
-        
-        elif current == FrequencyLevel.MEDIUM and target == FrequencyLevel.HIGH:
-            # 从中频升到高频: 需要超过 high_threshold + hysteresis
-            threshold = self.config.high_threshold + self.config.hysteresis
-            return weight >= threshold
-        
-        elif current == FrequencyLevel.HIGH and target == FrequencyLevel.MEDIUM:
-            # 从高频降到中频: 需要低于 high_threshold - hysteresis
-            threshold = self.config.high_threshold - self.config.hysteresis
-            return weight <= threshold
-        
-        elif current == FrequencyLevel.LOW and target == FrequencyLevel.HIGH:
-            # 从低频直接升到高频: 需要大幅超过 high_threshold
-            return weight >= self.config.high_threshold + self.config.hysteresis * 2
-        
-        elif current == FrequencyLevel.HIGH and target == FrequencyLevel.LOW:
-            # 从高频直接降到低频: 需要大幅低于 low_threshold
-            return weight <= self.config.low_threshold - self.config.hysteresis * 2
-        
-        return True
-    
     def get_frequency_interval(self, level: FrequencyLevel) -> float:
         """获取频率档位对应的间隔时间"""
         if level == FrequencyLevel.LOW:
@@ -329,21 +267,60 @@ class FrequencyScheduler:
             return FrequencyLevel.LOW
         return FrequencyLevel(self._current_levels[idx])
     
+    def _symbol_cache(self):
+        key = self._symbol_version
+        cache = self._symbol_index_cache
+        if cache is None or cache[0] != key:
+            index = pd.Index(list(self._symbol_to_idx.keys()))
+            slots = np.fromiter(self._symbol_to_idx.values(), dtype=np.int64, count=len(index))
+            slot_symbols = np.empty(len(index), dtype=object)
+            slot_symbols[slots] = index.to_numpy(dtype=object)
+            cache = (key, index, slots, slot_symbols)
+            self._symbol_index_cache = cache
+        return cache
+
+    def _symbol_index(self) -> Tuple[pd.Index, np.ndarray]:
+        _, index, slots, _ = self._symbol_cache()
+        return index, slots
+
+    def _slot_symbols(self) -> np.ndarray:
+        """槽位 -> symbol 的 object 数组"""
+        return self._symbol_cache()[3]
+
+    def get_levels(self, symbols: Sequence[str]) -> np.ndarray:
+        """批量获取频率档位（int8 数组，未注册的为 LOW）"""
+        index, slots = self._symbol_index()
+        pos = index.get_indexer(pd.Index(symbols)) if len(index) else np.full(len(symbols), -1)
+        levels = np.full(len(pos), FrequencyLevel.LOW.value, dtype=np.int8)
+        known = pos >= 0
+        levels[known] = self._current_levels[slots[pos[known]]]
+        return levels
+
+    def get_level_array(self) -> np.ndarray:
+        """全部已注册个股的档位数组（int8，按槽位）"""
+        return self._current_levels[:len(self._symbol_to_idx)].copy()
+
+    def level_indices(self) -> Dict[FrequencyLevel, np.ndarray]:
+        """各档位对应的槽位索引数组"""
+        levels = self._current_levels[:len(self._symbol_to_idx)]
+        return {level: np.flatnonzero(levels == level.value) for level in FrequencyLevel}
+
+    def symbols_by_level(self) -> Dict[FrequencyLevel, List[str]]:
+        """一次性获取各档位的个股列表"""
+        symbols = self._slot_symbols()
+        return {level: symbols[idx].tolist() for level, idx in self.level_indices().items()}
+
     def get_symbols_by_level(self, level: FrequencyLevel) -> List[str]:
         """获取指定频率档位的所有个股"""
-        return [
-            symbol for symbol, idx in self._symbol_to_idx.items()
-            if self._current_levels[idx] == level.value
-        ]
+        levels = self._current_levels[:len(self._symbol_to_idx)]
+        return self._slot_symbols()[levels == level.value].tolist()
     
     def get_schedule_summary(self) -> Dict:
         """获取调度摘要"""
-        level_counts = defaultdict(int)
-        
-        for symbol, idx in self._symbol_to_idx.items():
-            level = FrequencyLevel(self._current_levels[idx])
-            level_counts[level.name] += 1
-        
+        levels = self._current_levels[:len(self._symbol_to_idx)]
+        counts = np.bincount(levels, minlength=len(FrequencyLevel))
+        level_counts = {level.name: int(counts[level.value]) for level in FrequencyLevel}
+
         return {
             'high_frequency': level_counts.get('HIGH', 0),
             'medium_frequency': level_counts.get('MEDIUM', 0),
@@ -398,6 +375,7 @@ class FrequencyScheduler:
 
             self._symbol_to_idx = state.get('symbol_to_idx', {})
             self._idx_to_symbol = {int(k): v for k, v in state.get('idx_to_symbol', {}).items()}
+            self._symbol_version += 1
 
             current_levels = state.get('current_levels', [])
             for i, level in enumerate(current_levels):
@@ -0,0 +1,190 @@
+"""
+SegmentLog - 追加式分段二进制记录日志
+
+热点历史的变化记录 / 题材事件按条追加，保存开销只与新增记录数有关::
+
+    <dir>/<name>.000001.seg
+    <dir>/<name>.000002.seg ...
+
+每个分段以 4 字节格式标识开头（b'HLM1' msgpack / b'HLJ1' 紧凑 JSON），
+之后是 [uint32 小端长度][payload] 记录流。分段超过 segment_bytes 后轮换；
+分段数超过 max_segments 时压缩为只含最近 keep 条记录的新分段。
+
+尾部不完整的记录视为未完成写入：读取时忽略，重新打开写入时截断。
+"""
+
+import json
+import os
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_LENGTH = struct.Struct('<I')
+_MAGIC_MSGPACK = b'HLM1'
+_MAGIC_JSON = b'HLJ1'
+
+
+def _encode(magic: bytes, record: Dict[str, Any]) -> bytes:
+    if magic == _MAGIC_MSGPACK:
+        return msgpack.packb(record, use_bin_type=True)
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _decode(magic: bytes, payload: bytes) -> Dict[str, Any]:
+    if magic == _MAGIC_MSGPACK:
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload.decode('utf-8'))
+
+
+def _scan(data: bytes) -> List[slice]:
+    """分段内容 → 完整记录的 payload 切片"""
+    out = []
+    pos = len(_MAGIC_JSON)
+    end = len(data)
+    while pos + _LENGTH.size <= end:
+        (length,) = _LENGTH.unpack_from(data, pos)
+        start = pos + _LENGTH.size
+        if start + length > end:
+            break
+        out.append(slice(start, start + length))
+        pos = start + length
+    return out
+
+
+class SegmentLog:
+    """单类记录（如 'changes'）的分段日志"""
+
+    def __init__(self, directory: str, name: str, keep: int = 200,
+                 segment_bytes: int = 1 << 20, max_segments: int = 4):
+        self.directory = directory
+        self.name = name
+        self.keep = keep
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._magic = _MAGIC_MSGPACK if msgpack is not None else _MAGIC_JSON
+        self._lock = threading.Lock()
+        self._checked: Optional[str] = None
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f'{self.name}.{number:06d}.seg')
+
+    def segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        prefix = f'{self.name}.'
+        names = sorted(f for f in os.listdir(self.directory) if f.startswith(prefix) and f.endswith('.seg'))
+        return [os.path.join(self.directory, f) for f in names]
+
+    def _number(self, path: str) -> int:
+        return int(os.path.basename(path).split('.')[-2])
+
+    def _read_segment(self, path: str) -> List[Dict[str, Any]]:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic = data[:len(_MAGIC_JSON)]
+        if magic not in (_MAGIC_JSON, _MAGIC_MSGPACK):
+            return []
+        if magic == _MAGIC_MSGPACK and msgpack is None:
+            raise RuntimeError(f'{path} 为 msgpack 格式，但未安装 msgpack')
+        return [_decode(magic, data[s]) for s in _scan(data)]
+
+    def _repair_tail(self, path: str):
+        """截断上次未写完的尾部记录（每个分段只检查一次）"""
+        if self._checked == path:
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        slices = _scan(data)
+        valid = slices[-1].stop if slices else len(_MAGIC_JSON)
+        if valid < len(data):
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+        self._checked = path
+
+    def _new_segment(self, number: int, payload: bytes = b'') -> str:
+        path = self._segment_path(number)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self._magic + payload)
+        os.replace(tmp, path)
+        self._checked = path
+        return path
+
+    def _pack(self, records: Sequence[Dict[str, Any]], magic: bytes) -> bytes:
+        parts = []
+        for record in records:
+            payload = _encode(magic, record)
+            parts.append(_LENGTH.pack(len(payload)))
+            parts.append(payload)
+        return b''.join(parts)
+
+    def append(self, records: Sequence[Dict[str, Any]]) -> int:
+        """追加记录，返回写入字节数"""
+        if not records:
+            return 0
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            segments = self.segments()
+            if segments:
+                active = segments[-1]
+                with open(active, 'rb') as f:
+                    magic = f.read(len(_MAGIC_JSON))
+                if magic != self._magic or os.path.getsize(active) >= self.segment_bytes:
+                    active = self._new_segment(self._number(active) + 1)
+                    segments.append(active)
+                    magic = self._magic
+                else:
+                    self._repair_tail(active)
+            else:
+                active = self._new_segment(1)
+                segments = [active]
+                magic = self._magic
+
+            data = self._pack(records, magic)
+            with open(active, 'ab') as f:
+                f.write(data)
+
+            if len(segments) > self.max_segments:
+                self._compact_locked(segments)
+            return len(data)
+
+    def rewrite(self, records: Sequence[Dict[str, Any]]):
+        """用给定记录替换全部分段"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            old = self.segments()
+            number = self._number(old[-1]) + 1 if old else 1
+            self._new_segment(number, self._pack(list(records)[-self.keep:], self._magic))
+            for path in old:
+                os.remove(path)
+
+    def _compact_locked(self, segments: List[str]):
+        records = self._tail_locked(self.keep, segments)
+        self._new_segment(self._number(segments[-1]) + 1, self._pack(records, self._magic))
+        for path in segments:
+            os.remove(path)
+
+    def _tail_locked(self, n: int, segments: List[str]) -> List[Dict[str, Any]]:
+        chunks = []
+        total = 0
+        for path in reversed(segments):
+            records = self._read_segment(path)
+            chunks.append(records)
+            total += len(records)
+            if total >= n:
+                break
+        out = [r for chunk in reversed(chunks) for r in chunk]
+        return out[-n:] if n > 0 else []
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """最近 n 条记录（只读取需要的分段）"""
+        with self._lock:
+            return self._tail_locked(n, self.segments())
+
+    def nbytes(self) -> int:
+        return sum(os.path.getsize(p) for p in self.segments())
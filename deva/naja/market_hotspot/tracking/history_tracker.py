@@ -15,9 +15,15 @@ import os
 import threading
 from typing import Dict, List, Optional, Any
 from collections import deque
+from itertools import islice
 from dataclasses import dataclass, field
 from datetime import datetime
 
+import numpy as np
+
+from .history_log import SegmentLog
+from .snapshot_ring import SnapshotRing, top_n, weight_arrays
+
 
 def _lab_debug_log(msg: str):
     """实验室模式调试日志"""
@@ -100,7 +106,8 @@ class MarketHotspotHistoryTracker:
     def __init__(self, max_history: int = 100, max_persist_days: int = 7):
         self.max_history = max_history
         self.max_persist_days = max_persist_days
-        self.snapshots: deque = deque(maxlen=max_history)
+        # 列式快照环形缓冲（float32 列按 symbol/题材对齐），序列接口与 deque 一致
+        self.snapshots: SnapshotRing = SnapshotRing(maxlen=max_history)
         self.changes: deque = deque(maxlen=max_history * 2)
 
         # 持久化路径 - 使用 ~/.naja/ 目录
@@ -138,6 +145,12 @@ class MarketHotspotHistoryTracker:
         self._concentration_shift_threshold: float = 0.2
 
         self._persist_loaded = False
+        # 增量持久化: 变化/事件的累计序号，以及各持久化目录已写入的位置
+        self._persist_lock = threading.Lock()
+        self._change_seq = 0
+        self._event_seq = 0
+        self._names_version = 0
+        self._persisted: Dict[str, Dict[str, Any]] = {}
 
         # 基准快照 - 用于当 snapshots 不足时作为对比基准
         self._baseline_snapshot: Optional['HotspotSnapshot'] = None
@@ -188,17 +201,21 @@ class MarketHotspotHistoryTracker:
 
     def register_symbol_name(self, symbol: str, name: str):
         """注册股票名称"""
-        self.symbol_names[symbol] = name
+        if self.symbol_names.get(symbol) != name:
+            self.symbol_names[symbol] = name
+            self._names_version += 1
     
     def register_block_name(self, block_id: str, name: str):
         """注册题材名称"""
-        self.block_names[block_id] = name
+        if self.block_names.get(block_id) != name:
+            self.block_names[block_id] = name
+            self._names_version += 1
 
     def register_blocks(self, blocks: List):
         """批量注册题材配置（用于初始化）"""
         for block in blocks:
             if hasattr(block, 'block_id') and hasattr(block, 'name'):
-                self.block_names[block.block_id] = block.name
+                self.register_block_name(block.block_id, block.name)
                 self._block_configs[block.block_id] = block
 
     def get_symbol_name(self, symbol: str) -> str:
@@ -370,7 +387,7 @@ class MarketHotspotHistoryTracker:
         Args:
             global_hotspot: 全局热点
             block_weights: 题材权重字典
-            symbol_weights: 个股权重字典
+            symbol_weights: 个股权重字典，或 (symbols, weights) 数组对（热点系统逐 tick 传数组，不展开字典）
             timestamp: 时间戳（优先使用行情数据时间）
             timestamp_str: 时间字符串（用于日志显示）
             symbol_market_data: 个股行情数据字典 {symbol: {'price': float, 'change': float, 'volume': float, 'block': str}}
@@ -384,53 +401,50 @@ class MarketHotspotHistoryTracker:
         log = logging.getLogger(__name__)
 
         actual_timestamp = timestamp if timestamp is not None else time.time()
+        symbol_keys, symbol_values = weight_arrays(symbol_weights)
         market_data = symbol_market_data if symbol_market_data else {}
         actual_activity = activity if activity is not None else 0.5
         prev_state = self.current_market_state
         prev_hotspot = self.snapshots[-1].global_hotspot if self.snapshots else None
 
-        snapshot = HotspotSnapshot(
+        # 调试日志
+        if 0 < len(self.snapshots) <= 2:
+            sample_items = list(block_weights.items())[:3]
+            sample_named = {self.get_block_name(k): v for k, v in sample_items}
+            _lab_debug_log(f"快照{len(self.snapshots)+1}: block_weights样本={sample_named}")
+
+        self.snapshots.append(
             timestamp=actual_timestamp,
             global_hotspot=global_hotspot,
-            block_weights=block_weights.copy(),
-            symbol_weights=symbol_weights.copy(),
-            symbol_market_data=market_data.copy(),
+            block_weights=block_weights,
+            symbol_weights=(symbol_keys, symbol_values),
+            symbol_market_data=market_data,
             market_time_str=timestamp_str or "",
             activity=actual_activity,
         )
 
-        # 检测热点变化
-        if self.snapshots:
-            last_snapshot = self.snapshots[-1]
-
-            # 调试日志
-            if len(self.snapshots) <= 2:
-                sample_items = list(block_weights.items())[:3]
-                sample_named = {self.get_block_name(k): v for k, v in sample_items}
-                _lab_debug_log(f"快照{len(self.snapshots)+1}: block_weights样本={sample_named}")
+        # 检测热点变化（上一个快照 → 本快照）
+        if len(self.snapshots) >= 2:
+            self._detect_changes(timestamp_str)
 
-            self._detect_changes(last_snapshot, snapshot, timestamp_str)
-
-        self.snapshots.append(snapshot)
         log.debug(f"[HistoryTracker] record_snapshot(mode={current_mode}): 快照 #{len(self.snapshots)}, global_hotspot={global_hotspot:.3f}")
 
         # 设置基准快照（如果还没有的话）
-        if self._baseline_snapshot is None and len(self.snapshots) >= 1:
-            self._baseline_snapshot = snapshot
-            log.debug(f"[HistoryTracker] 基准快照已设置: timestamp={snapshot.timestamp}")
+        if self._baseline_snapshot is None:
+            self._baseline_snapshot = HotspotSnapshot(
+                timestamp=actual_timestamp,
+                global_hotspot=global_hotspot,
+                block_weights=dict(block_weights),
+                symbol_weights=dict(zip(symbol_keys, symbol_values.tolist())),
+                symbol_market_data=dict(market_data),
+                market_time_str=timestamp_str or "",
+                activity=actual_activity,
+            )
+            log.debug(f"[HistoryTracker] 基准快照已设置: timestamp={actual_timestamp}")
 
         # 更新当前热门
-        self.current_hot_blocks = dict(sorted(
-            block_weights.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10])
-
-        self.current_hot_symbols = dict(sorted(
-            symbol_weights.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:20])
+        self.current_hot_blocks = self._top_items(block_weights, 10)
+        self.current_hot_symbols = dict(top_n(symbol_keys, symbol_values, 20))
 
         # 更新市场热点状态
         self._update_market_state(global_hotspot, actual_activity, block_weights, symbol_weights, actual_timestamp)
@@ -489,12 +503,12 @@ class MarketHotspotHistoryTracker:
 
         # 题材集中度突变事件
         if self.snapshots and block_weights:
-            last_snapshot = self.snapshots[-1]
-            last_weights = last_snapshot.block_weights or {}
-            if last_weights:
-                last_top = max(last_weights.values()) if last_weights else 0
-                last_total = sum(last_weights.values()) if last_weights else 1
-                last_conc = last_top / last_total if last_total > 0 else 0
+            _, last_row = self.snapshots.recent_pair('block')
+            last_weights = last_row[~np.isnan(last_row)]
+            if len(last_weights):
+                last_top = last_weights.max()
+                last_total = last_weights.sum()
+                last_conc = float(last_top / last_total) if last_total > 0 else 0
             else:
                 last_conc = 0
             new_top = max(block_weights.values()) if block_weights else 0
@@ -587,8 +601,13 @@ class MarketHotspotHistoryTracker:
         self.current_market_state_description = desc
         self.last_update_time = timestamp
     
-    def _detect_changes(self, old: HotspotSnapshot, new: HotspotSnapshot, timestamp_str: str = None):
-        """检测热点变化 - 增强版：记录题材热点切换和个股关联"""
+    def _top_items(self, weights: Dict[str, float], n: int) -> Dict[str, float]:
+        """权重最高的 n 项（部分排序，与全量 sorted 结果一致）"""
+        values = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        return dict(top_n(list(weights), values, n))
+
+    def _detect_changes(self, timestamp_str: str = None):
+        """检测最近两个快照之间的热点变化 - 增强版：记录题材热点切换和个股关联"""
         import logging
         log = logging.getLogger(__name__)
 
@@ -598,13 +617,46 @@ class MarketHotspotHistoryTracker:
         time_display = timestamp_str if timestamp_str else datetime.fromtimestamp(current_time).strftime("%H:%M:%S")
         # 提取行情日期（格式如 "2024-01-15 10:30:00" -> "2024-01-15"）
         market_date = timestamp_str.split(" ")[0] if timestamp_str else datetime.fromtimestamp(current_time).strftime("%Y-%m-%d")
-        
-        # ========== 检测题材重大变化 ==========
-        all_blocks = set(old.block_weights.keys()) | set(new.block_weights.keys())
 
-        for block_id in all_blocks:
-            old_weight = old.block_weights.get(block_id, 0)
-            new_weight = new.block_weights.get(block_id, 0)
+        new = self.snapshots[-1]
+        symbol_keys = self.snapshots.keys('symbol')
+        s_old, s_new = self.snapshots.recent_pair('symbol')
+        s_union = np.flatnonzero(~(np.isnan(s_old) & np.isnan(s_new)))
+        s_old = np.nan_to_num(s_old[s_union])
+        s_new = np.nan_to_num(s_new[s_union])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s_pct = np.where(s_old > 0, (s_new - s_old) / np.where(s_old > 0, s_old, 1) * 100,
+                             np.where(s_new > 0, np.inf, 0.0))
+
+        # 个股权重变化（超过5%），按变化幅度取前3个 - 各题材事件共用
+        moved = np.flatnonzero((s_old > 0) & (np.abs(s_pct) > 5))
+        moved = moved[np.argsort(-np.abs(s_pct[moved]), kind='stable')[:3]]
+        moved_symbols = [
+            {
+                'symbol': symbol_keys[s_union[k]],
+                'name': self.get_symbol_name(symbol_keys[s_union[k]]),
+                'old': float(s_old[k]),
+                'new': float(s_new[k]),
+                'change_pct': float(s_pct[k]),
+            }
+            for k in moved
+        ]
+
+        # ========== 检测题材重大变化 ==========
+        block_keys = self.snapshots.keys('block')
+        b_old, b_new = self.snapshots.recent_pair('block')
+        b_union = np.flatnonzero(~(np.isnan(b_old) & np.isnan(b_new)))
+        b_old = np.nan_to_num(b_old[b_union])
+        b_new = np.nan_to_num(b_new[b_union])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b_pct = np.where(b_old > 0, (b_new - b_old) / np.where(b_old > 0, b_old, 1) * 100,
+                             np.where(b_new > 0, np.inf, 0.0))
+
+        # 低于 3% 的题材变化不产生事件
+        for k in np.flatnonzero(np.abs(b_pct) >= 3):
+            block_id = block_keys[b_union[k]]
+            old_weight = float(b_old[k])
+            new_weight = float(b_new[k])
             block_name = self.get_block_name(block_id)
 
             # 计算变化
@@ -613,26 +665,7 @@ class MarketHotspotHistoryTracker:
             else:
                 change_pct = float('inf') if new_weight > 0 else 0
 
-            # 只记录重大变化（变化超过5%）
-            # 获取该题材下的个股变化
-            all_symbol_changes = []
-            for symbol in set(old.symbol_weights.keys()) | set(new.symbol_weights.keys()):
-                s_old = old.symbol_weights.get(symbol, 0)
-                s_new = new.symbol_weights.get(symbol, 0)
-                if s_old > 0:
-                    s_change_pct = (s_new - s_old) / s_old * 100
-                    if abs(s_change_pct) > 5:  # 只记录变化超过5%的个股
-                        all_symbol_changes.append({
-                            'symbol': symbol,
-                            'name': self.get_symbol_name(symbol),
-                            'old': s_old,
-                            'new': s_new,
-                            'change_pct': s_change_pct
-                        })
-
-            # 按变化幅度排序，取前3个
-            all_symbol_changes.sort(key=lambda x: abs(x['change_pct']), reverse=True)
-            top_symbols = all_symbol_changes[:3]
+            top_symbols = [dict(item) for item in moved_symbols]
 
             # 定义事件类型
             if old_weight == 0 and new_weight > 0:
@@ -673,7 +706,9 @@ class MarketHotspotHistoryTracker:
 
             # 中阈值: 5%
             if abs(change_pct) >= 5 or (old_weight == 0 and new_weight > 0) or (old_weight > 0 and new_weight == 0):
-                self.block_hotspot_events_medium.append(event)
+                with self._persist_lock:
+                    self.block_hotspot_events_medium.append(event)
+                    self._event_seq += 1
                 score = min(1.0, abs(change_pct) / 100.0) if change_pct != float('inf') else 1.0
                 payload = {
                     "block_id": block_id,
@@ -711,30 +746,27 @@ class MarketHotspotHistoryTracker:
                         log.debug(f"    {emoji} {s['symbol']} {s['name']}: {s['old']:.2f} → {s['new']:.2f} ({s['change_pct']:+.1f}%)")
         
         # ========== 检测个股重大变化（优化版） ==========
-        # 只关注高权重个股的重大变化，减少噪音
-        all_symbols = set(old.symbol_weights.keys()) | set(new.symbol_weights.keys())
-        
-        # 筛选出高权重个股（权重大于2.0或变化前权重大于2.0）
-        significant_symbols = [
-            symbol for symbol in all_symbols
-            if old.symbol_weights.get(symbol, 0) > 2.0 or new.symbol_weights.get(symbol, 0) > 2.0
-        ]
-        
-        for symbol in significant_symbols:
-            old_weight = old.symbol_weights.get(symbol, 0)
-            new_weight = new.symbol_weights.get(symbol, 0)
+        # 只关注高权重个股（权重大于2.0或变化前权重大于2.0）的重大变化，减少噪音：
+        # 变化超过30%或进入/退出高权重区间
+        significant = (s_old > 2.0) | (s_new > 2.0)
+        crossed = ((s_old <= 2.0) & (s_new > 3.0)) | ((s_old > 3.0) & (s_new <= 2.0))
+        candidates = np.flatnonzero(significant & (crossed | (np.abs(s_pct) >= 30)))
+
+        for k in candidates:
+            symbol = symbol_keys[s_union[k]]
+            old_weight = float(s_old[k])
+            new_weight = float(s_new[k])
             symbol_name = self.get_symbol_name(symbol)
-            
+
             if old_weight > 0:
                 change_pct = (new_weight - old_weight) / old_weight * 100
             else:
                 change_pct = float('inf') if new_weight > 0 else 0
-            
-            # 只记录重大变化（变化超过30%或进入/退出高权重区间）
+
             is_new_hot = old_weight <= 2.0 and new_weight > 3.0
             is_cooled = old_weight > 3.0 and new_weight <= 2.0
             is_major_change = abs(change_pct) >= 30
-            
+
             if is_new_hot or is_cooled or is_major_change:
                 market_info = new.symbol_market_data.get(symbol, {})
                 price = market_info.get('price', 0)
@@ -771,7 +803,9 @@ class MarketHotspotHistoryTracker:
                     volume=volume,
                     block=block
                 )
-                self.changes.append(change)
+                with self._persist_lock:
+                    self.changes.append(change)
+                    self._change_seq += 1
                 score = min(1.0, abs(change.change_percent) / 100.0)
                 payload = {
                     "symbol": symbol,
@@ -818,27 +852,22 @@ class MarketHotspotHistoryTracker:
     
     def get_block_trend(self, block_id: str, n: int = 10) -> List[Dict]:
         """获取题材趋势"""
-        trend = []
-        for snapshot in list(self.snapshots)[-n:]:
-            weight = snapshot.block_weights.get(block_id, 0)
-            trend.append({
-                'timestamp': snapshot.timestamp,
-                'datetime': datetime.fromtimestamp(snapshot.timestamp).strftime('%H:%M:%S'),
-                'weight': weight
-            })
-        return trend
+        return self._weight_trend('block', block_id, n)
 
     def get_symbol_trend(self, symbol: str, n: int = 10) -> List[Dict]:
         """获取个股趋势"""
-        trend = []
-        for snapshot in list(self.snapshots)[-n:]:
-            weight = snapshot.symbol_weights.get(symbol, 0)
-            trend.append({
-                'timestamp': snapshot.timestamp,
-                'datetime': datetime.fromtimestamp(snapshot.timestamp).strftime('%H:%M:%S'),
+        return self._weight_trend('symbol', symbol, n)
+
+    def _weight_trend(self, kind: str, key: str, n: int) -> List[Dict]:
+        timestamps, weights = self.snapshots.column(kind, key, n)
+        return [
+            {
+                'timestamp': ts,
+                'datetime': datetime.fromtimestamp(ts).strftime('%H:%M:%S'),
                 'weight': weight
-            })
-        return trend
+            }
+            for ts, weight in zip(timestamps.tolist(), weights.tolist())
+        ]
     
     def get_hotspot_shift_report(self, emit_to_insight: bool = True) -> Dict[str, Any]:
         """
@@ -871,19 +900,11 @@ class MarketHotspotHistoryTracker:
             old_snapshot = self.snapshots[0]
             new_snapshot = self.snapshots[-1]
 
-        old_top_blocks = sorted(old_snapshot.block_weights.keys(),
-                                 key=lambda x: old_snapshot.block_weights[x],
-                                 reverse=True)[:3]
-        new_top_blocks = sorted(new_snapshot.block_weights.keys(),
-                                 key=lambda x: new_snapshot.block_weights[x],
-                                 reverse=True)[:3]
+        old_top_blocks = list(self._top_items(old_snapshot.block_weights, 3))
+        new_top_blocks = list(self._top_items(new_snapshot.block_weights, 3))
 
-        old_top_symbols = sorted(old_snapshot.symbol_weights.keys(),
-                                 key=lambda x: old_snapshot.symbol_weights[x],
-                                 reverse=True)[:5]
-        new_top_symbols = sorted(new_snapshot.symbol_weights.keys(),
-                                 key=lambda x: new_snapshot.symbol_weights[x],
-                                 reverse=True)[:5]
+        old_top_symbols = list(self._top_items(old_snapshot.symbol_weights, 5))
+        new_top_symbols = list(self._top_items(new_snapshot.symbol_weights, 5))
 
         old_block_set = set(old_top_blocks)
         new_block_set = set(new_top_blocks)
@@ -1070,7 +1091,7 @@ class MarketHotspotHistoryTracker:
             os.makedirs(self._persist_base_path, exist_ok=True)
 
     def _get_persist_file_path(self, market: str = None, date: str = None) -> str:
-        """获取持久化文件路径"""
+        """获取旧版 JSON 持久化文件路径（仅用于加载旧数据）"""
         self._ensure_persist_dir()
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
@@ -1078,9 +1099,19 @@ class MarketHotspotHistoryTracker:
             return os.path.join(self._persist_base_path, f'{market}_snapshots_{date}.json')
         return os.path.join(self._persist_base_path, f'snapshots_{date}.json')
 
+    def _get_persist_dir(self, market: str = None, date: str = None) -> str:
+        """获取持久化目录（分段日志，与旧 JSON 文件同名去掉扩展名）"""
+        return os.path.splitext(self._get_persist_file_path(market, date))[0]
+
+    def _history_logs(self, directory: str):
+        change_log = SegmentLog(directory, 'changes', keep=self.max_history * 2)
+        event_log = SegmentLog(directory, 'events', keep=self.block_hotspot_events_medium.maxlen)
+        return change_log, event_log
+
     def _cleanup_old_files(self):
         """清理过期的持久化文件"""
         import logging
+        import shutil
         log = logging.getLogger(__name__)
 
         try:
@@ -1091,13 +1122,17 @@ class MarketHotspotHistoryTracker:
             removed_count = 0
 
             for filename in os.listdir(self._persist_base_path):
-                if not filename.endswith('.json'):
-                    continue
                 file_path = os.path.join(self._persist_base_path, filename)
+                is_dir = os.path.isdir(file_path)
+                if not (filename.endswith('.json') or (is_dir and 'snapshots_' in filename)):
+                    continue
                 try:
                     file_mtime = os.path.getmtime(file_path)
                     if file_mtime < cutoff_time:
-                        os.remove(file_path)
+                        if is_dir:
+                            shutil.rmtree(file_path)
+                        else:
+                            os.remove(file_path)
                         removed_count += 1
                 except Exception:
                     pass
@@ -1107,12 +1142,64 @@ class MarketHotspotHistoryTracker:
         except Exception as e:
             log.warning(f"[HistoryTracker] 清理过期文件失败: {e}")
 
+    @staticmethod
+    def _change_to_record(c: HotspotChange) -> Dict[str, Any]:
+        return {
+            'timestamp': c.timestamp,
+            'change_type': c.change_type,
+            'item_type': c.item_type,
+            'item_id': c.item_id,
+            'item_name': c.item_name,
+            'old_weight': c.old_weight,
+            'new_weight': c.new_weight,
+            'change_percent': c.change_percent,
+            'description': c.description,
+            'market_time': c.market_time,
+            'price': c.price,
+            'price_change': c.price_change,
+            'volume': c.volume,
+            'block': c.block,
+        }
+
+    @staticmethod
+    def _event_to_record(e: BlockHotspotEvent) -> Dict[str, Any]:
+        return {
+            'timestamp': e.timestamp,
+            'market_time': e.market_time,
+            'market_date': e.market_date,
+            'block_id': e.block_id,
+            'block_name': e.block_name,
+            'event_type': e.event_type,
+            'weight_change': e.weight_change,
+            'change_percent': e.change_percent,
+            'description': e.description,
+        }
+
+    @staticmethod
+    def _new_records(items: deque, seq: int, persisted: int) -> Optional[List]:
+        """deque 中上次保存之后新增的记录；已被挤出 deque 时返回 None（需全量重写）"""
+        new = seq - persisted
+        if new > len(items):
+            return None
+        return list(islice(items, len(items) - new, len(items)))
+
+    @staticmethod
+    def _write_json(path: str, data: Any):
+        import json
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
     def save_state(self, market: str = None):
         """
-        保存当前状态到持久化文件
+        保存当前状态（增量）
+
+        变化记录和题材事件追加到分段日志，只写上次保存之后新增的部分；
+        名称映射和基准快照只在变化时重写。当天首次保存（或新增记录已被挤出内存队列）时全量重写。
 
         Args:
-            market: 市场标识 ('CN' 或 'US')，None 表示保存到默认文件
+            market: 市场标识 ('CN' 或 'US')，None 表示保存到默认目录
         """
         import logging
         log = logging.getLogger(__name__)
@@ -1121,57 +1208,57 @@ class MarketHotspotHistoryTracker:
             self._ensure_persist_dir()
             self._cleanup_old_files()
 
-            file_path = self._get_persist_file_path(market)
-
-            data = {
+            directory = self._get_persist_dir(market)
+            with self._persist_lock:
+                change_seq, event_seq = self._change_seq, self._event_seq
+                synced = self._persisted.get(directory) if os.path.isdir(directory) else None
+                changes = events = None
+                if synced is not None:
+                    changes = self._new_records(self.changes, change_seq, synced['changes'])
+                    events = self._new_records(self.block_hotspot_events_medium, event_seq, synced['events'])
+                full = changes is None or events is None
+                if full:
+                    changes = list(self.changes)
+                    events = list(self.block_hotspot_events_medium)
+                names_key = (self._names_version, len(self.symbol_names), len(self.block_names))
+                baseline = self._baseline_snapshot
+
+            os.makedirs(directory, exist_ok=True)
+            change_log, event_log = self._history_logs(directory)
+            change_records = [self._change_to_record(c) for c in changes]
+            event_records = [self._event_to_record(e) for e in events]
+            if full:
+                change_log.rewrite(change_records)
+                event_log.rewrite(event_records)
+            else:
+                change_log.append(change_records)
+                event_log.append(event_records)
+
+            if full or synced['names'] != names_key:
+                self._write_json(os.path.join(directory, 'names.json'), {
+                    'symbol_names': dict(self.symbol_names),
+                    'block_names': dict(self.block_names),
+                })
+            baseline_key = baseline.timestamp if baseline else None
+            if full or synced['baseline'] != baseline_key:
+                self._write_json(os.path.join(directory, 'baseline.json'), baseline.to_dict() if baseline else None)
+
+            self._write_json(os.path.join(directory, 'meta.json'), {
                 'saved_at': time.time(),
                 'saved_at_str': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'market': market or 'ALL',
                 'snapshot_count': len(self.snapshots),
                 'change_count': len(self.changes),
-                'symbol_names': self.symbol_names,
-                'block_names': self.block_names,
-                'baseline_snapshot': self._baseline_snapshot.to_dict() if self._baseline_snapshot else None,
-                'changes': [
-                    {
-                        'timestamp': c.timestamp,
-                        'change_type': c.change_type,
-                        'item_type': c.item_type,
-                        'item_id': c.item_id,
-                        'item_name': c.item_name,
-                        'old_weight': c.old_weight,
-                        'new_weight': c.new_weight,
-                        'change_percent': c.change_percent,
-                        'description': c.description,
-                        'market_time': c.market_time,
-                        'price': c.price,
-                        'price_change': c.price_change,
-                        'volume': c.volume,
-                        'block': c.block,
-                    }
-                    for c in self.changes
-                ],
-                'block_hotspot_events': [
-                    {
-                        'timestamp': e.timestamp,
-                        'market_time': e.market_time,
-                        'market_date': e.market_date,
-                        'block_id': e.block_id,
-                        'block_name': e.block_name,
-                        'event_type': e.event_type,
-                        'weight_change': e.weight_change,
-                        'change_percent': e.change_percent,
-                        'description': e.description,
-                    }
-                    for e in self.block_hotspot_events_medium
-                ],
+            })
+            self._persisted[directory] = {
+                'changes': change_seq,
+                'events': event_seq,
+                'names': names_key,
+                'baseline': baseline_key,
             }
 
-            import json
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            log.debug(f"[HistoryTracker] 状态已保存: {file_path}, snapshots={len(self.snapshots)}")
+            log.debug(f"[HistoryTracker] 状态已保存: {directory}, {'全量' if full else '增量'}, "
+                      f"changes+{len(change_records)}, events+{len(event_records)}")
         except Exception as e:
             log.warning(f"[HistoryTracker] 保存状态失败: {e}")
 
@@ -1179,6 +1266,8 @@ class MarketHotspotHistoryTracker:
         """
         从持久化文件加载状态
 
+        优先读取分段日志目录（只读取最近的变化记录和事件），不存在时回退到旧版 JSON 文件。
+
         Args:
             market: 市场标识 ('CN' 或 'US')，None 表示加载默认文件
             date: 日期字符串 (YYYY-MM-DD)，None 表示加载今天的文件
@@ -1190,74 +1279,128 @@ class MarketHotspotHistoryTracker:
         log = logging.getLogger(__name__)
 
         try:
-            file_path = self._get_persist_file_path(market, date)
+            directory = self._get_persist_dir(market, date)
+            if os.path.isdir(directory):
+                source = directory
+                data = self._read_segment_state(directory)
+            else:
+                source = self._get_persist_file_path(market, date)
+                if not os.path.exists(source):
+                    log.debug(f"[HistoryTracker] 持久化文件不存在: {source}")
+                    return False
+                import json
+                with open(source, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+            was_empty = not self.changes and not self.block_hotspot_events_medium
+            self._apply_state(data)
+
+            # 从今天的目录加载：已在磁盘上的记录下次保存无需重写
+            if was_empty and source == self._get_persist_dir(market):
+                self._persisted[source] = {
+                    'changes': self._change_seq,
+                    'events': self._event_seq,
+                    'names': (self._names_version, len(self.symbol_names), len(self.block_names)),
+                    'baseline': self._baseline_snapshot.timestamp if self._baseline_snapshot else None,
+                }
+
+            self._persist_loaded = True
+            log.info(f"[HistoryTracker] 状态已加载: {source}, snapshots={len(self.snapshots)}, changes={len(self.changes)}, has_baseline={self._baseline_snapshot is not None}")
+            return True
+        except Exception as e:
+            log.warning(f"[HistoryTracker] 加载状态失败: {e}")
+            return False
 
-            if not os.path.exists(file_path):
-                log.debug(f"[HistoryTracker] 持久化文件不存在: {file_path}")
-                return False
+    def _read_segment_state(self, directory: str) -> Dict[str, Any]:
+        """读取分段日志目录，返回与旧版 JSON 相同结构的字典"""
+        import json
 
-            import json
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        def read_json(name):
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
 
-            self.symbol_names.update(data.get('symbol_names', {}))
-            self.block_names.update(data.get('block_names', {}))
+        names = read_json('names.json') or {}
+        change_log, event_log = self._history_logs(directory)
+        return {
+            'symbol_names': names.get('symbol_names', {}),
+            'block_names': names.get('block_names', {}),
+            'changes': change_log.tail(self.max_history * 2),
+            'block_hotspot_events': event_log.tail(self.block_hotspot_events_medium.maxlen),
+            'baseline_snapshot': read_json('baseline.json'),
+        }
 
-            changes_data = data.get('changes', [])
-            for c_data in changes_data[-self.max_history * 2:]:
-                change = HotspotChange(
-                    timestamp=c_data['timestamp'],
-                    change_type=c_data['change_type'],
-                    item_type=c_data['item_type'],
-                    item_id=c_data['item_id'],
-                    item_name=c_data['item_name'],
-                    old_weight=c_data['old_weight'],
-                    new_weight=c_data['new_weight'],
-                    change_percent=c_data['change_percent'],
-                    description=c_data['description'],
-                    market_time=c_data.get('market_time', ''),
-                    price=c_data.get('price', 0),
-                    price_change=c_data.get('price_change', 0),
-                    volume=c_data.get('volume', 0),
-                    block=c_data.get('block', ''),
-                )
+    def _apply_state(self, data: Dict[str, Any]):
+        """把持久化数据恢复到内存"""
+        self.symbol_names.update(data.get('symbol_names', {}))
+        self.block_names.update(data.get('block_names', {}))
+        self._names_version += 1
+
+        changes_data = data.get('changes', [])
+        for c_data in changes_data[-self.max_history * 2:]:
+            change = HotspotChange(
+                timestamp=c_data['timestamp'],
+                change_type=c_data['change_type'],
+                item_type=c_data['item_type'],
+                item_id=c_data['item_id'],
+                item_name=c_data['item_name'],
+                old_weight=c_data['old_weight'],
+                new_weight=c_data['new_weight'],
+                change_percent=c_data['change_percent'],
+                description=c_data['description'],
+                market_time=c_data.get('market_time', ''),
+                price=c_data.get('price', 0),
+                price_change=c_data.get('price_change', 0),
+                volume=c_data.get('volume', 0),
+                block=c_data.get('block', ''),
+            )
+            with self._persist_lock:
                 self.changes.append(change)
+                self._change_seq += 1
 
-            events_data = data.get('block_hotspot_events', [])
-            for e_data in events_data[-50:]:
-                event = BlockHotspotEvent(
-                    timestamp=e_data['timestamp'],
-                    market_time=e_data['market_time'],
-                    market_date=e_data['market_date'],
-                    block_id=e_data['block_id'],
-                    block_name=e_data['block_name'],
-                    event_type=e_data['event_type'],
-                    weight_change=e_data['weight_change'],
-                    change_percent=e_data['change_percent'],
-                    top_symbols=[],
-                    description=e_data['description'],
-                )
+        events_data = data.get('block_hotspot_events', [])
+        for e_data in events_data[-50:]:
+            event = BlockHotspotEvent(
+                timestamp=e_data['timestamp'],
+                market_time=e_data['market_time'],
+                market_date=e_data['market_date'],
+                block_id=e_data['block_id'],
+                block_name=e_data['block_name'],
+                event_type=e_data['event_type'],
+                weight_change=e_data['weight_change'],
+                change_percent=e_data['change_percent'],
+                top_symbols=[],
+                description=e_data['description'],
+            )
+            with self._persist_lock:
                 self.block_hotspot_events_medium.append(event)
+                self._event_seq += 1
+
+        # 恢复基准快照
+        baseline_data = data.get('baseline_snapshot')
+        if baseline_data:
+            self._baseline_snapshot = HotspotSnapshot(
+                timestamp=baseline_data['timestamp'],
+                global_hotspot=baseline_data['global_hotspot'],
+                block_weights=baseline_data['block_weights'],
+                symbol_weights=baseline_data['symbol_weights'],
+                symbol_market_data=baseline_data.get('symbol_market_data', {}),
+                market_time_str=baseline_data.get('market_time_str', ''),
+                activity=baseline_data.get('activity', 0.5),
+            )
 
-            # 恢复基准快照
-            baseline_data = data.get('baseline_snapshot')
-            if baseline_data:
-                self._baseline_snapshot = HotspotSnapshot(
-                    timestamp=baseline_data['timestamp'],
-                    global_hotspot=baseline_data['global_hotspot'],
-                    block_weights=baseline_data['block_weights'],
-                    symbol_weights=baseline_data['symbol_weights'],
-                    symbol_market_data=baseline_data.get('symbol_market_data', {}),
-                    market_time_str=baseline_data.get('market_time_str', ''),
-                    activity=baseline_data.get('activity', 0.5),
-                )
-
-            self._persist_loaded = True
-            log.info(f"[HistoryTracker] 状态已加载: {file_path}, snapshots={len(self.snapshots)}, changes={len(self.changes)}, has_baseline={self._baseline_snapshot is not None}")
-            return True
-        except Exception as e:
-            log.warning(f"[HistoryTracker] 加载状态失败: {e}")
-            return False
+    def _persist_entries(self) -> List[str]:
+        """持久化目录下的快照文件/目录（旧版 .json 与分段日志目录）"""
+        entries = []
+        for filename in os.listdir(self._persist_base_path):
+            path = os.path.join(self._persist_base_path, filename)
+            if 'snapshots_' not in filename:
+                continue
+            if filename.endswith('.json') or os.path.isdir(path):
+                entries.append(path)
+        return entries
 
     def load_latest_state(self) -> bool:
         """
@@ -1274,16 +1417,8 @@ class MarketHotspotHistoryTracker:
             return False
 
         try:
-            import json
-            today = datetime.now().strftime('%Y-%m-%d')
-
             files = []
-            for filename in os.listdir(self._persist_base_path):
-                if not filename.endswith('.json'):
-                    continue
-                if '_snapshots_' not in filename:
-                    continue
-                file_path = os.path.join(self._persist_base_path, filename)
+            for file_path in self._persist_entries():
                 try:
                     mtime = os.path.getmtime(file_path)
                     files.append((mtime, file_path))
@@ -1293,9 +1428,19 @@ class MarketHotspotHistoryTracker:
             files.sort(reverse=True)
 
             loaded = False
-            for mtime, file_path in files[:self.max_persist_days]:
-                date_str = os.path.basename(file_path).split('_')[-1].replace('.json', '')
-                if self.load_state(date=date_str):
+            tried = set()
+            for mtime, file_path in files:
+                # {market}_snapshots_{date}[.json] / snapshots_{date}[.json]
+                stem = os.path.splitext(os.path.basename(file_path))[0] if file_path.endswith('.json') \
+                    else os.path.basename(file_path)
+                prefix, _, date_str = stem.rpartition('snapshots_')
+                market = prefix.rstrip('_') or None
+                if (market, date_str) in tried:
+                    continue
+                tried.add((market, date_str))
+                if len(tried) > self.max_persist_days:
+                    break
+                if self.load_state(market=market, date=date_str):
                     loaded = True
                     log.info(f"[HistoryTracker] 成功从 {date_str} 加载历史数据")
                     break
@@ -1321,15 +1466,17 @@ class MarketHotspotHistoryTracker:
 
         try:
             if os.path.exists(self._persist_base_path):
-                for filename in sorted(os.listdir(self._persist_base_path)):
-                    if filename.endswith('.json'):
-                        file_path = os.path.join(self._persist_base_path, filename)
-                        mtime = os.path.getmtime(file_path)
-                        info['files'].append({
-                            'name': filename,
-                            'modified': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S'),
-                            'size_kb': os.path.getsize(file_path) / 1024,
-                        })
+                for file_path in sorted(self._persist_entries()):
+                    mtime = os.path.getmtime(file_path)
+                    if os.path.isdir(file_path):
+                        size = sum(os.path.getsize(os.path.join(file_path, f)) for f in os.listdir(file_path))
+                    else:
+                        size = os.path.getsize(file_path)
+                    info['files'].append({
+                        'name': os.path.basename(file_path),
+                        'modified': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S'),
+                        'size_kb': size / 1024,
+                    })
         except Exception:
             pass
 
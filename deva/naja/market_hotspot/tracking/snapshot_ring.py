@@ -0,0 +1,317 @@
+"""
+SnapshotRing - 热点快照的列式环形缓冲
+
+每个快照不再保存 block_weights / symbol_weights 字典副本，而是写入
+按 symbol/题材 列对齐的 float32 矩阵的一行（缺失为 NaN）：
+
+- 趋势查询（get_symbol_trend / get_block_trend）直接取列切片
+- 最近两个快照额外保留 float64 行，变化检测与旧字典比较结果一致
+- Top-N 用 argpartition 选取候选后再稳定排序，不做全量排序
+
+对外通过 RingSnapshot 视图保持 HotspotSnapshot 的属性接口，
+字典只在视图被访问时才生成。
+"""
+
+import threading
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+def top_n(keys: List[str], values: np.ndarray, n: int) -> List[Tuple[str, float]]:
+    """
+    部分排序取前 n 项
+
+    与 sorted(d.items(), key=value, reverse=True)[:n] 结果一致（同值保持原顺序）。
+    """
+    total = len(values)
+    if total == 0 or n <= 0:
+        return []
+    if total > n:
+        kth = np.partition(values, total - n)[total - n]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(total)
+    order = candidates[np.argsort(-values[candidates], kind='stable')[:n]]
+    return [(keys[i], float(values[i])) for i in order]
+
+
+def weight_arrays(weights) -> Tuple[List[str], np.ndarray]:
+    """权重字典或 (keys, values) 数组对 → (key 列表, float64 数组)"""
+    if isinstance(weights, tuple):
+        keys, values = weights
+        keys = keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+        return keys, np.asarray(values, dtype=np.float64)
+    keys = list(weights)
+    return keys, np.fromiter(weights.values(), dtype=np.float64, count=len(keys))
+
+
+class _ColumnIndex:
+    """key → 列号（只追加）"""
+
+    def __init__(self):
+        self.key_to_col: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self._last_keys: Optional[List[str]] = None
+        self._last_cols: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def cols(self, keys: List[str]) -> np.ndarray:
+        if keys == self._last_keys:
+            return self._last_cols
+        key_to_col = self.key_to_col
+        cols = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            col = key_to_col.get(key)
+            if col is None:
+                col = len(self.keys)
+                key_to_col[key] = col
+                self.keys.append(key)
+            cols[i] = col
+        self._last_keys = keys
+        self._last_cols = cols
+        return cols
+
+    def clear(self):
+        self.key_to_col.clear()
+        self.keys.clear()
+        self._last_keys = None
+        self._last_cols = None
+
+
+class _WeightColumns:
+    """一类权重（symbol 或题材）的列矩阵"""
+
+    def __init__(self, maxlen: int):
+        self.index = _ColumnIndex()
+        self.matrix = np.full((maxlen, 0), np.nan, dtype=np.float32)
+        # 最近两个快照的 float64 行: [上一个, 最新]
+        self.recent: List[Optional[np.ndarray]] = [None, None]
+
+    def write(self, row: int, weights):
+        keys, values = weight_arrays(weights)
+        cols = self.index.cols(keys)
+
+        n = len(self.index)
+        if n > self.matrix.shape[1]:
+            grown = np.full((self.matrix.shape[0], max(n, self.matrix.shape[1] * 2, 64)), np.nan, dtype=np.float32)
+            grown[:, :self.matrix.shape[1]] = self.matrix
+            self.matrix = grown
+
+        self.matrix[row] = np.nan
+        self.matrix[row, cols] = values
+
+        latest = np.full(n, np.nan)
+        latest[cols] = values
+        self.recent = [self.recent[1], latest]
+
+    def pair(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(上一个, 最新) 快照的 float64 行，按当前列数对齐，缺失为 NaN"""
+        n = len(self.index)
+        prev, latest = self.recent
+        out = []
+        for row in (prev, latest):
+            aligned = np.full(n, np.nan)
+            if row is not None:
+                aligned[:len(row)] = row
+            out.append(aligned)
+        return out[0], out[1]
+
+    def row_dict(self, row: int) -> Dict[str, float]:
+        values = self.matrix[row, :len(self.index)]
+        present = np.flatnonzero(~np.isnan(values))
+        keys = self.index.keys
+        return {keys[c]: float(values[c]) for c in present}
+
+    def clear(self, maxlen: int):
+        self.index.clear()
+        self.matrix = np.full((maxlen, 0), np.nan, dtype=np.float32)
+        self.recent = [None, None]
+
+
+class RingSnapshot:
+    """
+    环形缓冲中一个快照的只读视图（属性与 HotspotSnapshot 一致）
+
+    block_weights / symbol_weights 在首次访问时从列矩阵生成；若该行已被新快照覆盖，
+    返回空字典。
+    """
+
+    __slots__ = ('_ring', '_row', '_seq', 'timestamp', 'global_hotspot', 'market_time_str',
+                 'activity', '_block_weights', '_symbol_weights')
+
+    def __init__(self, ring: 'SnapshotRing', row: int):
+        self._ring = ring
+        self._row = row
+        self._seq = ring._seqs[row]
+        self.timestamp = float(ring._timestamps[row])
+        self.global_hotspot = float(ring._global[row])
+        self.market_time_str = ring._market_time[row]
+        self.activity = float(ring._activity[row])
+        self._block_weights = None
+        self._symbol_weights = None
+
+    def _valid(self) -> bool:
+        return self._ring._seqs[self._row] == self._seq
+
+    @property
+    def block_weights(self) -> Dict[str, float]:
+        if self._block_weights is None:
+            self._block_weights = self._ring._blocks.row_dict(self._row) if self._valid() else {}
+        return self._block_weights
+
+    @property
+    def symbol_weights(self) -> Dict[str, float]:
+        if self._symbol_weights is None:
+            self._symbol_weights = self._ring._symbols.row_dict(self._row) if self._valid() else {}
+        return self._symbol_weights
+
+    @property
+    def symbol_market_data(self) -> Dict[str, Dict]:
+        data = self._ring._market_data[self._row] if self._valid() else None
+        return data if data is not None else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        from datetime import datetime
+        return {
+            'timestamp': self.timestamp,
+            'datetime': datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            'market_time_str': self.market_time_str,
+            'global_hotspot': self.global_hotspot,
+            'block_weights': self.block_weights,
+            'symbol_weights': self.symbol_weights,
+            'symbol_market_data': self.symbol_market_data,
+            'activity': self.activity,
+        }
+
+
+class SnapshotRing:
+    """
+    热点快照环形缓冲（最多 maxlen 个快照）
+
+    序列接口与原来的 deque 一致：len()、[-1]、[0]、迭代都返回 RingSnapshot 视图。
+    """
+
+    def __init__(self, maxlen: int = 100):
+        self.maxlen = maxlen
+        self._lock = threading.RLock()
+        self._symbols = _WeightColumns(maxlen)
+        self._blocks = _WeightColumns(maxlen)
+        self._timestamps = np.zeros(maxlen)
+        self._global = np.zeros(maxlen)
+        self._activity = np.zeros(maxlen)
+        self._market_time: List[str] = [''] * maxlen
+        self._market_data: List[Optional[Dict[str, Dict]]] = [None] * maxlen
+        self._seqs = np.full(maxlen, -1, dtype=np.int64)
+        self._head = 0
+        self._count = 0
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def _row(self, i: int) -> int:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('snapshot index out of range')
+        return (self._head - self._count + i) % self.maxlen
+
+    def _rows(self, n: Optional[int] = None) -> np.ndarray:
+        """最近 n 个快照的物理行号（时间升序）"""
+        n = self._count if n is None else max(0, min(n, self._count))
+        return (self._head - n + np.arange(n)) % self.maxlen
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [RingSnapshot(self, self._row(k)) for k in range(*i.indices(self._count))]
+        return RingSnapshot(self, self._row(i))
+
+    def __iter__(self) -> Iterator[RingSnapshot]:
+        return iter([RingSnapshot(self, row) for row in self._rows()])
+
+    def append(self, timestamp: float, global_hotspot: float,
+               block_weights: Mapping[str, float], symbol_weights: Mapping[str, float],
+               symbol_market_data: Optional[Dict[str, Dict]] = None,
+               market_time_str: str = "", activity: float = 0.5):
+        """追加一个快照；权重可以是字典，也可以是 (keys, values) 数组对"""
+        with self._lock:
+            row = self._head
+            self._blocks.write(row, block_weights)
+            self._symbols.write(row, symbol_weights)
+            self._timestamps[row] = timestamp
+            self._global[row] = global_hotspot
+            self._activity[row] = activity
+            self._market_time[row] = market_time_str
+            self._market_data[row] = dict(symbol_market_data) if symbol_market_data else None
+            self._seqs[row] = self._seq
+            self._seq += 1
+            self._head = (row + 1) % self.maxlen
+            self._count = min(self._count + 1, self.maxlen)
+
+    def clear(self):
+        with self._lock:
+            self._symbols.clear(self.maxlen)
+            self._blocks.clear(self.maxlen)
+            self._market_time = [''] * self.maxlen
+            self._market_data = [None] * self.maxlen
+            self._seqs[:] = -1
+            self._head = 0
+            self._count = 0
+
+    # ---- 列访问 ----
+
+    def _columns(self, kind: str) -> _WeightColumns:
+        return self._symbols if kind == 'symbol' else self._blocks
+
+    def keys(self, kind: str) -> List[str]:
+        """列号 → key（kind: 'symbol' | 'block'）"""
+        return self._columns(kind).index.keys
+
+    def recent_pair(self, kind: str) -> Tuple[np.ndarray, np.ndarray]:
+        """上一个与最新快照的 float64 权重行（列对齐，缺失为 NaN）"""
+        return self._columns(kind).pair()
+
+    def column(self, kind: str, key: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """最近 n 个快照中 key 的 (timestamps, weights)，缺失按 0"""
+        rows = self._rows(n)
+        columns = self._columns(kind)
+        col = columns.index.key_to_col.get(key)
+        if col is None:
+            return self._timestamps[rows], np.zeros(len(rows))
+        return self._timestamps[rows], np.nan_to_num(columns.matrix[rows, col].astype(np.float64))
+
+    def top(self, kind: str, n: int, i: int = -1) -> List[Tuple[str, float]]:
+        """第 i 个快照权重最高的 n 项"""
+        columns = self._columns(kind)
+        values = columns.matrix[self._row(i), :len(columns.index)]
+        present = np.flatnonzero(~np.isnan(values))
+        keys = columns.index.keys
+        return top_n([keys[c] for c in present], values[present].astype(np.float64), n)
+
+    def delta(self, kind: str, i: int = -1, min_change: float = 0.0) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        第 i 个快照相对前一个快照的稀疏差分
+
+        Returns:
+            (keys, old, new)：仅包含 |new - old| > min_change 的项，缺失按 0
+        """
+        columns = self._columns(kind)
+        n = len(columns.index)
+        i = i + self._count if i < 0 else i
+        new = np.nan_to_num(columns.matrix[self._row(i), :n].astype(np.float64))
+        if i >= 1:
+            old = np.nan_to_num(columns.matrix[self._row(i - 1), :n].astype(np.float64))
+        else:
+            old = np.zeros(n)
+        changed = np.flatnonzero(np.abs(new - old) > min_change)
+        keys = columns.index.keys
+        return [keys[c] for c in changed], old[changed], new[changed]
+
+    def nbytes(self) -> int:
+        return int(self._symbols.matrix.nbytes + self._blocks.matrix.nbytes)
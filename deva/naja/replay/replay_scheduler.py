@@ -22,7 +22,9 @@ import logging
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
 
 from deva import NB, log
 from deva.naja.register import SR
@@ -43,9 +45,36 @@ class ReplayConfig:
     start_time: Optional[str] = None
     end_time: Optional[str] = None
 
-    enable_level_filter: bool = True
+    # 档位过滤会丢弃低档、未注册个股与部分中档行，改变回放输出，需显式开启
+    enable_level_filter: bool = False
     medium_sample_rate: float = 0.5
     skip_low_level: bool = True
+    # 中档抽样随机种子（None 为不可复现的随机抽样）
+    sample_seed: Optional[int] = None
+
+    # 列式快照存储存在时只读取这些列并以 DataFrame 下发（None 表示按旧格式下发 list[dict]）
+    columns: Optional[List[str]] = None
+
+
+def level_filter_mask(
+    levels: np.ndarray,
+    medium_sample_rate: float,
+    skip_low_level: bool,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """按档位生成保留掩码
+
+    HIGH 全部保留；MEDIUM 按 medium_sample_rate 抽样（一次抽取整个随机向量）；
+    LOW 在 skip_low_level=False 时保留。
+    """
+    levels = np.asarray(levels)
+    mask = levels == 2
+    if medium_sample_rate > 0:
+        draws = rng.random(len(levels))
+        mask |= (levels == 1) & (draws < medium_sample_rate)
+    if not skip_low_level:
+        mask |= levels == 0
+    return mask
 
 
 class ReplayScheduler:
@@ -98,11 +127,16 @@ class ReplayScheduler:
         self._finished_callbacks: List[Callable] = []
 
         self._db: Optional[Any] = None
-        self._data_keys: List[Any] = []
+        self._key_cursor: Iterator[Any] = iter(())
+        self._data_total = 0
+        self._first_ts: Optional[float] = None
+        self._last_ts: Optional[float] = None
         self._key_index = 0
 
         self._perf_adjustments = deque(maxlen=100)
 
+        self._rng = np.random.default_rng(self.config.sample_seed)
+
         self._register_auto_tuner_callback()
 
         self._initialized = True
@@ -187,30 +221,38 @@ class ReplayScheduler:
         log.info("[ReplayScheduler] 回放调度器已停止")
 
     def _init_db(self):
-        """初始化数据库连接"""
-        try:
-            self._db = NB(self.config.db_table, key_mode='time')
-            self._data_keys = list(self._db.keys())
-
-            if self.config.start_time:
-                start_dt = datetime.fromisoformat(self.config.start_time)
-                start_ts = start_dt.timestamp()
-                self._data_keys = [k for k in self._data_keys if float(k) >= start_ts if self._is_numeric_key(k)]
+        """初始化数据库连接
 
-            if self.config.end_time:
-                end_dt = datetime.fromisoformat(self.config.end_time)
-                end_ts = end_dt.timestamp()
-                self._data_keys = [k for k in self._data_keys if float(k) <= end_ts if self._is_numeric_key(k)]
+        按回放区间选择数据源（SnapshotRange）：列式快照之前的部分走 NB 表的时间范围游标，
+        之后的部分读列式快照；两者都按需逐条取键，不预先载入整张表的键。
+        """
+        start, end = self.config.start_time, self.config.end_time
+        self._key_index = 0
+        try:
+            from deva.naja.market_hotspot.data.snapshot_store import SnapshotRange
 
-            self._data_keys.sort()
-            self._key_index = 0
+            self._db = SnapshotRange(
+                self.config.db_table, start, end,
+                nb=NB(self.config.db_table, key_mode='time'),
+            )
+            self._first_ts, self._last_ts, self._data_total = self._db.first_ts, self._db.last_ts, self._db.total
+            self._key_cursor = iter(self._db)
 
-            log.info(f"[ReplayScheduler] 加载 {len(self._data_keys)} 条数据")
+            log.info(f"[ReplayScheduler] 待回放 {self._data_total} 条数据")
         except Exception as e:
             log.error(f"[ReplayScheduler] 初始化DB失败: {e}")
-            self._data_keys = []
+            self._key_cursor = iter(())
+            self._data_total = 0
             self._has_more_data = False
 
+    def _read(self, key):
+        """读取一个快照
+
+        列式快照默认按 NB 表的旧格式返回 list[dict]；
+        指定 config.columns 时只取这些列，返回（可修改的）DataFrame。
+        """
+        return self._db.read(key, columns=self.config.columns)
+
     def _is_numeric_key(self, key) -> bool:
         """判断key是否为数字类型"""
         try:
@@ -221,19 +263,12 @@ class ReplayScheduler:
 
     def _init_replay_time(self):
         """初始化回放时间"""
-        if self._data_keys:
-            try:
-                first_key = self._data_keys[0]
-                self._current_replay_time = self._parse_timestamp(first_key)
-                if self.config.end_time:
-                    self._end_replay_time = datetime.fromisoformat(self.config.end_time)
-                else:
-                    last_key = self._data_keys[-1]
-                    self._end_replay_time = self._parse_timestamp(last_key)
-            except Exception as e:
-                log.error(f"[ReplayScheduler] 解析回放时间失败: {e}, key={self._data_keys[0]}")
-                self._current_replay_time = datetime.now()
-                self._end_replay_time = self._current_replay_time + timedelta(hours=1)
+        if self._data_total and self._first_ts is not None:
+            self._current_replay_time = datetime.fromtimestamp(self._first_ts)
+            if self.config.end_time:
+                self._end_replay_time = datetime.fromisoformat(self.config.end_time)
+            else:
+                self._end_replay_time = datetime.fromtimestamp(self._last_ts)
         else:
             self._current_replay_time = datetime.now()
             self._end_replay_time = self._current_replay_time + timedelta(hours=1)
@@ -268,15 +303,13 @@ class ReplayScheduler:
 
     def _fetch_and_send(self):
         """获取并发送数据"""
-        while self._key_index < len(self._data_keys):
-            key = self._data_keys[self._key_index]
-
+        for key in self._key_cursor:
             if not self._is_numeric_key(key):
                 log.debug(f"[ReplayScheduler] 跳过无效key: {key}")
                 self._key_index += 1
                 continue
 
-            data = self._db.get(key)
+            data = self._read(key)
 
             if data is None:
                 self._key_index += 1
@@ -300,7 +333,7 @@ class ReplayScheduler:
                 self._completion_event.set()
 
             if self._key_index % 10 == 0:
-                log.info(f"[ReplayScheduler] 已处理 {self._key_index}/{len(self._data_keys)} 条，"
+                log.info(f"[ReplayScheduler] 已处理 {self._key_index}/{self._data_total} 条，"
                         f"当前间隔: {self._current_interval:.2f}s")
 
             self._key_index += 1
@@ -309,14 +342,25 @@ class ReplayScheduler:
         self._has_more_data = False
         self._emit_finished()
 
+    def set_sample_seed(self, seed: Optional[int]):
+        """重置中档抽样的随机种子（用于可复现的回测）"""
+        self.config.sample_seed = seed
+        self._rng = np.random.default_rng(seed)
+
+    def _get_frequency_scheduler(self):
+        from deva.naja.market_hotspot.integration import get_market_hotspot_integration
+
+        integration = get_market_hotspot_integration()
+        hotspot_system = getattr(integration, 'hotspot_system', None) if integration else None
+        return getattr(hotspot_system, 'frequency_scheduler', None) if hotspot_system else None
+
     def _filter_by_level(self, data):
-        """按档位过滤数据"""
+        """按档位过滤数据（按 code 批量查档位，布尔索引）"""
         if not self.config.enable_level_filter:
             return data
 
         try:
-            from deva.naja.market_hotspot.intelligence.frequency_scheduler import get_frequency_scheduler
-            fs = get_frequency_scheduler()
+            fs = self._get_frequency_scheduler()
 
             if fs is None:
                 return data
@@ -326,30 +370,17 @@ class ReplayScheduler:
                 if 'code' not in data.columns:
                     return data
 
-                filtered_rows = []
-                for _, row in data.iterrows():
-                    symbol = row.get('code', '')
-                    if not symbol:
-                        continue
-
-                    try:
-                        level = fs.get_symbol_level(symbol)
-                        level_val = level.value if hasattr(level, 'value') else level
-
-                        if level_val == 2:
-                            filtered_rows.append(row)
-                        elif level_val == 1 and self.config.medium_sample_rate > 0:
-                            import random
-                            if random.random() < self.config.medium_sample_rate:
-                                filtered_rows.append(row)
-                        elif level_val == 0 and not self.config.skip_low_level:
-                            filtered_rows.append(row)
-
-                    except Exception:
-                        filtered_rows.append(row)
-
-                if filtered_rows:
-                    return pd.DataFrame(filtered_rows)
+                codes = data['code'].astype(str).to_numpy()
+                mask = level_filter_mask(
+                    fs.get_levels(codes),
+                    self.config.medium_sample_rate,
+                    self.config.skip_low_level,
+                    self._rng,
+                )
+                mask &= (codes != '') & data['code'].notna().to_numpy()
+
+                if mask.any():
+                    return data.loc[mask]
                 return data
 
         except Exception as e:
@@ -407,7 +438,7 @@ class ReplayScheduler:
             'current_replay_time': str(self._current_replay_time) if self._current_replay_time else None,
             'end_replay_time': str(self._end_replay_time) if self._end_replay_time else None,
             'has_more_data': self._has_more_data,
-            'progress': f"{self._key_index}/{len(self._data_keys)}" if self._data_keys else "0/0",
+            'progress': f"{self._key_index}/{self._data_total}",
             'last_processing_time_ms': self._last_processing_time,
         }
 
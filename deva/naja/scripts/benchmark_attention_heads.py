@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+多头注意力基准：逐事件逐头循环 vs 特征矩阵批量打分（一批事件的延迟）
+
+场景：
+- default  默认四头（price_change / sentiment / volume_spike / historical_alpha）
+- regime   市场状态三头（trend 头按 Q 的 regime 选特征）
+- lambda   四个普通 (Q, K) lambda 头（CallableScorer 兼容路径）
+
+loop 为旧实现：每个头各自遍历事件打分、math.exp softmax、逐个加权求和；
+batch 为 MultiHeadAttention：事件只构建一次特征矩阵，H×N 打分一次 softmax 与矩阵乘。
+两者结果逐头核对一致。
+
+用法: python -m deva.naja.scripts.benchmark_attention_heads [--events 100,1000,5000] [--repeat 20]
+"""
+import argparse
+import math
+import random
+import time
+
+from deva.naja.attention.kernel import (
+    AttentionEvent,
+    AttentionHead,
+    Encoder,
+    MultiHeadAttention,
+    get_default_heads,
+    get_regime_aware_heads,
+)
+
+FEATURES = ["price_change", "sentiment", "volume_spike", "historical_alpha", "momentum", "reversal", "breakout"]
+
+
+def make_events(n, rng):
+    events = []
+    for i in range(n):
+        features = {name: rng.uniform(-3, 3) for name in FEATURES}
+        features.update(alpha=rng.uniform(-1, 1), risk=rng.random(), confidence=rng.random())
+        events.append(AttentionEvent(source="market", data={}, features=features, timestamp=i))
+    return Encoder().encode_batch(events)
+
+
+def loop_head(head, Q, events):
+    """旧实现：逐事件打分与聚合"""
+    scores, values = [], []
+    for e in events:
+        scores.append(head.scorer(Q, e.key if e.key is not None else e.features))
+        values.append(e.value if e.value is not None else {})
+    exp_scores = [math.exp(s) for s in scores]
+    total = sum(exp_scores)
+    result = {"alpha": 0, "risk": 0, "confidence": 0}
+    for s, v in zip(exp_scores, values):
+        if isinstance(v, dict):
+            w = s / total
+            result["alpha"] += w * v.get("alpha", 0)
+            result["risk"] += w * v.get("risk", 0)
+            result["confidence"] += w * v.get("confidence", 0)
+    return result
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', default='100,1000,5000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    Q = {"regime": "trend"}
+    head_sets = {
+        "default": get_default_heads(),
+        "regime": get_regime_aware_heads(),
+        "lambda": [AttentionHead(name, scorer=lambda Q, K, name=name: K.get(name, 0)) for name in FEATURES[:4]],
+    }
+
+    print(f"repeat={args.repeat}")
+    print(f"{'heads':>8} {'events':>7} {'loop ms':>9} {'batch ms':>9} {'speedup':>8}")
+    for n in (int(x) for x in args.events.split(',')):
+        events = make_events(n, rng)
+        for label, heads in head_sets.items():
+            multi_head = MultiHeadAttention(heads, output_mode="concat")
+            loop_ms, expected = timed(lambda: [loop_head(h, Q, events) for h in heads], args.repeat)
+            batch_ms, got = timed(lambda: multi_head.compute(Q, events)["head_outputs"], args.repeat)
+            for exp, out in zip(expected, got):
+                assert all(math.isclose(exp[k], out[k], abs_tol=1e-9) for k in exp)
+            print(f"{label:>8} {n:>7} {loop_ms:>9.3f} {batch_ms:>9.3f} {loop_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+MarketHotspotSystem.process_snapshot 单 tick 延迟基准（全 A 股规模）
+
+分别给出端到端延迟和各阶段耗时：
+- universe   快照 symbols → 编号 / 各阶段槽位
+- weights    WeightPool.update_array
+- frequency  FrequencyScheduler.schedule_array
+- dual       DualEngineCoordinator.process_batch
+- block      BlockHotspotEngine.update
+- global     GlobalHotspotEngine（get_hotspot_and_activity + update）
+
+用法: python -m deva.naja.scripts.benchmark_hotspot_tick [--symbols 5000] [--blocks 400] [--ticks 20]
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from deva.naja.market_hotspot.core import BlockConfig, MarketSnapshot
+from deva.naja.market_hotspot.integration.market_hotspot_system import MarketHotspotSystem
+from deva.naja.market_hotspot.integration.system_config import MarketHotspotSystemConfig
+
+
+def make_market(n_symbols, n_blocks, seed=0):
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f"sh{600000 + i}" for i in range(n_symbols)], dtype=object)
+    blocks = [BlockConfig(block_id=f"B{i}", name=f"题材{i}", symbols=set()) for i in range(n_blocks)]
+    symbol_blocks = {s: [f"B{b}" for b in rng.choice(n_blocks, size=2, replace=False)] for s in symbols}
+    block_ids = np.array([symbol_blocks[s][0] for s in symbols], dtype=object)
+    return rng, symbols, blocks, symbol_blocks, block_ids
+
+
+def make_tick(rng, n, prices):
+    prices *= 1 + rng.normal(0, 0.002, n)
+    returns = rng.normal(0, 2, n)
+    volumes = rng.gamma(2.0, 1e5, n)
+    return returns, volumes, prices.copy()
+
+
+def median_ms(fn, ticks):
+    samples = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--blocks', type=int, default=400)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng, symbols, blocks, symbol_blocks, block_ids = make_market(args.symbols, args.blocks)
+    system = MarketHotspotSystem(MarketHotspotSystemConfig(max_symbols=max(args.symbols, 5000)))
+    system.initialize(blocks, symbol_blocks)
+    ctx = system._get_context('CN')
+    prices = rng.uniform(5, 50, args.symbols)
+
+    clock = [1_000.0]
+
+    def tick():
+        clock[0] += 3.0
+        returns, volumes, p = make_tick(rng, args.symbols, prices)
+        return system.process_snapshot(symbols, returns, volumes, p, block_ids, clock[0])
+
+    for _ in range(args.warmup):
+        result = tick()
+    end_to_end = median_ms(tick, args.ticks)
+
+    returns, volumes, p = make_tick(rng, args.symbols, prices)
+    block_hotspot = result['block_hotspot']
+    universe = ctx.universe
+    pool, scheduler, dual = ctx.weight_pool, ctx.frequency_scheduler, ctx.dual_engine
+    pool_positions = universe.positions(symbols, pool._symbol_to_idx)
+    weights = pool.update_array(pool_positions, returns, volumes, block_hotspot, clock[0]).copy()
+    src, dst = universe.translate(pool._symbol_to_idx, scheduler._symbol_to_idx)
+    row_weights = np.ones(args.symbols)
+    row_weights[pool_positions >= 0] = weights[pool_positions[pool_positions >= 0]]
+
+    def stage_frequency():
+        scheduler_weights = np.full(len(scheduler._symbol_to_idx), np.nan)
+        scheduler_weights[dst] = weights[src]
+        scheduler.schedule_array(scheduler_weights, clock[0])
+
+    def stage_dual():
+        clock[0] += 3.0
+        dual.process_batch(symbols, universe.positions(symbols, dual.river._symbol_to_idx), p, volumes,
+                           result['global_hotspot'], block_hotspot, row_weights, clock[0])
+
+    def stage_global():
+        snapshot = MarketSnapshot(symbols=symbols, returns=returns, volumes=volumes, prices=p,
+                                  block_ids=block_ids, timestamp=clock[0])
+        ctx.global_hotspot.get_hotspot_and_activity(snapshot)
+        ctx.global_hotspot.update(snapshot)
+
+    stages = {
+        'universe': lambda: universe.positions(symbols.copy(), pool._symbol_to_idx),
+        'weights': lambda: pool.update_array(pool_positions, returns, volumes, block_hotspot, clock[0]),
+        'frequency': stage_frequency,
+        'dual': stage_dual,
+        'result': lambda: result.top_weights(50),
+        'block': lambda: ctx.block_engine.update(symbols, returns, volumes, clock[0], block_ids),
+        'global': stage_global,
+    }
+    timings = {name: median_ms(fn, args.ticks) for name, fn in stages.items()}
+    array_total = sum(timings[k] for k in ('universe', 'weights', 'frequency', 'dual', 'result'))
+
+    print(f"symbols={args.symbols} blocks={args.blocks} ticks={args.ticks}")
+    print(f"{'stage':>10} {'median(ms)':>12}")
+    for name, ms in timings.items():
+        print(f"{name:>10} {ms:>12.3f}")
+    print(f"{'arrays':>10} {array_total:>12.3f}   (universe + weights + frequency + dual + result)")
+    print(f"{'end2end':>10} {end_to_end:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
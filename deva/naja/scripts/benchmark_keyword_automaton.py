@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+关键词匹配基准：逐词子串判断 vs 编译好的关键词自动机（单条新闻的匹配延迟）
+
+场景：一批新闻依次经过 叙事 / 供需动态 / 市场情绪 / 供需问题 四个检测器
+- naive      每个检测器拼接文本后对自己词典的每个关键词做一次子串判断（旧实现）
+- automaton  四个分组编译进同一个自动机，每条新闻单遍扫描，检测器共享扫描结果
+
+叙事词典 = 默认叙事关键词 + --narratives 个合成叙事（每个 --keywords 个关键词），
+模拟新闻爆发时关注主题与关键词规模变大的情况。
+
+用法: python -m deva.naja.scripts.benchmark_keyword_automaton [--narratives 0,50,200] [--keywords 40] [--items 500]
+"""
+import argparse
+import random
+import time
+
+from deva.naja.cognition.semantic.keyword_automaton import KeywordAutomaton
+from deva.naja.cognition.semantic.keyword_registry import (
+    DEFAULT_NARRATIVE_KEYWORDS,
+    DYNAMICS_KEYWORDS,
+    SENTIMENT_KEYWORDS,
+    SUPPLY_DEMAND_KEYWORDS,
+)
+
+_CJK = [chr(c) for c in range(0x4E00, 0x4E00 + 800)]
+
+
+def make_dictionaries(narratives, keywords, rng):
+    narrative = {k: list(v) for k, v in DEFAULT_NARRATIVE_KEYWORDS.items()}
+    for n in range(narratives):
+        narrative[f"合成叙事{n}"] = ["".join(rng.choices(_CJK, k=rng.randint(2, 4))) for _ in range(keywords)]
+    return {
+        "narrative": narrative,
+        "dynamics": DYNAMICS_KEYWORDS,
+        "sentiment": SENTIMENT_KEYWORDS,
+        "supply_demand": SUPPLY_DEMAND_KEYWORDS,
+    }
+
+
+def make_news(dictionaries, items, rng):
+    vocab = [k for mapping in dictionaries.values() for ks in mapping.values() for k in ks]
+    news = []
+    for _ in range(items):
+        parts = ["".join(rng.choices(_CJK, k=rng.randint(5, 30))) for _ in range(rng.randint(5, 15))]
+        parts += rng.sample(vocab, 3)
+        rng.shuffle(parts)
+        news.append("，".join(parts))
+    return news
+
+
+def naive_detect(dictionaries, text):
+    lower = text.lower()
+    result = {}
+    for group, mapping in dictionaries.items():
+        matches = {}
+        for label, keywords in mapping.items():
+            hits = [k for k in keywords if k and ((k.lower() in lower) if k.isascii() else (k in text))]
+            if hits:
+                matches[label] = hits
+        result[group] = matches
+    return result
+
+
+def automaton_detect(automaton, dictionaries, text):
+    return {group: automaton.match(text, group) for group in dictionaries}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--narratives', default='0,50,200')
+    parser.add_argument('--keywords', type=int, default=40)
+    parser.add_argument('--items', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"items={args.items} keywords/narrative={args.keywords}")
+    print(f"{'narratives':>10} {'patterns':>9} {'build ms':>9} {'naive us':>9} {'automaton us':>13} {'speedup':>8}")
+    for extra in (int(n) for n in args.narratives.split(',')):
+        dictionaries = make_dictionaries(extra, args.keywords, rng)
+        news = make_news(dictionaries, args.items, rng)
+
+        start = time.perf_counter()
+        automaton = KeywordAutomaton(dictionaries, cache_size=args.items)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        expected = [naive_detect(dictionaries, text) for text in news]
+        naive_us = (time.perf_counter() - start) / len(news) * 1e6
+
+        start = time.perf_counter()
+        actual = [automaton_detect(automaton, dictionaries, text) for text in news]
+        automaton_us = (time.perf_counter() - start) / len(news) * 1e6
+
+        assert actual == expected
+        print(f"{len(dictionaries['narrative']):>10} {automaton.pattern_count:>9} {build_ms:>9.1f}"
+              f" {naive_us:>9.1f} {automaton_us:>13.1f} {naive_us / automaton_us:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
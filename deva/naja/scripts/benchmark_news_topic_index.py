@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+新闻认知向量索引基准：逐个余弦循环 vs float32 矩阵索引（单条新闻的延迟）
+
+场景：
+- nearest_topic  在 --topics 个主题中找最近主题（TopicCenterIndex 粗筛 + 精确复核 vs 逐个比较）
+- novelty        与 --history 条历史事件比较的新颖度（EmbeddingRing vs 逐条余弦）
+- score_batch    一批 --batch 条新闻的注意力评分（批量 vs 逐条 score）
+
+主题分配结果逐条与逐个比较的结果核对一致。
+
+用法: python -m deva.naja.scripts.benchmark_news_topic_index [--topics 50,200,1000] [--history 1000] [--batch 80]
+"""
+import argparse
+import copy
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from deva.naja.cognition.semantic.attention_scorer import AttentionScorer
+from deva.naja.cognition.semantic.embedding_index import TopicCenterIndex
+from deva.naja.cognition.semantic.news_event import NewsEvent
+
+DIM = 28  # NewsMindStrategy._simple_embedding 的维度
+
+
+def cosine(v1, v2):
+    return AttentionScorer._cosine_similarity(v1, v2)
+
+
+def nearest_exhaustive(topics, vector, threshold):
+    best_topic, best_similarity = None, -1
+    for topic_id, topic in topics.items():
+        sim = cosine(vector, topic.center)
+        if sim > best_similarity and sim > threshold:
+            best_similarity, best_topic = sim, topic_id
+    return best_topic
+
+
+def nearest_indexed(index, topics, vector, threshold):
+    index.sync(topics)
+    shortlist = index.shortlist(vector, threshold, nearest=True)
+    if shortlist is None:
+        shortlist = list(topics)
+    elif len(shortlist) > 1:
+        wanted = set(shortlist)
+        shortlist = [topic_id for topic_id in topics if topic_id in wanted]
+    best_topic, best_similarity = None, -1
+    for topic_id in shortlist:
+        sim = cosine(vector, topics[topic_id].center)
+        if sim > best_similarity and sim > threshold:
+            best_similarity, best_topic = sim, topic_id
+    return best_topic
+
+
+def novelty_loop(history, event):
+    sims = [cosine(event.vector, h.vector) for h in history if h.vector is not None]
+    return 1.0 - np.mean(sims) if sims else 0.5
+
+
+def make_event(i, vector):
+    return NewsEvent(id=str(i), timestamp=datetime.now(), source="news", event_type="news",
+                     content=f"新闻 {i}", vector=vector)
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return (time.perf_counter() - start) / len(items) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--topics', default='50,200,1000')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--history', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=80)
+    parser.add_argument('--threshold', type=float, default=0.9)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.random((args.queries, DIM)).tolist()
+
+    print(f"dim={DIM} queries={args.queries} threshold={args.threshold}")
+    print(f"{'topics':>7} {'loop us':>9} {'index us':>9} {'speedup':>8}")
+    for n in (int(t) for t in args.topics.split(',')):
+        topics = {i + 1: SimpleNamespace(center=rng.random(DIM).tolist()) for i in range(n)}
+        index = TopicCenterIndex()
+        index.sync(topics)
+        loop_us, expected = timed(lambda v: nearest_exhaustive(topics, v, args.threshold), queries)
+        index_us, got = timed(lambda v: nearest_indexed(index, topics, v, args.threshold), queries)
+        assert got == expected
+        print(f"{n:>7} {loop_us:>9.1f} {index_us:>9.1f} {loop_us / index_us:>7.1f}x")
+
+    scorer = AttentionScorer(history_size=args.history)
+    for i in range(args.history):
+        scorer.score(make_event(i, rng.random(DIM).tolist()))
+    probes = [make_event(-i, v) for i, v in enumerate(queries)]
+    loop_us, expected = timed(lambda e: novelty_loop(scorer.history, e), probes)
+    ring_us, got = timed(scorer._novelty_score, probes)
+    assert np.allclose(got, expected, atol=1e-6)
+    print(f"\nnovelty history={args.history}: loop {loop_us:.1f} us, ring {ring_us:.1f} us"
+          f" ({loop_us / ring_us:.1f}x)")
+
+    batch = [make_event(10_000 + i, rng.random(DIM).tolist()) for i in range(args.batch)]
+    sequential = copy.deepcopy(scorer)
+    start = time.perf_counter()
+    expected = [sequential.score(e) for e in batch]
+    seq_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    got = scorer.score_batch(batch)
+    batch_ms = (time.perf_counter() - start) * 1e3
+    assert np.allclose(got, expected, atol=1e-6)
+    print(f"score batch={args.batch}: sequential {seq_ms:.2f} ms, score_batch {batch_ms:.2f} ms"
+          f" ({seq_ms / batch_ms:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+EventSelfAttention 微基准：逐元素循环实现 vs 向量化实现
+
+用法: python -m deva.naja.scripts.benchmark_self_attention [--loop-max 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from deva.naja.attention.kernel.self_attention import EventSelfAttention
+
+
+def loop_attention(Q, K, V):
+    batch_size, num_heads, seq_len, d_k = Q.shape
+    scores = np.zeros((batch_size, num_heads, seq_len, seq_len))
+    for b in range(batch_size):
+        for h in range(num_heads):
+            for i in range(seq_len):
+                for j in range(seq_len):
+                    scores[b, h, i, j] = np.dot(Q[b, h, i], K[b, h, j]) / np.sqrt(d_k)
+    exp_x = np.exp(scores - np.max(scores, axis=-1, keepdims=True))
+    weights = exp_x / np.sum(exp_x, axis=-1, keepdims=True)
+    return np.matmul(weights, V), weights
+
+
+def timeit(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--loop-max', type=int, default=200, help='循环实现只测到该序列长度')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    d_model, num_heads = 128, 4
+    d_k = d_model // num_heads
+
+    attn64 = EventSelfAttention(d_model, num_heads)
+    attn32 = EventSelfAttention(d_model, num_heads, dtype=np.float32)
+    attn_topk = EventSelfAttention(d_model, num_heads, top_k=16)
+
+    print(f"{'seq_len':>8} {'loop(ms)':>12} {'f64(ms)':>10} {'f32(ms)':>10} {'top16(ms)':>10}")
+    for seq_len in (10, 50, 100, 200, 500, 1000):
+        Q, K, V = (rng.standard_normal((1, num_heads, seq_len, d_k)) for _ in range(3))
+        Q32, K32, V32 = (x.astype(np.float32) for x in (Q, K, V))
+
+        loop_ms = timeit(lambda: loop_attention(Q, K, V), repeat=1) * 1000 if seq_len <= args.loop_max else float('nan')
+        f64_ms = timeit(lambda: attn64._scaled_dot_product_attention(Q, K, V)) * 1000
+        f32_ms = timeit(lambda: attn32._scaled_dot_product_attention(Q32, K32, V32)) * 1000
+        topk_ms = timeit(lambda: attn_topk._scaled_dot_product_attention(Q, K, V)) * 1000
+        print(f"{seq_len:>8} {loop_ms:>12.2f} {f64_ms:>10.3f} {f32_ms:>10.3f} {topk_ms:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
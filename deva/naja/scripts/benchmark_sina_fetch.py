@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sina 全量获取基准（离线）：顺序分批 vs 常驻 SinaFetcher 并发分批
+
+启动本地 HTTP 替身服务器模拟新浪行情接口（可设置单次请求延迟），
+比较旧的“逐批 + sleep(0.05)”方式与有界并发方式获取 ~5000 只代码的耗时。
+
+用法: python -m deva.naja.scripts.benchmark_sina_fetch [--codes 5000] [--latency 0.15]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import aiohttp
+
+from deva.naja.market_hotspot.data.sina_parser import (
+    SinaFetcher,
+    _fetch_sina_batch_with_session,
+)
+
+
+def make_server(latency):
+    fields = ["名称", "10.0", "9.8", "10.2", "10.5", "9.7", "10.1", "10.2", "123400", "1234567.0"]
+    payload = ",".join(fields + ["0"] * (33 - len(fields)))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            codes = unquote(self.path.split("list=", 1)[-1]).split(",")
+            time.sleep(latency)
+            body = "\n".join(f'var hq_str_{c}="{payload}";' for c in codes).encode("gbk")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=gbk")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/list="
+
+
+async def sequential(codes, url, batch_size=800):
+    """旧实现：逐批串行 + 批间 sleep"""
+    data = {}
+    async with aiohttp.ClientSession() as session:
+        for i in range(0, len(codes), batch_size):
+            data.update(await _fetch_sina_batch_with_session(codes[i:i + batch_size], session, url))
+            await asyncio.sleep(0.05)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codes", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.15, help="替身服务器单次请求延迟（秒）")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    server, url = make_server(args.latency)
+    codes = [f"sh{600000 + i}" for i in range(args.codes)]
+
+    seq = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        loop = asyncio.new_event_loop()
+        n = len(loop.run_until_complete(sequential(codes, url)))
+        loop.close()
+        seq.append(time.perf_counter() - start)
+
+    fetcher = SinaFetcher(base_url=url)
+    conc = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        m = len(fetcher.fetch(codes))
+        conc.append(time.perf_counter() - start)
+    fetcher.close()
+    server.shutdown()
+
+    print(f"codes={args.codes} latency={args.latency * 1000:.0f}ms batches={fetcher.last_stats.get('batches')}")
+    print(f"sequential + new loop : median {sorted(seq)[len(seq) // 2] * 1000:8.1f} ms  ({n} quotes)")
+    print(f"SinaFetcher concurrent: median {sorted(conc)[len(conc) // 2] * 1000:8.1f} ms  ({m} quotes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+TradingEventBus.publish 吞吐基准
+
+场景：
+- dedup      去重窗口内有大量近期指纹时的发布吞吐（窗口记录数 = --recent）
+- sync       N 个同步订阅者
+- slow-sync  多个发布线程，其中一个同步订阅者每次回调耗时 --slow-ms
+- slow-async 同上，慢订阅者改为有界异步队列（--queue-size），溢出丢弃
+
+用法: python -m deva.naja.scripts.benchmark_trading_bus [--events 20000] [--subscribers 8] [--publishers 4]
+"""
+import argparse
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from deva.naja.events.trading_bus import TradingEventBus
+
+
+@dataclass
+class BenchEvent:
+    symbol: str
+    importance: float = 0.5
+    market: str = "CN"
+
+
+def run_publishers(bus, n_events, n_publishers):
+    """多线程发布，返回每秒事件数"""
+    per_thread = n_events // n_publishers
+    events = [[BenchEvent(f"{t}-{i}") for i in range(per_thread)] for t in range(n_publishers)]
+
+    def publish_all(batch):
+        for event in batch:
+            bus.publish(event)
+
+    threads = [threading.Thread(target=publish_all, args=(batch,)) for batch in events]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_thread * n_publishers / (time.perf_counter() - start)
+
+
+def make_bus(n_subscribers, slow_ms=0.0, queue_size=0):
+    bus = TradingEventBus(use_stream=False, dedup_window=60.0)
+    bus._max_recent = 10 ** 6
+    for i in range(n_subscribers):
+        bus.subscribe("BenchEvent", lambda e: None, subscription_id=f"fast_{i}")
+    if slow_ms:
+        bus.subscribe("BenchEvent", lambda e: time.sleep(slow_ms / 1000), subscription_id="slow_0",
+                      queue_size=queue_size)
+    return bus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--subscribers', type=int, default=8)
+    parser.add_argument('--publishers', type=int, default=4)
+    parser.add_argument('--recent', type=int, default=1000)
+    parser.add_argument('--slow-ms', type=float, default=1.0)
+    parser.add_argument('--queue-size', type=int, default=256)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    bus = make_bus(args.subscribers)
+    bus._max_recent = args.recent
+    for i in range(args.recent):
+        bus.publish(BenchEvent(f"warm-{i}"))
+    dedup = run_publishers(bus, args.events, 1)
+
+    sync = run_publishers(make_bus(args.subscribers), args.events, args.publishers)
+
+    slow_events = max(args.publishers, min(args.events, int(2000 / max(args.slow_ms, 0.01))))
+    slow_sync = run_publishers(make_bus(args.subscribers, args.slow_ms), slow_events, args.publishers)
+
+    async_bus = make_bus(args.subscribers, args.slow_ms, args.queue_size)
+    slow_async = run_publishers(async_bus, args.events, args.publishers)
+    slow_stats = async_bus.get_subscriber_stats()["slow_0"]
+    async_bus.unsubscribe("slow_0")
+
+    print(f"events={args.events} subscribers={args.subscribers} publishers={args.publishers} "
+          f"recent={args.recent} slow_ms={args.slow_ms} queue_size={args.queue_size}")
+    print(f"{'scenario':>11} {'events/s':>12}")
+    print(f"{'dedup':>11} {dedup:>12.0f}")
+    print(f"{'sync':>11} {sync:>12.0f}")
+    print(f"{'slow-sync':>11} {slow_sync:>12.0f}   ({slow_events} events)")
+    print(f"{'slow-async':>11} {slow_async:>12.0f}   "
+          f"(slow subscriber dropped={slow_stats['dropped']} max_depth={slow_stats['max_depth']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+VirtualPortfolio 行情更新基准：单次更新开销与持仓簿大小的关系
+
+场景：
+- update_price   单只股票的价格推送，轮流落在 --active 只持仓股票上
+                 （持仓簿中共 --book 个持仓，分布在不同股票上）
+- update_prices  一次全市场行情（--quotes 只股票，其中包含全部持仓股票）
+- flush          提交期间累积的脏持仓（每个持仓一行，同一持仓多次更新只写一次）
+
+持久化使用临时目录中的 DBStream；计时期间不触发按条数提交，
+行情路径与提交开销分开统计。
+
+用法: python -m deva.naja.scripts.benchmark_virtual_portfolio [--books 10,1000,10000] [--ticks 2000] [--active 10]
+"""
+import argparse
+import logging
+import tempfile
+import time
+
+import numpy as np
+
+from deva.core.store import DBStream
+from deva.naja.bandit import virtual_portfolio as vp
+
+
+class _MarketTime:
+    def get_market_time(self):
+        return time.time()
+
+
+def make_portfolio(book, path):
+    vp.SR = lambda name: _MarketTime()
+    vp.NB = lambda name, **kwargs: DBStream(name, path, **kwargs)
+    portfolio = vp.VirtualPortfolio(account_name=f"bench_{book}", persist_interval=600)
+    portfolio._position_db.flush_batch_size = 10 ** 9
+    portfolio.set_capital(1e12)
+    portfolio.set_max_total_pct(1.0)
+    with portfolio._position_db.batch():
+        for i in range(book):
+            code = f"{i:06d}"
+            position = vp.VirtualPosition(
+                position_id=f"VP_{code}", strategy_id="bench", strategy_name="bench",
+                stock_code=code, stock_name=code, entry_price=10.0, current_price=10.0,
+                quantity=100.0, entry_time=0.0, last_update_time=0.0,
+                stop_loss=1.0, take_profit=100.0,
+            )
+            portfolio._positions[position.position_id] = position
+            portfolio._index(position)
+            portfolio._mark_dirty(position)
+    return portfolio
+
+
+def timed_flush(portfolio):
+    start = time.perf_counter()
+    rows = portfolio.flush()
+    return (time.perf_counter() - start) * 1e3, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--books', default='10,1000,10000')
+    parser.add_argument('--ticks', type=int, default=2000)
+    parser.add_argument('--active', type=int, default=10)
+    parser.add_argument('--quotes', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(0)
+    print(f"ticks={args.ticks} active={args.active} quotes={args.quotes} rounds={args.rounds}")
+    print(f"{'book':>7} {'update_price us':>16} {'flush ms':>9} {'rows':>6}"
+          f" {'update_prices ms':>17} {'flush ms':>9} {'rows':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for book in (int(b) for b in args.books.split(',')):
+            portfolio = make_portfolio(book, f"{tmp}/vp_{book}")
+            portfolio.flush()
+
+            active = min(args.active, book)
+            codes = [f"{i % active:06d}" for i in range(args.ticks)]
+            prices = 10.0 + rng.random(args.ticks)
+            start = time.perf_counter()
+            for code, price in zip(codes, prices):
+                portfolio.update_price(code, float(price))
+            single_us = (time.perf_counter() - start) / args.ticks * 1e6
+            single_flush_ms, single_rows = timed_flush(portfolio)
+
+            market_codes = np.array([f"{i:06d}" for i in range(max(args.quotes, book))])
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                portfolio.update_prices((market_codes, 10.0 + rng.random(len(market_codes))))
+            batch_ms = (time.perf_counter() - start) / args.rounds * 1e3
+            batch_flush_ms, batch_rows = timed_flush(portfolio)
+
+            print(f"{book:>7} {single_us:>16.1f} {single_flush_ms:>9.1f} {single_rows:>6}"
+                  f" {batch_ms:>17.2f} {batch_flush_ms:>9.1f} {batch_rows:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+迁移 quant_snapshot_5min_window（NB 表，每个快照一个 pickle）到列式快照存储
+
+已迁移的时间戳会被跳过，可重复执行；默认不删除源表数据。
+
+用法: python -m deva.naja.scripts.migrate_snapshots_columnar [--table T] [--start ISO] [--end ISO]
+                                                              [--root DIR] [--delete-source]
+"""
+import argparse
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from deva import NB
+from deva.naja.market_hotspot.data.snapshot_store import SNAPSHOT_TABLE, ColumnarSnapshotStore
+
+
+def _to_frame(value):
+    if isinstance(value, pd.DataFrame):
+        return value
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return pd.DataFrame.from_records(value)
+    return None
+
+
+def migrate(table, root=None, start=None, end=None, delete_source=False):
+    db = NB(table, key_mode='time')
+    store = ColumnarSnapshotStore(table, root=root)
+
+    start_ts = datetime.fromisoformat(start).timestamp() if start else None
+    end_ts = datetime.fromisoformat(end).timestamp() if end else None
+
+    pairs = []
+    for key in db.keys():
+        try:
+            ts = float(key)
+        except (TypeError, ValueError):
+            continue
+        if (start_ts is None or ts >= start_ts) and (end_ts is None or ts <= end_ts):
+            pairs.append((ts, key))
+    pairs.sort()
+
+    migrated = skipped = rows = 0
+    t0 = time.perf_counter()
+    for n, (ts, key) in enumerate(pairs, 1):
+        if ts in store:
+            skipped += 1
+        else:
+            frame = _to_frame(db.get(key))
+            if frame is None or frame.empty:
+                skipped += 1
+                continue
+            rows += store.append(frame, ts)
+            migrated += 1
+        if delete_source:
+            del db[key]
+        if n % 100 == 0:
+            print(f'  {n}/{len(pairs)} 快照, {rows} 行')
+
+    elapsed = time.perf_counter() - t0
+    print(f'迁移 {migrated} 个快照 ({rows} 行), 跳过 {skipped}, 用时 {elapsed:.1f}s')
+    print(f'列式存储: {store.path} ({store.nbytes() / 1024 / 1024:.1f} MB, {len(store.days())} 天)')
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--table', default=SNAPSHOT_TABLE)
+    parser.add_argument('--root', default=None, help='列式存储根目录（默认 DEVA_SNAPSHOT_PATH 或 ~/.deva/snapshots）')
+    parser.add_argument('--start', default=None, help='开始时间 (ISO)')
+    parser.add_argument('--end', default=None, help='结束时间 (ISO)')
+    parser.add_argument('--delete-source', action='store_true', help='迁移后删除 NB 表中的对应快照')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print(f'迁移 {args.table} → 列式快照存储')
+    print('=' * 60)
+    migrate(args.table, root=args.root, start=args.start, end=args.end, delete_source=args.delete_source)
+    if args.delete_source:
+        print('建议: 运行 VACUUM 压缩数据库')
+
+
+if __name__ == '__main__':
+    main()
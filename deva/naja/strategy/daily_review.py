@@ -820,9 +820,12 @@ class DailyReviewAnalyzer:
     def _load_ashare_snapshots_for_day(self) -> tuple[list, str, str, bool]:
         """加载A股当日完整快照数据"""
         try:
-            from deva import NB
-            snapshot_db = NB('quant_snapshot_5min_window', key_mode='time')
-            keys = list(snapshot_db.keys())
+            from deva.naja.market_hotspot.data.snapshot_store import SnapshotRange
+
+            # 列式快照之前的日期仍从 NB 表读取
+            snapshots_range = SnapshotRange('quant_snapshot_5min_window')
+            keys = list(snapshots_range)
+            read_snapshot = snapshots_range.read
             if not keys:
                 return [], "", "", True
 
@@ -858,7 +861,7 @@ class DailyReviewAnalyzer:
 
             snapshots = []
             for ts, key in day_pairs:
-                data_list = snapshot_db.get(key)
+                data_list = read_snapshot(key)
                 if not data_list or not isinstance(data_list, list):
                     continue
                 records = self._normalize_ashare_records(data_list)
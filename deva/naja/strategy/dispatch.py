@@ -0,0 +1,173 @@
+"""数据源级分发 - 一个数据源只订阅一次，一个 tick 一个批处理任务
+
+原来每个绑定到数据源的 StrategyEntry 各自 sink 一个 on_data 回调，每个 tick 给线程池
+提交 N 个任务；现在每个数据源流只挂一个 DatasourceDispatcher：
+
+- 数据包装（_datasource_id / _receive_time）每个 tick 只做一次
+- 同一组字典的补齐经 enrichment 共享缓存只计算一次（各策略拿到副本）
+- 所有绑定策略在同一个线程池任务里依次执行；当前空闲的策略先执行，
+  仍在处理上一 tick 的策略放到最后，避免慢策略拖住其他策略
+- 策略重复启动不会重复订阅（按策略 id 去重）
+
+窗口缓冲和 timed 触发状态仍是每个策略自己的（各策略窗口参数不同）。
+
+另外提供 result_fingerprint：结果去重用的结构哈希，替代每次把上次结果和本次结果
+各序列化一遍 JSON 再比较。
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+
+from ..infra.runtime.thread_pool import get_thread_pool
+
+# 去重时忽略的顶层动态字段
+VOLATILE_KEYS = frozenset({'timestamp', 'ts', 'datetime', 'time', 'created_at', 'updated_at'})
+
+
+def _structure(value: Any) -> Any:
+    """结果 → 可哈希结构
+
+    与原 json.dumps(sort_keys=True, default=str) 的比较口径一致：dict 键按字符串、
+    list/tuple 等同、int / float / bool 区分、无法序列化的对象按 str()。
+    DataFrame / Series / ndarray 按内容哈希（原实现用 str()，中间行被截断，变化会漏掉）。
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return ('b', value)
+    if isinstance(value, int):
+        return ('i', value)
+    if isinstance(value, float):
+        return ('f', 'nan' if math.isnan(value) else value)
+    if isinstance(value, dict):
+        return ('d', tuple(sorted((str(k), _structure(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ('l', tuple(_structure(v) for v in value))
+
+    module = type(value).__module__
+    if module.startswith('pandas'):
+        import pandas as pd
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            columns = tuple(map(str, value.columns)) if isinstance(value, pd.DataFrame) else (str(value.name),)
+            try:
+                content = int(pd.util.hash_pandas_object(value, index=True).sum())
+            except TypeError:
+                content = str(value.to_dict())
+            return ('pd', type(value).__name__, value.shape, columns, content)
+    elif module == 'numpy':
+        import numpy as np
+        if isinstance(value, np.ndarray):
+            if value.dtype == object:
+                return ('l', tuple(_structure(v) for v in value.tolist()))
+            return ('np', str(value.dtype), value.shape, hash(value.tobytes()))
+    return str(value)
+
+
+def result_fingerprint(result: Any) -> int:
+    """策略结果的结构哈希（顶层 VOLATILE_KEYS 不参与）"""
+    if isinstance(result, dict):
+        result = {k: v for k, v in result.items() if k not in VOLATILE_KEYS}
+    return hash(_structure(result))
+
+
+class DatasourceDispatcher:
+    """单个数据源流到其绑定策略的分发器"""
+
+    def __init__(self, datasource_id: str, datasource_name: str, stream: Any):
+        self.datasource_id = datasource_id
+        self.datasource_name = datasource_name
+        self.stream = stream
+        self._entries: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._subscribed = False
+        self.dispatched_count = 0
+
+    def subscribe(self) -> bool:
+        """在数据源流上挂唯一的回调"""
+        with self._lock:
+            if self._subscribed:
+                return True
+            stream = self.stream
+            if hasattr(stream, "sink"):
+                stream.sink(self.on_data)
+            elif hasattr(stream, "map"):
+                stream.map(self.on_data).sink(lambda x: None)
+            elif hasattr(stream, "subscribe"):
+                stream.subscribe(self.on_data)
+            else:
+                return False
+            self._subscribed = True
+            return True
+
+    def attach(self, entry: Any):
+        with self._lock:
+            self._entries[entry.id] = entry
+
+    def detach(self, entry: Any):
+        with self._lock:
+            if self._entries.get(entry.id) is entry:
+                del self._entries[entry.id]
+
+    def entries(self) -> List[Any]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def on_data(self, data: Any):
+        entries = [e for e in self.entries() if e._accepts_data()]
+        if not entries:
+            return
+        if sys.is_finalizing():
+            return
+
+        envelope = {
+            "_datasource_id": self.datasource_id,
+            "_datasource_name": self.datasource_name,
+            "_receive_time": time.time(),
+            "data": data,
+        }
+        try:
+            get_thread_pool().submit(self._dispatch, envelope, entries)
+        except RuntimeError:
+            # 线程池已关闭，忽略
+            pass
+
+    def _dispatch(self, envelope: Dict[str, Any], entries: List[Any]):
+        """一个 tick 的批处理：空闲策略先跑，仍在处理上一 tick 的策略排在最后"""
+        idle, busy = [], []
+        for entry in entries:
+            (busy if entry._processing_lock.locked() else idle).append(entry)
+        for entry in idle + busy:
+            entry._process_data_async(dict(envelope))
+        self.dispatched_count += 1
+
+
+_dispatchers: Dict[str, DatasourceDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_datasource_dispatcher(datasource: Any) -> Optional[DatasourceDispatcher]:
+    """数据源的分发器（数据源流对象变化时重建）；流为空返回 None"""
+    stream = datasource.get_stream()
+    if stream is None:
+        return None
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(datasource.id)
+        if dispatcher is None or dispatcher.stream is not stream:
+            dispatcher = DatasourceDispatcher(datasource.id, datasource.name, stream)
+            _dispatchers[datasource.id] = dispatcher
+        dispatcher.datasource_name = datasource.name
+    return dispatcher
+
+
+def detach_from_dispatchers(entry: Any):
+    """策略停止时从所有数据源分发器上摘除"""
+    with _dispatchers_lock:
+        dispatchers = list(_dispatchers.values())
+    for dispatcher in dispatchers:
+        dispatcher.detach(entry)
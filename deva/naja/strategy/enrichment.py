@@ -0,0 +1,213 @@
+"""字典补齐缓存 - 策略输入 DataFrame 与字典维表的共享 join
+
+按 (profile_id, payload 版本) 缓存维表：payload 只在版本变化时从字典读取一次，
+每个 join 键预先建好唯一索引，补齐时用 get_indexer 取行，不再 copy + merge。
+
+同一数据源上的多个策略收到的是同一个 DataFrame 对象，最近一次补齐结果按
+(输入对象, profile_ids, 版本) 记住，后续策略直接拿副本。
+
+结果与原 merge 实现一致：左连接、保持左表行序、RangeIndex、code 键统一转 str、
+左表同名列的缺失值用字典值填充。维表 join 键不唯一或键类型不一致时回退到 merge。
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from deva.naja.register import SR
+
+JOIN_KEYS = ("code", "ts_code", "symbol", "name")
+
+
+def infer_join_key(left_df: pd.DataFrame, right_df: pd.DataFrame) -> Optional[str]:
+    common_cols = set(left_df.columns).intersection(set(right_df.columns))
+    for key in JOIN_KEYS:
+        if key in common_cols:
+            return key
+    return None
+
+
+def merge_enrich(df: pd.DataFrame, dim_df: pd.DataFrame, join_key: str) -> pd.DataFrame:
+    """原始 merge 实现（维表键不唯一等情况的回退路径）"""
+    left_df = df.copy()
+    right_df = dim_df.copy()
+
+    if join_key == "code":
+        left_df[join_key] = left_df[join_key].astype(str)
+        right_df[join_key] = right_df[join_key].astype(str)
+
+    enrich_cols = [c for c in right_df.columns if c != join_key]
+    if not enrich_cols:
+        return left_df
+
+    merged = left_df.merge(
+        right_df[[join_key] + enrich_cols],
+        on=join_key,
+        how="left",
+        suffixes=("", "__dict"),
+    )
+
+    for col in enrich_cols:
+        dict_col = f"{col}__dict"
+        if dict_col not in merged.columns:
+            continue
+        if col in left_df.columns:
+            merged[col] = merged[col].where(merged[col].notna(), merged[dict_col])
+            merged.drop(columns=[dict_col], inplace=True)
+        else:
+            merged.rename(columns={dict_col: col}, inplace=True)
+
+    return merged
+
+
+class _DimensionTable:
+    """一个字典 payload 的维表及其按 join 键建好的索引"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._indexed: Dict[str, Tuple[List[str], Optional[pd.DataFrame]]] = {}
+        self._padded: Dict[str, pd.DataFrame] = {}
+
+    def indexed(self, join_key: str) -> Tuple[List[str], Optional[pd.DataFrame]]:
+        """(补齐列, 以 join 键为唯一索引的表)；键不唯一时表为 None"""
+        cached = self._indexed.get(join_key)
+        if cached is None:
+            enrich_cols = [c for c in self.frame.columns if c != join_key]
+            keys = self.frame[join_key]
+            if join_key == "code":
+                keys = keys.astype(str)
+            table = self.frame[enrich_cols].set_axis(pd.Index(keys, name=join_key), axis=0)
+            cached = (enrich_cols, table if table.index.is_unique else None)
+            self._indexed[join_key] = cached
+        return cached
+
+    def padded(self, join_key: str, table: pd.DataFrame) -> pd.DataFrame:
+        """末尾追加一行缺失值的表（位置 -1 取到缺失行，与左连接未命中一致）"""
+        padded = self._padded.get(join_key)
+        if padded is None:
+            padded = table.reset_index(drop=True).reindex(range(len(table) + 1))
+            self._padded[join_key] = padded
+        return padded
+
+    def join(self, df: pd.DataFrame, join_key: str) -> pd.DataFrame:
+        enrich_cols, table = self.indexed(join_key)
+        left_keys = df[join_key]
+        if table is None or (join_key != "code" and left_keys.dtype != self.frame[join_key].dtype):
+            return merge_enrich(df, self.frame, join_key)
+
+        left = df.reset_index(drop=True)
+        if join_key == "code":
+            left_keys = left_keys.astype(str)
+            left[join_key] = left_keys.to_numpy()
+        if not enrich_cols:
+            return left
+
+        positions = table.index.get_indexer(left_keys)
+        if (positions >= 0).all():
+            fetched = table.iloc[positions]
+        else:
+            fetched = self.padded(join_key, table).iloc[positions]
+        fetched = fetched.set_axis(left.index, axis=0)
+
+        new_cols = []
+        for col in enrich_cols:
+            if col in left.columns:
+                left[col] = left[col].where(left[col].notna(), fetched[col])
+            else:
+                new_cols.append(col)
+        if not new_cols:
+            return left
+        return pd.concat([left, fetched[new_cols]], axis=1)
+
+
+class DictionaryEnrichmentCache:
+    """字典维表缓存（进程内共享）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Tuple[Any, Optional[_DimensionTable]]] = {}
+        self._last: Optional[Tuple] = None
+
+    def _entry(self, profile_id: str):
+        dict_mgr = SR('dictionary_manager')
+        return dict_mgr.get(profile_id)
+
+    def dimension(self, profile_id: str) -> Tuple[Any, Optional[_DimensionTable]]:
+        """(版本, 维表)；字典不存在或为空时维表为 None"""
+        entry = self._entry(profile_id)
+        if entry is None:
+            return None, None
+        version = getattr(entry, "payload_version", None)
+        cached = self._tables.get(profile_id)
+        if cached is not None and version is not None and cached[0] == version:
+            return cached
+
+        dim_data = entry.get_payload()
+        if isinstance(dim_data, pd.DataFrame):
+            dim_df = dim_data
+        elif isinstance(dim_data, (list, dict)):
+            dim_df = pd.DataFrame(dim_data)
+        else:
+            dim_df = None
+        table = _DimensionTable(dim_df) if dim_df is not None and not dim_df.empty else None
+        with self._lock:
+            self._tables[profile_id] = (version, table)
+        return version, table
+
+    def enrich(self, df: pd.DataFrame, profile_id: str) -> pd.DataFrame:
+        """用单个字典补齐 DataFrame"""
+        _, table = self.dimension(profile_id)
+        if table is None:
+            return df
+        join_key = infer_join_key(df, table.frame)
+        if not join_key:
+            return df
+        return table.join(df, join_key)
+
+    def enrich_many(self, df: pd.DataFrame, profile_ids: Sequence[str]) -> pd.DataFrame:
+        """依次用多个字典补齐；同一输入对象、同一组字典版本的结果复用（返回副本）"""
+        profile_ids = tuple(profile_ids)
+        versions = tuple(self.dimension(pid)[0] for pid in profile_ids)
+        shape_key = (df.shape, tuple(df.columns))
+
+        last = self._last
+        if (last is not None and last[0]() is df and last[1] == profile_ids
+                and last[2] == versions and None not in versions and last[3] == shape_key):
+            return last[4].copy()
+
+        result = df
+        for profile_id in profile_ids:
+            try:
+                result = self.enrich(result, profile_id)
+            except Exception:
+                pass
+
+        if result is not df:
+            try:
+                self._last = (weakref.ref(df), profile_ids, versions, shape_key, result)
+            except TypeError:
+                self._last = None
+            return result.copy()
+        return result
+
+    def invalidate(self, profile_id: str = None):
+        with self._lock:
+            if profile_id is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(profile_id, None)
+            self._last = None
+
+
+_enrichment_cache: Optional[DictionaryEnrichmentCache] = None
+
+
+def get_enrichment_cache() -> DictionaryEnrichmentCache:
+    global _enrichment_cache
+    if _enrichment_cache is None:
+        _enrichment_cache = DictionaryEnrichmentCache()
+    return _enrichment_cache
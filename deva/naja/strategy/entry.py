@@ -14,8 +14,9 @@ from deva.core.namespace import NS
 
 from ..infra.runtime.recoverable import RecoverableUnit, UnitStatus
 from ..infra.runtime.thread_pool import get_thread_pool
+from .dispatch import detach_from_dispatchers, get_datasource_dispatcher, result_fingerprint
+from .enrichment import get_enrichment_cache, infer_join_key
 from .output_controller import get_output_controller
-from deva.naja.register import SR
 from .models import (
     STRATEGY_TABLE,
     STRATEGY_RESULTS_TABLE,
@@ -47,6 +48,8 @@ class StrategyEntry(RecoverableUnit):
         self._runtime = None
         self._runtime_type = ""
         self._runtime_config_hash = ""
+        self._last_result_fp: Optional[tuple] = None  # (上次保存结果的 id, 结构哈希)，去重用
+        self._candidate_fp = None
 
         self._ensure_runtime_stub_code()
 
@@ -204,6 +207,7 @@ class StrategyEntry(RecoverableUnit):
     
     def _do_stop(self) -> dict:
         try:
+            detach_from_dispatchers(self)
             self._input_stream = None
             self._output_stream = None
             runtime = self._get_runtime()
@@ -243,43 +247,27 @@ class StrategyEntry(RecoverableUnit):
                 description=f"Strategy {self.name} output",
             )
             
-            # 创建数据源特定的数据处理函数
-            def create_on_data(datasource_id: str, datasource_name: str):
-                def on_data(data: Any):
-                    # 添加数据源信息到数据
-                    enriched_data = {
-                        "_datasource_id": datasource_id,
-                        "_datasource_name": datasource_name,
-                        "_receive_time": time.time(),
-                        "data": data,
-                    }
-                    self._process_data(enriched_data)
-                return on_data
-            
-            on_data = create_on_data(ds_id, ds_name)
-            
-            if hasattr(stream, "sink"):
-                stream.sink(on_data)
-            elif hasattr(stream, "map"):
-                mapped_stream = stream.map(on_data)
-                mapped_stream.sink(lambda x: None)
-            elif hasattr(stream, "subscribe"):
-                stream.subscribe(on_data)
-            else:
+            # 每个数据源只订阅一次，由分发器在一个批处理任务里驱动所有绑定策略
+            dispatcher = get_datasource_dispatcher(datasource)
+            if dispatcher is None or not dispatcher.subscribe():
                 self._log("ERROR", "No valid subscription method found on stream", datasource_id=ds_id)
+                return
+            dispatcher.attach(self)
             
             self._log("INFO", f"Datasource bound successfully", datasource_id=ds_id, name=ds_name)
                 
         except Exception as e:
             self._log("ERROR", "Bind datasource failed", error=str(e))
     
-    def _process_data(self, data: Any):
-        """处理数据"""
+    def _accepts_data(self) -> bool:
+        """是否处于可处理数据的状态（运行中且有可执行函数或运行时）"""
         if not self.is_running:
-            return
+            return False
+        return self._compiled_func is not None or self._get_runtime() is not None
 
-        runtime = self._get_runtime()
-        if self._compiled_func is None and runtime is None:
+    def _process_data(self, data: Any):
+        """处理数据（单策略提交；数据源绑定走 DatasourceDispatcher 批处理）"""
+        if not self._accepts_data():
             return
 
         # 检查解释器是否正在关闭
@@ -374,44 +362,24 @@ class StrategyEntry(RecoverableUnit):
                     self._save_result_to_store(data, result, process_time_ms, success, error)
     
     def _is_duplicate_result(self, result: Any) -> bool:
-        """检查结果是否与上次相同"""
-        import json
-        
+        """检查结果是否与结果存储中的上次结果相同
+
+        结构哈希比较，忽略时间戳等动态字段；上次结果的哈希按结果 id 缓存，只计算一次。
+        """
         try:
-            # 获取上次结果
             from .result_store import get_result_store
-            store = get_result_store()
-            recent = store.get_recent(self.id, limit=1)
-            
+            recent = get_result_store().get_recent(self.id, limit=1)
+            fingerprint = result_fingerprint(result)
+            self._candidate_fp = (result, fingerprint)
+
             if not recent:
                 return False
-            
-            last_result = recent[0].output_full
-            
-            # 比较结果
-            if last_result is None and result is None:
-                return True
-            
-            if last_result is None or result is None:
-                return False
-            
-            # 排除时间戳等动态字段后比较
-            exclude_keys = {'timestamp', 'ts', 'datetime', 'time', 'created_at', 'updated_at'}
-            
-            def filter_result(r):
-                if isinstance(r, dict):
-                    return {k: v for k, v in r.items() if k not in exclude_keys}
-                return r
-            
-            last_filtered = filter_result(last_result)
-            current_filtered = filter_result(result)
-            
-            # 序列化比较
-            last_json = json.dumps(last_filtered, sort_keys=True, default=str)
-            current_json = json.dumps(current_filtered, sort_keys=True, default=str)
-            
-            return last_json == current_json
-            
+
+            last = recent[0]
+            cached = self._last_result_fp
+            if cached is None or cached[0] != last.id:
+                cached = self._last_result_fp = (last.id, result_fingerprint(last.output_full))
+            return fingerprint == cached[1]
         except Exception:
             return False
     
@@ -618,7 +586,7 @@ class StrategyEntry(RecoverableUnit):
         return value
     
     def _enrich_data(self, data: Any) -> Any:
-        """数据补齐"""
+        """数据补齐（字典维表经共享缓存 join，见 enrichment.py）"""
         import pandas as pd
         
         profile_ids = getattr(self._metadata, "dictionary_profile_ids", [])
@@ -631,9 +599,7 @@ class StrategyEntry(RecoverableUnit):
         if not isinstance(actual_data, pd.DataFrame):
             return data
         
-        result = actual_data
-        for profile_id in profile_ids:
-            result = self._enrich_dataframe(result, profile_id)
+        result = get_enrichment_cache().enrich_many(actual_data, profile_ids)
         
         # 如果是 enriched_data 结构，更新 data 中的实际数据
         if isinstance(data, dict) and 'data' in data:
@@ -645,68 +611,12 @@ class StrategyEntry(RecoverableUnit):
     def _enrich_dataframe(self, df: Any, profile_id: str) -> Any:
         """使用字典数据补齐 DataFrame"""
         try:
-            dict_mgr = SR('dictionary_manager')
-            entry = dict_mgr.get(profile_id)
-            
-            if entry is None:
-                return df
-            
-            dim_data = entry.get_payload()
-            if dim_data is None:
-                return df
-            
-            import pandas as pd
-            if not isinstance(dim_data, pd.DataFrame):
-                dim_df = pd.DataFrame(dim_data) if isinstance(dim_data, (list, dict)) else None
-            else:
-                dim_df = dim_data
-            
-            if dim_df is None or dim_df.empty:
-                return df
-            
-            join_key = self._infer_join_key(df, dim_df)
-            if not join_key:
-                return df
-            
-            left_df = df.copy()
-            right_df = dim_df.copy()
-            
-            if join_key == "code":
-                left_df[join_key] = left_df[join_key].astype(str)
-                right_df[join_key] = right_df[join_key].astype(str)
-            
-            enrich_cols = [c for c in right_df.columns if c != join_key]
-            if not enrich_cols:
-                return left_df
-            
-            merged = left_df.merge(
-                right_df[[join_key] + enrich_cols],
-                on=join_key,
-                how="left",
-                suffixes=("", "__dict"),
-            )
-            
-            for col in enrich_cols:
-                dict_col = f"{col}__dict"
-                if dict_col not in merged.columns:
-                    continue
-                if col in left_df.columns:
-                    merged[col] = merged[col].where(merged[col].notna(), merged[dict_col])
-                    merged.drop(columns=[dict_col], inplace=True)
-                else:
-                    merged.rename(columns={dict_col: col}, inplace=True)
-            
-            return merged
-            
+            return get_enrichment_cache().enrich(df, profile_id)
         except Exception:
             return df
     
     def _infer_join_key(self, left_df: Any, right_df: Any) -> Optional[str]:
-        common_cols = set(left_df.columns).intersection(set(right_df.columns))
-        for key in ("code", "ts_code", "symbol", "name"):
-            if key in common_cols:
-                return key
-        return None
+        return infer_join_key(left_df, right_df)
     
     def _emit_result(self, result: Any):
         if self._output_stream is None:
@@ -787,7 +697,7 @@ class StrategyEntry(RecoverableUnit):
         else:  # "summary" 及其他未知值均视为 summary
             persist_flag = True
 
-        store.save(
+        saved = store.save(
             strategy_id=self.id,
             strategy_name=self.name,
             success=success,
@@ -798,6 +708,13 @@ class StrategyEntry(RecoverableUnit):
             persist=persist_flag,
         )
 
+        # 刚保存的结果即下次去重的基准，复用去重时算好的哈希
+        candidate, self._candidate_fp = self._candidate_fp, None
+        if candidate is not None and candidate[0] is saved.output_full:
+            self._last_result_fp = (saved.id, candidate[1])
+        else:
+            self._last_result_fp = None
+
         try:
             from .registry import record_performance_snapshot
             record_performance_snapshot(
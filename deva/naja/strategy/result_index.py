@@ -0,0 +1,195 @@
+"""策略结果日志的旁路索引
+
+每个按天的 JSON Lines 结果日志（naja_results_YYYY-MM-DD.log）配一个同名 .idx 文件，
+每条结果一行定长记录::
+
+    ts float64 | offset int64 | length uint32 | success uint8 | id_hash uint64 | strategy_hash uint64
+
+success 为 SKIP 的条目只用于推进覆盖位置（空行/坏行），查询时忽略。
+
+查询先在索引上做向量化过滤，再按偏移直接读取对应行，不再逐行 json.loads 整个文件。
+索引落后于日志时（旧日志、外部追加、写索引前崩溃）从最后一个已索引位置补扫。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("offset", "<i8"),
+    ("length", "<u4"),
+    ("success", "u1"),
+    ("id_hash", "<u8"),
+    ("strategy_hash", "<u8"),
+])
+
+
+SKIP = 255
+
+
+def key_hash(value) -> int:
+    """字符串 → 稳定的 64 位哈希（跨进程一致）"""
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def index_entry(record: dict, offset: int, length: int) -> Tuple:
+    return (
+        float(record.get("ts", 0) or 0),
+        offset,
+        length,
+        1 if record.get("success", False) else 0,
+        key_hash(record.get("id", "")),
+        key_hash(record.get("strategy_id", "")),
+    )
+
+
+class ResultLogIndex:
+    """单个结果日志文件的索引
+
+    写日志与写索引在同一把锁内完成（write），读取时的补扫也持有该锁，避免重复索引。
+    """
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self.index_path = os.path.splitext(log_path)[0] + ".idx"
+        self._lock = threading.RLock()
+
+    def _load(self) -> np.ndarray:
+        if not os.path.exists(self.index_path):
+            return np.empty(0, dtype=INDEX_DTYPE)
+        count = os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        return np.memmap(self.index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,))
+
+    def _covered(self) -> int:
+        """索引覆盖到的日志字节位置（最后一条条目的结尾）"""
+        if not os.path.exists(self.index_path):
+            return 0
+        count = os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize
+        if count == 0:
+            return 0
+        with open(self.index_path, "rb") as f:
+            f.seek((count - 1) * INDEX_DTYPE.itemsize)
+            last = np.frombuffer(f.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)[0]
+        return int(last["offset"]) + int(last["length"])
+
+    def _append_entries(self, entries: Sequence[Tuple]):
+        with open(self.index_path, "ab") as f:
+            f.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+
+    def write(self, records: Sequence[dict], lines: Sequence[bytes]) -> int:
+        """追加日志行并写入对应索引，返回写入字节数"""
+        if not lines:
+            return 0
+        with self._lock:
+            self._catch_up()
+            with open(self.log_path, "ab") as f:
+                offset = f.tell()
+                f.write(b"".join(lines))
+            entries = []
+            for record, line in zip(records, lines):
+                entries.append(index_entry(record, offset, len(line)))
+                offset += len(line)
+            self._append_entries(entries)
+        return offset
+
+    def entries(self) -> np.ndarray:
+        """完整索引（必要时先补扫日志尾部）"""
+        if not os.path.exists(self.log_path):
+            return np.empty(0, dtype=INDEX_DTYPE)
+        with self._lock:
+            self._catch_up()
+            index = self._load()
+        log_size = os.path.getsize(self.log_path)
+        if len(index) and int(index["offset"][-1]) + int(index["length"][-1]) > log_size:
+            index = index[index["offset"] + index["length"] <= log_size]
+        return index
+
+    def _catch_up(self):
+        """把已索引位置之后的完整行补入索引"""
+        if not os.path.exists(self.log_path):
+            return
+        start = self._covered()
+        if start >= os.path.getsize(self.log_path):
+            return
+        entries = []
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                length = len(line)
+                stripped = line.strip()
+                record = None
+                if stripped:
+                    try:
+                        record = json.loads(stripped)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        pass
+                if isinstance(record, dict):
+                    entries.append(index_entry(record, offset, length))
+                else:
+                    # 空行/坏行：占位条目，只推进覆盖位置
+                    entries.append((0.0, offset, length, SKIP, 0, 0))
+                offset += length
+        if entries:
+            self._append_entries(entries)
+            logger.debug(f"结果日志索引补扫 {self.log_path}: {len(entries)} 条")
+
+    def select(
+        self,
+        strategy_id: str = None,
+        start_ts: float = None,
+        end_ts: float = None,
+        success: Optional[bool] = None,
+        result_id: str = None,
+    ) -> np.ndarray:
+        """按条件过滤，返回匹配条目（文件顺序）"""
+        index = self.entries()
+        if not len(index):
+            return index[:0]
+        mask = index["success"] != SKIP
+        if result_id is not None:
+            mask &= index["id_hash"] == key_hash(result_id)
+        if strategy_id:
+            mask &= index["strategy_hash"] == key_hash(strategy_id)
+        if start_ts:
+            mask &= index["ts"] >= start_ts
+        if end_ts:
+            mask &= index["ts"] <= end_ts
+        if success is not None:
+            mask &= index["success"] == (1 if success else 0)
+        return index[mask]
+
+    def read(self, entries: np.ndarray) -> Iterator[dict]:
+        """按偏移读取条目对应的记录"""
+        if not len(entries):
+            return
+        with open(self.log_path, "rb") as f:
+            for offset, length in zip(entries["offset"].tolist(), entries["length"].tolist()):
+                f.seek(offset)
+                try:
+                    record = json.loads(f.read(length))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    def rebuild(self) -> int:
+        """丢弃并重建索引"""
+        with self._lock:
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return len(self.entries())
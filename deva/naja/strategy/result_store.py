@@ -2,7 +2,8 @@
 
 架构设计：
 1. 热数据：SignalStream 内存流（实时处理用）
-2. 错误日志：JSON Lines 文件（按天存放，顺序写）
+2. 错误日志：JSON Lines 文件（按天存放，写后缓冲、批量顺序写）
+   + 旁路索引（.idx，按 id / 策略 / 时间定位字节偏移）
 3. 统计：内存增量统计（无持久化，需要可从日志重建）
 
 移除：SQLite 批量写入
@@ -10,6 +11,7 @@
 
 from __future__ import annotations
 
+import atexit
 import gzip
 import json
 import logging
@@ -18,12 +20,14 @@ import threading
 import time
 from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from deva import NB
 
+from .result_index import ResultLogIndex
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -168,7 +172,9 @@ class StreamResultStore:
 
     设计原则：
     - 热数据走 SignalStream（内存），不落盘
-    - 错误日志走文件（JSON Lines），按天切分
+    - 错误日志走文件（JSON Lines），按天切分；写入先进缓冲区，
+      满 flush_batch_size 条或超过 flush_interval 秒合并写一次
+    - 查询走旁路索引，只读取命中的行
     - 统计用内存增量计算，不持久化
 
     ================================================================================
@@ -215,8 +221,16 @@ class StreamResultStore:
 
         self._log_dir = self._get_log_dir()
         self._current_log_file: Optional[str] = None
-        self._current_log_handle: Optional[Any] = None
         self._log_lock = threading.Lock()
+        self._indexes: Dict[str, ResultLogIndex] = {}
+
+        # 写后缓冲
+        self.flush_interval = 1.0
+        self.flush_batch_size = 500
+        self._pending: List[dict] = []
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
 
         self._initialized = True
         logger.info(f"StreamResultStore 初始化，日志目录: {self._log_dir}")
@@ -239,27 +253,109 @@ class StreamResultStore:
         """检查是否需要切换日志文件（按天切分）"""
         new_filename = self._get_log_filename(ts)
         if new_filename != self._current_log_file:
-            if self._current_log_handle:
-                try:
-                    self._current_log_handle.close()
-                except Exception:
-                    pass
             self._current_log_file = new_filename
-            self._current_log_handle = open(new_filename, "a", buffering=1, encoding="utf-8")
             logger.info(f"日志文件切换: {new_filename}")
 
+    def _get_index(self, log_file: str) -> ResultLogIndex:
+        index = self._indexes.get(log_file)
+        if index is None:
+            with self._log_lock:
+                index = self._indexes.setdefault(log_file, ResultLogIndex(log_file))
+        return index
+
     def _write_log(self, record: dict):
-        """写入日志（线程安全，顺序写）"""
-        ts = record.get("ts", time.time())
-        self._rotate_log_if_needed(ts)
-
-        with self._log_lock:
-            if self._current_log_handle:
-                try:
-                    self._current_log_handle.write(json.dumps(record, ensure_ascii=False) + "\n")
-                    self._current_log_handle.flush()
-                except Exception as e:
-                    logger.error(f"写入日志失败: {e}")
+        """写入日志（线程安全）：进入缓冲区，由 flush 批量顺序写"""
+        with self._pending_lock:
+            self._pending.append(record)
+            size = len(self._pending)
+            if size < self.flush_batch_size and self._flush_timer is None and self.flush_interval:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if size >= self.flush_batch_size or not self.flush_interval:
+            self.flush()
+
+    def flush(self) -> int:
+        """把缓冲区写入日志与索引，返回写入条数"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        if not pending:
+            return 0
+
+        by_file: Dict[str, tuple] = {}
+        for record in pending:
+            try:
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            except Exception as e:
+                logger.error(f"写入日志失败: {e}")
+                continue
+            ts = record.get("ts", time.time())
+            self._rotate_log_if_needed(ts)
+            records, lines = by_file.setdefault(self._get_log_filename(ts), ([], []))
+            records.append(record)
+            lines.append(line)
+
+        written = 0
+        for log_file, (records, lines) in by_file.items():
+            try:
+                self._get_index(log_file).write(records, lines)
+                written += len(lines)
+            except Exception as e:
+                logger.error(f"写入日志失败: {e}")
+        return written
+
+    def _flush_if_pending(self):
+        if self._pending:
+            self.flush()
+
+    def _log_files_between(self, start_ts: float = None, end_ts: float = None, max_days: int = 7) -> List[str]:
+        """时间范围内按日期升序的日志文件"""
+        now = time.time()
+
+        if start_ts:
+            start_date = datetime.fromtimestamp(start_ts)
+        else:
+            start_date = datetime.fromtimestamp(now - (max_days * 86400))
+
+        if end_ts:
+            end_date = datetime.fromtimestamp(end_ts)
+        else:
+            end_date = datetime.fromtimestamp(now)
+
+        files = []
+        current_date = start_date
+        while current_date <= end_date:
+            log_file = self._get_log_filename(current_date.timestamp())
+            if os.path.exists(log_file):
+                files.append(log_file)
+            current_date = current_date + timedelta(days=1)
+        return files
+
+    def _query_indexed(self, predicate, limit: int, strategy_id: str = None, start_ts: float = None,
+                       end_ts: float = None, success: Optional[bool] = None) -> List[StrategyResult]:
+        """在索引上过滤后按偏移读取，predicate 对读出的记录做最终校验"""
+        self._flush_if_pending()
+        results = []
+        for log_file in self._log_files_between(start_ts, end_ts):
+            try:
+                index = self._get_index(log_file)
+                entries = index.select(strategy_id=strategy_id, start_ts=start_ts, end_ts=end_ts, success=success)
+                for record in index.read(entries):
+                    if predicate(record):
+                        results.append(self._dict_to_result(record))
+                        if len(results) >= limit:
+                            break
+            except Exception as e:
+                logger.debug(f"读取日志文件 {log_file} 失败: {e}")
+
+            if len(results) >= limit:
+                break
+
+        results.sort(key=lambda x: x.ts, reverse=True)
+        return results[:limit]
 
     def _generate_id(self, strategy_id: str, ts: float) -> str:
         import hashlib
@@ -396,35 +492,25 @@ class StreamResultStore:
         return None
 
     def _scan_logs_for_result_id(self, result_id: str, max_days: int = 7) -> List[dict]:
-        """扫描日志文件查找指定 result_id"""
-        results = []
+        """按索引查找指定 result_id（从最近一天往前）"""
+        self._flush_if_pending()
         now = time.time()
 
         for day_offset in range(max_days):
-            ts = now - (day_offset * 86400)
-            log_file = self._get_log_filename(ts)
+            log_file = self._get_log_filename(now - (day_offset * 86400))
 
             if not os.path.exists(log_file):
                 continue
 
             try:
-                with open(log_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            record = json.loads(line)
-                            if record.get("id") == result_id:
-                                results.append(record)
-                                if len(results) >= 1:
-                                    return results
-                        except json.JSONDecodeError:
-                            continue
+                index = self._get_index(log_file)
+                for record in index.read(index.select(result_id=result_id)):
+                    if record.get("id") == result_id:
+                        return [record]
             except Exception as e:
                 logger.debug(f"读取日志文件 {log_file} 失败: {e}")
 
-        return results
+        return []
 
     def query(
         self,
@@ -434,50 +520,12 @@ class StreamResultStore:
         success_only: bool = False,
         limit: int = 100,
     ) -> List[StrategyResult]:
-        """查询策略结果（从日志文件）"""
-        results = []
-        now = time.time()
-        max_days = 7
-
-        if start_ts:
-            start_date = datetime.fromtimestamp(start_ts)
-        else:
-            start_date = datetime.fromtimestamp(now - (max_days * 86400))
-
-        if end_ts:
-            end_date = datetime.fromtimestamp(end_ts)
-        else:
-            end_date = datetime.fromtimestamp(now)
-
-        current_date = start_date
-        while current_date <= end_date:
-            log_file = self._get_log_filename(current_date.timestamp())
-
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, "r", encoding="utf-8") as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line:
-                                continue
-                            try:
-                                record = json.loads(line)
-                                if self._match_query(record, strategy_id, start_ts, end_ts, success_only):
-                                    results.append(self._dict_to_result(record))
-                                    if len(results) >= limit:
-                                        break
-                            except json.JSONDecodeError:
-                                continue
-                except Exception as e:
-                    logger.debug(f"读取日志文件 {log_file} 失败: {e}")
-
-            if len(results) >= limit:
-                break
-
-            current_date = current_date + __import__("datetime").timedelta(days=1)
-
-        results.sort(key=lambda x: x.ts, reverse=True)
-        return results[:limit]
+        """查询策略结果（从日志文件，经索引定位）"""
+        return self._query_indexed(
+            lambda record: self._match_query(record, strategy_id, start_ts, end_ts, success_only),
+            limit, strategy_id=strategy_id, start_ts=start_ts, end_ts=end_ts,
+            success=True if success_only else None,
+        )
 
     def _match_query(
         self,
@@ -525,51 +573,12 @@ class StreamResultStore:
         end_ts: float = None,
         limit: int = 100,
     ) -> List[StrategyResult]:
-        """专门查询错误记录（从日志文件）"""
-        results = []
-        now = time.time()
-        max_days = 7
-
-        if start_ts:
-            start_date = datetime.fromtimestamp(start_ts)
-        else:
-            start_date = datetime.fromtimestamp(now - (max_days * 86400))
-
-        if end_ts:
-            end_date = datetime.fromtimestamp(end_ts)
-        else:
-            end_date = datetime.fromtimestamp(now)
-
-        current_date = start_date
-        while current_date <= end_date:
-            log_file = self._get_log_filename(current_date.timestamp())
-
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, "r", encoding="utf-8") as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line:
-                                continue
-                            try:
-                                record = json.loads(line)
-                                if not record.get("success", True):
-                                    if self._match_query(record, strategy_id, start_ts, end_ts, False):
-                                        results.append(self._dict_to_result(record))
-                                        if len(results) >= limit:
-                                            break
-                            except json.JSONDecodeError:
-                                continue
-                except Exception:
-                    pass
-
-            if len(results) >= limit:
-                break
-
-            current_date = current_date + __import__("datetime").timedelta(days=1)
-
-        results.sort(key=lambda x: x.ts, reverse=True)
-        return results[:limit]
+        """专门查询错误记录（从日志文件，经索引定位）"""
+        return self._query_indexed(
+            lambda record: not record.get("success", True)
+            and self._match_query(record, strategy_id, start_ts, end_ts, False),
+            limit, strategy_id=strategy_id, start_ts=start_ts, end_ts=end_ts, success=False,
+        )
 
     def get_stats(self, strategy_id: str = None) -> dict:
         """获取统计信息"""
@@ -688,13 +697,8 @@ class StreamResultStore:
 
     def close(self):
         """关闭 ResultStore"""
-        if self._current_log_handle:
-            try:
-                self._current_log_handle.close()
-            except Exception:
-                pass
-            self._current_log_handle = None
-            self._current_log_file = None
+        self.flush()
+        self._current_log_file = None
         logger.info("StreamResultStore 已关闭")
 
 
@@ -67,12 +67,15 @@ NAJA_TABLE_REGISTRY = {
     "naja_bandit_adaptive_config": "Bandit自适应配置",
     "naja_bandit_portfolio_manager": "Bandit组合管理器",
     "naja_bandit_positions": "Bandit统一持仓表(所有账户持仓)",
+    "naja_bandit_virtual_positions": "Bandit虚拟账户持仓(每个持仓一行)",
 
     "naja_bandit_stats": "Bandit统计",
     "naja_bandit_decisions": "Bandit决策记录",
     "naja_bandit_actions": "Bandit动作记录",
     "naja_bandit_position_rewards": "Bandit持仓收益",
     "naja_bandit_attribution": "Bandit归因分析",
+    "naja_bandit_attribution_stats": "Bandit归因分析按策略聚合",
+    "naja_bandit_attribution_index": "Bandit归因记录键索引(每条记录一行)",
 
     # ===== 雷达/新闻 =====
     "naja_radar_events": "雷达事件",
@@ -0,0 +1,132 @@
+"""
+批量特征矩阵打分测试：AttentionHead / MultiHeadAttention 与逐事件循环结果一致、
+普通 lambda scorer 兼容、数值稳定的 softmax、Manas-aware 头的向量化 scorer
+"""
+
+import math
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from deva.naja.attention.kernel import (
+    AttentionEvent,
+    AttentionHead,
+    Encoder,
+    EventFeatureMatrix,
+    FeatureScorer,
+    MultiHeadAttention,
+    QueryState,
+    TemperatureAwareHead,
+    get_default_heads,
+    get_regime_aware_heads,
+)
+from deva.naja.attention.kernel.feature_matrix import softmax
+from deva.naja.attention.kernel.kernel import AttentionKernel
+
+FEATURES = ["price_change", "sentiment", "volume_spike", "historical_alpha",
+            "momentum", "reversal", "breakout", "_recall_priority"]
+
+
+def _events(n, seed=0):
+    rng = random.Random(seed)
+    events = []
+    for i in range(n):
+        features = {name: rng.uniform(-3, 3) for name in FEATURES if rng.random() < 0.8}
+        features.update(alpha=rng.uniform(-1, 1), risk=rng.random(), confidence=rng.random())
+        events.append(AttentionEvent(source="market", data={}, features=features, timestamp=i))
+    Encoder().encode_batch(events)
+    events[1].value = "not a dict"  # 非 dict 的 value 不参与聚合
+    events[2].key = None  # key 为空时使用 features
+    return events
+
+
+def _reference_head(head, Q, events):
+    """旧实现：逐事件打分、math.exp softmax、逐个加权求和"""
+    scores, values = [], []
+    for e in events:
+        scores.append(head.scorer(Q, e.key if e.key is not None else e.features))
+        values.append(e.value if e.value is not None else {})
+    exp_scores = [math.exp(s) for s in scores]
+    total = sum(exp_scores)
+    result = {"alpha": 0, "risk": 0, "confidence": 0}
+    for s, v in zip(exp_scores, values):
+        if isinstance(v, dict):
+            for field in result:
+                result[field] += s / total * v.get(field, 0)
+    return result
+
+
+def _approx(result):
+    return {k: pytest.approx(v, abs=1e-9) for k, v in result.items()}
+
+
+@pytest.mark.parametrize("Q", [{"regime": "trend"}, {"regime": "reversal"}, QueryState()])
+def test_heads_match_per_event_loop(Q):
+    events = _events(300)
+    lambda_head = AttentionHead("custom", scorer=lambda Q, K: K.get("sentiment", 0) * K.get("breakout", 1))
+    heads = get_default_heads() + get_regime_aware_heads() + [lambda_head]
+
+    expected = [_reference_head(head, Q, events) for head in heads]
+    for head, exp in zip(heads, expected):
+        assert head.compute(Q, events) == _approx(exp)
+
+    concat = MultiHeadAttention(heads, output_mode="concat").compute(Q, events)
+    assert [_approx(o) for o in expected] == concat["head_outputs"]
+    merged = MultiHeadAttention(heads).compute(Q, EventFeatureMatrix(events))
+    for field in ("alpha", "risk", "confidence"):
+        assert merged[field] == pytest.approx(sum(o[field] for o in expected), abs=1e-9)
+
+
+def test_regime_head_selects_feature_by_query():
+    trend = get_regime_aware_heads()[0].scorer
+    K = {"momentum": 1.0, "reversal": 2.0, "breakout": 3.0}
+    assert trend({"regime": "trend"}, K) == 1.0
+    assert trend({"regime": "reversal"}, K) == 2.0
+    assert trend(QueryState(), K) == trend({"regime": "neutral"}, K) == 3.0
+
+
+def test_mixed_heads_and_empty_events():
+    events = _events(50, seed=1)
+    temperature_head = TemperatureAwareHead("t", scorer=lambda Q, K: K.get("price_change", 0))
+    heads = get_default_heads()[:2] + [temperature_head]
+    outputs = MultiHeadAttention(heads, output_mode="concat").compute({}, events)["head_outputs"]
+    assert outputs[2] == temperature_head.compute({}, events)
+    assert outputs[0] == _approx(_reference_head(heads[0], {}, events))
+
+    assert MultiHeadAttention(heads).compute({}, []) == {"alpha": 0, "risk": 0, "confidence": 0}
+    assert AttentionHead("x", FeatureScorer("sentiment")).compute({}, []) == {"alpha": 0, "risk": 0, "confidence": 0}
+
+
+def test_softmax_is_stable_for_large_scores():
+    weights = softmax([1000.0, 1000.0, -1000.0])
+    assert weights.tolist() == pytest.approx([0.5, 0.5, 0.0])
+    assert softmax([[1.0, 2.0], [-np.inf, -np.inf]]).tolist() == [pytest.approx([0.26894142, 0.73105858]), [0.0, 0.0]]
+
+    events = _events(10, seed=2)
+    events[3].features["price_change"] = 800.0  # 旧实现 math.exp 溢出
+    result = get_default_heads()[0].compute({}, events)
+    assert result["alpha"] == pytest.approx(events[3].value["alpha"])
+
+
+def test_manas_heads_are_vectorized():
+    unified = SimpleNamespace(**{name: SimpleNamespace(value="watch") for name in
+                                 ("attention_focus", "portfolio_signal", "harmony_state", "action_type")},
+                              regime_score=0.0, timing_score=0.5)
+    multi_head = AttentionKernel._build_manas_aware_heads(None, unified)
+    Q = {"attention_focus": "stop_loss", "regime_score": -0.4, "timing_score": 0.9,
+         "harmony_state": "resonance", "portfolio_signal": "take_profit",
+         "confidence_score": 0.2, "action_type": "act_fully"}
+    events = _events(200, seed=3)
+    events[5].key = SimpleNamespace(features=dict(events[5].features))  # 对象形式的 key
+
+    market = multi_head.heads[0].scorer
+    K = {"price_change": 2.0, "_recall_priority": 0.5}
+    assert market(Q, K) == pytest.approx(2.0 * 1.5 * 1.2 * 2.0)
+
+    for head in multi_head.heads:
+        assert isinstance(head.scorer, FeatureScorer)
+        scores = head.score_matrix(Q, EventFeatureMatrix(events))
+        expected = [head.scorer(Q, e.key if e.key is not None else e.features) for e in events]
+        assert scores.tolist() == pytest.approx(expected, abs=1e-12)
@@ -0,0 +1,162 @@
+"""
+StrategyAttribution 测试：增量聚合与全量重算一致、按策略记录索引、持久化重载
+"""
+
+import math
+import random
+
+import pytest
+
+from deva.core.store import DBStream
+from deva.naja.bandit import attribution as attr_mod
+
+
+@pytest.fixture
+def make_attribution(tmp_path, monkeypatch):
+    monkeypatch.setattr(attr_mod, "NB", lambda name: DBStream(name, str(tmp_path / "attr")))
+
+    def make():
+        monkeypatch.setattr(attr_mod.StrategyAttribution, "_instance", None)
+        return attr_mod.StrategyAttribution()
+
+    yield make
+    attr_mod.StrategyAttribution._instance = None
+
+
+def _record_trades(attribution, n=60, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        entry = 10.0
+        attribution.record_trade(
+            position_id=f"P{i}",
+            strategy_id=f"s{i % 3}",
+            stock_code="000001",
+            stock_name="平安银行",
+            entry_price=entry,
+            exit_price=entry * (1 + rng.uniform(-0.05, 0.06)),
+            entry_time=1000.0 + i,
+            exit_time=2000.0 + i,
+            holding_seconds=rng.uniform(60, 86400),
+            close_reason="TAKE_PROFIT",
+            signal_confidence=rng.random(),
+            market_liquidity=rng.random(),
+            market_volatility=rng.random(),
+        )
+
+
+def _reference_correlation(records):
+    n = len(records)
+    cs = [r["signal_confidence"] for r in records]
+    rs = [r["total_return_pct"] for r in records]
+    mc, mr = sum(cs) / n, sum(rs) / n
+    cov = sum((c - mc) * (r - mr) for c, r in zip(cs, rs)) / n
+    sc = (sum((c - mc) ** 2 for c in cs) / n) ** 0.5
+    sr = (sum((r - mr) ** 2 for r in rs) / n) ** 0.5
+    return cov / (sc * sr)
+
+
+def test_incremental_stats_match_full_scan(make_attribution):
+    attribution = make_attribution()
+    _record_trades(attribution)
+
+    records = attribution._get_strategy_records("s1")
+    assert len(records) == 20
+    returns = [r["total_return_pct"] for r in records]
+
+    c = attribution.get_strategy_contribution("s1")
+    assert c.total_trades == 20
+    assert c.win_trades == sum(1 for r in returns if r > 0)
+    assert c.total_return == pytest.approx(sum(returns))
+    assert c.best_return == max(returns) and c.worst_return == min(returns)
+    mean = sum(returns) / len(returns)
+    assert c.return_volatility == pytest.approx(math.sqrt(sum((r - mean) ** 2 for r in returns) / len(returns)))
+
+    cum = peak = max_dd = 0.0
+    for r in returns:
+        cum += r
+        peak = max(peak, cum)
+        max_dd = max(max_dd, peak - cum)
+    assert c.max_drawdown == pytest.approx(max_dd)
+
+    quality = attribution.get_signal_quality_analysis("s1")
+    high = [r["total_return_pct"] for r in records if r["signal_confidence"] > 0.7]
+    assert quality.high_confidence_trades == len(high)
+    assert quality.high_confidence_avg_return == pytest.approx(sum(high) / len(high) if high else 0.0)
+    assert quality.confidence_return_correlation == pytest.approx(_reference_correlation(records))
+
+    market = attribution.get_market_condition_attribution("s1")
+    low_liq = [r for r in records if r["market_liquidity"] < 0.3]
+    assert market.liquidity_low_count == len(low_liq)
+
+    breakdown = attribution.get_attribution_breakdown("s1")
+    assert breakdown["timing_return"] == pytest.approx(sum(r["timing_return_pct"] for r in records))
+
+    ranked = attribution.get_all_strategy_contributions()
+    assert [x.rank for x in ranked] == [1, 2, 3]
+    assert len(attribution.get_trade_history(strategy_id="s2", limit=100)) == 20
+
+
+def test_aggregates_persist_and_rebuild(make_attribution):
+    attribution = make_attribution()
+    _record_trades(attribution, n=30, seed=1)
+    before = attribution.get_strategy_contribution("s0")
+
+    reloaded = make_attribution()
+    assert reloaded.get_strategy_contribution("s0") == before
+
+    assert reloaded.rebuild_aggregates() == 30
+    rebuilt = reloaded.get_strategy_contribution("s0")
+    assert rebuilt.total_trades == before.total_trades
+    assert rebuilt.total_return == pytest.approx(before.total_return)
+    assert rebuilt.max_drawdown == pytest.approx(before.max_drawdown)
+
+
+def test_legacy_records_are_aggregated_on_first_load(make_attribution, tmp_path):
+    attribution = make_attribution()
+    _record_trades(attribution, n=9, seed=2)
+    DBStream(attr_mod.ATTRIBUTION_STATS_TABLE, str(tmp_path / "attr")).clear()
+
+    reloaded = make_attribution()
+    assert reloaded.get_strategy_contribution("s2").total_trades == 3
+    assert reloaded.get_strategy_contribution("missing").total_trades == 0
+
+
+def test_key_index_is_stored_per_record(make_attribution, tmp_path):
+    attribution = make_attribution()
+    _record_trades(attribution, n=12, seed=3)
+
+    stats = DBStream(attr_mod.ATTRIBUTION_STATS_TABLE, str(tmp_path / "attr"))
+    assert all("record_keys" not in row for row in stats.values())
+    index = DBStream(attr_mod.ATTRIBUTION_INDEX_TABLE, str(tmp_path / "attr"))
+    assert len(index) == 12
+    assert {row["strategy_id"] for row in index.values()} == {"s0", "s1", "s2"}
+
+    expected = attribution.get_strategy_aggregate("s1").record_keys
+    reloaded = make_attribution()
+    assert reloaded.get_strategy_aggregate("s1").record_keys == expected
+    assert len(reloaded._get_strategy_records("s1")) == 4
+
+
+def test_stale_aggregates_are_rebuilt_after_external_clear(make_attribution, tmp_path):
+    attribution = make_attribution()
+    _record_trades(attribution, n=10, seed=4)
+    records = DBStream(attr_mod.ATTRIBUTION_TABLE, str(tmp_path / "attr"))
+    for key in list(records.keys())[:4]:
+        del records[key]
+
+    reloaded = make_attribution()
+    assert sum(reloaded.get_strategy_contribution(s).total_trades for s in ("s0", "s1", "s2")) == 6
+
+    records.clear()
+    assert make_attribution().get_strategy_contribution("s0").total_trades == 0
+
+
+def test_clear_removes_records_aggregates_and_index(make_attribution):
+    attribution = make_attribution()
+    _record_trades(attribution, n=6, seed=5)
+    assert attribution.clear() == 6
+    assert attribution.get_strategy_contribution("s0").total_trades == 0
+    assert len(attribution._index_db) == 0 and len(attribution._stats_db) == 0
+
+    _record_trades(attribution, n=3, seed=6)
+    assert make_attribution().get_strategy_contribution("s1").total_trades == 1
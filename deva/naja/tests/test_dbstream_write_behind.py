@@ -0,0 +1,114 @@
+"""
+DBStream 写后合并提交与增量容量维护测试
+"""
+
+import gc
+import time
+import weakref
+
+from deva.core import store
+from deva.core.store import DBStream
+
+
+def test_write_behind_buffers_until_flush(tmp_path):
+    db = DBStream("wb", str(tmp_path / "wb"), write_behind=True, flush_interval=0, flush_batch_size=100)
+
+    for i in range(10):
+        db.upsert(f"k{i}", i)
+    assert len(db._pending) == 10
+
+    assert db.flush() == 10
+    assert db._pending == {}
+
+    reader = DBStream("wb", str(tmp_path / "wb"))
+    assert len(reader) == 10
+    assert reader["k3"] == 3
+
+
+def test_write_behind_flushes_on_batch_size_and_reads(tmp_path):
+    db = DBStream("wb", str(tmp_path / "wb"), write_behind=True, flush_interval=0, flush_batch_size=5)
+
+    for i in range(7):
+        db.upsert(i, i)
+    assert len(db._pending) == 2
+
+    # 读操作先刷出缓冲区
+    assert db[6] == 6
+    assert db._pending == {}
+
+
+def test_write_behind_flush_interval(tmp_path):
+    db = DBStream("wb", str(tmp_path / "wb"), write_behind=True, flush_interval=0.05, flush_batch_size=1000)
+    db.append("x")
+    deadline = time.time() + 2
+    while db._pending and time.time() < deadline:
+        time.sleep(0.01)
+    assert db._pending == {}
+
+
+def test_batch_context_commits_once(tmp_path):
+    db = DBStream("batch", str(tmp_path / "batch"))
+    with db.batch():
+        for i in range(20):
+            db[i] = i
+        assert len(db._pending) == 20
+    assert db._pending == {}
+    assert len(db) == 20
+
+
+def test_batch_ignores_size_and_interval_until_exit(tmp_path):
+    db = DBStream("wbb", str(tmp_path / "wbb"), write_behind=True, flush_interval=0.02, flush_batch_size=5)
+    commits = []
+    commit = db._commit
+    db._commit = lambda mapping, new_keys=(): (commits.append(len(mapping)), commit(mapping, new_keys))
+
+    db["before"] = 0  # 块开始前已排定的定时提交也不在块内触发
+    with db.batch():
+        with db.batch():
+            for i in range(20):
+                db[i] = i
+        time.sleep(0.06)
+        assert commits == [] and len(db._pending) == 21
+    assert commits == [21]
+    assert DBStream("wbb", str(tmp_path / "wbb"))[19] == 19
+
+
+def test_maxsize_evicts_oldest_incrementally(tmp_path):
+    db = DBStream("cap", str(tmp_path / "cap"), maxsize=5, write_behind=True, flush_interval=0, flush_batch_size=3)
+    base = 1_700_000_000.0
+    for i in range(12):
+        db.append(i, key=base + i)
+    db.upsert(base + 11, "updated")  # 覆盖已有键不增加行数
+    db.flush()
+
+    assert db._row_count == 5
+    assert len(db) == 5
+    remaining = sorted(float(k) for k in db.keys())
+    assert remaining == [base + i for i in range(7, 12)]
+    assert db[base + 11] == "updated"
+
+
+def test_maxsize_matches_default_mode(tmp_path):
+    db = DBStream("cap", str(tmp_path / "cap"), maxsize=3)
+    for i in range(6):
+        db.append(i)
+    db["name"] = "non-time key"
+
+    assert len(db) == 3
+    assert db._row_count == 3
+    assert "name" in db
+
+
+def test_exit_hook_flushes_live_streams_without_keeping_them_alive(tmp_path):
+    db = DBStream("exit", str(tmp_path / "exit"), write_behind=True, flush_interval=0, flush_batch_size=100)
+    db.upsert("k", 1)
+    assert db in store._write_behind_streams
+
+    store._flush_write_behind_streams()
+    assert db._pending == {}
+    assert DBStream("exit", str(tmp_path / "exit"))["k"] == 1
+
+    ref = weakref.ref(db)
+    del db
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,167 @@
+"""
+TradingEventStore / EventQuery 测试：索引列提取、SQL 下推的过滤分页、聚合统计与导出
+"""
+
+import csv
+import time
+
+from deva.naja.events.event_store import TradingEventStore
+from deva.naja.events.query_interface import EventQuery, QueryCondition
+from deva.naja.events.trading_bus import TradingEventBus
+from deva.naja.events.trading_events import (
+    DecisionResult,
+    SignalDirection,
+    StrategySignalEvent,
+    TradeDecisionEvent,
+)
+
+
+def _signal(symbol, direction, confidence, ts, strategy="Momentum"):
+    return StrategySignalEvent(
+        symbol=symbol,
+        direction=direction,
+        confidence=confidence,
+        strategy_name=strategy,
+        signal_type="momentum",
+        current_price=10.0,
+        price_change_pct=0.01,
+        timestamp=ts,
+    )
+
+
+def _bus_with_store():
+    store = TradingEventStore(':memory:')
+    bus = TradingEventBus(use_stream=False, dedup_window=0.0, event_store=store)
+    bus.configure_persistence('StrategySignalEvent')
+    bus.configure_persistence('TradeDecisionEvent')
+    return bus, store
+
+
+def test_bus_persists_into_indexed_store():
+    bus, store = _bus_with_store()
+    now = time.time()
+    bus.publish(_signal("000001", SignalDirection.BUY, 0.8, now - 10))
+    bus.publish(_signal("000002", SignalDirection.SELL, 0.4, now - 5))
+
+    history = bus.get_persistent_history('StrategySignalEvent', limit=10)
+    assert [e['symbol'] for e in history] == ["000002", "000001"]
+    assert history[0]['direction'] == 'sell'
+    assert bus.get_history('StrategySignalEvent', limit=1)[0]['data']['symbol'] == "000002"
+    assert store.count(event_type='StrategySignalEvent', direction='buy') == 1
+
+
+def test_query_pushdown_filters_and_paginates():
+    bus, store = _bus_with_store()
+    now = time.time()
+    store.append_many([
+        ('StrategySignalEvent', _signal("000001", SignalDirection.BUY, 0.1 * i, now - i))
+        for i in range(10)
+    ])
+    store.append('StrategySignalEvent', _signal("000001", SignalDirection.BUY, 0.9, now - 30 * 86400))
+    query = EventQuery(bus)
+
+    page = query.query_events(QueryCondition(
+        event_type='StrategySignalEvent', symbol="000001", direction='buy',
+        min_confidence=0.25, start_time=now - 86400, limit=3, offset=1))
+    assert [round(e['confidence'], 1) for e in page] == [0.4, 0.5, 0.6]
+
+    signals = query.query_strategy_signals(symbol="000001", direction='buy', days=7, limit=100)
+    assert len(signals) == 10
+
+
+def test_stats_and_trade_decision_columns():
+    bus, store = _bus_with_store()
+    now = time.time()
+    buy = _signal("000001", SignalDirection.BUY, 0.6, now - 2)
+    store.append('StrategySignalEvent', buy)
+    store.append('StrategySignalEvent', _signal("000002", SignalDirection.SELL, 0.2, now - 1))
+    store.append('TradeDecisionEvent', TradeDecisionEvent(
+        signal_event=buy, decision=DecisionResult.APPROVED, approval_score=0.7,
+        approved_symbol="000001", approved_direction=SignalDirection.BUY, timestamp=now))
+    query = EventQuery(bus)
+
+    stats = query.get_stats('StrategySignalEvent', days=1)
+    assert stats.total_events == 2
+    assert (stats.buy_signals, stats.sell_signals) == (1, 1)
+    assert abs(stats.avg_confidence - 0.4) < 1e-9
+    assert sum(stats.timeline.values()) == 2
+
+    decisions = query.query_trade_decisions(symbol="000001", decision='approved')
+    assert len(decisions) == 1 and decisions[0]['approval_score'] == 0.7
+    assert query.query_trade_decisions(decision='rejected') == []
+
+
+def test_export_streams_all_rows(tmp_path):
+    bus, store = _bus_with_store()
+    now = time.time()
+    store.append_many([
+        ('StrategySignalEvent', _signal(f"{i:06d}", SignalDirection.BUY, 0.5, now - i))
+        for i in range(25)
+    ])
+    out = tmp_path / "signals.csv"
+    EventQuery(bus).export_to_csv('StrategySignalEvent', str(out), days=1)
+
+    with open(out, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 25
+    assert rows[0]['symbol'] == "000000"
+    assert len(list(store.iter_events(batch_size=7, event_type='StrategySignalEvent'))) == 25
+
+
+def test_append_is_write_behind_and_flushed_before_reads(tmp_path):
+    store = TradingEventStore(str(tmp_path / "events.sqlite"), flush_interval=60.0)
+    now = time.time()
+    store.append('StrategySignalEvent', _signal("000001", SignalDirection.BUY, 0.5, now))
+    assert len(store._pending) == 1
+    assert store.count(event_type='StrategySignalEvent') == 1
+    assert store._pending == []
+
+    store.append('StrategySignalEvent', _signal("000002", SignalDirection.SELL, 0.5, now))
+    store.close()
+    reopened = TradingEventStore(str(tmp_path / "events.sqlite"), flush_interval=0)
+    assert reopened.count() == 2
+    assert reopened.query(limit=1)[0]['direction'] == 'sell'
+
+
+def test_bus_schedules_retention_prune():
+    store = TradingEventStore(':memory:')
+    bus = TradingEventBus(use_stream=False, dedup_window=0.0, event_store=store, retention_days=1)
+    bus.configure_persistence('StrategySignalEvent')
+    now = time.time()
+    store.append('StrategySignalEvent', _signal("000001", SignalDirection.BUY, 0.5, now - 3 * 86400))
+    bus.publish(_signal("000002", SignalDirection.BUY, 0.5, now))
+    assert [e['symbol'] for e in store.query(limit=10)] == ["000002"]
+
+    store.append('StrategySignalEvent', _signal("000003", SignalDirection.BUY, 0.5, now - 3 * 86400))
+    bus.publish(_signal("000004", SignalDirection.BUY, 0.5, now))  # 一小时内不重复清理
+    assert store.count() == 3
+
+
+class _FakeNB(dict):
+    def emit(self, data):
+        self[str(time.time())] = data
+
+
+def test_nb_history_is_imported_once(monkeypatch):
+    from deva.naja.events import trading_bus as bus_mod
+
+    now = time.time()
+    legacy = _FakeNB({
+        str(now - 20): {"symbol": "000001", "direction": SignalDirection.BUY, "confidence": 0.7,
+                        "strategy_name": "Old", "timestamp": now - 20},
+        str(now - 10): {"symbol": "000002", "direction": SignalDirection.SELL, "confidence": 0.3},
+        "junk": "not an event",
+    })
+    monkeypatch.setattr(bus_mod, "STREAM_AVAILABLE", True)
+    monkeypatch.setattr(bus_mod, "NB", lambda *args, **kwargs: legacy, raising=False)
+
+    store = TradingEventStore(':memory:')
+    for _ in range(2):
+        bus = TradingEventBus(use_stream=True, dedup_window=0.0, event_store=store)
+        bus.configure_persistence('StrategySignalEvent')
+
+    history = bus.get_history('StrategySignalEvent', limit=10)
+    assert [h['data']['symbol'] for h in history] == ["000002", "000001"]
+    assert history[0]['timestamp'] == now - 10 and history[1]['data']['direction'] == 'buy'
+    assert store.count(event_type='StrategySignalEvent', direction='sell') == 1
+    assert store.is_migrated('StrategySignalEvent')
@@ -0,0 +1,109 @@
+"""
+FrequencyScheduler 数组调度测试
+"""
+
+import numpy as np
+
+from deva.naja.market_hotspot.scheduling.frequency_scheduler import (
+    FrequencyConfig,
+    FrequencyLevel,
+    FrequencyScheduler,
+)
+
+LOW, MEDIUM, HIGH = FrequencyLevel.LOW, FrequencyLevel.MEDIUM, FrequencyLevel.HIGH
+
+
+def _scheduler(n=10, **config):
+    config.setdefault("cooldown", 0.0)
+    config.setdefault("min_change_ratio", 1.0)
+    fs = FrequencyScheduler(FrequencyConfig(**config), max_symbols=100)
+    for i in range(n):
+        fs.register_symbol(f"s{i}")
+    return fs
+
+
+def test_thresholds_and_hysteresis():
+    fs = _scheduler(4)
+    # low=1.2 high=2.5 hysteresis=0.2
+    levels = fs.schedule_array(np.array([1.3, 1.5, 2.6, 3.0]), 100.0)
+    # LOW->MEDIUM 需 >= 1.4；LOW->HIGH 跨两档需 >= 2.9
+    assert levels.tolist() == [LOW.value, MEDIUM.value, LOW.value, HIGH.value]
+
+    levels = fs.schedule_array(np.array([1.3, 1.5, 2.0, 3.0]), 150.0)
+    assert levels.tolist() == [LOW.value, MEDIUM.value, MEDIUM.value, HIGH.value]
+
+    levels = fs.schedule_array(np.array([1.3, 1.1, 2.4, 2.4]), 200.0)
+    # MEDIUM->LOW 需 <= 1.0；HIGH->MEDIUM 需 <= 2.3
+    assert levels.tolist() == [LOW.value, MEDIUM.value, MEDIUM.value, HIGH.value]
+
+
+def test_cooldown_blocks_recent_switches():
+    fs = _scheduler(2, cooldown=30.0)
+    fs.schedule_array(np.array([5.0, 0.0]), 100.0)
+    assert fs.get_level_array().tolist() == [HIGH.value, LOW.value]
+
+    # s0 刚切换过，仍处于冷静期；s1 不受影响
+    fs.schedule_array(np.array([0.0, 5.0]), 110.0)
+    assert fs.get_level_array().tolist() == [HIGH.value, HIGH.value]
+    fs.schedule_array(np.array([0.0, 5.0]), 130.0)
+    assert fs.get_level_array().tolist() == [LOW.value, HIGH.value]
+
+
+def test_min_change_keeps_largest_weight_moves():
+    fs = _scheduler(10, min_change_ratio=0.2)
+    weights = np.array([3.0, 9.0, 4.0, 8.0, 3.5, 0, 0, 0, 0, 0])
+    levels = fs.schedule_array(weights, 100.0)
+    assert np.flatnonzero(levels == HIGH.value).tolist() == [1, 3]
+
+
+def test_nan_weights_are_not_scheduled():
+    fs = _scheduler(3)
+    fs.schedule_array(np.array([5.0, 5.0, 5.0]), 100.0)
+    levels = fs.schedule_array(np.array([np.nan, 0.0, np.nan]), 200.0)
+    assert levels.tolist() == [HIGH.value, LOW.value, HIGH.value]
+    assert fs._last_weights[:3].tolist() == [5.0, 0.0, 5.0]
+
+
+def test_protected_symbols_target_high():
+    fs = _scheduler(3)
+    fs.register_protected_symbol("s2")
+    levels = fs.schedule_array(np.zeros(3), 100.0)
+    assert levels.tolist() == [LOW.value, LOW.value, HIGH.value]
+
+
+def test_dict_path_matches_array_path():
+    rng = np.random.default_rng(0)
+    a, b = _scheduler(50, min_change_ratio=0.1), _scheduler(50, min_change_ratio=0.1)
+    for t in range(20):
+        weights = {f"s{i}": float(w) for i, w in enumerate(rng.gamma(2.0, 1.0, 50)) if i % 7}
+        weights["unregistered"] = 9.0
+        result = a.schedule(weights, float(t))
+        levels = b.schedule_array(b.weights_from_dict(weights), float(t))
+
+        assert set(result) == {s for s in weights if s != "unregistered"}
+        assert all(levels[int(s[1:])] == lvl.value for s, lvl in result.items())
+        assert np.array_equal(a.get_level_array(), levels)
+
+
+def test_level_indices_and_symbols_by_level():
+    fs = _scheduler(5)
+    fs.schedule_array(np.array([0.0, 1.5, 3.0, 1.5, 0.0]), 100.0)
+    indices = fs.level_indices()
+    assert indices[MEDIUM].tolist() == [1, 3]
+    by_level = fs.symbols_by_level()
+    assert by_level[HIGH] == ["s2"]
+    assert by_level[LOW] == fs.get_symbols_by_level(LOW) == ["s0", "s4"]
+    assert fs.get_schedule_summary()["medium_frequency"] == 2
+
+
+def test_symbol_cache_invalidated_by_load_state():
+    fs = _scheduler(2)
+    assert fs.get_levels(["s0", "a", "b"]).tolist() == [LOW.value, LOW.value, LOW.value]
+
+    # 恢复同样数量、不同 symbol 的映射，缓存不能沿用旧索引
+    fs.load_state({
+        "symbol_to_idx": {"a": 0, "b": 1},
+        "idx_to_symbol": {"0": "a", "1": "b"},
+        "last_weights": [3.0, 2.0],
+    })
+    assert fs.get_levels(["s0", "a", "b"]).tolist() == [LOW.value, HIGH.value, MEDIUM.value]
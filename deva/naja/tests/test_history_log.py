@@ -0,0 +1,98 @@
+"""
+热点历史分段日志 / 增量持久化测试
+"""
+
+import json
+import os
+
+from deva.naja.market_hotspot.tracking.history_log import SegmentLog
+from deva.naja.market_hotspot.tracking.history_tracker import MarketHotspotHistoryTracker
+
+
+def _tracker(path, max_history=10):
+    tracker = MarketHotspotHistoryTracker(max_history=max_history)
+    tracker._emit_hotspot_event = lambda **kwargs: None
+    tracker._persist_base_path = str(path)
+    return tracker
+
+
+def _record_ticks(tracker, start, count):
+    for k in range(start, start + count):
+        hot = 1.0 if k % 2 else 5.0
+        tracker.record_snapshot(0.5, {"A": 1.0 + k, "B": 2.0 if k % 2 else 0.5},
+                                {"s1": hot, "s2": 6.0 - hot, "s3": 1.0}, timestamp=float(k))
+
+
+def test_segment_log_rotates_compacts_and_ignores_torn_tail(tmp_path):
+    log = SegmentLog(str(tmp_path), 'changes', keep=5, segment_bytes=64, max_segments=3)
+    for i in range(20):
+        log.append([{'i': i, 'text': '变化'}])
+    assert len(log.segments()) <= 4
+    assert [r['i'] for r in log.tail(5)] == list(range(15, 20))
+    assert [r['i'] for r in log.tail(2)] == [18, 19]
+
+    with open(log.segments()[-1], 'ab') as f:
+        f.write(b'\x40\x00\x00\x00{"i":')
+    assert log.tail(1) == [{'i': 19, 'text': '变化'}]
+    log.append([{'i': 20, 'text': ''}])
+    assert [r['i'] for r in log.tail(2)] == [19, 20]
+
+
+def test_save_state_appends_only_new_records(tmp_path):
+    tracker = _tracker(tmp_path)
+    tracker.register_symbol_name("s1", "股票1")
+    _record_ticks(tracker, 0, 4)
+    tracker.save_state()
+    directory = tracker._get_persist_dir()
+    change_log, event_log = tracker._history_logs(directory)
+    size = change_log.nbytes()
+    assert len(change_log.tail(100)) == len(tracker.changes)
+
+    names_mtime = os.stat(os.path.join(directory, 'names.json')).st_mtime_ns
+    tracker.save_state()
+    assert change_log.nbytes() == size
+    assert os.stat(os.path.join(directory, 'names.json')).st_mtime_ns == names_mtime
+
+    _record_ticks(tracker, 4, 2)
+    tracker.save_state()
+    assert [c['timestamp'] for c in change_log.tail(100)] == [c.timestamp for c in tracker.changes]
+    assert len(event_log.tail(100)) == len(tracker.block_hotspot_events_medium)
+
+
+def test_load_latest_state_restores_from_segments(tmp_path):
+    tracker = _tracker(tmp_path)
+    tracker.register_symbol_name("s1", "股票1")
+    _record_ticks(tracker, 0, 30)
+    tracker.save_state()
+
+    restored = _tracker(tmp_path)
+    assert restored.load_latest_state()
+    assert [c.item_id for c in restored.changes] == [c.item_id for c in tracker.changes]
+    assert [e.block_id for e in restored.block_hotspot_events_medium] == \
+        [e.block_id for e in tracker.block_hotspot_events_medium]
+    assert restored.get_symbol_name("s1") == "股票1"
+    assert restored._baseline_snapshot.symbol_weights == tracker._baseline_snapshot.symbol_weights
+
+    # 从今天的目录加载后，再次保存不会重复追加
+    restored.save_state()
+    change_log, _ = restored._history_logs(restored._get_persist_dir())
+    assert len(change_log.tail(1000)) == len(tracker.changes)
+
+
+def test_load_state_reads_legacy_json(tmp_path):
+    tracker = _tracker(tmp_path)
+    legacy = {
+        'symbol_names': {"s9": "旧股票"},
+        'block_names': {},
+        'changes': [{
+            'timestamp': 1.0, 'change_type': 'new_hot', 'item_type': 'symbol', 'item_id': 's9',
+            'item_name': '旧股票', 'old_weight': 1.0, 'new_weight': 4.0, 'change_percent': 300.0,
+            'description': 'd',
+        }],
+        'block_hotspot_events': [],
+        'baseline_snapshot': None,
+    }
+    with open(tracker._get_persist_file_path(date='2024-01-02'), 'w', encoding='utf-8') as f:
+        json.dump(legacy, f)
+    assert tracker.load_latest_state()
+    assert [c.item_id for c in tracker.changes] == ["s9"]
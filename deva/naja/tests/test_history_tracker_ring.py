@@ -0,0 +1,86 @@
+"""
+MarketHotspotHistoryTracker 列式快照环形缓冲测试
+"""
+
+import numpy as np
+
+from deva.naja.market_hotspot.tracking.history_tracker import MarketHotspotHistoryTracker
+from deva.naja.market_hotspot.tracking.snapshot_ring import SnapshotRing, top_n
+
+
+def _tracker(max_history=5):
+    tracker = MarketHotspotHistoryTracker(max_history=max_history)
+    tracker._emit_hotspot_event = lambda **kwargs: None
+    return tracker
+
+
+def test_top_n_matches_full_sort_with_ties():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.random(200), 1)
+    keys = [f"k{i}" for i in range(200)]
+    expected = sorted(zip(keys, values.tolist()), key=lambda x: x[1], reverse=True)[:20]
+    assert top_n(keys, values, 20) == expected
+    assert top_n(keys[:3], values[:3], 10) == sorted(zip(keys[:3], values[:3].tolist()), key=lambda x: x[1], reverse=True)
+
+
+def test_ring_keeps_last_snapshots_and_new_columns():
+    ring = SnapshotRing(maxlen=3)
+    for k in range(5):
+        ring.append(float(k), 0.1 * k, {"b": float(k)}, {f"s{k}": 1.0, "s0": float(k)})
+    assert len(ring) == 3
+    assert [s.timestamp for s in ring] == [2.0, 3.0, 4.0]
+    assert ring[-1].symbol_weights == {"s0": 4.0, "s4": 1.0}
+    assert ring[0].symbol_weights == {"s0": 2.0, "s2": 1.0}
+
+    timestamps, weights = ring.column('symbol', "s3", 10)
+    assert timestamps.tolist() == [2.0, 3.0, 4.0] and weights.tolist() == [0.0, 1.0, 0.0]
+    assert ring.column('symbol', "missing", 2)[1].tolist() == [0.0, 0.0]
+
+    keys, old, new = ring.delta('symbol')
+    assert dict(zip(keys, zip(old.tolist(), new.tolist()))) == {"s0": (3.0, 4.0), "s3": (1.0, 0.0), "s4": (0.0, 1.0)}
+
+
+def test_stale_view_returns_empty_weights():
+    ring = SnapshotRing(maxlen=2)
+    ring.append(0.0, 0.5, {"b": 1.0}, {"s": 1.0})
+    view = ring[0]
+    ring.append(1.0, 0.5, {"b": 1.0}, {"s": 1.0})
+    ring.append(2.0, 0.5, {"b": 1.0}, {"s": 1.0})
+    assert view.symbol_weights == {} and view.timestamp == 0.0
+
+
+def test_tracker_trends_hot_lists_and_changes():
+    tracker = _tracker()
+    symbols = {f"s{i}": 1.0 + i for i in range(30)}
+    tracker.record_snapshot(0.5, {"A": 1.0, "B": 2.0}, symbols, timestamp=1.0)
+    tracker.record_snapshot(0.5, {"A": 1.5, "C": 0.5}, dict(symbols, s1=6.0, s29=1.0), timestamp=2.0)
+
+    assert list(tracker.current_hot_symbols)[:2] == ["s28", "s27"]
+    assert len(tracker.current_hot_symbols) == 20
+    trend = tracker.get_block_trend("B")
+    assert [(p['timestamp'], p['weight']) for p in trend] == [(1.0, 2.0), (2.0, 0.0)]
+    assert [p['weight'] for p in tracker.get_symbol_trend("s1")] == [2.0, 6.0]
+
+    events = {e.block_id: e.event_type for e in tracker.block_hotspot_events_low}
+    assert events == {"A": "rise", "B": "cooled", "C": "new_hot"}
+    top = [s['symbol'] for s in tracker.block_hotspot_events_low[0].top_symbols]
+    assert top == ["s1", "s29"]
+    assert {c.item_id: c.change_type for c in tracker.changes} == {"s1": "new_hot", "s29": "cooled"}
+
+    assert tracker._baseline_snapshot.symbol_weights == symbols
+    assert tracker.get_hotspot_shift_report(emit_to_insight=False)['removed_blocks'] == [("B", "B")]
+
+
+def test_tracker_accepts_weight_arrays():
+    by_dict, by_arrays = _tracker(), _tracker()
+    rng = np.random.default_rng(3)
+    keys = np.array([f"s{i}" for i in range(40)], dtype=object)
+    for t in range(3):
+        values = np.round(rng.random(40), 2)
+        by_dict.record_snapshot(0.5, {"A": 1.0 + t}, dict(zip(keys.tolist(), values.tolist())), timestamp=float(t))
+        by_arrays.record_snapshot(0.5, {"A": 1.0 + t}, (keys, values), timestamp=float(t))
+
+    assert by_arrays.current_hot_symbols == by_dict.current_hot_symbols
+    assert by_arrays._baseline_snapshot.symbol_weights == by_dict._baseline_snapshot.symbol_weights
+    assert by_arrays.snapshots[-1].symbol_weights == by_dict.snapshots[-1].symbol_weights
+    assert [c.item_id for c in by_arrays.changes] == [c.item_id for c in by_dict.changes]
@@ -0,0 +1,168 @@
+"""
+process_snapshot 数组流水线测试：SymbolUniverse / SnapshotResult / 各阶段数组接口
+"""
+
+import numpy as np
+
+from deva.naja.market_hotspot.core import BlockConfig, SnapshotResult, SymbolUniverse, WeightPool
+from deva.naja.market_hotspot.engine.river_engine import RiverEngine
+from deva.naja.market_hotspot.integration.market_hotspot_system import MarketHotspotSystem
+from deva.naja.market_hotspot.scheduling.frequency_scheduler import FrequencyLevel
+
+
+def test_universe_ids_are_stable_and_aligned_to_stages():
+    universe = SymbolUniverse()
+    ids = universe.ids(np.array(["a", "b", "c"], dtype=object))
+    assert ids.tolist() == [0, 1, 2]
+    assert universe.ids(np.array(["c", "d", "a"])).tolist() == [2, 3, 0]
+
+    pool = {"d": 0, "a": 1}
+    scheduler = {"a": 0, "x": 1, "d": 2}
+    assert universe.positions(np.array(["a", "b", "d"]), pool).tolist() == [1, -1, 0]
+    src, dst = universe.translate(pool, scheduler)
+    assert src.tolist() == [1, 0] and dst.tolist() == [0, 2]
+    assert universe.stage_symbols(scheduler).tolist() == ["a", "x", "d"]
+
+
+def test_snapshot_result_materializes_dicts_lazily():
+    result = SnapshotResult(
+        {'timestamp': 1.0, 'symbol_weights': None, 'frequency_levels': None},
+        weight_symbols=np.array(["a", "b", "c"], dtype=object), weights=np.array([1.0, 3.0, 3.0]),
+        level_symbols=np.array(["b"], dtype=object), levels=np.array([2], dtype=np.int8),
+    )
+    assert result._fields['symbol_weights'] is None
+    assert result['symbol_weights'] == {"a": 1.0, "b": 3.0, "c": 3.0}
+    assert result['symbol_weights'] is result['symbol_weights']
+    assert result.get('frequency_levels') == {"b": FrequencyLevel.HIGH}
+    assert list(result.top_weights(2)) == ["b", "c"]
+    assert list(result) == ['timestamp', 'symbol_weights', 'frequency_levels']
+
+
+def test_weight_pool_block_influence_is_max_of_member_blocks():
+    pool = WeightPool(max_symbols=8)
+    pool.register_symbol("sh600000", ["x", "y"])
+    pool.register_symbol("sh600001", [])
+    pool.register_symbol("sh600002", ["y"])
+    weights = pool.update_array(np.array([0, 1, 2]), np.zeros(3), np.ones(3), {"x": 0.2, "y": 0.6}, 1.0)
+    # 样本不足，局部活动度为 0: weight = base * (1 + influence)
+    assert np.allclose(weights, [1.6, 1.0, 1.6])
+
+    pool.register_symbol("sh600001", ["x"])
+    assert pool.update(np.array(["sh600001"]), np.zeros(1), np.ones(1), {"x": 0.2}, 2.0)["sh600001"] == 1.2
+
+
+def test_river_batch_matches_per_tick_processing():
+    rng = np.random.default_rng(0)
+    symbols = [f"s{i}" for i in range(30)]
+    batch, single = RiverEngine(max_symbols=40), RiverEngine(max_symbols=40)
+    for s in symbols:
+        batch.register_symbol(s)
+        single.register_symbol(s)
+
+    for t in range(40):
+        rows = np.concatenate([np.arange(30), rng.integers(30, size=5)])
+        prices = 10 + rng.normal(0, 1, len(rows)) * (1 + 5 * (rng.random(len(rows)) < 0.05))
+        volumes = rng.uniform(1e3, 1e5, len(rows))
+        got = batch.process_batch(rows, prices, volumes, float(t))
+
+        expected = []
+        for k, row in enumerate(rows):
+            signal = single.process_tick(symbols[row], float(prices[k]), float(volumes[k]), float(t))
+            if signal is not None:
+                expected.append((k, signal))
+        assert [(k, s.symbol, s.anomaly_score, s.anomaly_level, s.features) for k, s in got] == \
+            [(k, s.symbol, s.anomaly_score, s.anomaly_level, s.features) for k, s in expected]
+
+    assert np.array_equal(batch._anomaly_scores, single._anomaly_scores)
+
+
+def test_process_snapshot_returns_array_backed_result():
+    system = MarketHotspotSystem()
+    symbols = np.array([f"sh60000{i}" for i in range(6)], dtype=object)
+    blocks = [BlockConfig(block_id="B1", name="题材1"), BlockConfig(block_id="B2", name="题材2")]
+    system.initialize(blocks, {s: ["B1"] if i % 2 else ["B2"] for i, s in enumerate(symbols)})
+    block_ids = np.array(["B1", "B2"] * 3, dtype=object)
+
+    rng = np.random.default_rng(1)
+    for t in range(5):
+        result = system.process_snapshot(
+            symbols, rng.normal(0, 3, 6), rng.uniform(1e4, 1e6, 6), rng.uniform(5, 10, 6),
+            block_ids, 1000.0 + t * 3)
+
+    assert isinstance(result, SnapshotResult)
+    assert result['symbol_weights'] == system.weight_pool.get_all_weights()
+    assert system._last_symbol_weights == result['symbol_weights']
+    levels = result['frequency_levels']
+    assert set(levels) == set(symbols)
+    assert all(levels[s] == system.frequency_scheduler.get_symbol_level(s) for s in symbols)
+    assert not result['degraded']
+
+
+def test_intelligence_layer_adds_keys_to_snapshot_result():
+    from deva.naja.market_hotspot.integration.hotspot_intelligence_system import (
+        HotspotIntelligenceSystem,
+        IntelligenceConfig,
+    )
+
+    system = HotspotIntelligenceSystem(intelligence_config=IntelligenceConfig(enable_strategy_learning=False))
+    symbols = np.array([f"sh60000{i}" for i in range(6)], dtype=object)
+    block_ids = np.array(["B1", "B2"] * 3, dtype=object)
+
+    rng = np.random.default_rng(2)
+    for t in range(3):
+        result = system.process_snapshot(
+            symbols, rng.normal(0, 3, 6), rng.uniform(1e4, 1e6, 6), rng.uniform(5, 10, 6),
+            block_ids, 1000.0 + t * 3)
+
+    assert isinstance(result, SnapshotResult)
+    for key in ('prediction_scores', 'adjusted_hotspot', 'propagated_block_hotspot',
+                'budget_allocation', 'tier_symbols', 'datasource_control', 'enhanced'):
+        assert key in result
+    assert set(result['symbol_weights']) == set(symbols)
+    assert result.to_dict()['enhanced']['budget'] is True
+
+    result['symbol_weights'] = {"x": 1.0}
+    assert result['symbol_weights'] == {"x": 1.0}
+    del result['enhanced']
+    assert 'enhanced' not in result
+
+
+def test_tick_path_does_not_build_symbol_weight_dict(monkeypatch):
+    import pandas as pd
+
+    import deva.naja.events as events
+    from deva.naja.market_hotspot.core import WeightsView
+    from deva.naja.market_hotspot.tracking import history_tracker
+
+    published, recorded = [], []
+    monkeypatch.setattr(events, "get_event_bus", lambda: type("Bus", (), {"publish": lambda self, e: published.append(e)})())
+
+    class Tracker:
+        snapshots = []
+
+        def record_snapshot(self, **kwargs):
+            recorded.append(kwargs)
+
+    monkeypatch.setattr(history_tracker, "get_history_tracker", lambda: Tracker())
+
+    system = MarketHotspotSystem()
+    codes = [f"sh60000{i}" for i in range(6)]
+    system.initialize([BlockConfig(block_id="B1", name="题材1")], {s: ["B1"] for s in codes})
+    system._apply_noise_filter = lambda data: data
+    frame = pd.DataFrame({"now": np.linspace(10, 11, 6), "change_pct": np.linspace(0, 10, 6), "volume": 1e5},
+                         index=codes)
+    system.process_data(frame, market="CN")
+
+    event = published[-1]
+    assert isinstance(event.symbol_weights, WeightsView)
+    result = event.symbol_weights._result
+    symbols, weights = recorded[-1]["symbol_weights"]
+    assert symbols is result.weight_symbols and weights is result.weights
+    assert result._fields['symbol_weights'] is None
+
+    # 订阅方按需读取：迭代 / items() 走数组，按 symbol 取值才生成字典
+    assert len(event.symbol_weights) == len(symbols)
+    assert dict(event.symbol_weights.items()) == dict(zip(symbols.tolist(), weights.tolist()))
+    assert result._fields['symbol_weights'] is None
+    assert event.symbol_weights[symbols[0]] == weights[0]
+    assert event.to_dict()['symbol_weights'] == result['symbol_weights']
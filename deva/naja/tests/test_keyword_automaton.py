@@ -0,0 +1,127 @@
+"""
+KeywordAutomaton 测试：与逐词子串判断结果一致、命中位置、共享自动机重建、检测器与评分器接入
+"""
+
+import random
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from deva.naja.cognition.narrative import tracker as tracker_mod
+from deva.naja.cognition.semantic import keyword_automaton as ka
+from deva.naja.cognition.semantic.attention_scorer import AttentionScorer
+from deva.naja.cognition.semantic.keyword_registry import (
+    ATTENTION_KEYWORDS,
+    ATTENTION_SENTIMENT_WORDS,
+    DYNAMICS_KEYWORDS,
+    SENTIMENT_KEYWORDS,
+)
+from deva.naja.cognition.semantic.news_event import NewsEvent
+
+DICTIONARIES = {
+    "narrative": {
+        "AI": ["AI", "大模型", "AI芯片", "ai应用", "OpenAI", "GPT"],
+        "芯片": ["芯片", "GPU", "AI芯片", "半导体", "芯片"],
+        "空": ["", "不会出现的词"],
+    },
+    "dynamics": {"短缺": ["短缺", "算力短缺", "GPU短缺", "he", "she", "hers"]},
+}
+
+
+def _naive(dictionaries, text):
+    """旧实现：逐个关键词子串判断"""
+    lower = text.lower()
+    result = {}
+    for group, mapping in dictionaries.items():
+        for label, keywords in mapping.items():
+            hits = [k for k in keywords if k and ((k.lower() in lower) if k.isascii() else (k in text))]
+            if hits:
+                result.setdefault(group, {})[label] = hits
+    return result
+
+
+def _random_texts(n, seed=0):
+    rng = random.Random(seed)
+    vocab = [k for m in DICTIONARIES.values() for ks in m.values() for k in ks if k]
+    vocab += ["的", "，", "新闻", "ushers", "Ai", "aI芯片", "AI应用", "Gpt-5", " "]
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(vocab) for _ in range(rng.randint(0, 12))]
+        words = [w.swapcase() if w.isascii() and rng.random() < 0.3 else w for w in words]
+        texts.append("".join(words))
+    return texts
+
+
+def test_matches_naive_substring_semantics():
+    automaton = ka.KeywordAutomaton(DICTIONARIES)
+    for text in _random_texts(500):
+        assert automaton.scan(text) == _naive(DICTIONARIES, text), text
+
+    hits = automaton.match("NVIDIA 发布 AI芯片，ai芯片 与 AI应用", "narrative")
+    assert hits == {"AI": ["AI", "AI芯片"], "芯片": ["芯片", "AI芯片", "芯片"]}
+    assert automaton.match("", "narrative") == {}
+
+
+def test_find_all_reports_every_position():
+    automaton = ka.KeywordAutomaton(DICTIONARIES)
+    text = "ushers: GPU短缺, GPU短缺, gpu短缺"
+    hits = [(h.label, h.keyword, h.position) for h in automaton.find_all(text) if h.group == "dynamics"]
+    assert ("短缺", "she", 1) in hits and ("短缺", "he", 2) in hits and ("短缺", "hers", 2) in hits
+    assert [h[2] for h in hits if h[1] == "GPU短缺"] == [8, 15]  # 含非 ASCII 的关键词大小写敏感
+    for hit in automaton.find_all(text):
+        assert text[hit.position:hit.position + len(hit.keyword)].lower() == hit.keyword.lower()
+
+
+def test_update_keyword_group_rebuilds_shared_automaton(monkeypatch):
+    monkeypatch.setattr(ka, "_shared_groups", {})
+    monkeypatch.setattr(ka, "_shared_automaton", None)
+
+    shared = ka.get_keyword_automaton()
+    assert shared.dictionary("dynamics") == DYNAMICS_KEYWORDS
+    assert ka.update_keyword_group("narrative", shared.dictionary("narrative")) is shared
+
+    rebuilt = ka.update_keyword_group("narrative", {"量子": ["量子计算"]})
+    assert rebuilt is not shared and ka.get_keyword_automaton() is rebuilt
+    assert rebuilt.match("量子计算迎来突破", "narrative") == {"量子": ["量子计算"]}
+    assert "量子" not in shared.match("量子计算迎来突破", "narrative")
+
+
+def test_tracker_detectors_use_automaton(monkeypatch):
+    themes = [{"id": label, "keywords": kws} for label, kws in DICTIONARIES["narrative"].items()]
+    monkeypatch.setattr(tracker_mod.NarrativeTracker, "_get_initial_focus_themes", lambda self: themes)
+    monkeypatch.setattr(tracker_mod.NarrativeTracker, "_load_state", lambda self: None)
+    monkeypatch.setattr(ka, "_shared_groups", {})
+    monkeypatch.setattr(ka, "_shared_automaton", None)
+    tracker = tracker_mod.NarrativeTracker()
+
+    for text in _random_texts(200, seed=1):
+        event = SimpleNamespace(content=text + " 算力短缺 芯片短缺 涨停", meta={"title": "AI 大模型"})
+        combined = " ".join(tracker._collect_texts(event))
+        expected = _naive({"narrative": tracker._keywords, "dynamics": DYNAMICS_KEYWORDS,
+                           "sentiment": SENTIMENT_KEYWORDS}, combined)
+        assert tracker.detect_narratives(event) == expected.get("narrative", {})
+        assert tracker.detect_value_signals(event) == expected.get("dynamics", {})
+        assert tracker.detect_minxin_signals(event) == expected.get("sentiment", {})
+
+    tracker._on_manas_state_changed(SimpleNamespace(data={"focus_themes": [{"id": "量子", "keywords": ["量子"]}]}))
+    assert tracker.detect_narratives(SimpleNamespace(content="量子 AI", meta={})) == {"量子": ["量子"]}
+
+
+@pytest.mark.parametrize("content", [
+    "英伟达发布新 GPU，算力需求暴涨！！涨停",
+    "openai 与监管合作，重大利好，市场危机解除!",
+    "平淡的一天",
+])
+def test_attention_scorer_scores_unchanged(content):
+    scorer = AttentionScorer()
+    event = NewsEvent(id="1", timestamp=datetime.now(), source="test", event_type="news", content=content)
+    lower = content.lower()
+
+    keyword_score = (0.25 * sum(k.lower() in lower for k in ATTENTION_KEYWORDS["high"])
+                     + 0.1 * sum(k.lower() in lower for k in ATTENTION_KEYWORDS["medium"]))
+    assert scorer._keyword_score(event) == pytest.approx(min(1.0, keyword_score))
+
+    sentiment = 0.3 * sum(w in lower for w in ATTENTION_SENTIMENT_WORDS["strong"])
+    sentiment += min(0.2, lower.count("!") * 0.05)
+    assert scorer._sentiment_score(event) == pytest.approx(min(1.0, sentiment))
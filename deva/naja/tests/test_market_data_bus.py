@@ -0,0 +1,71 @@
+"""
+MarketDataBus 列式批量写入测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from deva.core.store import DBStream
+from deva.naja.bandit import market_data_bus as mdb
+
+
+@pytest.fixture
+def bus(tmp_path, monkeypatch):
+    monkeypatch.setattr(mdb.MarketDataBus, "_instance", None)
+    monkeypatch.setattr(mdb, "NB", lambda name: DBStream(name, str(tmp_path / "bus")))
+    instance = mdb.MarketDataBus()
+    yield instance
+    mdb.MarketDataBus._instance = None
+
+
+def _snapshot():
+    return pd.DataFrame({
+        "code": ["sh600000", "sz000001", "nvda", "sh600001"],
+        "name": ["浦发银行", "平安银行", "NVIDIA", "停牌"],
+        "now": [10.5, 12.0, 900.0, 0.0],
+        "close": [10.0, 12.5, 880.0, 5.0],
+        "p_change": [5.0, -4.0, 2.27, 0.0],
+        "volume": [1000, 2000, 3000, 0],
+        "high": [10.6, 12.6, 905.0, 0.0],
+        "low": [9.9, 11.9, 870.0, 0.0],
+        "open": [10.1, 12.4, 881.0, 0.0],
+    })
+
+
+def test_write_quotes_frame_updates_cache_and_db(bus):
+    written = bus.write_quotes_frame(_snapshot())
+
+    assert written == 3
+    quote = bus._get_cached_quote("600000")
+    assert quote.current == 10.5
+    assert quote.prev_close == 10.0
+    assert quote.open_price == 10.1
+    assert quote.market == "SH"
+    assert bus._get_cached_quote("nvda").market == "US"
+    assert bus._get_cached_quote("600001") is None
+    assert bus._db["000001"]["volume"] == 2000
+
+
+def test_write_quotes_frame_accepts_struct_of_arrays(bus):
+    written = bus.write_quotes_frame({
+        "code": np.array(["sh600000", "sz000001"]),
+        "current": np.array([10.5, 12.0]),
+        "prev_close": np.array([10.0, 12.5]),
+    })
+
+    assert written == 2
+    assert bus._get_cached_quote("000001").current == 12.0
+
+
+def test_batch_subscriber_receives_one_notification(bus):
+    calls = []
+    per_quote = []
+    bus.subscribe_batch(calls.append)
+    bus._subscribers.append(lambda code, price: per_quote.append(code))
+
+    bus.write_quotes_frame(_snapshot())
+
+    assert len(calls) == 1
+    assert calls[0] == {"sh600000": 10.5, "sz000001": 12.0, "nvda": 900.0}
+    assert len(per_quote) == 3
@@ -0,0 +1,127 @@
+"""
+新闻认知向量索引测试：主题中心矩阵的最近主题查找与逐个比较一致、
+新颖度环形缓冲与逐条余弦一致、批量评分与逐条评分一致
+"""
+
+import copy
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from deva.naja.cognition import core as core_mod
+from deva.naja.cognition.narrative.tracker import NarrativeTracker
+from deva.naja.cognition.semantic.attention_scorer import AttentionScorer
+from deva.naja.cognition.semantic.embedding_index import TopicCenterIndex
+from deva.naja.cognition.semantic.news_event import NewsEvent
+
+
+def _event(i, vector, event_type="news"):
+    return NewsEvent(id=str(i), timestamp=datetime.now(), source="news", event_type=event_type,
+                     content=f"新闻 {i}", vector=None if vector is None else list(vector))
+
+
+def _vectors(n, dim=28, seed=7):
+    rng = np.random.default_rng(seed)
+    prototypes = rng.random((12, dim))
+    vectors = []
+    for i in range(n):
+        kind = i % 10
+        if kind == 0:
+            vectors.append(np.zeros(dim))  # 零向量
+        elif kind == 1:
+            vectors.append(prototypes[rng.integers(12)] * rng.uniform(0.5, 3.0))  # 同方向，相似度并列
+        else:
+            vectors.append(np.clip(prototypes[rng.integers(12)] + rng.normal(0, 0.3, dim), 0, None))
+    return [v.tolist() for v in vectors]
+
+
+@pytest.fixture
+def make_strategy(monkeypatch):
+    monkeypatch.setattr(NarrativeTracker, "_load_state", lambda self: None)
+
+    def make(**config):
+        return core_mod.NewsMindStrategy(config)
+
+    return make
+
+
+@pytest.mark.parametrize("threshold,max_topics", [(0.5, 50), (0.9, 30), (0.97, 200)])
+def test_topic_assignment_matches_exhaustive_scan(make_strategy, threshold, max_topics):
+    indexed = make_strategy(topic_threshold=threshold, max_topics=max_topics)
+    exhaustive = make_strategy(topic_threshold=threshold, max_topics=max_topics)
+    exhaustive._topic_candidates = lambda vector, threshold, nearest=False: list(exhaustive.topics)
+
+    vectors = _vectors(1500)
+    got = [indexed._assign_topic(_event(i, v)) for i, v in enumerate(vectors)]
+    expected = [exhaustive._assign_topic(_event(i, v)) for i, v in enumerate(vectors)]
+    assert got == expected
+    assert len(set(got)) > 1
+    for topic_id, topic in indexed.topics.items():
+        assert topic.center == exhaustive.topics[topic_id].center
+
+    probe = _event(-1, vectors[3])
+    assert indexed._is_first_appearance_topic(probe) == exhaustive._is_first_appearance_topic(probe)
+
+
+def test_topic_index_tracks_replaced_and_removed_topics(make_strategy):
+    strategy = make_strategy(topic_threshold=0.5)
+    a = strategy._assign_topic(_event(0, [1.0, 0.0, 0.0]))
+    b = strategy._assign_topic(_event(1, [0.0, 1.0, 0.0]))
+    assert strategy._find_nearest_topic([0.1, 1.0, 0.0]) == b
+
+    del strategy.topics[b]
+    assert strategy._find_nearest_topic([0.1, 1.0, 0.0]) is None
+    strategy.topics[a].center = [0.0, 1.0, 0.0]
+    assert strategy._find_nearest_topic([0.1, 1.0, 0.0]) == a
+    assert len(strategy._topic_index) == 1
+
+    index = TopicCenterIndex(capacity=1)
+    for i in range(5):
+        index.set(i, [float(i), 1.0])
+    index.set("odd", [1.0, 2.0, 3.0])
+    assert sorted(index.shortlist([4.0, 1.0], 0.99, nearest=True), key=str) == [4, "odd"]
+    assert index.shortlist([1.0, 2.0, 3.0], 0.5) is None
+
+
+def _reference_novelty(history, event):
+    if not history or event.vector is None:
+        return 0.5
+    sims = [AttentionScorer._cosine_similarity(event.vector, h.vector) for h in history if h.vector is not None]
+    return 0.5 if not sims else 1.0 - float(np.mean(sims))
+
+
+def test_novelty_ring_matches_pairwise_loop():
+    scorer = AttentionScorer(history_size=50)
+    vectors = _vectors(200, seed=3)
+    for i, vector in enumerate(vectors):
+        event = _event(i, None if i % 13 == 0 else vector)
+        assert scorer._novelty_score(event) == pytest.approx(_reference_novelty(scorer.history, event), abs=1e-6)
+        scorer.score(event)
+    assert len(scorer.history) == len(scorer._history_vectors) == 50
+
+    scorer.history.clear()
+    assert scorer._novelty_score(_event(0, vectors[0])) == 0.5
+    scorer.score(_event(0, vectors[0]))
+    assert len(scorer._history_vectors) == 1
+
+
+def test_score_batch_matches_sequential_scores():
+    vectors = _vectors(120, seed=5)
+    warmup = [_event(i, v) for i, v in enumerate(vectors[:40])]
+    batch = [_event(100 + i, None if i % 17 == 0 else v, event_type="news" if i % 2 else "text")
+             for i, v in enumerate(vectors[40:])]
+
+    batched = AttentionScorer(history_size=60)
+    for event in warmup:
+        batched.score(event)
+    sequential = copy.deepcopy(batched)
+
+    expected = [sequential.score(event) for event in batch]
+    assert batched.score_batch(batch) == pytest.approx(expected, abs=1e-6)
+    assert [e.id for e in batched.history] == [e.id for e in sequential.history]
+
+    events = [_event(0, None), _event(1, [0.0, 0.0]), _event(2, [1.0, 0.0])]
+    fresh = AttentionScorer(history_size=2)
+    expected = [fresh.score(event) for event in events]
+    assert AttentionScorer(history_size=2).score_batch(events) == pytest.approx(expected, abs=1e-6)
@@ -0,0 +1,98 @@
+"""
+题材滞后相关引擎测试（与逐对 np.corrcoef 实现对照）
+"""
+
+import numpy as np
+import pytest
+
+from deva.naja.market_hotspot.intelligence.propagation import (
+    LaggedCorrelationEngine,
+    RelationMatrix,
+    lagged_cross_correlation,
+)
+
+
+@pytest.fixture
+def relation_matrix(monkeypatch):
+    rm = RelationMatrix()
+    monkeypatch.setattr(rm, "_get_noise_detector", lambda: None)
+    return rm
+
+
+def _feed(rm, n_blocks=16, seed=0):
+    rng = np.random.default_rng(seed)
+    driver = rng.standard_normal(80)
+    for b in range(n_blocks):
+        rm.register_block(f"b{b}")
+        length = int(rng.integers(8, 70))
+        for t in range(length):
+            value = 0.0 if b == 3 else driver[(t + b % 5) % 80] + 0.5 * rng.standard_normal()
+            rm.record_hotspot(f"b{b}", float(value), t)
+    return list(rm._block_history)
+
+
+def _assert_matches_pairwise(rm, blocks):
+    corr, delay = rm._lag_engine.best_lags(blocks)
+    for i, source in enumerate(blocks):
+        for j, target in enumerate(blocks):
+            if i == j:
+                continue
+            expected = rm._compute_lagged_correlation(source, target)
+            assert corr[i, j] == pytest.approx(expected, abs=1e-12)
+            if abs(expected) > 0.3:
+                assert delay[i, j] == rm._estimate_delay(source, target)
+
+
+def test_lagged_cross_correlation_matches_corrcoef():
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal((3, 30))
+    out = lagged_cross_correlation(x, x, max_delay=4)
+    for d in range(1, 5):
+        expected = np.corrcoef(x[0, :-d], x[2, d:])[0, 1]
+        assert out[d - 1, 0, 2] == pytest.approx(expected)
+
+
+def test_engine_matches_pairwise_with_mixed_lengths(relation_matrix):
+    blocks = _feed(relation_matrix)
+    _assert_matches_pairwise(relation_matrix, blocks)
+
+
+def test_incremental_update_recomputes_only_dirty_blocks(relation_matrix):
+    blocks = _feed(relation_matrix)
+    engine = relation_matrix._lag_engine
+    engine.update()
+
+    for b in ("b1", "b7"):
+        relation_matrix.record_hotspot(b, 3.0, 100)
+    assert engine.update() == 2
+    assert engine.update() == 0
+    _assert_matches_pairwise(relation_matrix, blocks)
+
+
+def test_learn_relations_sets_symmetric_relations(relation_matrix):
+    blocks = _feed(relation_matrix)
+    relation_matrix._auto_blacklist_enabled = False
+    relation_matrix.learn_relations(min_correlation=0.3)
+
+    corr, delay = relation_matrix._lag_engine.best_lags(blocks)
+    learned = relation_matrix.get_all_relations()
+    assert learned
+    for rel in learned:
+        i, j = sorted((blocks.index(rel.source_block), blocks.index(rel.target_block)))
+        assert rel.correlation == pytest.approx(abs(corr[i, j]))
+        assert rel.delay_ticks == delay[i, j]
+        assert relation_matrix.get_relation(rel.target_block, rel.source_block)[0] == rel.correlation
+
+
+def test_engine_grows_and_resets():
+    engine = LaggedCorrelationEngine(window=20, max_delay=3, capacity=2)
+    for b in range(5):
+        for t in range(20):
+            engine.record(f"b{b}", float(t * (b + 1) % 7))
+    assert engine.history("b4").shape == (20,)
+    corr, _ = engine.best_lags([f"b{b}" for b in range(5)] + ["missing"])
+    assert corr.shape == (6, 6)
+    assert not corr[5].any()
+
+    engine.reset()
+    assert engine.history("b0").size == 0
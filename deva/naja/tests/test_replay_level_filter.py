@@ -0,0 +1,88 @@
+"""
+ReplayScheduler 档位过滤测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from deva.naja.market_hotspot.scheduling.frequency_scheduler import FrequencyLevel, FrequencyScheduler
+from deva.naja.replay.replay_scheduler import ReplayConfig, ReplayScheduler, level_filter_mask
+
+
+@pytest.fixture
+def frequency_scheduler():
+    fs = FrequencyScheduler(max_symbols=100)
+    for i in range(60):
+        fs.register_symbol(f"s{i}")
+    fs._current_levels[:20] = FrequencyLevel.HIGH.value
+    fs._current_levels[20:40] = FrequencyLevel.MEDIUM.value
+    return fs
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch, frequency_scheduler):
+
+    def make(**kwargs):
+        ReplayScheduler._instance = None
+        kwargs.setdefault("enable_level_filter", True)
+        scheduler = ReplayScheduler(ReplayConfig(**kwargs))
+        monkeypatch.setattr(scheduler, "_get_frequency_scheduler", lambda: frequency_scheduler)
+        return scheduler
+
+    yield make
+    ReplayScheduler._instance = None
+
+
+def _snapshot():
+    codes = [f"s{i}" for i in range(60)] + ["unknown"]
+    return pd.DataFrame({"code": codes, "now": np.arange(len(codes), dtype=float)})
+
+
+def test_get_levels_matches_scalar_lookup(frequency_scheduler):
+    symbols = ["s0", "s25", "s59", "nope", "s0"]
+    levels = frequency_scheduler.get_levels(symbols)
+    assert levels.tolist() == [frequency_scheduler.get_symbol_level(s).value for s in symbols]
+
+    frequency_scheduler.register_symbol("new")
+    frequency_scheduler.register_protected_symbol("new")
+    assert frequency_scheduler.get_levels(["new"]).tolist() == [2]
+
+
+def test_level_filter_mask_rules():
+    levels = np.array([2, 1, 0, 2, 1, 0])
+    rng = np.random.default_rng(0)
+    assert level_filter_mask(levels, 1.0, True, rng).tolist() == [True, True, False, True, True, False]
+    assert level_filter_mask(levels, 0.0, False, rng).tolist() == [True, False, True, True, False, True]
+
+
+def test_filter_by_level_keeps_high_and_samples_medium(make_scheduler):
+    scheduler = make_scheduler(sample_seed=7, medium_sample_rate=0.5)
+    out = scheduler._filter_by_level(_snapshot())
+
+    kept = set(out["code"])
+    assert {f"s{i}" for i in range(20)} <= kept
+    medium = kept & {f"s{i}" for i in range(20, 40)}
+    assert 0 < len(medium) < 20
+    assert not kept & ({f"s{i}" for i in range(40, 60)} | {"unknown"})
+
+
+def test_filter_by_level_is_reproducible_with_seed(make_scheduler):
+    first = make_scheduler(sample_seed=42)._filter_by_level(_snapshot())
+    second = make_scheduler(sample_seed=42)._filter_by_level(_snapshot())
+    assert first.index.tolist() == second.index.tolist()
+
+    scheduler = make_scheduler(sample_seed=1)
+    a = scheduler._filter_by_level(_snapshot())
+    scheduler.set_sample_seed(1)
+    b = scheduler._filter_by_level(_snapshot())
+    assert a.index.tolist() == b.index.tolist()
+
+
+def test_filter_disabled_returns_input(make_scheduler):
+    data = _snapshot()
+    assert make_scheduler(enable_level_filter=False)._filter_by_level(data) is data
+
+
+def test_level_filter_is_off_by_default():
+    assert ReplayConfig().enable_level_filter is False
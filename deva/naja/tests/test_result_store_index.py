@@ -0,0 +1,86 @@
+"""
+StreamResultStore 写后缓冲与旁路索引测试
+"""
+
+import json
+import time
+
+import pytest
+
+from deva.naja.strategy.result_index import ResultLogIndex
+from deva.naja.strategy.result_store import StreamResultStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = StreamResultStore()
+    store.flush()
+    monkeypatch.setattr(store, "_log_dir", str(tmp_path))
+    monkeypatch.setattr(store, "_indexes", {})
+    monkeypatch.setattr(store, "_current_log_file", None)
+    monkeypatch.setattr(store, "flush_interval", 0)
+    monkeypatch.setattr(store, "flush_batch_size", 1000)
+    yield store
+    store.flush()
+
+
+def _scan(store, predicate):
+    records = []
+    for log_file in store._log_files_between():
+        with open(log_file, encoding="utf-8") as f:
+            records.extend(r for r in map(json.loads, filter(str.strip, f)) if predicate(r))
+    return records
+
+
+def test_write_behind_buffers_until_batch_or_flush(store, monkeypatch):
+    monkeypatch.setattr(store, "flush_interval", 60)
+    monkeypatch.setattr(store, "flush_batch_size", 5)
+    for i in range(7):
+        store.save("s1", "策略1", success=True, output_data={"i": i}, dispatch=False)
+    assert len(store._pending) == 2
+    # 读操作先刷出缓冲区
+    assert len(store.query(strategy_id="s1")) == 7
+    assert store._pending == []
+
+
+def test_indexed_queries_match_full_scan(store):
+    saved = []
+    for i in range(60):
+        saved.append(store.save(f"s{i % 3}", f"策略{i % 3}", success=i % 4 != 0,
+                                output_data={"i": i}, error="" if i % 4 else "boom", dispatch=False))
+    store.flush()
+
+    got = store.query(strategy_id="s1", limit=100)
+    expected = _scan(store, lambda r: r["strategy_id"] == "s1")
+    assert sorted(r.id for r in got) == sorted(r["id"] for r in expected)
+    assert [r.ts for r in got] == sorted((r.ts for r in got), reverse=True)
+
+    errors = store.query_errors(limit=100)
+    assert sorted(r.id for r in errors) == sorted(r["id"] for r in _scan(store, lambda r: not r["success"]))
+    assert len(store.query(success_only=True, limit=10)) == 10
+
+    middle = saved[30]
+    assert store.get_by_id(middle.id).output_preview == middle.output_preview
+    assert store.get_by_id("missing") is None
+
+
+def test_legacy_log_is_indexed_on_first_query(store):
+    log_file = store._get_log_filename()
+    now = time.time()
+    with open(log_file, "w", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(json.dumps({"id": f"old{i}", "strategy_id": "legacy", "ts": now, "success": True}) + "\n")
+        f.write("\n{not json}\n")
+        f.write(json.dumps({"id": "partial", "strategy_id": "legacy", "ts": now}))
+
+    assert {r.id for r in store.query(strategy_id="legacy")} == {f"old{i}" for i in range(5)}
+    index = ResultLogIndex(log_file)
+    assert len(index.select(strategy_id="legacy")) == 5
+
+    # 不完整的尾行之后继续追加，新记录仍可定位
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("\n")
+    result = store.save("legacy", "旧策略", success=True, dispatch=False)
+    store.flush()
+    assert store.get_by_id(result.id).strategy_id == "legacy"
+    assert store.get_by_id("partial").id == "partial"
@@ -0,0 +1,95 @@
+"""
+EventSelfAttention 向量化实现测试
+"""
+
+import numpy as np
+
+from deva.naja.attention.kernel.embedding import EventEmbedding
+from deva.naja.attention.kernel.self_attention import EventSelfAttention
+
+
+def _reference_attention(Q, K, V):
+    """逐元素循环的参考实现"""
+    batch_size, num_heads, seq_len, d_k = Q.shape
+    scores = np.zeros((batch_size, num_heads, seq_len, seq_len))
+    for b in range(batch_size):
+        for h in range(num_heads):
+            for i in range(seq_len):
+                for j in range(seq_len):
+                    scores[b, h, i, j] = np.dot(Q[b, h, i], K[b, h, j]) / np.sqrt(d_k)
+    exp_x = np.exp(scores - np.max(scores, axis=-1, keepdims=True))
+    weights = exp_x / np.sum(exp_x, axis=-1, keepdims=True)
+    output = np.zeros_like(Q)
+    for b in range(batch_size):
+        for h in range(num_heads):
+            for i in range(seq_len):
+                for j in range(seq_len):
+                    output[b, h, i] += weights[b, h, i, j] * V[b, h, j]
+    return output, weights
+
+
+def _random_qkv(rng, seq_len=12, heads=4, d_k=8):
+    shape = (2, heads, seq_len, d_k)
+    return rng.standard_normal(shape), rng.standard_normal(shape), rng.standard_normal(shape)
+
+
+def test_matches_reference_loop():
+    rng = np.random.default_rng(0)
+    Q, K, V = _random_qkv(rng)
+    attn = EventSelfAttention(d_model=32, num_heads=4)
+
+    out, weights = attn._scaled_dot_product_attention(Q, K, V)
+    ref_out, ref_weights = _reference_attention(Q, K, V)
+
+    np.testing.assert_allclose(weights, ref_weights, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(out, ref_out, rtol=1e-10, atol=1e-12)
+
+
+def test_float32_close_to_float64():
+    np.random.seed(1)
+    attn64 = EventSelfAttention(d_model=32, num_heads=4)
+    np.random.seed(1)
+    attn32 = EventSelfAttention(d_model=32, num_heads=4, dtype=np.float32)
+
+    rng = np.random.default_rng(1)
+    embeddings = [EventEmbedding(vector=v, features={}, timestamp=0.0)
+                  for v in rng.standard_normal((20, 32))]
+
+    out64, w64 = attn64.forward(embeddings)
+    out32, w32 = attn32.forward(embeddings)
+
+    assert w32.dtype == np.float32
+    np.testing.assert_allclose(w32, w64, rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(
+        np.array([e.vector for e in out32]), np.array([e.vector for e in out64]), rtol=1e-3, atol=1e-6
+    )
+
+
+def test_mask_excludes_positions():
+    rng = np.random.default_rng(2)
+    Q, K, V = _random_qkv(rng, seq_len=6)
+    mask = np.tril(np.ones((6, 6), dtype=bool))
+    attn = EventSelfAttention(d_model=32, num_heads=4)
+
+    _, weights = attn._scaled_dot_product_attention(Q, K, V, mask=mask)
+
+    assert np.all(weights[..., ~mask] == 0)
+    np.testing.assert_allclose(weights.sum(axis=-1), 1.0)
+
+
+def test_top_k_keeps_k_weights_per_row():
+    rng = np.random.default_rng(3)
+    Q, K, V = _random_qkv(rng, seq_len=10)
+    attn = EventSelfAttention(d_model=32, num_heads=4, top_k=3)
+
+    _, weights = attn._scaled_dot_product_attention(Q, K, V)
+
+    assert np.all((weights > 0).sum(axis=-1) == 3)
+    np.testing.assert_allclose(weights.sum(axis=-1), 1.0)
+
+
+def test_forward_empty_sequence():
+    attn = EventSelfAttention(d_model=32, num_heads=4)
+    embeddings, weights = attn.forward([])
+    assert embeddings == []
+    assert weights.size == 0
@@ -0,0 +1,131 @@
+"""
+SinaFetcher 并发分批获取测试（本地 HTTP 替身服务器，离线运行）
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+from deva.naja.market_hotspot.data.sina_parser import SinaFetcher
+
+
+def _quote_line(code: str) -> str:
+    fields = ["名称", "10.0", "9.8", "10.2", "10.5", "9.7", "10.1", "10.2", "123400", "1234567.0"]
+    fields += ["0"] * (33 - len(fields))
+    return f'var hq_str_{code}="{",".join(fields)}";'
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    slow_codes = set()
+    requests = []
+
+    def do_GET(self):
+        codes = unquote(self.path.split("list=", 1)[-1]).split(",")
+        type(self).requests.append((time.perf_counter(), len(codes)))
+        time.sleep(self.delay)
+        if self.slow_codes.intersection(codes):
+            time.sleep(1.0)
+        body = "\n".join(_quote_line(c) for c in codes).encode("gbk")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=gbk")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sina_server():
+    handler = type("Handler", (_StandInHandler,), {"delay": 0.0, "slow_codes": set(), "requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_address[1]}/list="
+    server.shutdown()
+    server.server_close()
+
+
+def _codes(n):
+    return [f"sh{600000 + i}" for i in range(n)]
+
+
+def test_fetch_batches_concurrently(sina_server):
+    handler, url = sina_server
+    handler.delay = 0.2
+    fetcher = SinaFetcher(base_url=url, batch_size=100, max_concurrency=8)
+    try:
+        start = time.perf_counter()
+        data = fetcher.fetch(_codes(700))
+        elapsed = time.perf_counter() - start
+    finally:
+        fetcher.close()
+
+    assert len(data) == 700
+    assert data["sh600042"]["now"] == 10.2
+    assert fetcher.last_stats == {"batches": 7, "failed": 0, "codes": 700, "received": 700}
+    # 7 批并发：约一个 RTT，而不是 7 个
+    assert elapsed < 0.2 * 4
+
+
+def test_concurrency_is_bounded(sina_server):
+    handler, url = sina_server
+    handler.delay = 0.1
+    fetcher = SinaFetcher(base_url=url, batch_size=10, max_concurrency=2)
+    try:
+        start = time.perf_counter()
+        fetcher.fetch(_codes(60))
+        elapsed = time.perf_counter() - start
+    finally:
+        fetcher.close()
+
+    assert len(handler.requests) == 6
+    assert elapsed >= 0.1 * 3
+
+
+def test_batch_timeout_returns_partial_result(sina_server):
+    handler, url = sina_server
+    handler.slow_codes = {"sh600150"}
+    fetcher = SinaFetcher(base_url=url, batch_size=100, batch_timeout=0.3)
+    try:
+        data = fetcher.fetch(_codes(300))
+    finally:
+        fetcher.close()
+
+    assert len(data) == 200
+    assert "sh600150" not in data
+    assert fetcher.last_stats["failed"] == 1
+
+
+def test_loop_and_session_are_reused(sina_server):
+    _, url = sina_server
+    fetcher = SinaFetcher(base_url=url, batch_size=50)
+    try:
+        fetcher.fetch(_codes(10))
+        loop, session = fetcher._loop, fetcher._session
+        fetcher.fetch(_codes(10))
+        assert fetcher._loop is loop
+        assert fetcher._session is session
+    finally:
+        fetcher.close()
+    assert fetcher._loop is None
+
+
+def test_fetch_frame_is_typed(sina_server):
+    _, url = sina_server
+    fetcher = SinaFetcher(base_url=url, batch_size=100)
+    try:
+        df = fetcher.fetch_frame(_codes(250))
+    finally:
+        fetcher.close()
+
+    assert len(df) == 250
+    assert df.loc["sh600042", "now"] == 10.2
+    assert df["volume"].dtype == "int64"
+    assert df["amount"].dtype == "float64"
+    assert fetcher.last_stats["received"] == 250
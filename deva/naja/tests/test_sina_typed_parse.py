@@ -0,0 +1,61 @@
+"""
+新浪行情类型化列解析测试
+"""
+
+import numpy as np
+import pandas as pd
+
+from deva.naja.market_hotspot.data.sina_parser import (
+    _parse_sina_response,
+    _parse_sina_response_columns,
+    _sina_columns_to_frame,
+)
+
+
+def _line(code, name="平安银行", now="10.2", volume="123400", amount="1234567.0"):
+    fields = [name, "10.0", "9.8", now, "10.5", "9.7", "10.1", "10.2", volume, amount]
+    fields += ["0"] * (33 - len(fields))
+    return f'var hq_str_{code}="{",".join(fields)}";'
+
+
+def _text(*lines):
+    return "\n".join(lines)
+
+
+def test_columns_match_dict_parser():
+    text = _text(
+        _line("sz000001"),
+        _line("sh600000", name="浦发银行", now="8.5", volume="99", amount=""),
+        'var hq_str_sh600001="";',
+        'var hq_str_sh600002="短,1,2";',
+        _line("sh600003", now="bad"),
+    )
+    cols = _parse_sina_response_columns(text)
+    ref = _parse_sina_response(text)
+
+    assert list(cols["code"]) == list(ref) == ["sz000001", "sh600000"]
+    assert cols["now"].dtype == np.float64
+    assert cols["volume"].dtype == np.int64
+    for i, code in enumerate(cols["code"]):
+        for key, value in ref[code].items():
+            assert cols[key][i] == value
+
+
+def test_frame_is_typed_and_merges_batches():
+    parts = [
+        _parse_sina_response_columns(_text(_line("sz000001"), _line("sh600000", name="浦发银行"))),
+        _parse_sina_response_columns(""),
+        _parse_sina_response_columns(_text(_line("sz000001", now="11.0"), _line("sh600036", name="招商银行"))),
+    ]
+    df = _sina_columns_to_frame(parts)
+
+    assert list(df.index) == ["sh600000", "sz000001", "sh600036"]
+    assert df.loc["sz000001", "now"] == 11.0
+    assert isinstance(df["name"].dtype, pd.CategoricalDtype)
+    assert df["volume"].dtype == np.int64
+    assert all(df[c].dtype == np.float64 for c in ("open", "close", "now", "high", "low", "amount"))
+    assert df["name"].astype(str).str.contains("银行").all()
+
+
+def test_frame_empty():
+    assert _sina_columns_to_frame([_parse_sina_response_columns("")]) is None
@@ -0,0 +1,175 @@
+"""
+列式快照存储测试
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from deva.core.store import DBStream
+from deva.naja.market_hotspot.data.snapshot_store import ColumnarSnapshotStore, SnapshotRange
+
+T0 = 1776130200.0  # 交易日 09:30 附近
+
+
+def _frame(codes, now, name_prefix="股"):
+    return pd.DataFrame(
+        {
+            "name": [f"{name_prefix}{c}" for c in codes],
+            "open": 10.0,
+            "close": 10.0,
+            "now": now,
+            "high": 11.0,
+            "low": 9.0,
+            "volume": np.arange(len(codes), dtype=np.int64) * 100,
+            "amount": 1e6,
+        },
+        index=codes,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ColumnarSnapshotStore("snap", root=str(tmp_path))
+
+
+@pytest.fixture
+def nb(tmp_path):
+    return DBStream("snap", str(tmp_path / "nb"), key_mode="time")
+
+
+def test_append_and_read_roundtrip(store):
+    assert store.append(_frame(["sh600000", "sz000001"], [10.5, 9.5]), T0) == 2
+    assert store.append(_frame(["sz000001", "sh600036"], [9.8, 20.0]), T0 + 300) == 2
+
+    assert store.timestamps().tolist() == [T0, T0 + 300]
+    df = store.get(T0 + 300)
+    assert list(df["code"]) == ["sz000001", "sh600036"]
+    assert list(df["name"]) == ["股sz000001", "股sh600036"]
+    assert df["volume"].dtype == np.int64
+    assert df["p_change"].tolist() == pytest.approx([-0.02, 1.0])
+    assert (df["timestamp"] == T0 + 300).all()
+
+    records = store.read_records(T0)
+    assert records[0]["code"] == "sh600000"
+    assert records[0]["now"] == 10.5
+
+
+def test_read_columns_is_zero_copy(store):
+    store.append(_frame(["a", "b", "c"], [1.0, 2.0, 3.0]), T0)
+    cols = store.read_columns(T0, ["now"])
+    assert set(cols) == {"code", "now"}
+    assert isinstance(cols["now"].base, np.memmap) or isinstance(cols["now"], np.memmap)
+    assert cols["now"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_time_range_and_duplicates(store):
+    for i in range(5):
+        store.append(_frame(["a"], [float(i + 1)]), T0 + i * 60)
+    assert store.append(_frame(["a"], [99.0]), T0) == 0
+
+    assert store.timestamps(T0 + 60, T0 + 180).tolist() == [T0 + 60, T0 + 120, T0 + 180]
+    assert len(store) == 5
+    assert T0 + 120 in store
+    assert store.get(T0 + 1) is None
+    assert store.latest_timestamp() == T0 + 240
+
+
+def test_records_input_and_new_reader_sees_appends(store, tmp_path):
+    store.append_records(
+        [{"timestamp": T0, "code": "x", "name": "X", "now": 2.0, "close": 1.0, "volume": 5}],
+        T0,
+    )
+    reader = ColumnarSnapshotStore("snap", root=str(tmp_path))
+    assert reader.get(T0)["p_change"].tolist() == [1.0]
+
+    store.append(_frame(["x", "y"], [3.0, 4.0]), T0 + 60)
+    assert reader.get(T0 + 60)["now"].tolist() == [3.0, 4.0]
+
+
+def test_torn_write_is_truncated(store):
+    store.append(_frame(["a", "b"], [1.0, 2.0]), T0)
+    day_path = os.path.join(store.path, store.days()[0])
+    with open(os.path.join(day_path, "now.bin"), "ab") as f:
+        f.write(b"\x00" * 24)
+
+    fresh = ColumnarSnapshotStore("snap", root=os.path.dirname(store.path))
+    fresh.append(_frame(["c"], [5.0]), T0 + 60)
+    assert fresh.get(T0 + 60)["now"].tolist() == [5.0]
+    assert fresh.get(T0)["now"].tolist() == [1.0, 2.0]
+
+
+def test_get_returns_writable_copy_by_default(store):
+    store.append(_frame(["a", "b"], [1.0, 2.0]), T0)
+    df = store.get(T0)
+    df.loc[0, "now"] = 7.0
+    df["now"] *= 2
+    assert store.get(T0)["now"].tolist() == [1.0, 2.0]
+
+    view = store.get(T0, copy=False)
+    with pytest.raises(ValueError):
+        view["now"].to_numpy()[0] = 5.0
+
+
+def test_replay_reads_legacy_records_unless_columns_requested(store, nb):
+    from deva.naja.replay.replay_scheduler import ReplayConfig, ReplayScheduler
+
+    store.append(_frame(["a", "b"], [1.0, 2.0]), T0)
+    ReplayScheduler._instance = None
+    try:
+        scheduler = ReplayScheduler(ReplayConfig(db_table="snap_table_without_columnar_data"))
+        scheduler._db = SnapshotRange("snap", nb=nb, store=store)
+        records = scheduler._read(T0)
+        assert isinstance(records, list) and records == store.read_records(T0)
+        assert records[1]["code"] == "b" and records[1]["now"] == 2.0
+        assert scheduler._read(T0 + 1) is None
+
+        scheduler.config.columns = ["code", "now"]
+        frame = scheduler._read(T0)
+        assert list(frame.columns) == ["timestamp", "code", "now"]
+        frame["now"] += 1
+    finally:
+        ReplayScheduler._instance = None
+
+
+def test_range_before_first_columnar_day_reads_nb(store, nb, monkeypatch):
+    import deva.naja.replay.replay_scheduler as rs
+
+    day = 86400
+    for i in range(3):
+        nb.upsert(T0 - day + i * 60, [{"code": "a", "now": float(i)}])
+    # 部署后 NB 表与列式存储同时写入
+    nb.upsert(T0, [{"code": "a", "now": 10.0}])
+    store.append(_frame(["a"], [10.0]), T0)
+    store.append(_frame(["a"], [11.0]), T0 + 60)
+
+    older = SnapshotRange("snap", T0 - day, T0 - day + 120, nb=nb, store=store)
+    assert older.total == 3 and older.split is None
+    assert [older.read(k)[0]["now"] for k in older] == [0.0, 1.0, 2.0]
+
+    spanning = SnapshotRange("snap", T0 - day + 60, T0 + 60, nb=nb, store=store)
+    assert (spanning.total, spanning.first_ts, spanning.last_ts) == (4, T0 - day + 60, T0 + 60)
+    assert [spanning.read(k)[0]["now"] for k in spanning] == [1.0, 2.0, 10.0, 11.0]
+
+    monkeypatch.setattr(rs, "NB", lambda *args, **kwargs: nb)
+    rs.ReplayScheduler._instance = None
+    try:
+        scheduler = rs.ReplayScheduler(rs.ReplayConfig(
+            db_table="snap",
+            start_time=datetime.fromtimestamp(T0 - day).isoformat(),
+            end_time=datetime.fromtimestamp(T0 - day + 120).isoformat(),
+        ))
+        monkeypatch.setattr(
+            "deva.naja.market_hotspot.data.snapshot_store.get_snapshot_store", lambda name: store)
+        received = []
+        scheduler.set_downstream_callback(received.append)
+        scheduler._init_db()
+        assert scheduler._data_total == 3
+        while scheduler._has_more_data:
+            scheduler._fetch_and_send()
+        assert [r[0]["now"] for r in received] == [0.0, 1.0, 2.0]
+    finally:
+        rs.ReplayScheduler._instance = None
@@ -0,0 +1,44 @@
+"""
+SqliteMultithread 批量 executemany 与分块 select 测试
+"""
+
+import os
+
+import pytest
+
+from deva.utils.sqlitedict import SqliteDict
+
+
+@pytest.fixture
+def sdict(tmp_path):
+    d = SqliteDict(os.path.join(str(tmp_path), "t.sqlite"), tablename="t")
+    yield d
+    d.close()
+
+
+def test_update_and_scan_across_chunks(sdict):
+    sdict.conn.fetch_size = 7
+    sdict.update({f"k{i:03d}": i for i in range(50)})
+    sdict.commit()
+
+    assert len(sdict) == 50
+    assert list(sdict.keys()) == [f"k{i:03d}" for i in range(50)]
+    assert dict(sdict.items())["k042"] == 42
+
+
+def test_executemany_error_is_reraised(sdict):
+    sdict.conn.executemany('INSERT INTO "t" (key, value) VALUES (?, ?)', [("a", b"1"), ("a", b"2")])
+    with pytest.raises(Exception):
+        sdict.commit()
+
+
+def test_delete_many_and_existing_keys(sdict):
+    sdict.update({"a": 1, "b": 2, 3.5: 3})
+    sdict.commit()
+
+    assert sorted(map(str, sdict.existing_keys(["a", "zz", 3.5]))) == ["3.5", "a"]
+
+    sdict.delete_many(["a", "missing"])
+    sdict.commit()
+    assert "a" not in sdict
+    assert len(sdict) == 2
@@ -0,0 +1,177 @@
+"""
+数据源级分发测试：一个数据源只订阅一次、一个 tick 一个批处理任务，结果去重用结构哈希
+"""
+
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from deva.naja.strategy import dispatch
+from deva.naja.strategy.dispatch import DatasourceDispatcher, get_datasource_dispatcher, result_fingerprint
+
+
+class _Stream:
+    def __init__(self):
+        self.callbacks = []
+
+    def sink(self, fn):
+        self.callbacks.append(fn)
+
+    def emit(self, data):
+        for fn in self.callbacks:
+            fn(data)
+
+
+class _Datasource:
+    def __init__(self, ds_id="ds1", name="行情"):
+        self.id = ds_id
+        self.name = name
+        self.stream = _Stream()
+
+    def get_stream(self):
+        return self.stream
+
+
+class _Entry:
+    def __init__(self, entry_id, running=True):
+        self.id = entry_id
+        self.running = running
+        self._processing_lock = threading.Lock()
+        self.received = []
+
+    def _accepts_data(self):
+        return self.running
+
+    def _process_data_async(self, data):
+        with self._processing_lock:
+            self.received.append(data)
+
+
+class _InlinePool:
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        fn(*args)
+
+
+def test_one_subscription_and_one_task_per_tick(monkeypatch):
+    pool = _InlinePool()
+    monkeypatch.setattr(dispatch, "get_thread_pool", lambda: pool)
+    monkeypatch.setattr(dispatch, "_dispatchers", {})
+
+    ds = _Datasource()
+    entries = [_Entry(f"s{i}") for i in range(5)] + [_Entry("stopped", running=False)]
+    for entry in entries + entries[:2]:  # 重复绑定不重复订阅 / 不重复处理
+        dispatcher = get_datasource_dispatcher(ds)
+        dispatcher.subscribe()
+        dispatcher.attach(entry)
+
+    assert len(ds.stream.callbacks) == 1
+    ds.stream.emit({"price": 1})
+    ds.stream.emit({"price": 2})
+
+    assert pool.submitted == 2
+    for entry in entries[:5]:
+        assert [d["data"]["price"] for d in entry.received] == [1, 2]
+        assert entry.received[0]["_datasource_id"] == "ds1"
+        assert entry.received[0]["_datasource_name"] == "行情"
+    assert entries[5].received == []
+    # 每个策略拿到独立的包装 dict（补齐时会改写 data 字段）
+    assert entries[0].received[0] is not entries[1].received[0]
+
+
+def test_busy_strategies_run_last():
+    order = []
+
+    class Entry(_Entry):
+        def _process_data_async(self, data):
+            order.append(self.id)
+
+    slow, fast = Entry("slow"), Entry("fast")
+    dispatcher = DatasourceDispatcher("ds", "ds", _Stream())
+    slow._processing_lock.acquire()
+    dispatcher._dispatch({"data": 1}, [slow, fast])
+    assert order == ["fast", "slow"]
+
+
+def _json_equal(a, b):
+    exclude = dispatch.VOLATILE_KEYS
+
+    def f(r):
+        return {k: v for k, v in r.items() if k not in exclude} if isinstance(r, dict) else r
+    return json.dumps(f(a), sort_keys=True, default=str) == json.dumps(f(b), sort_keys=True, default=str)
+
+
+def test_fingerprint_matches_json_comparison():
+    base = {"signal": "buy", "score": 0.5, "codes": ["600000", "600001"], "meta": {"n": 2, "ok": True}}
+    variants = [
+        dict(base, timestamp=123.0),
+        dict(base, codes=("600000", "600001")),
+        dict(base, score=0.50000001),
+        dict(base, meta={"n": 2.0, "ok": True}),
+        dict(base, meta={"n": True, "ok": True}),
+        dict(base, meta={"ok": True, "n": 2}),
+        dict(base, extra=None),
+        dict(base, score=float("nan")),
+        {1: "a"},
+        {"1": "a"},
+        "buy",
+        [1, 2],
+    ]
+    candidates = [base] + variants
+    for a in candidates:
+        for b in candidates:
+            assert (result_fingerprint(a) == result_fingerprint(b)) == _json_equal(a, b), (a, b)
+
+
+def test_fingerprint_hashes_frame_content():
+    df = pd.DataFrame({"code": [str(i) for i in range(200)], "w": np.arange(200.0)})
+    changed = df.copy()
+    changed.loc[100, "w"] = -1.0  # 在 str(df) 截断的中间部分
+    assert str(df) == str(changed)
+    assert result_fingerprint({"picks": df}) == result_fingerprint({"picks": df.copy()})
+    assert result_fingerprint({"picks": df}) != result_fingerprint({"picks": changed})
+    assert result_fingerprint(np.arange(5)) != result_fingerprint(np.arange(5.0))
+
+
+def test_stop_detaches_strategy_from_dispatcher(monkeypatch):
+    from deva.naja.strategy.entry import StrategyEntry
+
+    monkeypatch.setattr(dispatch, "_dispatchers", {})
+    ds = _Datasource()
+    dispatcher = get_datasource_dispatcher(ds)
+    entry = _Entry("s1")
+    dispatcher.attach(entry)
+
+    entry._get_runtime = lambda: None
+    assert StrategyEntry._do_stop(entry)["success"]
+    assert dispatcher.entries() == []
+
+
+def test_duplicate_is_checked_against_result_store(monkeypatch):
+    from types import SimpleNamespace
+    from deva.naja.strategy import result_store
+    from deva.naja.strategy.entry import StrategyEntry
+
+    recent = []
+    fake_store = SimpleNamespace(get_recent=lambda strategy_id, limit=1: recent[:limit])
+    monkeypatch.setattr(result_store, "get_result_store", lambda: fake_store)
+    entry = SimpleNamespace(id="s1", _last_result_fp=None, _candidate_fp=None)
+
+    def is_dup(result):
+        return StrategyEntry._is_duplicate_result(entry, result)
+
+    assert not is_dup({"signal": "buy"})  # 没有上次结果
+
+    recent[:] = [SimpleNamespace(id="r1", output_full={"signal": "buy", "timestamp": 1})]
+    assert is_dup({"signal": "buy", "timestamp": 2})
+    assert not is_dup({"signal": "sell"})
+
+    # 上次结果为 None 时，再次得到 None 仍视为重复（与原实现一致）
+    recent[:] = [SimpleNamespace(id="r2", output_full=None)]
+    assert is_dup(None)
+    assert not is_dup({"signal": "buy"})
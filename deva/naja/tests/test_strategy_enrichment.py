@@ -0,0 +1,92 @@
+"""
+字典补齐缓存测试：索引 join 与原 merge 实现结果一致，维表按版本缓存
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from deva.naja.strategy.enrichment import DictionaryEnrichmentCache, infer_join_key, merge_enrich
+
+
+class _Entry:
+    def __init__(self, payload):
+        self.payload = payload
+        self.version = 1
+        self.reads = 0
+
+    @property
+    def payload_version(self):
+        return ("k", 0, self.version)
+
+    def get_payload(self):
+        self.reads += 1
+        return self.payload
+
+
+def _cache(entries):
+    cache = DictionaryEnrichmentCache()
+    cache._entry = entries.get
+    return cache
+
+
+def _market(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "code": np.arange(600000, 600000 + n),
+        "now": rng.uniform(5, 50, n),
+        "industry": [None if i % 3 else "左表行业" for i in range(n)],
+    }, index=np.arange(n) * 7)
+
+
+@pytest.mark.parametrize("dim", [
+    # code 类型不同（int vs str），部分未命中，与左表有同名列
+    pd.DataFrame({"code": [str(600000 + i) for i in range(0, 60, 2)],
+                  "industry": [f"行业{i}" for i in range(30)],
+                  "float_shares": np.arange(30, dtype=np.int64),
+                  "is_st": [i % 5 == 0 for i in range(30)]}),
+    # 全部命中，整数列保持整数
+    pd.DataFrame({"code": [str(600000 + i) for i in range(50)], "lot": np.arange(50)}),
+    # join 键重复：回退 merge（行数扩张）
+    pd.DataFrame({"code": ["600001", "600001", "600002"], "tag": ["a", "b", "c"]}),
+])
+def test_indexed_join_matches_merge(dim):
+    df = _market()
+    got = _cache({"p": _Entry(dim)}).enrich(df, "p")
+    expected = merge_enrich(df, dim, infer_join_key(df, dim))
+    pd.testing.assert_frame_equal(got, expected)
+    assert df["code"].dtype == np.int64
+
+
+def test_non_code_key_and_dtype_mismatch_fall_back():
+    df = pd.DataFrame({"symbol": ["a", "b", "z"], "x": [1, 2, 3]})
+    dim = pd.DataFrame({"symbol": ["b", "a"], "name_cn": ["乙", "甲"]})
+    cache = _cache({"p": _Entry(dim)})
+    pd.testing.assert_frame_equal(cache.enrich(df, "p"), merge_enrich(df, dim, "symbol"))
+
+    numeric = pd.DataFrame({"symbol": [1, 2], "name_cn": ["甲", "乙"]})
+    cache = _cache({"q": _Entry(numeric)})
+    with pytest.raises(Exception):
+        merge_enrich(df, numeric, "symbol")
+    with pytest.raises(Exception):
+        cache.enrich(df, "q")
+
+
+def test_dimension_cached_by_version_and_result_shared():
+    entry = _Entry([{"code": "600001", "industry": "银行"}])
+    cache = _cache({"p": entry, "missing": None})
+    df = _market(5)
+
+    first = cache.enrich_many(df, ["p", "missing"])
+    second = cache.enrich_many(df, ["p", "missing"])
+    assert entry.reads == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert first is not second
+    assert first.loc[1, "industry"] == "银行"
+
+    entry.payload = [{"code": "600001", "industry": "证券"}]
+    entry.version += 1
+    assert cache.enrich_many(df, ["p"]).loc[1, "industry"] == "证券"
+    assert entry.reads == 2
+
+    assert cache.enrich_many(df, ["missing"]) is df
@@ -0,0 +1,157 @@
+"""
+TradingEventBus 测试：O(1) 去重窗口、锁外分发、有界异步订阅队列
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from deva.naja.events.trading_bus import TradingEventBus
+
+
+@dataclass
+class Tick:
+    symbol: str
+    importance: float = 0.5
+    market: str = "CN"
+
+
+@dataclass
+class Fill:
+    symbol: str
+
+
+def _bus(**kwargs):
+    return TradingEventBus(use_stream=False, **kwargs)
+
+
+def test_dedup_window_and_capacity():
+    bus = _bus(dedup_window=0.05)
+    seen = []
+    bus.subscribe("Tick", seen.append)
+    first, second = Tick("600000"), Tick("600000")
+
+    assert bus.publish(first) == 1
+    assert bus.publish(first) == 0
+    assert bus.publish(second) == 1
+    assert bus.get_stats().total_dropped == 1
+
+    time.sleep(0.06)
+    assert bus.publish(first) == 1
+    assert len(seen) == 3
+    # 过期记录随发布清理
+    assert len(bus._recent_events) == len(bus._recent_fingerprints) == 1
+
+    bus = _bus(dedup_window=60)
+    bus._max_recent = 3
+    events = [Tick(s) for s in "abcd"]
+    for event in events:
+        bus.publish(event)
+    assert len(bus._recent_events) == len(bus._recent_fingerprints) == 3
+    # 超出容量被淘汰的最早指纹不再判重
+    bus.publish(events[0])
+    assert bus.get_stats().total_dropped == 0
+    bus.publish(events[3])
+    assert bus.get_stats().total_dropped == 1
+
+
+def test_filters_priority_and_unsubscribe():
+    bus = _bus()
+    order = []
+    bus.subscribe("Tick", lambda e: order.append("low"), subscription_id="low_1", priority=0)
+    bus.subscribe("Tick", lambda e: order.append("high"), subscription_id="high_1", priority=5)
+    bus.subscribe("Tick", lambda e: order.append("us"), subscription_id="us_1", markets={"US"})
+    bus.subscribe("Tick", lambda e: order.append("vip"), subscription_id="vip_1", min_importance=0.9)
+    bus.subscribe("Tick", lambda e: 1 / 0, subscription_id="bad_1")
+
+    assert bus.publish(Tick("600000")) == 2
+    assert order == ["high", "low"]
+    stats = bus.get_stats()
+    assert stats.total_delivered == 2
+    assert stats.by_module == {"high": 1, "low": 1}
+    assert bus.get_subscriber_stats()["bad_1"]["errors"] == 1
+
+    assert bus.unsubscribe("high_1")
+    assert bus.publish(Tick("600001", importance=0.95)) == 2
+    assert order[2:] == ["low", "vip"]
+
+
+def test_slow_subscriber_does_not_block_other_publishers():
+    bus = _bus()
+    entered, release = threading.Event(), threading.Event()
+
+    def slow(event):
+        entered.set()
+        release.wait(5)
+
+    bus.subscribe("Tick", slow)
+    fills = []
+    bus.subscribe("Fill", fills.append)
+
+    worker = threading.Thread(target=bus.publish, args=(Tick("600000"),))
+    worker.start()
+    assert entered.wait(5)
+
+    start = time.time()
+    assert bus.publish(Fill("600000")) == 1
+    # 回调执行期间可以继续订阅
+    bus.subscribe("Fill", fills.append)
+    assert time.time() - start < 1.0
+    release.set()
+    worker.join(5)
+    assert len(fills) == 1
+
+
+def test_async_subscriber_queue_bounds_and_metrics():
+    bus = _bus()
+    entered, release = threading.Event(), threading.Event()
+    handled = []
+
+    def slow(event):
+        entered.set()
+        release.wait(5)
+        handled.append(event.symbol)
+
+    bus.subscribe("Tick", slow, subscription_id="slow_1", queue_size=2)
+    sync_seen = []
+    bus.subscribe("Tick", sync_seen.append, subscription_id="fast_1")
+
+    assert bus.publish(Tick("s0")) == 2
+    assert entered.wait(5)  # s0 已被工作线程取出，阻塞在回调里
+    for i in range(1, 5):
+        bus.publish(Tick(f"s{i}"))
+
+    stats = bus.get_subscriber_stats()["slow_1"]
+    assert stats["async"] and stats["queue_size"] == 2
+    assert stats["queue_depth"] == 2 and stats["max_depth"] == 2
+    assert stats["dropped"] == 2
+    assert len(sync_seen) == 5
+
+    release.set()
+    assert bus.drain(timeout=5)
+    assert handled == ["s0", "s1", "s2"]
+    assert bus.get_subscriber_stats()["slow_1"]["delivered"] == 3
+
+
+def test_async_drop_oldest_keeps_latest():
+    bus = _bus()
+    entered, release = threading.Event(), threading.Event()
+    handled = []
+
+    def slow(event):
+        entered.set()
+        release.wait(5)
+        handled.append(event.symbol)
+
+    bus.subscribe("Tick", slow, subscription_id="slow_1", queue_size=2, overflow="drop_oldest")
+    # 保持事件存活：通用指纹含 id(event)，被丢弃的事件回收后 id 可能被后续事件复用而判重
+    ticks = [Tick(f"s{i}") for i in range(5)]
+    bus.publish(ticks[0])
+    assert entered.wait(5)
+    for tick in ticks[1:]:
+        bus.publish(tick)
+    release.set()
+    assert bus.drain(timeout=5)
+    assert handled == ["s0", "s3", "s4"]
+    assert bus.get_subscriber_stats()["slow_1"]["dropped"] == 2
+    assert bus.unsubscribe("slow_1")
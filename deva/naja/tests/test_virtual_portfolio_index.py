@@ -0,0 +1,94 @@
+"""
+VirtualPortfolio 测试：按股票索引的持仓、批量价格更新、逐行脏持仓持久化
+"""
+
+import numpy as np
+import pytest
+
+from deva.core.store import DBStream
+from deva.naja.bandit import virtual_portfolio as vp
+
+
+class _MarketTime:
+    now = 1_700_000_000.0
+
+    def get_market_time(self):
+        return self.now
+
+
+@pytest.fixture
+def make_portfolio(tmp_path, monkeypatch):
+    monkeypatch.setattr(vp, "SR", lambda name: _MarketTime())
+    monkeypatch.setattr(vp, "NB", lambda name, **kwargs: DBStream(name, str(tmp_path / "vp"), **kwargs))
+
+    def make(**kwargs):
+        portfolio = vp.VirtualPortfolio(account_name="test", **kwargs)
+        portfolio.set_capital(1e9)
+        return portfolio
+
+    return make
+
+
+def _open(portfolio, code, price=10.0):
+    return portfolio.open_position("s1", "Momentum", code, code, price, amount=1000.0)
+
+
+def test_update_prices_touches_only_held_symbols(make_portfolio):
+    portfolio = make_portfolio(persist_interval=0)
+    a, b = _open(portfolio, "000001"), _open(portfolio, "000002")
+    seen = []
+    portfolio.register_position_callback(lambda pos_id, pos: seen.append(pos_id))
+
+    quotes = {f"{i:06d}": 10.5 for i in range(3, 500)}
+    quotes["000001"] = 10.2
+    assert portfolio.update_prices(quotes) == []
+    assert seen == [a.position_id]
+    assert a.current_price == 10.2 and b.current_price == 10.0
+
+    codes = np.array(["000002", "600000", "000001"])
+    closed = portfolio.update_prices((codes, np.array([11.5, 9.0, 0.0])))
+    assert [p.position_id for p in closed] == [b.position_id]
+    assert b.status == "CLOSED" and b.close_reason == "TAKE_PROFIT"
+    assert a.current_price == 10.2  # 非正价格被跳过
+    assert portfolio.get_positions_by_stock("000002") == []
+
+    closed = portfolio.update_price("000001", 9.0)
+    assert [p.close_reason for p in closed] == ["STOP_LOSS"]
+    assert portfolio.get_positions_by_stock("000001") == []
+
+
+def test_price_updates_persist_dirty_rows_on_flush(make_portfolio, tmp_path):
+    portfolio = make_portfolio(persist_interval=60)
+    pos = _open(portfolio, "000001")
+    portfolio.update_price("000001", 10.4)
+
+    reader = DBStream(vp.VIRTUAL_POSITIONS_TABLE, str(tmp_path / "vp"))
+    key = f"test/{pos.position_id}"
+    assert reader[key]["current_price"] == 10.0  # 价格更新仍在写后缓冲中
+    assert portfolio.flush() == 1
+    assert reader[key]["current_price"] == 10.4
+
+    accounts = DBStream(vp.UNIFIED_POSITIONS_TABLE, str(tmp_path / "vp"))["accounts"]
+    assert "positions" not in accounts["test"]
+
+    reloaded = make_portfolio()
+    assert reloaded.get_positions_by_stock("000001")[0].current_price == 10.4
+
+
+def test_legacy_account_blob_is_migrated(make_portfolio, tmp_path):
+    legacy = vp.VirtualPosition(
+        position_id="VP_000009_1", strategy_id="s1", strategy_name="Momentum",
+        stock_code="000009", stock_name="000009", entry_price=5.0, current_price=5.0,
+        quantity=100.0, entry_time=1.0, last_update_time=1.0,
+    )
+    DBStream(vp.UNIFIED_POSITIONS_TABLE, str(tmp_path / "vp"))["accounts"] = {
+        "test": {"account_type": "virtual", "total_capital": 1e6, "positions": {legacy.position_id: vars(legacy)}},
+    }
+
+    portfolio = make_portfolio()
+    assert [p.position_id for p in portfolio.get_positions_by_stock("000009")] == ["VP_000009_1"]
+    rows = DBStream(vp.VIRTUAL_POSITIONS_TABLE, str(tmp_path / "vp"))
+    assert rows["test/VP_000009_1"]["entry_price"] == 5.0
+
+    assert portfolio.clear_history() == 1
+    assert "test/VP_000009_1" not in rows
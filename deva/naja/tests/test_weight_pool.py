@@ -0,0 +1,82 @@
+"""
+WeightPool 环形缓冲局部活动度测试
+"""
+
+import numpy as np
+
+from deva.naja.market_hotspot.core.weight_pool import WeightPool
+
+
+def _reference_activity(prices, volumes, price_limit):
+    """原逐 symbol 列表实现"""
+    if len(prices) < 3:
+        return 0.0
+    prices_arr = np.array(prices)
+    volumes_arr = np.array(volumes)
+    normalized_prices = prices_arr / price_limit
+    price_volatility = np.std(normalized_prices) / (np.mean(np.abs(normalized_prices)) + 1e-6)
+    volume_ratio = volumes_arr[-1] / (np.mean(volumes_arr[:-1]) + 1e-6)
+    volume_anomaly = min(abs(volume_ratio - 1.0), 3.0) / 3.0
+    recent_trend = abs(np.mean(prices_arr[-3:]))
+    trend_strength = min(recent_trend / price_limit, 1.0)
+    activity = min(price_volatility, 1.0) * 0.4 + volume_anomaly * 0.3 + trend_strength * 0.3
+    return min(activity, 1.0)
+
+
+def _make_pool(symbols):
+    pool = WeightPool(max_symbols=len(symbols) + 4)
+    for symbol in symbols:
+        pool.register_symbol(symbol, ["block"])
+    return pool
+
+
+def test_local_activity_matches_reference():
+    rng = np.random.default_rng(0)
+    symbols = np.array(["sh600000", "sz000001", "bj830001", "688001", "300750", "usAAPL"])
+    pool = _make_pool(symbols)
+    history = {s: ([], []) for s in symbols}
+
+    for tick in range(25):
+        # 每个 tick 只更新部分 symbol，检验各自独立的环形写指针
+        present = symbols[rng.random(len(symbols)) < 0.8]
+        returns = rng.normal(0, 3, len(present)).astype(np.float32)
+        volumes = rng.uniform(1e4, 1e6, len(present)).astype(np.float32)
+        pool.update(present, returns, volumes, {"block": 0.5}, float(tick))
+
+        for i, s in enumerate(present):
+            prices, vols = history[s]
+            prices.append(float(returns[i]))
+            vols.append(float(volumes[i]))
+            del prices[:-pool._history_window]
+            del vols[:-pool._history_window]
+
+        for s in present:
+            idx = pool._symbol_to_idx[s]
+            expected = _reference_activity(*history[s], pool._get_price_limit(s))
+            assert abs(pool._local_activity[idx] - expected) < 1e-6
+
+
+def test_stale_symbols_are_evicted():
+    pool = _make_pool(["sh600000", "sz000001"])
+    pool.max_history_stale_seconds = 10.0
+    pool.update(np.array(["sh600000", "sz000001"]), np.ones(2), np.ones(2), {}, 0.0)
+
+    idx = pool._symbol_to_idx["sh600000"]
+    pool._last_seen[idx] -= 100.0
+    pool._cleanup_stale_history(pool._last_seen[idx] + 100.0)
+
+    assert pool._ring_count[idx] == 0
+    assert pool._ring_count[pool._symbol_to_idx["sz000001"]] == 1
+
+
+def test_state_round_trip_preserves_history_order():
+    pool = _make_pool(["sh600000"])
+    for value in range(1, 14):
+        pool.update(np.array(["sh600000"]), np.array([float(value)]), np.array([value * 10.0]), {}, 0.0)
+
+    state = pool.save_state()
+    assert state["price_history"]["sh600000"] == [float(v) for v in range(4, 14)]
+
+    restored = _make_pool(["sh600000"])
+    assert restored.load_state(state)
+    assert restored._get_history(0) == pool._get_history(0)
@@ -295,6 +295,98 @@ class SqliteDict(DictClass):
         if kwds:
             self.update(kwds)
 
+    def existing_keys(self, keys, chunk_size=500):
+        """返回 keys 中已存在于表里的键（保持传入时的原始对象）
+
+        每 chunk_size 个键一次带索引的 JOIN 查询，避免逐键 SELECT。
+        """
+        keys = list(keys)
+        found = []
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            values = ','.join('(?)' for _ in chunk)
+            GET_EXISTING = (
+                'WITH v(k) AS (VALUES %s) SELECT v.k FROM v JOIN "%s" ON "%s".key = v.k'
+                % (values, self.tablename, self.tablename)
+            )
+            found.extend(row[0] for row in self.conn.select(GET_EXISTING, tuple(chunk)))
+        return found
+
+    def delete_many(self, keys):
+        """批量删除键，不存在的键忽略"""
+        if self.flag == 'r':
+            raise RuntimeError('拒绝删除只读的SqliteDict')
+
+        DEL_ITEM = 'DELETE FROM "%s" WHERE key = ?' % self.tablename
+        self.conn.executemany(DEL_ITEM, [(key,) for key in keys])
+
+    def _ensure_numeric_key_index(self):
+        """为数值键建立表达式索引 (CAST(key AS REAL), key)，供范围查询使用"""
+        if getattr(self, '_numeric_key_indexed', False) or self.flag == 'r':
+            return
+        MAKE_INDEX = (
+            'CREATE INDEX IF NOT EXISTS "%s__numkey" ON "%s" (CAST(key AS REAL), key)'
+            % (self.tablename, self.tablename)
+        )
+        self.conn.execute(MAKE_INDEX)
+        self.conn.commit()
+        self._numeric_key_indexed = True
+
+    def _numeric_range_where(self, start, stop):
+        where, args = [], []
+        if start is None:
+            where.append('CAST(key AS REAL) > 0')
+        else:
+            where.append('CAST(key AS REAL) >= ?')
+            args.append(start)
+        if stop is not None:
+            where.append('CAST(key AS REAL) <= ?')
+            args.append(stop)
+        return where, args
+
+    def iter_numeric_range(self, start=None, stop=None, chunk_size=1000, with_values=False):
+        """按数值顺序遍历数值键在 [start, stop] 内的记录
+
+        start 为 None 时从最小的正数键开始。每块是一次独立的 LIMIT 查询
+        （按 (数值, key) 续查），不会把整个结果集缓冲在内存里。
+
+        Yields:
+            (number, key) 或 with_values=True 时 (number, key, value)
+        """
+        self._ensure_numeric_key_index()
+        where, args = self._numeric_range_where(start, stop)
+        columns = 'CAST(key AS REAL), key, value' if with_values else 'CAST(key AS REAL), key'
+        last = None
+        while True:
+            cond, cond_args = list(where), list(args)
+            if last is not None:
+                cond.append('(CAST(key AS REAL), key) > (?, ?)')
+                cond_args.extend(last)
+            GET_RANGE = 'SELECT %s FROM "%s" WHERE %s ORDER BY CAST(key AS REAL), key LIMIT ?' % (
+                columns, self.tablename, ' AND '.join(cond))
+            rows = list(self.conn.select(GET_RANGE, tuple(cond_args) + (chunk_size,)))
+            for row in rows:
+                try:
+                    float(row[1])
+                except (TypeError, ValueError):
+                    continue
+                if with_values:
+                    yield row[0], row[1], self.decode(row[2])
+                else:
+                    yield row[0], row[1]
+            if len(rows) < chunk_size:
+                return
+            last = (rows[-1][0], rows[-1][1])
+
+    def numeric_range_bounds(self, start=None, stop=None):
+        """返回数值键在 [start, stop] 内的 (最小值, 最大值, 数量)，无数据时为 (None, None, 0)"""
+        self._ensure_numeric_key_index()
+        where, args = self._numeric_range_where(start, stop)
+        GET_BOUNDS = 'SELECT MIN(CAST(key AS REAL)), MAX(CAST(key AS REAL)), COUNT(*) FROM "%s" WHERE %s' % (
+            self.tablename, ' AND '.join(where))
+        lo, hi, count = self.conn.select_one(GET_BOUNDS, tuple(args))
+        return lo, hi, count
+
     def __iter__(self):
         """返回键的迭代器"""
         return self.iterkeys()
@@ -409,6 +501,8 @@ class SqliteMultithread(Thread):
 
     """
 
+    fetch_size = 1000  # rows per response-queue chunk in select()
+
     def __init__(self, filename, autocommit, journal_mode):
         super(SqliteMultithread, self).__init__()
         self.filename = filename
@@ -470,38 +564,22 @@ class SqliteMultithread(Thread):
                     res.put('--no more--')
             else:
                 try:
-                    cursor.execute(req, arg)
+                    if req == '--executemany--':
+                        # the whole batch runs as one cursor.executemany call
+                        many_req, items = arg
+                        cursor.executemany(many_req, items)
+                    else:
+                        cursor.execute(req, arg)
                 except Exception as err:
-                    self.exception = (e_type, e_value, e_tb) = sys.exc_info()
-                    inner_stack = traceback.extract_stack()
-
-                    # An exception occurred in our thread, but we may not
-                    # immediately able to throw it in our calling thread, if it has
-                    # no return `res` queue: log as level ERROR both the inner and
-                    # outer exception immediately.
-                    #
-                    # Any iteration of res.get() or any next call will detect the
-                    # inner exception and re-raise it in the calling Thread; though
-                    # it may be confusing to see an exception for an unrelated
-                    # statement, an ERROR log statement from the 'sqlitedict.*'
-                    # namespace contains the original outer stack location.
-                    self.log.error('Inner exception:')
-                    for item in traceback.format_list(inner_stack):
-                        self.log.error(item)
-                    # deliniate traceback & exception w/blank line
-                    self.log.error('')
-                    for item in traceback.format_exception_only(e_type, e_value):
-                        self.log.error(item)
-
-                    self.log.error('')  # exception & outer stack w/blank line
-                    self.log.error('Outer stack:')
-                    for item in traceback.format_list(outer_stack):
-                        self.log.error(item)
-                    self.log.error('Exception will be re-raised at next call.')
+                    self._record_exception(outer_stack)
 
                 if res:
-                    for rec in cursor:
-                        res.put(rec)
+                    # stream rows back in fetchmany-sized chunks, one queue put per chunk
+                    while True:
+                        rows = cursor.fetchmany(self.fetch_size)
+                        if not rows:
+                            break
+                        res.put(rows)
                     res.put('--no more--')
 
                 if self.autocommit:
@@ -519,6 +597,34 @@ class SqliteMultithread(Thread):
             except Exception as e:
                 self.log.error(f'Error sending final response: {e}')
 
+    def _record_exception(self, outer_stack):
+        self.exception = (e_type, e_value, e_tb) = sys.exc_info()
+        inner_stack = traceback.extract_stack()
+
+        # An exception occurred in our thread, but we may not
+        # immediately able to throw it in our calling thread, if it has
+        # no return `res` queue: log as level ERROR both the inner and
+        # outer exception immediately.
+        #
+        # Any iteration of res.get() or any next call will detect the
+        # inner exception and re-raise it in the calling Thread; though
+        # it may be confusing to see an exception for an unrelated
+        # statement, an ERROR log statement from the 'sqlitedict.*'
+        # namespace contains the original outer stack location.
+        self.log.error('Inner exception:')
+        for item in traceback.format_list(inner_stack):
+            self.log.error(item)
+        # deliniate traceback & exception w/blank line
+        self.log.error('')
+        for item in traceback.format_exception_only(e_type, e_value):
+            self.log.error(item)
+
+        self.log.error('')  # exception & outer stack w/blank line
+        self.log.error('Outer stack:')
+        for item in traceback.format_list(outer_stack):
+            self.log.error(item)
+        self.log.error('Exception will be re-raised at next call.')
+
     def stop(self, timeout=5.0):
         """安全停止线程"""
         self._stop_requested = True
@@ -575,26 +681,35 @@ class SqliteMultithread(Thread):
         self.reqs.put((req, arg or tuple(), res, stack))
 
     def executemany(self, req, items):
-        for item in items:
-            self.execute(req, item)
+        """
+        Queue all `items` as a single request, executed with `cursor.executemany`.
+        """
+        items = list(items)
+        if not items:
+            return
+        self.execute('--executemany--', (req, items))
         self.check_raise_error()
 
     def select(self, req, arg=None):
         """
-        Unlike sqlite's native select, this select doesn't handle iteration efficiently.
+        Rows are produced in `fetch_size` chunks: the worker thread puts one list of
+        rows per `cursor.fetchmany` call into the response queue, so a scan costs one
+        queue round-trip per chunk instead of per row.
 
         The result of `select` starts filling up with values as soon as the
         request is dequeued, and although you can iterate over the result normally
-        (`for res in self.select(): ...`), the entire result will be in memory.
+        (`for res in self.select(): ...`), the result may be fully buffered in memory
+        if the consumer is slower than the worker.
         """
-        res = Queue()  # results of the select will appear as items in this queue
+        res = Queue()  # results of the select will appear as row chunks in this queue
         self.execute(req, arg, res)
         while True:
-            rec = res.get()
+            rows = res.get()
             self.check_raise_error()
-            if rec == '--no more--':
+            if rows == '--no more--':
                 break
-            yield rec
+            for rec in rows:
+                yield rec
 
     def select_one(self, req, arg=None):
         """Return only the first row of the SELECT, or None if there are no matching rows."""
@@ -0,0 +1,42 @@
+"""DBStream 写入吞吐基准：逐条提交 vs 写后合并提交
+
+用法:
+    python scripts/analysis/benchmark_dbstream_writes.py [--n 5000] [--maxsize 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from deva.core.store import DBStream
+
+
+def run(label, n, **kwargs):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBStream('bench', os.path.join(tmp, 'bench'), **kwargs)
+        start = time.perf_counter()
+        for i in range(n):
+            db.append({'price': 10.0 + i * 0.01, 'volume': i})
+        if db.write_behind:
+            db.flush()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<40} {n / elapsed:>12.0f} writes/s   rows={len(db)}")
+        db.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=5000)
+    parser.add_argument('--maxsize', type=int, default=2000)
+    args = parser.parse_args()
+
+    run('default', args.n)
+    run('write_behind', args.n, write_behind=True, flush_batch_size=1000)
+    run(f'default maxsize={args.maxsize}', args.n, maxsize=args.maxsize)
+    run(f'write_behind maxsize={args.maxsize}', args.n, maxsize=args.maxsize,
+        write_behind=True, flush_batch_size=1000)
+
+
+if __name__ == '__main__':
+    main()
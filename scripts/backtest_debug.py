@@ -30,13 +30,11 @@ def clear_data():
     except Exception as e:
         print(f"清空持仓失败: {e}")
 
-    from deva import NB
-    attr_db = NB("naja_bandit_attribution")
+    from deva.naja.bandit.attribution import get_attribution
     try:
-        keys = list(attr_db.keys())
-        for k in keys:
-            del attr_db[k]
-        print(f"✓ 清空归因数据: {len(keys)} 条")
+        # 同时清空按策略聚合与记录键索引，否则旧聚合会在清空后继续生效
+        count = get_attribution().clear()
+        print(f"✓ 清空归因数据: {count} 条")
     except Exception as e:
         print(f"清空归因数据失败: {e}")
 